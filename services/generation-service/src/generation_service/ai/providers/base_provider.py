@@ -13,6 +13,8 @@ from typing import TYPE_CHECKING, Any, Optional
 
 from pydantic import BaseModel
 
+from ...monitoring.prometheus_metrics import observe_llm_request
+
 # Import retry library
 try:
     from tenacity import (
@@ -611,7 +613,8 @@ class BaseProvider(ABC):
     def _create_metrics(
         self, tokens_used: int, generation_time: float, model_used: str
     ) -> dict[str, Any]:
-        """Create generation metrics"""
+        """Create generation metrics and record them for Prometheus"""
+        observe_llm_request(self.name, generation_time, tokens_used)
         return {
             "tokens_used": tokens_used,
             "generation_time_seconds": generation_time,
@@ -209,13 +209,9 @@ class OpenAIProvider(BaseProvider):
                     {
                         "request_id": request_id,
                         "created_at": utc_now(),
-                        "metadata": {
-                            "tokens_used": tokens_used,
-                            "generation_time_seconds": generation_time,
-                            "cost_estimate": self._calculate_cost(tokens_used),
-                            "model_used": self.model,
-                            "provider_used": self.name,
-                        },
+                        "metadata": self._create_metrics(
+                            tokens_used, generation_time, self.model
+                        ),
                     }
                 )
 
@@ -14,7 +14,10 @@ from generation_service.workflows.agents import (
     AgentCoordinator,
     AgentPriority,
 )
-from generation_service.workflows.feedback import FeedbackLearningEngine
+from generation_service.workflows.feedback import (
+    FeedbackLearningEngine,
+    get_feedback_learning_engine,
+)
 from generation_service.workflows.quality import QualityAssessor
 
 router = APIRouter(prefix="/api/v1/agents", tags=["Specialized Agents"])
@@ -122,8 +125,8 @@ async def get_quality_assessor() -> QualityAssessor:
 
 
 async def get_feedback_engine() -> FeedbackLearningEngine:
-    """Get feedback learning engine instance"""
-    return FeedbackLearningEngine()
+    """Get the shared feedback learning engine instance"""
+    return get_feedback_learning_engine()
 
 
 # Agent Analysis and Recommendations
@@ -228,6 +228,60 @@ async def get_generation_quality(
         )
 
 
+@router.post(
+    "/generate/{generation_id}/resume",
+    response_model=GenerationResponse,
+    summary="Resume Generation",
+    description="Resume an interrupted generation from its last completed node",
+)
+async def resume_generation(
+    generation_id: str, service: GenerationService = Depends(get_generation_service)
+) -> GenerationResponse:
+    """Resume an interrupted generation"""
+
+    try:
+        result = await service.resume_generation(generation_id)
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No checkpoint found for generation {generation_id}",
+            )
+        return result
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to resume generation: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to resume generation: {e!s}",
+        )
+
+
+@router.get(
+    "/resumable",
+    summary="List Resumable Generations",
+    description="Get interrupted generations that can be resumed from a checkpoint",
+)
+async def list_resumable_generations(
+    service: GenerationService = Depends(get_generation_service),
+) -> dict[str, list[dict[str, Any]]]:
+    """List resumable generations"""
+
+    try:
+        resumable = await service.list_resumable_generations()
+        return {"resumable_generations": resumable}
+
+    except Exception as e:
+        logger.error(f"Failed to list resumable generations: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to list resumable generations: {e!s}",
+        )
+
+
 @router.get(
     "/statistics/quality",
     summary="Get Service Quality Statistics",
@@ -1,13 +1,15 @@
 """
-FastAPI middleware for handling idempotency keys
+ASGI middleware for handling idempotency keys
 """
 
 import json
-from collections.abc import Callable
+from typing import Any, Optional
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ai_script_core.utils.asgi import read_body, replay_body, request_headers
 
 from ..cache.idempotency_cache import (
     IdempotencyConflictError,
@@ -23,19 +25,32 @@ except ImportError:
 
     logger = logging.getLogger(__name__)
 
+# Statuses whose responses are cached for replay
+CACHEABLE_STATUS_CODES = (200, 201, 202)
+
+# Response headers that are recomputed when a cached response is replayed
+_UNCACHED_HEADERS = {"content-length", "content-type"}
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware for handling idempotency keys
 
-class IdempotencyMiddleware(BaseHTTPMiddleware):
-    """FastAPI middleware for handling idempotency keys"""
+    Only requests with an applicable method, path and key are touched: their
+    body is read once for the comparison and replayed to the app, and the
+    response body is copied while it is forwarded so it can be cached. Event
+    streams are forwarded without being copied.
+    """
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         header_name: str = "Idempotency-Key",
         ttl_seconds: int = 24 * 3600,  # 24 hours
         methods: set = None,
         enabled_paths: set = None,
     ):
-        super().__init__(app)
+        self.app = app
         self.header_name = header_name
         self.ttl_seconds = ttl_seconds
         self.methods = methods or {"POST", "PUT", "PATCH"}
@@ -45,27 +60,32 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
             "/hybrid-script",
             "/custom-workflow",
         }
+        self._path_prefixes = tuple(self.enabled_paths)
         self.manager = get_redis_idempotency_manager()
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Handle idempotency for applicable requests"""
 
         # Only process applicable methods and paths
-        if request.method not in self.methods or not any(
-            request.url.path.startswith(path) for path in self.enabled_paths
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in self.methods
+            or not scope["path"].startswith(self._path_prefixes)
         ):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Extract idempotency key from headers
-        idempotency_key = request.headers.get(self.header_name)
+        idempotency_key = request_headers(scope).get(self.header_name.lower())
 
         if not idempotency_key:
             # No idempotency key provided - proceed normally
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Validate key format
         if not self._is_valid_key(idempotency_key):
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=400,
                 content={
                     "success": False,
@@ -75,9 +95,13 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
                     },
                 },
             )
+            await response(scope, receive, send)
+            return
 
-        # Get request body for comparison
-        request_body = await self._get_request_body(request)
+        # Get request body for comparison, then replay it to the app
+        body = await read_body(receive)
+        receive = replay_body(body, receive)
+        request_body = self._parse_body(body)
 
         try:
             # Check for existing response
@@ -107,11 +131,12 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
                 response.headers["Idempotency-Key"] = idempotency_key
                 response.headers["Idempotency-Replayed"] = "true"
 
-                return response
+                await response(scope, receive, send)
+                return
 
         except IdempotencyConflictError as e:
             logger.warning(f"Idempotency conflict for key {idempotency_key}: {e}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=409,
                 content={
                     "success": False,
@@ -121,39 +146,67 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
                     },
                 },
             )
+            await response(scope, receive, send)
+            return
 
         except Exception as e:
             logger.error(f"Error checking idempotency: {e}")
             # Continue without idempotency on errors
 
         # Store idempotency key in request state for endpoint to use
-        request.state.idempotency_key = idempotency_key
-        request.state.request_body = request_body
-
-        # Process request normally
-        response = await call_next(request)
-
-        # Cache successful responses
-        if response.status_code in [200, 201, 202] and hasattr(response, "body"):
-            try:
-                # Get response body
-                response_data = await self._get_response_body(response)
-
-                # Store in cache
-                self.manager.store_response(
-                    key=idempotency_key,
-                    status_code=response.status_code,
-                    response_data=response_data,
-                    headers=dict(response.headers),
-                    ttl_seconds=self.ttl_seconds,
-                )
-
-                logger.info(f"Cached response for idempotency key: {idempotency_key}")
+        state = scope.setdefault("state", {})
+        state["idempotency_key"] = idempotency_key
+        state["request_body"] = request_body
+
+        status_code = 0
+        response_headers: dict[str, str] = {}
+        chunks: Optional[list[bytes]] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, chunks
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if status_code in CACHEABLE_STATUS_CODES:
+                    response_headers.update(
+                        (name.decode("latin-1"), value.decode("latin-1"))
+                        for name, value in message.get("headers") or ()
+                    )
+                    content_type = response_headers.get("content-type", "")
+                    if not content_type.startswith("text/event-stream"):
+                        chunks = []
+            elif message["type"] == "http.response.body" and chunks is not None:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    # Cache successful responses
+                    self._cache_response(
+                        idempotency_key, status_code, b"".join(chunks), response_headers
+                    )
+                    chunks = None
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _cache_response(
+        self, key: str, status_code: int, body: bytes, headers: dict[str, str]
+    ) -> None:
+        """Store a completed response for replay"""
+        try:
+            self.manager.store_response(
+                key=key,
+                status_code=status_code,
+                response_data=self._parse_body(body),
+                headers={
+                    name: value
+                    for name, value in headers.items()
+                    if name not in _UNCACHED_HEADERS
+                },
+                ttl_seconds=self.ttl_seconds,
+            )
 
-            except Exception as e:
-                logger.error(f"Error caching idempotent response: {e}")
+            logger.info(f"Cached response for idempotency key: {key}")
 
-        return response
+        except Exception as e:
+            logger.error(f"Error caching idempotent response: {e}")
 
     def _is_valid_key(self, key: str) -> bool:
         """Validate idempotency key format"""
@@ -163,27 +216,14 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
             and key.replace("-", "").replace("_", "").isalnum()
         )
 
-    async def _get_request_body(self, request: Request) -> dict:
-        """Get request body for idempotency comparison"""
+    def _parse_body(self, body: bytes) -> Any:
+        """Parse a JSON request or response body, {} if empty or not JSON"""
         try:
-            body = await request.body()
             if body:
                 return json.loads(body.decode())
             return {}
         except Exception as e:
-            logger.debug(f"Error parsing request body: {e}")
-            return {}
-
-    async def _get_response_body(self, response: Response) -> dict:
-        """Get response body for caching"""
-        try:
-            if hasattr(response, "body"):
-                body = response.body
-                if isinstance(body, bytes):
-                    return json.loads(body.decode())
-            return {}
-        except Exception as e:
-            logger.debug(f"Error parsing response body: {e}")
+            logger.debug(f"Error parsing body: {e}")
             return {}
 
 
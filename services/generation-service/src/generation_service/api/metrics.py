@@ -10,6 +10,12 @@ from typing import Any, Dict
 from fastapi import APIRouter, Response, status
 from pydantic import BaseModel
 
+from generation_service.monitoring.loop_monitor import get_loop_monitor
+from generation_service.monitoring.prometheus_metrics import (
+    CONTENT_TYPE_LATEST,
+    observe_request,
+    render_metrics,
+)
 from generation_service.services.job_manager import get_job_manager
 
 router = APIRouter()
@@ -44,6 +50,11 @@ class MetricsResponse(BaseModel):
 )
 async def metrics():
     """Prometheus-compatible metrics endpoint"""
+    # Registry series of all workers when the core module is available
+    metrics_text = render_metrics()
+    if metrics_text is not None:
+        return Response(content=metrics_text, media_type=CONTENT_TYPE_LATEST)
+
     current_time = time.time()
     job_manager = get_job_manager()
 
@@ -144,6 +155,25 @@ async def metrics_json():
     )
 
 
+@router.get(
+    "/metrics/event-loop",
+    status_code=status.HTTP_200_OK,
+    summary="Event Loop Health",
+    description="Get event loop lag statistics and top blocking call sites",
+)
+async def event_loop_metrics(top: int = 10):
+    """Event loop lag histogram and blocking call sites of this worker"""
+    loop_monitor = get_loop_monitor()
+    if loop_monitor is None:
+        return {"running": False, "error": "Loop monitor not running"}
+
+    return {
+        "service": "generation-service",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        **loop_monitor.get_report(top),
+    }
+
+
 @router.get(
     "/readyz",
     status_code=status.HTTP_200_OK,
@@ -187,7 +217,10 @@ async def liveness_check():
     }
 
 
-def increment_request_counter(duration: float = 0.0):
+def increment_request_counter(
+    duration: float = 0.0, method: str = "GET", status_code: int = 200
+):
     """Increment request metrics (call this from middleware)"""
     _metrics["requests_total"] += 1
     _metrics["requests_duration_sum"] += duration
+    observe_request(method, status_code, duration)
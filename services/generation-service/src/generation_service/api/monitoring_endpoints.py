@@ -7,7 +7,7 @@ from datetime import datetime, timedelta
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from pydantic import BaseModel
 
 # Import Core Module components
@@ -146,6 +146,12 @@ class MonitoringAPI:
         self.router.add_api_route(
             "/metrics/summary", self.get_metrics_summary, methods=["GET"]
         )
+        self.router.add_api_route(
+            "/metrics/prometheus",
+            self.get_prometheus_metrics,
+            methods=["GET"],
+            response_class=Response,
+        )
 
         # Alert endpoints
         self.router.add_api_route(
@@ -313,6 +319,19 @@ class MonitoringAPI:
                 status_code=500, detail=f"Metrics retrieval failed: {e!s}"
             )
 
+    async def get_prometheus_metrics(self) -> Response:
+        """Get all workers' metrics in the Prometheus text format"""
+
+        from ..monitoring.prometheus_metrics import CONTENT_TYPE_LATEST, render_metrics
+
+        metrics_text = render_metrics()
+        if metrics_text is None:
+            raise HTTPException(
+                status_code=503, detail="Prometheus metrics not available"
+            )
+
+        return Response(content=metrics_text, media_type=CONTENT_TYPE_LATEST)
+
     async def get_current_metrics(self) -> dict[str, Any]:
         """Get current performance metrics"""
 
@@ -349,11 +368,7 @@ class MonitoringAPI:
             since = (utc_now() if CORE_AVAILABLE else datetime.now()) - timedelta(
                 hours=hours
             )
-            history = collector.get_metric_history(metric_name, since)
-
-            # Limit results
-            if len(history) > limit:
-                history = history[-limit:]
+            history = collector.get_metric_history(metric_name, since, limit=limit)
 
             formatted_history = [
                 {
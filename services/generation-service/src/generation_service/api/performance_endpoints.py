@@ -6,7 +6,11 @@ from datetime import datetime
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from ..logging.debug_tools import get_debug_tools, initialize_debug_tools
+from ..logging.performance_tracer import get_performance_tracer
 
 # Import Core Module components
 try:
@@ -88,6 +92,15 @@ class OptimizationResponse(BaseModel):
     timestamp: datetime
 
 
+class ProfileRequest(BaseModel):
+    """Sampling profiler run request"""
+
+    duration_seconds: float = Field(default=10.0, gt=0, le=120)
+    interval_ms: float = Field(default=5.0, ge=1, le=1000)
+    include_tasks: bool = True
+    top: int = Field(default=20, ge=1, le=200)
+
+
 class PerformanceAPI:
     """
     Performance management API endpoints
@@ -173,6 +186,21 @@ class PerformanceAPI:
             "/recommendations", self.get_optimization_recommendations, methods=["GET"]
         )
 
+        # Sampling profiler
+        self.router.add_api_route("/profile", self.run_profiler, methods=["POST"])
+        self.router.add_api_route("/profile", self.get_profile, methods=["GET"])
+        self.router.add_api_route(
+            "/profile/collapsed",
+            self.get_profile_collapsed,
+            methods=["GET"],
+            response_class=PlainTextResponse,
+        )
+
+        # Sampled traces
+        self.router.add_api_route(
+            "/traces/otlp", self.export_traces_otlp, methods=["GET"]
+        )
+
         # Configuration
         self.router.add_api_route(
             "/config", self.get_performance_config, methods=["GET"]
@@ -840,6 +868,69 @@ class PerformanceAPI:
 
         return opportunities
 
+    async def run_profiler(self, request: ProfileRequest) -> dict[str, Any]:
+        """Run the sampling profiler on this worker for a while"""
+
+        debug_tools = get_debug_tools() or initialize_debug_tools()
+
+        try:
+            profiler = await debug_tools.run_sampling_profiler(
+                request.duration_seconds,
+                interval=request.interval_ms / 1000,
+                include_tasks=request.include_tasks,
+            )
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e)) from e
+
+        return {
+            "timestamp": (utc_now() if CORE_AVAILABLE else datetime.now()).isoformat(),
+            "profile": profiler.report(request.top),
+        }
+
+    async def get_profile(self, top: int = 20) -> dict[str, Any]:
+        """Get the report of the last (or running) sampling profiler"""
+
+        debug_tools = get_debug_tools()
+        if not debug_tools or not debug_tools.sampling_profiler:
+            raise HTTPException(status_code=404, detail="No profile recorded")
+
+        return {
+            "timestamp": (utc_now() if CORE_AVAILABLE else datetime.now()).isoformat(),
+            "profile": debug_tools.sampling_profiler.report(top),
+        }
+
+    async def get_profile_collapsed(self, kind: str = "all") -> str:
+        """Get the last profile as collapsed stacks for flamegraph tools"""
+
+        debug_tools = get_debug_tools()
+        if not debug_tools or not debug_tools.sampling_profiler:
+            raise HTTPException(status_code=404, detail="No profile recorded")
+
+        try:
+            return debug_tools.sampling_profiler.collapsed(kind)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+    async def export_traces_otlp(
+        self, kind: str = "all", threshold_seconds: float = 5.0, limit: int = 100
+    ) -> dict[str, Any]:
+        """Export sampled traces (all, slow or error) as OTLP/JSON"""
+
+        tracer = get_performance_tracer()
+        if not tracer:
+            raise HTTPException(status_code=503, detail="Tracing not available")
+
+        if kind == "slow":
+            traces = tracer.find_slow_traces(threshold_seconds, limit)
+        elif kind == "error":
+            traces = tracer.find_error_traces(limit)
+        elif kind == "all":
+            traces = tracer.get_recent_traces(limit)
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown trace kind: {kind}")
+
+        return tracer.export_otlp([trace.trace_id for trace in traces])
+
     async def get_performance_config(self) -> dict[str, Any]:
         """Get current performance configuration"""
 
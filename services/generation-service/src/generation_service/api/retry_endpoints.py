@@ -4,9 +4,9 @@ API endpoints for retry queue management and progress monitoring
 
 from typing import Any, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
 
-from ..services.retry_queue import get_retry_queue
+from ..services.retry_queue import STATS_HORIZON_SECONDS, get_retry_queue
 from ..services.save_processors import (
     enqueue_generation_save,
 )
@@ -56,6 +56,32 @@ async def get_queue_stats() -> dict[str, Any]:
         )
 
 
+@router.get("/processors/stats")
+async def get_processor_stats(
+    window_seconds: float = Query(default=60.0, gt=0, le=STATS_HORIZON_SECONDS),
+) -> dict[str, Any]:
+    """Get per-job-type throughput, latency and concurrency report"""
+    try:
+        queue = get_retry_queue()
+        report = queue.get_processor_report(window_seconds)
+
+        if CORE_AVAILABLE:
+            return SuccessResponseDTO(
+                success=True,
+                message="Processor statistics retrieved successfully",
+                data=report,
+            )
+        else:
+            return {"success": True, "data": report}
+
+    except Exception as e:
+        logger.error(f"Failed to get processor stats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve processor statistics",
+        )
+
+
 @router.get("/job/{job_id}/status")
 async def get_job_status(job_id: str) -> dict[str, Any]:
     """Get status of a specific retry job"""
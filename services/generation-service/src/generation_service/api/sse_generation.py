@@ -7,13 +7,18 @@ import logging
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Request, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from ..models.sse_models import (
     GenerationJobRequest,
     GenerationJobResponse,
     GenerationJobStatus,
 )
+from ..services.generation_scheduler import (
+    GenerationPriority,
+    QueueFullError,
+    get_generation_scheduler,
+)
 from ..services.generation_service import GenerationService
 from ..services.job_manager import get_job_manager
 
@@ -39,28 +44,42 @@ def get_generation_service() -> GenerationService:
     status_code=status.HTTP_201_CREATED,
     summary="Start Script Generation",
     description="Start a new script generation job and return SSE endpoint",
+    responses={429: {"description": "Generation queue is full"}},
 )
-async def start_generation(
-    request: GenerationJobRequest, http_request: Request
-) -> GenerationJobResponse:
+async def start_generation(request: GenerationJobRequest, http_request: Request) -> Any:
     """
     Start a new script generation job
 
+    Jobs run on a bounded worker pool; when all workers are busy the job is
+    queued (see queuePosition/queueEtaSeconds). Returns 429 with Retry-After
+    once the queue is over capacity.
+
     Returns SSE endpoint URL for real-time updates
     """
     try:
         job_manager = get_job_manager()
+        scheduler = get_generation_scheduler()
+        tenant_id = http_request.headers.get("X-Tenant-ID") or "default"
+
+        # Admission control before any job state is created
+        scheduler.check_admission(tenant_id)
 
         # Create generation job
-        job = job_manager.create_job(request)
+        job = job_manager.create_job(request, tenant_id=tenant_id)
 
         # Build URLs
         base_url = str(http_request.base_url).rstrip("/")
         sse_url = f"{base_url}/api/v1/generations/{job.jobId}/events"
         cancel_url = f"{base_url}/api/v1/generations/{job.jobId}"
 
-        # Start generation in background
-        asyncio.create_task(execute_generation(job.jobId))
+        # Start generation on the worker pool (or queue it)
+        position = scheduler.submit(
+            job.jobId,
+            lambda: execute_generation(job.jobId),
+            tenant_id=tenant_id,
+            project_id=job.projectId,
+            priority=GenerationPriority(request.priority),
+        )
 
         response = GenerationJobResponse(
             jobId=job.jobId,
@@ -71,11 +90,24 @@ async def start_generation(
             episodeNumber=job.episodeNumber,
             title=job.title,
             estimatedDuration=job.estimatedDuration,
+            queuePosition=position,
+            queueEtaSeconds=job.queueEtaSeconds if position else None,
         )
 
-        logger.info(f"Started generation job: {job.jobId}")
+        logger.info(f"Started generation job: {job.jobId} (queue position: {position})")
         return response
 
+    except QueueFullError as e:
+        logger.warning(f"Rejected generation request: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={
+                "detail": str(e),
+                "errorCode": "GENERATION_QUEUE_FULL",
+                "retryAfter": e.retry_after,
+            },
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         logger.error(f"Failed to start generation: {e}")
         raise HTTPException(
@@ -155,8 +187,9 @@ async def cancel_generation(jobId: str) -> None:
     try:
         job_manager = get_job_manager()
 
-        # Cancel job (idempotent)
+        # Cancel job (idempotent) and release its queue slot or worker
         success = job_manager.cancel_job(jobId)
+        get_generation_scheduler().cancel(jobId)
 
         if success:
             logger.info(f"Canceled generation job: {jobId}")
@@ -204,6 +237,9 @@ async def get_generation_status(jobId: str) -> dict[str, Any]:
             "startedAt": job.startedAt.isoformat() if job.startedAt else None,
             "completedAt": job.completedAt.isoformat() if job.completedAt else None,
             "estimatedRemainingTime": job.get_estimated_remaining_time(),
+            "priority": job.priority,
+            "queuePosition": job.queuePosition,
+            "queueEtaSeconds": job.queueEtaSeconds,
             "errorCode": job.errorCode,
             "errorMessage": job.errorMessage,
             "episodeId": job.episodeId,
@@ -243,6 +279,7 @@ async def list_active_generations() -> dict[str, Any]:
                     "title": job.title,
                     "createdAt": job.createdAt.isoformat(),
                     "estimatedRemainingTime": job.get_estimated_remaining_time(),
+                    "queuePosition": job.queuePosition,
                 }
             )
 
@@ -269,6 +306,7 @@ async def get_generation_stats() -> dict[str, Any]:
 
         return {
             "job_statistics": stats,
+            "queue_statistics": get_generation_scheduler().get_stats(),
             "service_status": "healthy",
             "timestamp": asyncio.get_event_loop().time(),
         }
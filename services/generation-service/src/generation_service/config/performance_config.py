@@ -153,6 +153,11 @@ class LoggingConfig:
 
     # Structured logging
     max_log_entries: int = 10000
+    log_queue_size: int = 10000
+    log_batch_size: int = 256
+    log_flush_interval: float = 0.5
+    log_overflow_policy: str = "sample"  # "drop" or "sample"
+    log_pressure_sample_every: int = 10
 
     # Performance tracing
     tracing_enabled: bool = True
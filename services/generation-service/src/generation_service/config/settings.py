@@ -94,6 +94,17 @@ class Settings(BaseSettings):
         default=60.0, ge=1.0, le=300.0, description="AI API timeout in seconds"
     )
 
+    # Generation queue (admission control for SSE generation jobs)
+    generation_max_concurrent: int = Field(
+        default=5, ge=1, le=100, description="Maximum concurrently running generations"
+    )
+    generation_queue_size: int = Field(
+        default=100, ge=0, description="Maximum queued generations before 429"
+    )
+    generation_queue_per_tenant: int = Field(
+        default=20, ge=1, description="Maximum queued generations per tenant"
+    )
+
     # Monitoring and alerting
     monitoring_interval: float = Field(
         default=30.0, ge=1.0, description="Monitoring interval in seconds"
@@ -134,6 +145,16 @@ class Settings(BaseSettings):
         default=24, ge=1, le=168, description="Trace retention in hours"
     )
 
+    # Event loop health
+    loop_monitor_enabled: bool = Field(
+        default=True, description="Measure event loop lag and blocking calls"
+    )
+    loop_block_threshold: float = Field(
+        default=0.1,
+        gt=0.0,
+        description="Event loop lag in seconds reported as a blocking call",
+    )
+
     # AI Provider settings
     openai_api_key: Optional[str] = Field(default=None, description="OpenAI API key")
     anthropic_api_key: Optional[str] = Field(
@@ -163,6 +184,18 @@ class Settings(BaseSettings):
     rate_limit_requests: int = Field(
         default=1000, ge=10, description="Rate limit requests per hour"
     )
+    rate_limit_redis_url: Optional[str] = Field(
+        default=None,
+        description="Redis URL for rate limits shared by all workers (per worker if unset)",
+    )
+    rate_limit_tenant_header: Optional[str] = Field(
+        default=None,
+        description="Header identifying the tenant requests are rate limited per",
+    )
+    rate_limit_tenant_policies: dict[str, dict[str, float]] = Field(
+        default_factory=dict,
+        description='Per-tenant limits, e.g. {"acme": {"calls": 500, "period": 60}}',
+    )
 
     # Database settings (if needed)
     database_url: Optional[str] = Field(
@@ -172,11 +205,90 @@ class Settings(BaseSettings):
         default=5, ge=1, le=20, description="Database connection pool size"
     )
 
+    # Generation registry bounds
+    generation_registry_max_live: int = Field(
+        default=200, ge=1, description="Generations kept fully in memory"
+    )
+    generation_registry_ttl: float = Field(
+        default=300.0,
+        ge=0,
+        description="Seconds finished generations stay in memory before spilling",
+    )
+    generation_registry_max_summaries: int = Field(
+        default=10000, ge=1, description="Generation summaries kept in memory"
+    )
+    generation_spill_backend: str = Field(
+        default="disk",
+        pattern="^(disk|redis|none)$",
+        description="Where finished generations are spilled",
+    )
+    generation_spill_dir: str = Field(
+        default="./data/generations", description="Directory for disk spilling"
+    )
+
+    # Workflow checkpoints for crash-resume
+    checkpoint_enabled: bool = Field(
+        default=True, description="Persist workflow state after each node"
+    )
+    checkpoint_db_path: str = Field(
+        default="./data/checkpoints.sqlite3", description="SQLite checkpoint file"
+    )
+    checkpoint_retention_seconds: float = Field(
+        default=3600.0, ge=0, description="Seconds finished checkpoints are kept"
+    )
+
+    # Architect/stylist pipelining over the streamed structure
+    pipelined_generation_enabled: bool = Field(
+        default=False, description="Style scene outlines while the architect streams"
+    )
+    pipeline_max_concurrency: int = Field(
+        default=3, ge=1, description="Scene outlines styled at once"
+    )
+
+    # User feedback learning
+    feedback_db_path: Optional[str] = Field(
+        default="./data/feedback.sqlite3",
+        description="SQLite file for feedback and learned profiles (unset: memory)",
+    )
+    feedback_max_items: int = Field(
+        default=10000, ge=1, description="Feedback items kept for statistics"
+    )
+    feedback_half_life_days: float = Field(
+        default=30.0, gt=0, description="Age at which feedback counts half as much"
+    )
+
+    # Memoization of specialized agent results
+    agent_memo_enabled: bool = Field(
+        default=True, description="Reuse agent results for identical input"
+    )
+    agent_memo_backend: str = Field(
+        default="memory",
+        pattern="^(memory|redis)$",
+        description="Second tier behind the in-process agent result cache",
+    )
+    agent_memo_max_entries: int = Field(
+        default=512, ge=1, description="Agent results kept in process memory"
+    )
+    agent_memo_analysis_ttl: float = Field(
+        default=3600.0, gt=0, description="Seconds agent analyses are reused"
+    )
+    agent_memo_enhancement_ttl: float = Field(
+        default=86400.0, gt=0, description="Seconds agent enhancements are reused"
+    )
+
     # External service URLs
     project_service_url: str = Field(
         default="http://localhost:8001", description="Project service URL"
     )
 
+    # Write-behind batching of saves to the project service
+    save_batch_size: int = Field(
+        default=50, ge=1, le=500, description="Maximum saves per bulk request"
+    )
+    save_flush_interval: float = Field(
+        default=0.2, gt=0, description="Seconds to buffer saves before flushing"
+    )
+
     model_config = SettingsConfigDict(
         env_prefix="GEN_SERVICE_",
         case_sensitive=False,
@@ -279,6 +391,72 @@ class Settings(BaseSettings):
             "priority_timeout": 120.0,
         }
 
+    def get_generation_queue_config(self) -> dict[str, Any]:
+        """Get generation queue configuration"""
+        return {
+            "max_concurrent": self.generation_max_concurrent,
+            "max_queue_size": self.generation_queue_size,
+            "max_queued_per_tenant": self.generation_queue_per_tenant,
+            "default_job_duration": 60.0,
+        }
+
+    def get_generation_registry_config(self) -> dict[str, Any]:
+        """Get generation registry bounds and spill configuration"""
+        return {
+            "max_live": self.generation_registry_max_live,
+            "completed_ttl": self.generation_registry_ttl,
+            "max_summaries": self.generation_registry_max_summaries,
+            "summary_ttl": 86400.0,
+            "spill_backend": self.generation_spill_backend,
+            "spill_dir": self.generation_spill_dir,
+            "redis_url": self.redis_url,
+        }
+
+    def get_checkpoint_config(self) -> dict[str, Any]:
+        """Get workflow checkpoint configuration"""
+        return {
+            "enabled": self.checkpoint_enabled,
+            "db_path": self.checkpoint_db_path,
+            "retention_seconds": self.checkpoint_retention_seconds,
+            "max_age_seconds": 86400.0,
+        }
+
+    def get_pipeline_config(self) -> dict[str, Any]:
+        """Get architect/stylist pipelining configuration"""
+        return {
+            "enabled": self.pipelined_generation_enabled,
+            "max_concurrency": self.pipeline_max_concurrency,
+            "min_outline_chars": 200,
+        }
+
+    def get_feedback_config(self) -> dict[str, Any]:
+        """Get feedback learning configuration"""
+        return {
+            "db_path": self.feedback_db_path,
+            "max_feedback_items": self.feedback_max_items,
+            "preference_half_life_days": self.feedback_half_life_days,
+        }
+
+    def get_agent_memo_config(self) -> dict[str, Any]:
+        """Get agent result memoization configuration"""
+        return {
+            "enabled": self.agent_memo_enabled,
+            "backend": self.agent_memo_backend,
+            "max_entries": self.agent_memo_max_entries,
+            "analysis_ttl": self.agent_memo_analysis_ttl,
+            "enhancement_ttl": self.agent_memo_enhancement_ttl,
+            "redis_url": self.redis_url,
+        }
+
+    def get_save_batch_config(self) -> dict[str, Any]:
+        """Get project-service save batching configuration"""
+        return {
+            "max_batch_size": self.save_batch_size,
+            "flush_interval": self.save_flush_interval,
+            "request_timeout": 30.0,
+            "max_connections": 10,
+        }
+
     def get_resource_config(self) -> dict[str, Any]:
         """Get resource management configuration"""
         return {
@@ -301,6 +479,8 @@ class Settings(BaseSettings):
             "alerting_enabled": not self.is_testing,
             "alert_cooldown_seconds": self.alert_cooldown,
             "dashboard_enabled": self.dashboard_enabled,
+            "loop_monitor_enabled": self.loop_monitor_enabled,
+            "loop_block_threshold": self.loop_block_threshold,
         }
 
     def get_logging_config(self) -> dict[str, Any]:
@@ -313,6 +493,10 @@ class Settings(BaseSettings):
             "max_file_size": self.log_max_file_size,
             "backup_count": self.log_backup_count,
             "max_log_entries": 10000,
+            "log_queue_size": 10000,
+            "log_batch_size": 256,
+            "log_flush_interval": 0.5,
+            "log_overflow_policy": "sample",
             "tracing_enabled": self.tracing_enabled,
             "trace_sample_rate": self.trace_sample_rate,
             "trace_retention_hours": self.trace_retention_hours,
@@ -2,6 +2,7 @@
 Debug tools and utilities for development and troubleshooting
 """
 
+import asyncio
 import inspect
 import sys
 import time
@@ -11,6 +12,8 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Optional
 
+from .sampling_profiler import SamplingProfiler
+
 # Import Core Module components
 try:
     from ai_script_core import (
@@ -115,6 +118,10 @@ class DebugTools:
         self._original_trace_func = None
         self._trace_depth = 0
 
+        # Sampling profiler; the last one is kept for its report
+        self.profile_interval = self.config.get("profile_sample_interval", 0.005)
+        self.sampling_profiler: Optional[SamplingProfiler] = None
+
     def start_debug_session(self, session_id: Optional[str] = None) -> DebugSession:
         """Start new debug session"""
 
@@ -190,6 +197,53 @@ class DebugTools:
         sys.settrace(self._original_trace_func)
         self._trace_depth = 0
 
+    def start_sampling_profiler(
+        self, interval: Optional[float] = None, include_tasks: bool = True
+    ) -> SamplingProfiler:
+        """
+        Start a sampling profiler
+
+        Unlike call tracing this adds no per-call overhead, so it can be
+        switched on for a while on a production worker.
+        """
+
+        if self.sampling_profiler and self.sampling_profiler.running:
+            raise RuntimeError("Sampling profiler already running")
+
+        self.sampling_profiler = SamplingProfiler(
+            interval=interval or self.profile_interval, include_tasks=include_tasks
+        )
+        self.sampling_profiler.start()
+
+        logger.info(
+            f"Sampling profiler started (interval {self.sampling_profiler.interval}s)"
+        )
+        return self.sampling_profiler
+
+    def stop_sampling_profiler(self) -> Optional[SamplingProfiler]:
+        """Stop the running sampling profiler"""
+
+        profiler = self.sampling_profiler
+        if profiler and profiler.running:
+            profiler.stop()
+            logger.info(f"Sampling profiler stopped after {profiler.samples} samples")
+        return profiler
+
+    async def run_sampling_profiler(
+        self,
+        duration: float,
+        interval: Optional[float] = None,
+        include_tasks: bool = True,
+    ) -> SamplingProfiler:
+        """Profile the running worker for ``duration`` seconds"""
+
+        profiler = self.start_sampling_profiler(interval, include_tasks)
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            self.stop_sampling_profiler()
+        return profiler
+
     def add_breakpoint(self, identifier: str) -> None:
         """Add breakpoint for debugging"""
 
@@ -568,9 +622,15 @@ class DebugTools:
     def create_performance_summary(self) -> dict[str, Any]:
         """Create comprehensive performance summary"""
 
+        profiler = self.sampling_profiler
+
         return {
             "function_performance": self.get_function_performance_report(),
             "memory_usage": self.get_memory_usage_report(),
+            "sampling_profiler": {
+                "running": bool(profiler and profiler.running),
+                "samples": profiler.samples if profiler else 0,
+            },
             "debug_session": {
                 "active": self.current_session is not None,
                 "session_id": (
@@ -3,8 +3,11 @@ Performance tracing system for detailed execution analysis
 """
 
 import asyncio
+import random
+import time
 import uuid
-from collections import defaultdict
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict, deque
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -198,6 +201,201 @@ class Trace:
         }
 
 
+# OTLP span kinds; spans calling out of the service are clients
+_OTLP_SPAN_KINDS = {
+    SpanType.AI_API: 3,
+    SpanType.HTTP: 3,
+    SpanType.DATABASE: 3,
+    SpanType.CACHE: 3,
+}
+_OTLP_KIND_INTERNAL = 1
+_OTLP_STATUS_ERROR = 2
+
+
+def _otlp_id(value: str, length: int) -> str:
+    """Hex trace/span ID of ``length`` characters for a UUID string ID"""
+    try:
+        hex_id = uuid.UUID(value).hex
+    except ValueError:
+        hex_id = value.encode().hex()
+    return hex_id[:length].rjust(length, "0")
+
+
+def _otlp_time(timestamp: Optional[datetime]) -> str:
+    return str(int(timestamp.timestamp() * 1_000_000_000)) if timestamp else "0"
+
+
+def _otlp_attributes(values: dict[str, Any]) -> list[dict[str, Any]]:
+    attributes = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            otlp_value = {"boolValue": value}
+        elif isinstance(value, int):
+            otlp_value = {"intValue": str(value)}
+        elif isinstance(value, float):
+            otlp_value = {"doubleValue": value}
+        else:
+            otlp_value = {"stringValue": str(value)}
+        attributes.append({"key": key, "value": otlp_value})
+    return attributes
+
+
+def span_to_otlp(span: Span) -> dict[str, Any]:
+    """Span in the OTLP/JSON encoding"""
+    otlp_span = {
+        "traceId": _otlp_id(span.trace_id, 32),
+        "spanId": _otlp_id(span.span_id, 16),
+        "parentSpanId": (
+            _otlp_id(span.parent_span_id, 16) if span.parent_span_id else ""
+        ),
+        "name": span.operation_name,
+        "kind": _OTLP_SPAN_KINDS.get(span.span_type, _OTLP_KIND_INTERNAL),
+        "startTimeUnixNano": _otlp_time(span.start_time),
+        "endTimeUnixNano": _otlp_time(span.end_time or span.start_time),
+        "attributes": _otlp_attributes(
+            {"span.type": span.span_type.value, **span.metadata, **span.tags}
+        ),
+        "events": [
+            {
+                "timeUnixNano": _otlp_time(datetime.fromisoformat(log["timestamp"])),
+                "name": log["message"],
+                "attributes": _otlp_attributes(
+                    {k: v for k, v in log.items() if k not in ("timestamp", "message")}
+                ),
+            }
+            for log in span.logs
+        ],
+        "status": {},
+    }
+    if not span.success:
+        otlp_span["status"] = {"code": _OTLP_STATUS_ERROR, "message": span.error or ""}
+    return otlp_span
+
+
+# Upper bounds (seconds) of the duration buckets kept traces are indexed by
+TRACE_DURATION_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+
+class TraceStore:
+    """
+    Bounded store of sampled traces
+
+    Traces are indexed by error flag and duration bucket when added, so
+    slow and error queries read only the matching entries. Once full, the
+    oldest randomly sampled trace is evicted first; slow and error traces
+    are only evicted when nothing else is left.
+    """
+
+    def __init__(self, max_traces: int = 1000) -> None:
+        self.max_traces = max_traces
+        self._interesting: OrderedDict[str, Trace] = OrderedDict()
+        self._sampled: OrderedDict[str, Trace] = OrderedDict()
+        self._errors: OrderedDict[str, None] = OrderedDict()
+        self._buckets: list[dict[str, None]] = [{} for _ in TRACE_DURATION_BUCKETS]
+        self._bucket_of: dict[str, int] = {}
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._interesting) + len(self._sampled)
+
+    def __contains__(self, trace_id: str) -> bool:
+        return trace_id in self._interesting or trace_id in self._sampled
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        return self._interesting.get(trace_id) or self._sampled.get(trace_id)
+
+    def traces(self) -> list[Trace]:
+        return [*self._interesting.values(), *self._sampled.values()]
+
+    def add(self, trace: Trace, interesting: bool, has_error: bool) -> None:
+        trace_id = trace.trace_id
+        (self._interesting if interesting else self._sampled)[trace_id] = trace
+        if has_error:
+            self._errors[trace_id] = None
+        self._index_duration(trace)
+
+        while len(self) > self.max_traces:
+            oldest = next(iter(self._sampled or self._interesting))
+            self.remove(oldest)
+            self.evicted += 1
+
+    def reindex(self, trace: Trace, has_error: bool) -> None:
+        """Update the indexes of a stored trace after a late span finished"""
+        trace_id = trace.trace_id
+        if trace_id not in self:
+            return
+        if has_error:
+            self._errors[trace_id] = None
+            # A failed trace is no longer one to evict first
+            if trace_id in self._sampled:
+                self._interesting[trace_id] = self._sampled.pop(trace_id)
+        self._index_duration(trace)
+
+    def _index_duration(self, trace: Trace) -> None:
+        trace_id = trace.trace_id
+        bucket = bisect_left(TRACE_DURATION_BUCKETS, trace.total_duration or 0.0)
+        previous = self._bucket_of.get(trace_id)
+        if previous is not None:
+            self._buckets[previous].pop(trace_id, None)
+        self._buckets[bucket][trace_id] = None
+        self._bucket_of[trace_id] = bucket
+
+    def remove(self, trace_id: str) -> None:
+        self._interesting.pop(trace_id, None)
+        self._sampled.pop(trace_id, None)
+        self._errors.pop(trace_id, None)
+        bucket = self._bucket_of.pop(trace_id, None)
+        if bucket is not None:
+            self._buckets[bucket].pop(trace_id, None)
+
+    def remove_ended_before(self, cutoff: datetime) -> int:
+        """Drop traces that ended before ``cutoff``"""
+        # Late spans can move a stored trace's end, so scan every trace
+        expired = [
+            trace.trace_id
+            for trace in self.traces()
+            if trace.end_time and trace.end_time < cutoff
+        ]
+        for trace_id in expired:
+            self.remove(trace_id)
+        return len(expired)
+
+    def slowest(self, threshold_seconds: float, limit: int) -> list[Trace]:
+        """Traces longer than ``threshold_seconds``, slowest first"""
+        first_bucket = bisect_left(TRACE_DURATION_BUCKETS, threshold_seconds)
+        found: list[Trace] = []
+        # Every trace in a higher bucket is slower than any in a lower one
+        for bucket in range(len(TRACE_DURATION_BUCKETS) - 1, first_bucket - 1, -1):
+            for trace_id in self._buckets[bucket]:
+                trace = self.get(trace_id)
+                if trace and (trace.total_duration or 0.0) > threshold_seconds:
+                    found.append(trace)
+            if len(found) >= limit:
+                break
+        found.sort(key=lambda x: x.total_duration or 0, reverse=True)
+        return found[:limit]
+
+    def with_errors(self, limit: int) -> list[Trace]:
+        """Traces with failed spans, most recently completed first"""
+        found = []
+        for trace_id in reversed(self._errors):
+            trace = self.get(trace_id)
+            if trace:
+                found.append(trace)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "stored": len(self),
+            "interesting": len(self._interesting),
+            "sampled": len(self._sampled),
+            "errors": len(self._errors),
+            "evicted": self.evicted,
+        }
+
+
 class PerformanceTracer:
     """
     Distributed tracing system for performance analysis
@@ -208,7 +406,13 @@ class PerformanceTracer:
     - Performance bottleneck identification
     - Async operation tracing
     - Custom span attributes and logs
-    - Trace sampling and filtering
+    - Tail-based trace sampling
+
+    Sampling is decided when a trace completes: spans are buffered per
+    trace until ``decision_wait`` seconds after the root span finishes, so
+    late children are included, and then the trace is kept if it failed,
+    took at least ``slow_trace_threshold`` seconds, or was picked with
+    probability ``sample_rate``. Everything else is dropped.
     """
 
     def __init__(self, config: Optional[dict[str, Any]] = None) -> None:
@@ -216,15 +420,26 @@ class PerformanceTracer:
 
         # Tracing configuration
         self.enabled = self.config.get("enabled", True)
-        self.sample_rate = self.config.get(
-            "sample_rate", 1.0
-        )  # 100% sampling by default
+        self.sample_rate = self.config.get("sample_rate", 0.1)  # of normal traces
+        self.slow_trace_threshold = self.config.get("slow_trace_threshold", 5.0)
+        self.decision_wait = self.config.get("decision_wait", 2.0)
+        self.max_trace_seconds = self.config.get("max_trace_seconds", 600.0)
+        self.max_pending_traces = self.config.get("max_pending_traces", 10000)
         self.max_traces = self.config.get("max_traces", 1000)
         self.trace_retention_hours = self.config.get("trace_retention_hours", 24)
 
-        # Trace storage
-        self._traces: dict[str, Trace] = {}
+        # Traces in progress (with their start on the monotonic clock), the
+        # decision queue of completed ones, and the sampled traces
+        self._pending: dict[str, tuple[float, Trace]] = {}
+        self._completed: deque[tuple[float, str]] = deque()
+        self._store = TraceStore(self.max_traces)
         self._active_spans: dict[str, Span] = {}
+        self.sampling_stats = {
+            "kept_error": 0,
+            "kept_slow": 0,
+            "kept_sampled": 0,
+            "dropped": 0,
+        }
 
         # Current context (thread-local alternative)
         self._current_context: Optional[TraceContext] = None
@@ -243,7 +458,7 @@ class PerformanceTracer:
         )
 
         # Background cleanup
-        self._cleanup_task: asyncio.Optional[Task] = None
+        self._cleanup_task: Optional[asyncio.Task[None]] = None
         self._tracing_enabled = False
 
     async def start_tracing(self) -> None:
@@ -276,7 +491,7 @@ class PerformanceTracer:
     ) -> Optional[TraceContext]:
         """Create new trace"""
 
-        if not self.enabled or not self._should_sample():
+        if not self.enabled:
             return None
 
         trace_id = str(uuid.uuid4())
@@ -296,9 +511,13 @@ class PerformanceTracer:
         trace = Trace(trace_id=trace_id, root_span_id=span_id)
         trace.add_span(root_span)
 
-        # Store trace and span
-        self._traces[trace_id] = trace
+        # Buffer trace until it completes
+        self._pending[trace_id] = (time.monotonic(), trace)
         self._active_spans[span_id] = root_span
+        if len(self._pending) > self.max_pending_traces:
+            # Decide on the oldest trace with the spans it has so far
+            oldest_id = next(iter(self._pending))
+            self._decide(self._pending.pop(oldest_id)[1])
 
         # Create context
         context = TraceContext(trace_id=trace_id, parent_span_id=span_id)
@@ -336,9 +555,10 @@ class PerformanceTracer:
             tags=tags or {},
         )
 
-        # Add to trace
-        if trace_context.trace_id in self._traces:
-            self._traces[trace_context.trace_id].add_span(span)
+        # Add to trace; spans of dropped traces are not kept
+        trace = self._find_trace(trace_context.trace_id)
+        if trace:
+            trace.add_span(span)
 
         self._active_spans[span_id] = span
 
@@ -360,8 +580,66 @@ class PerformanceTracer:
         # Update statistics
         self._update_span_statistics(span)
 
+        # Update trace timing; a finished root span completes the trace
+        now = time.monotonic()
+        trace = self._find_trace(span.trace_id)
+        if trace:
+            trace.add_span(span)
+            if span.trace_id not in self._pending:
+                # Already decided on: keep the store's indexes in step
+                self._store.reindex(trace, has_error=not span.success)
+            elif span.span_id == trace.root_span_id:
+                self._completed.append((now + self.decision_wait, span.trace_id))
+
+        self._flush_decisions(now)
+
         logger.debug(f"Finished span: {span.span_id}, duration: {span.duration:.3f}s")
 
+    def _find_trace(self, trace_id: str) -> Optional[Trace]:
+        pending = self._pending.get(trace_id)
+        return pending[1] if pending else self._store.get(trace_id)
+
+    def _flush_decisions(self, now: Optional[float] = None) -> None:
+        """Decide on traces whose decision wait or maximum duration is over"""
+
+        now = time.monotonic() if now is None else now
+
+        completed = self._completed
+        while completed and completed[0][0] <= now:
+            pending = self._pending.pop(completed.popleft()[1], None)
+            if pending:
+                self._decide(pending[1])
+
+        # Traces whose root span never finished
+        horizon = now - self.max_trace_seconds
+        while self._pending:
+            trace_id, (started, trace) = next(iter(self._pending.items()))
+            if started > horizon:
+                break
+            del self._pending[trace_id]
+            self._decide(trace)
+
+    def _decide(self, trace: Trace) -> None:
+        """Keep a completed trace if it failed, was slow, or is sampled"""
+
+        has_error = any(not span.success for span in trace.spans.values())
+        duration = trace.total_duration or 0.0
+
+        if has_error:
+            reason = "kept_error"
+        elif duration >= self.slow_trace_threshold:
+            reason = "kept_slow"
+        elif self._should_sample():
+            reason = "kept_sampled"
+        else:
+            self.sampling_stats["dropped"] += 1
+            return
+
+        self.sampling_stats[reason] += 1
+        self._store.add(
+            trace, interesting=reason != "kept_sampled", has_error=has_error
+        )
+
     def _update_span_statistics(self, span: Span) -> None:
         """Update span statistics for analysis"""
 
@@ -409,44 +687,26 @@ class PerformanceTracer:
         return previous
 
     def _should_sample(self) -> bool:
-        """Check if trace should be sampled"""
-        import random
-
+        """Check if a normal trace should be sampled"""
         return random.random() < self.sample_rate
 
     async def _cleanup_worker(self) -> None:
-        """Background worker for cleaning old traces"""
+        """Background worker deciding on completed traces and expiring old ones"""
 
         while self._tracing_enabled:
             try:
-                await asyncio.sleep(3600)  # Cleanup every hour
+                await asyncio.sleep(self.decision_wait)
+
+                self._flush_decisions()
 
                 cutoff_time = (
                     utc_now() if CORE_AVAILABLE else datetime.now()
                 ) - timedelta(hours=self.trace_retention_hours)
 
                 # Remove old traces
-                to_remove = []
-                for trace_id, trace in self._traces.items():
-                    if trace.end_time and trace.end_time < cutoff_time:
-                        to_remove.append(trace_id)
-
-                for trace_id in to_remove:
-                    del self._traces[trace_id]
-
-                # Trim if still too many traces
-                if len(self._traces) > self.max_traces:
-                    # Keep most recent traces
-                    sorted_traces = sorted(
-                        self._traces.items(),
-                        key=lambda x: x[1].end_time or datetime.min,
-                        reverse=True,
-                    )
-
-                    self._traces = dict(sorted_traces[: self.max_traces])
-
-                if to_remove:
-                    logger.debug(f"Cleaned up {len(to_remove)} old traces")
+                removed = self._store.remove_ended_before(cutoff_time)
+                if removed:
+                    logger.debug(f"Cleaned up {removed} old traces")
 
             except asyncio.CancelledError:
                 break
@@ -454,14 +714,14 @@ class PerformanceTracer:
                 logger.error(f"Trace cleanup worker error: {e}")
 
     def get_trace(self, trace_id: str) -> Optional[Trace]:
-        """Get trace by ID"""
-        return self._traces.get(trace_id)
+        """Get trace by ID, sampled or still in progress"""
+        return self._find_trace(trace_id)
 
     def get_recent_traces(self, count: int = 100) -> list[Trace]:
         """Get recent traces"""
 
         sorted_traces = sorted(
-            self._traces.values(),
+            self._store.traces(),
             key=lambda x: x.start_time or datetime.min,
             reverse=True,
         )
@@ -472,8 +732,10 @@ class PerformanceTracer:
         """Get performance analysis from traces"""
 
         analysis = {
-            "total_traces": len(self._traces),
+            "total_traces": len(self._store),
+            "pending_traces": len(self._pending),
             "active_spans": len(self._active_spans),
+            "sampling": {**self.sampling_stats, **self._store.stats()},
             "operations": {},
         }
 
@@ -512,48 +774,68 @@ class PerformanceTracer:
         self, threshold_seconds: float = 5.0, limit: int = 10
     ) -> list[Trace]:
         """Find traces that exceed duration threshold"""
-
-        slow_traces = [
-            trace
-            for trace in self._traces.values()
-            if trace.total_duration and trace.total_duration > threshold_seconds
-        ]
-
-        # Sort by duration (slowest first)
-        slow_traces.sort(key=lambda x: x.total_duration or 0, reverse=True)
-
-        return slow_traces[:limit]
+        return self._store.slowest(threshold_seconds, limit)
 
     def find_error_traces(self, limit: int = 10) -> list[Trace]:
-        """Find traces with errors"""
+        """Find traces with errors, most recent first"""
+        return self._store.with_errors(limit)
 
-        error_traces = []
+    def export_otlp(self, trace_ids: Optional[list[str]] = None) -> dict[str, Any]:
+        """Export sampled traces as an OTLP/JSON ``ExportTraceServiceRequest``"""
 
-        for trace in self._traces.values():
-            has_error = any(not span.success for span in trace.spans.values())
-            if has_error:
-                error_traces.append(trace)
-
-        # Sort by most recent
-        error_traces.sort(key=lambda x: x.start_time or datetime.min, reverse=True)
+        if trace_ids:
+            traces = [
+                trace for trace in map(self._store.get, trace_ids) if trace is not None
+            ]
+        else:
+            traces = self._store.traces()
 
-        return error_traces[:limit]
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {"service.name": "generation-service"}
+                        )
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [
+                                span_to_otlp(span)
+                                for trace in traces
+                                for span in trace.spans.values()
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
 
     def export_traces(
-        self, file_path: str, trace_ids: Optional[list[str]] = None
+        self,
+        file_path: str,
+        trace_ids: Optional[list[str]] = None,
+        format_type: str = "json",
     ) -> None:
-        """Export traces to JSON file"""
+        """Export traces to JSON file, natively or as OTLP/JSON"""
 
         import json
 
+        if format_type == "otlp":
+            with open(file_path, "w") as f:
+                json.dump(self.export_otlp(trace_ids), f)
+            logger.info(f"Exported traces as OTLP to {file_path}")
+            return
+
         if trace_ids:
             traces_to_export = [
-                self._traces[trace_id].to_dict()
-                for trace_id in trace_ids
-                if trace_id in self._traces
+                trace.to_dict()
+                for trace in map(self._store.get, trace_ids)
+                if trace is not None
             ]
         else:
-            traces_to_export = [trace.to_dict() for trace in self._traces.values()]
+            traces_to_export = [trace.to_dict() for trace in self._store.traces()]
 
         with open(file_path, "w") as f:
             json.dump(
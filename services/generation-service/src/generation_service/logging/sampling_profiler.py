@@ -0,0 +1,245 @@
+"""
+Statistical sampling profiler for live workers
+
+A background thread wakes up every ``interval`` seconds and records the
+stack of every other thread and, optionally, of every asyncio task of the
+worker's event loop. Nothing is hooked into the profiled code, so the cost
+is one stack walk per thread and task per sample, independent of how many
+calls the application makes.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from types import CodeType, FrameType
+from typing import Any, Optional
+
+try:
+    from ai_script_core import get_service_logger
+
+    logger = get_service_logger("generation-service.sampling_profiler")
+except (ImportError, RuntimeError):
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+Stack = tuple[str, ...]
+
+# Root frames of the two kinds of stacks in a profile
+TASKS_ROOT = "asyncio-tasks"
+THREAD_ROOT_PREFIX = "thread:"
+
+
+def _coroutine_frames(coro: Any) -> Iterator[FrameType]:
+    """Frames of a suspended coroutine chain, outermost first"""
+    while coro is not None:
+        frame = (
+            getattr(coro, "cr_frame", None)
+            or getattr(coro, "gi_frame", None)
+            or getattr(coro, "ag_frame", None)
+        )
+        if frame is None:
+            return
+        yield frame
+        coro = (
+            getattr(coro, "cr_await", None)
+            or getattr(coro, "gi_yieldfrom", None)
+            or getattr(coro, "ag_await", None)
+        )
+
+
+class SamplingProfiler:
+    """
+    Sampling profiler aggregating thread and asyncio task stacks
+
+    Thread stacks show where threads (the event loop's included) spend CPU
+    time; task stacks show where coroutines are suspended, i.e. what the
+    worker is waiting on. Stacks are folded per function, and the two kinds
+    are counted separately so a report can show either.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        max_depth: int = 64,
+        include_tasks: bool = True,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        self.interval = interval
+        self.max_depth = max_depth
+        self.include_tasks = include_tasks
+        self.loop = loop
+
+        self.thread_stacks: Counter[Stack] = Counter()
+        self.task_stacks: Counter[Stack] = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+
+        self._labels: dict[CodeType, str] = {}
+        # Guards the counters against reads from request handlers
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.stopped_at or time.monotonic()) - self.started_at
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread"""
+
+        if self.running:
+            return
+
+        if self.loop is None and self.include_tasks:
+            try:
+                self.loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.loop = None
+
+        self._stop_event.clear()
+        self.started_at = time.monotonic()
+        self.stopped_at = None
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread"""
+
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.stopped_at = time.monotonic()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample(exclude_thread=own_id)
+            except Exception as e:
+                logger.debug(f"Profiler sample failed: {e}")
+
+    def sample(self, exclude_thread: Optional[int] = None) -> None:
+        """Record the current stack of every thread and task once"""
+
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        thread_stacks = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == exclude_thread:
+                continue
+            root = THREAD_ROOT_PREFIX + thread_names.get(thread_id, str(thread_id))
+            thread_stacks.append(self._stack(root, self._walk_back(frame)))
+
+        task_stacks = []
+        if self.include_tasks and self.loop is not None and not self.loop.is_closed():
+            # all_tasks() retries itself if the loop changes the task set
+            for task in asyncio.all_tasks(self.loop):
+                frames = list(_coroutine_frames(task.get_coro()))
+                if frames:
+                    task_stacks.append(self._stack(TASKS_ROOT, frames))
+
+        with self._lock:
+            self.thread_stacks.update(thread_stacks)
+            self.task_stacks.update(task_stacks)
+            self.samples += 1
+
+    def _walk_back(self, frame: Optional[FrameType]) -> list[FrameType]:
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+        return frames
+
+    def _stack(self, root: str, frames: list[FrameType]) -> Stack:
+        """Fold frames (outermost first) into a stack of function labels"""
+        if len(frames) > self.max_depth:
+            # Keep the innermost frames, where the time is spent
+            frames = frames[-self.max_depth :]
+        labels = self._labels
+        stack = [root]
+        for frame in frames:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                label = labels[code] = self._label(code)
+            stack.append(label)
+        return tuple(stack)
+
+    @staticmethod
+    def _label(code: CodeType) -> str:
+        path = code.co_filename.replace(os.sep, "/").rsplit("/", 2)
+        return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+    def _stacks(self, kind: str) -> Counter[Stack]:
+        """Copy of the counters for ``kind``, safe to iterate while sampling"""
+        if kind not in ("threads", "tasks", "all"):
+            raise ValueError(f"Unknown stack kind: {kind}")
+        with self._lock:
+            if kind == "threads":
+                return Counter(self.thread_stacks)
+            if kind == "tasks":
+                return Counter(self.task_stacks)
+            return self.thread_stacks + self.task_stacks
+
+    def collapsed(self, kind: str = "all") -> str:
+        """Stacks in the collapsed format read by flamegraph tools"""
+        lines = [
+            f"{';'.join(stack)} {count}"
+            for stack, count in sorted(self._stacks(kind).items())
+        ]
+        return "\n".join(lines)
+
+    def top(self, count: int = 20, kind: str = "threads") -> list[dict[str, Any]]:
+        """Functions with the most self time, with their cumulative time"""
+
+        stacks = self._stacks(kind)
+        sample_count = max(self.samples, 1)
+        self_samples: Counter[str] = Counter()
+        total_samples: Counter[str] = Counter()
+        for stack, samples in stacks.items():
+            frames = stack[1:]
+            if not frames:
+                continue
+            self_samples[frames[-1]] += samples
+            for label in set(frames):
+                total_samples[label] += samples
+
+        return [
+            {
+                "function": label,
+                "self_samples": samples,
+                "self_percent": round(samples * 100 / sample_count, 2),
+                "total_samples": total_samples[label],
+                "total_percent": round(total_samples[label] * 100 / sample_count, 2),
+                "self_seconds": round(samples * self.interval, 4),
+            }
+            for label, samples in self_samples.most_common(count)
+        ]
+
+    def report(self, top: int = 20) -> dict[str, Any]:
+        """Summary of the profile with top-N tables for both stack kinds"""
+        return {
+            "samples": self.samples,
+            "duration_seconds": round(self.duration, 3),
+            "interval_seconds": self.interval,
+            "running": self.running,
+            "top_threads": self.top(top, "threads"),
+            "top_tasks": self.top(top, "tasks") if self.include_tasks else [],
+        }
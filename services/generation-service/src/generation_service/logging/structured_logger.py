@@ -8,11 +8,26 @@ import logging
 import logging.handlers
 import time
 import traceback
+from collections import deque
 from collections.abc import Callable
-from dataclasses import asdict, dataclass, field
+from contextvars import ContextVar, Token
+from dataclasses import asdict, dataclass, field, fields, replace
 from datetime import datetime
 from enum import Enum
-from typing import Any, Optional
+from itertools import groupby
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+
+    def _dumps(data: Any) -> str:
+        return orjson.dumps(data, default=str).decode()
+
+except ImportError:
+
+    def _dumps(data: Any) -> str:
+        return json.dumps(data, default=str)
+
 
 # Import Core Module components
 try:
@@ -75,6 +90,15 @@ class LogLevel(str, Enum):
     CRITICAL = "critical"
 
 
+LEVEL_PRIORITIES = {
+    LogLevel.DEBUG: 1,
+    LogLevel.INFO: 2,
+    LogLevel.WARNING: 3,
+    LogLevel.ERROR: 4,
+    LogLevel.CRITICAL: 5,
+}
+
+
 @dataclass
 class LogContext:
     """Logging context with request/session tracking"""
@@ -92,6 +116,20 @@ class LogContext:
         return {k: v for k, v in asdict(self).items() if v is not None}
 
 
+CONTEXT_FIELDS = tuple(f.name for f in fields(LogContext))
+
+# Context of the current task; each request or workflow task sees its own
+# copy, so concurrent requests cannot overwrite each other's context
+_log_context: ContextVar[Optional[LogContext]] = ContextVar(
+    "structured_log_context", default=None
+)
+
+
+def get_log_context() -> LogContext:
+    """Logging context of the current task"""
+    return _log_context.get() or LogContext()
+
+
 @dataclass
 class LogEntry:
     """Structured log entry"""
@@ -102,9 +140,20 @@ class LogEntry:
     component: str
     context: LogContext
     extra_data: dict[str, Any] = field(default_factory=dict)
-    exception: Optional[str] = None
+    # An exception is kept as is and only formatted when the entry is read
+    exception: Optional[Union[str, BaseException]] = None
     performance_data: Optional[dict[str, Any]] = None
 
+    @property
+    def exception_text(self) -> Optional[str]:
+        """Formatted traceback of the logged exception"""
+        if isinstance(self.exception, BaseException):
+            exc = self.exception
+            self.exception = "".join(
+                traceback.format_exception(type(exc), exc, exc.__traceback__)
+            )
+        return self.exception
+
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for serialization"""
         data = {
@@ -119,7 +168,7 @@ class LogEntry:
             data["extra"] = self.extra_data
 
         if self.exception:
-            data["exception"] = self.exception
+            data["exception"] = self.exception_text
 
         if self.performance_data:
             data["performance"] = self.performance_data
@@ -127,6 +176,99 @@ class LogEntry:
         return data
 
 
+class LogTail:
+    """
+    Bounded in-memory tail of recent log entries
+
+    Entries are indexed by level and context values as they are added; the
+    index lists are kept in insertion order, so evicting the oldest entry
+    only pops the front of its own lists. Each entry's lowercased search
+    text is computed once, when it is added.
+    """
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self._entries: deque[tuple[int, LogEntry, str]] = deque()
+        self._index: dict[tuple[str, Any], deque[int]] = {}
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _keys(entry: LogEntry) -> list[tuple[str, Any]]:
+        keys: list[tuple[str, Any]] = [("level", entry.level)]
+        context = entry.context
+        for name in CONTEXT_FIELDS:
+            value = getattr(context, name)
+            if value is not None:
+                keys.append((name, value))
+        return keys
+
+    def add(self, entry: LogEntry) -> None:
+        seq = self._next_seq
+        self._next_seq += 1
+        search_text = f"{entry.message}\n{entry.extra_data}".lower()
+        self._entries.append((seq, entry, search_text))
+        for key in self._keys(entry):
+            self._index.setdefault(key, deque()).append(seq)
+
+        if len(self._entries) > self.max_entries:
+            old_seq, old_entry, _ = self._entries.popleft()
+            for key in self._keys(old_entry):
+                seqs = self._index[key]
+                if seqs and seqs[0] == old_seq:
+                    seqs.popleft()
+                if not seqs:
+                    del self._index[key]
+
+    def _get(self, seq: int) -> LogEntry:
+        return self._entries[seq - self._entries[0][0]][1]
+
+    def entries(self) -> list[LogEntry]:
+        return [entry for _, entry, _ in self._entries]
+
+    def recent(self, count: int, level: Optional[LogLevel] = None) -> list[LogEntry]:
+        if level is None:
+            start = max(0, len(self._entries) - count)
+            return [self._entries[i][1] for i in range(start, len(self._entries))]
+        seqs = list(self._index.get(("level", level), ()))[-count:]
+        return [self._get(seq) for seq in seqs]
+
+    def search(self, query: str, max_results: int) -> list[LogEntry]:
+        query_lower = query.lower()
+        results = []
+        for _, entry, search_text in self._entries:
+            if query_lower in search_text:
+                results.append(entry)
+                if len(results) >= max_results:
+                    break
+        return results
+
+    def by_context(self, **filters: Any) -> list[LogEntry]:
+        indexed = [
+            (name, value) for name, value in filters.items() if value is not None
+        ]
+        if not indexed:
+            return [
+                entry
+                for _, entry, _ in self._entries
+                if all(getattr(entry.context, k, None) is None for k in filters)
+            ]
+
+        # Walk the shortest index list and check the other filters
+        candidates = min((self._index.get(key, ()) for key in indexed), key=len)
+        return [
+            entry
+            for entry in map(self._get, candidates)
+            if all(getattr(entry.context, k, None) == v for k, v in filters.items())
+        ]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._index.clear()
+
+
 class StructuredLogger:
     """
     Structured logging system with performance tracking and debugging support
@@ -155,12 +297,9 @@ class StructuredLogger:
         )  # 100MB
         self.backup_count = self.config.get("backup_count", 5)
 
-        # Structured logging storage
-        self._log_entries: list[LogEntry] = []
+        # Indexed tail of recent entries, served to queries
         self.max_entries = self.config.get("max_log_entries", 10000)
-
-        # Current context
-        self._current_context = LogContext()
+        self._tail = LogTail(self.max_entries)
 
         # Performance tracking
         self._performance_timers: dict[str, float] = {}
@@ -171,21 +310,40 @@ class StructuredLogger:
         # Initialize loggers
         self._setup_loggers()
 
-        # Log buffer for async processing
-        self._log_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        # Bounded buffer drained in batches by the background writer. Once
+        # it is full new entries are dropped; with the "sample" policy only
+        # one in ``pressure_sample_every`` entries below WARNING is kept
+        # while it is more than ``pressure_threshold`` full.
+        self.queue_size = self.config.get("log_queue_size", 10000)
+        self.batch_size = self.config.get("log_batch_size", 256)
+        self.flush_interval = self.config.get("log_flush_interval", 0.5)
+        self.overflow_policy = self.config.get("log_overflow_policy", "sample")
+        self.pressure_sample_every = self.config.get("log_pressure_sample_every", 10)
+        self.pressure_threshold = int(self.queue_size * 0.8)
+        self._pending: deque[LogEntry] = deque()
+        self._pending_event: Optional[asyncio.Event] = None
         self._log_processor_task: asyncio.Task[None] | None = None
         self._logging_enabled = False
+        self._pressure_seen = 0
+        self.pipeline_stats = {
+            "written": 0,
+            "batches": 0,
+            "dropped": 0,
+            "sampled_out": 0,
+        }
 
     def _setup_loggers(self) -> None:
         """Setup underlying loggers"""
 
-        # Create structured logger
+        # Create structured logger; records carry batches of entries that
+        # are already serialized as JSON lines
         self.logger = logging.getLogger(f"{self.component_name}.structured")
         self.logger.setLevel(getattr(logging, self.log_level.value.upper()))
+        formatter = logging.Formatter("%(message)s")
 
-        # Console handler with JSON formatting
+        # Console handler
         console_handler = logging.StreamHandler()
-        console_handler.setFormatter(self._get_json_formatter())
+        console_handler.setFormatter(formatter)
         self.logger.addHandler(console_handler)
 
         # File handler if configured
@@ -195,37 +353,12 @@ class StructuredLogger:
                 maxBytes=self.max_file_size,
                 backupCount=self.backup_count,
             )
-            file_handler.setFormatter(self._get_json_formatter())
+            file_handler.setFormatter(formatter)
             self.logger.addHandler(file_handler)
 
         # Prevent duplicate logs
         self.logger.propagate = False
 
-    def _get_json_formatter(self) -> logging.Formatter:
-        """Get JSON formatter for structured logging"""
-
-        class JSONFormatter(logging.Formatter):
-            def format(self, record: logging.LogRecord) -> str:
-                # Extract structured data if available
-                log_data = {
-                    "timestamp": datetime.fromtimestamp(record.created).isoformat(),
-                    "level": record.levelname.lower(),
-                    "message": record.getMessage(),
-                    "component": record.name,
-                }
-
-                # Add extra data if available
-                if hasattr(record, "extra_data"):
-                    log_data.update(record.extra_data)
-
-                # Add exception info
-                if record.exc_info:
-                    log_data["exception"] = self.formatException(record.exc_info)
-
-                return json.dumps(log_data)
-
-        return JSONFormatter()
-
     async def start_logging(self) -> None:
         """Start async log processing"""
 
@@ -233,12 +366,13 @@ class StructuredLogger:
             return
 
         self._logging_enabled = True
+        self._pending_event = asyncio.Event()
         self._log_processor_task = asyncio.create_task(self._log_processor())
 
         logger.info("StructuredLogger started")
 
     async def stop_logging(self) -> None:
-        """Stop async log processing"""
+        """Stop async log processing, writing out entries still queued"""
 
         self._logging_enabled = False
 
@@ -249,64 +383,140 @@ class StructuredLogger:
             except asyncio.CancelledError:
                 pass
 
+        while self._pending:
+            await self._process_batch(self._take_batch())
+
         logger.info("StructuredLogger stopped")
 
     async def _log_processor(self) -> None:
-        """Background processor for log entries"""
+        """Background writer draining queued entries in batches"""
 
         while self._logging_enabled:
             try:
-                # Process queued log entries
-                try:
-                    entry = await asyncio.wait_for(self._log_queue.get(), timeout=1.0)
-                    await self._process_log_entry(entry)
-                except asyncio.TimeoutError:
-                    continue
+                if not self._pending:
+                    self._pending_event.clear()
+                    try:
+                        await asyncio.wait_for(
+                            self._pending_event.wait(), timeout=self.flush_interval
+                        )
+                    except asyncio.TimeoutError:
+                        continue
+
+                await self._process_batch(self._take_batch())
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Log processor error: {e}")
 
-    async def _process_log_entry(self, entry: LogEntry) -> None:
-        """Process individual log entry"""
+    def _take_batch(self) -> list[LogEntry]:
+        pending = self._pending
+        return [pending.popleft() for _ in range(min(len(pending), self.batch_size))]
 
-        # Store in memory
-        self._log_entries.append(entry)
+    async def _process_batch(self, batch: list[LogEntry]) -> None:
+        """Index, dispatch and write a batch of entries"""
 
-        # Trim if too many entries
-        if len(self._log_entries) > self.max_entries:
-            self._log_entries = self._log_entries[-self.max_entries :]
+        for entry in batch:
+            self._tail.add(entry)
+            for handler in self._log_handlers:
+                try:
+                    if asyncio.iscoroutinefunction(handler):
+                        await handler(entry)
+                    else:
+                        handler(entry)
+                except Exception as e:
+                    logger.error(f"Log handler failed: {e}")
+
+        # Serialization and I/O happen off the event loop
+        await asyncio.to_thread(self._write_batch, batch)
+
+    def _process_log_entry(self, entry: LogEntry) -> None:
+        """Process an entry synchronously (the writer is not running)"""
 
-        # Call handlers
+        self._tail.add(entry)
         for handler in self._log_handlers:
             try:
                 if asyncio.iscoroutinefunction(handler):
-                    await handler(entry)
+                    asyncio.get_running_loop().create_task(handler(entry))
                 else:
                     handler(entry)
+            except RuntimeError:
+                # Async handlers need a running loop
+                pass
             except Exception as e:
                 logger.error(f"Log handler failed: {e}")
 
-        # Log to underlying logger
-        log_data = entry.to_dict()
+        self._write_batch([entry])
+
+    def _write_batch(self, batch: list[LogEntry]) -> None:
+        """Write entries as JSON lines through the logger's handlers"""
+
+        # One record per run of same-level entries: handlers and filters see
+        # each entry's real level, and the output keeps its order
+        for level, run in groupby(batch, key=lambda entry: entry.level):
+            text = "\n".join(_dumps(entry.to_dict()) for entry in run)
+            record = self.logger.makeRecord(
+                self.logger.name,
+                getattr(logging, level.value.upper()),
+                __file__,
+                0,
+                text,
+                None,
+                None,
+            )
+            self.logger.handle(record)
+        self.pipeline_stats["written"] += len(batch)
+        self.pipeline_stats["batches"] += 1
+
+    def _enqueue(self, entry: LogEntry) -> None:
+        """Queue an entry for the writer, applying the overflow policy"""
+
+        queued = len(self._pending)
+        if queued >= self.queue_size:
+            self.pipeline_stats["dropped"] += 1
+            return
+
+        if (
+            self.overflow_policy == "sample"
+            and queued >= self.pressure_threshold
+            and LEVEL_PRIORITIES[entry.level] < LEVEL_PRIORITIES[LogLevel.WARNING]
+        ):
+            self._pressure_seen += 1
+            if self._pressure_seen % self.pressure_sample_every:
+                self.pipeline_stats["sampled_out"] += 1
+                return
+
+        self._pending.append(entry)
+        if not self._pending_event.is_set():
+            self._pending_event.set()
+
+    def get_pipeline_stats(self) -> dict[str, Any]:
+        """Counters of the log pipeline"""
+        return {
+            **self.pipeline_stats,
+            "queued": len(self._pending),
+            "tail_size": len(self._tail),
+            "overflow_policy": self.overflow_policy,
+        }
 
-        log_level = getattr(self.logger, entry.level.value)
-        log_level(entry.message, extra={"extra_data": log_data})
+    @property
+    def current_context(self) -> LogContext:
+        """Logging context of the current task"""
+        return get_log_context()
 
     def set_context(self, context: LogContext) -> None:
         """Set current logging context"""
-        self._current_context = context
+        _log_context.set(context)
 
     def update_context(self, **kwargs: Any) -> None:
         """Update current context with new values"""
-        for key, value in kwargs.items():
-            if hasattr(self._current_context, key):
-                setattr(self._current_context, key, value)
+        updates = {key: value for key, value in kwargs.items() if key in CONTEXT_FIELDS}
+        if updates:
+            _log_context.set(replace(get_log_context(), **updates))
 
     def clear_context(self) -> None:
         """Clear current logging context"""
-        self._current_context = LogContext()
+        _log_context.set(LogContext())
 
     def debug(self, message: str, **kwargs: Any) -> None:
         """Log debug message"""
@@ -336,22 +546,15 @@ class StructuredLogger:
             return
 
         # Extract special kwargs
-        context = kwargs.pop("context", self._current_context)
-        extra_data = kwargs.pop("extra", {})
+        context = kwargs.pop("context", None) or get_log_context()
+        extra_data = dict(kwargs.pop("extra", None) or {})
         exception = kwargs.pop("exception", None)
         performance_data = kwargs.pop("performance", None)
 
         # Add remaining kwargs to extra data
         extra_data.update(kwargs)
 
-        # Handle exception formatting
-        if exception and isinstance(exception, Exception):
-            exception = traceback.format_exception(
-                type(exception), exception, exception.__traceback__
-            )
-            exception = "".join(exception)
-
-        # Create log entry
+        # Create log entry; a traceback is only formatted when written
         entry = LogEntry(
             timestamp=utc_now() if CORE_AVAILABLE else datetime.now(),
             level=level,
@@ -363,29 +566,16 @@ class StructuredLogger:
             performance_data=performance_data,
         )
 
-        # Queue for async processing if enabled
+        # Queue for the background writer if running
         if self._logging_enabled:
-            try:
-                self._log_queue.put_nowait(entry)
-            except asyncio.QueueFull:
-                # Fallback to sync processing
-                asyncio.create_task(self._process_log_entry(entry))
+            self._enqueue(entry)
         else:
             # Sync processing
-            asyncio.create_task(self._process_log_entry(entry))
+            self._process_log_entry(entry)
 
     def _should_skip_level(self, level: LogLevel) -> bool:
         """Check if log level should be skipped"""
-
-        level_priorities = {
-            LogLevel.DEBUG: 1,
-            LogLevel.INFO: 2,
-            LogLevel.WARNING: 3,
-            LogLevel.ERROR: 4,
-            LogLevel.CRITICAL: 5,
-        }
-
-        return level_priorities[level] < level_priorities[self.log_level]
+        return LEVEL_PRIORITIES[level] < LEVEL_PRIORITIES[self.log_level]
 
     def start_timer(self, operation_name: str) -> str:
         """Start performance timer"""
@@ -545,57 +735,22 @@ class StructuredLogger:
         self, count: int = 100, level: Optional[LogLevel] = None
     ) -> list[LogEntry]:
         """Get recent log entries"""
-
-        logs = self._log_entries
-
-        if level:
-            logs = [entry for entry in logs if entry.level == level]
-
-        return logs[-count:]
+        return self._tail.recent(count, level)
 
     def search_logs(self, query: str, max_results: int = 100) -> list[LogEntry]:
         """Search log entries by message content"""
-
-        results = []
-        query_lower = query.lower()
-
-        for entry in self._log_entries:
-            if (
-                query_lower in entry.message.lower()
-                or query_lower in str(entry.extra_data).lower()
-            ):
-                results.append(entry)
-
-                if len(results) >= max_results:
-                    break
-
-        return results
+        return self._tail.search(query, max_results)
 
     def get_logs_by_context(self, **context_filters: Any) -> list[LogEntry]:
         """Get logs filtered by context"""
-
-        results = []
-
-        for entry in self._log_entries:
-            match = True
-
-            for key, value in context_filters.items():
-                context_value = getattr(entry.context, key, None)
-                if context_value != value:
-                    match = False
-                    break
-
-            if match:
-                results.append(entry)
-
-        return results
+        return self._tail.by_context(**context_filters)
 
     def get_performance_summary(self) -> dict[str, Any]:
         """Get performance metrics from logs"""
 
         operations = {}
 
-        for entry in self._log_entries:
+        for entry in self._tail.entries():
             if entry.performance_data:
                 operation = entry.performance_data.get("operation", "unknown")
                 duration = entry.performance_data.get("duration_seconds", 0)
@@ -637,21 +792,23 @@ class StructuredLogger:
     def export_logs(self, file_path: str, format_type: str = "json") -> None:
         """Export logs to file"""
 
+        entries = self._tail.entries()
+
         if format_type == "json":
             with open(file_path, "w") as f:
-                log_data = [entry.to_dict() for entry in self._log_entries]
+                log_data = [entry.to_dict() for entry in entries]
                 json.dump(log_data, f, indent=2)
 
         elif format_type == "csv":
             import csv
 
             with open(file_path, "w", newline="") as f:
-                if self._log_entries:
+                if entries:
                     fieldnames = ["timestamp", "level", "message", "component"]
                     writer = csv.DictWriter(f, fieldnames=fieldnames)
                     writer.writeheader()
 
-                    for entry in self._log_entries:
+                    for entry in entries:
                         row = {
                             "timestamp": entry.timestamp.isoformat(),
                             "level": entry.level.value,
@@ -660,7 +817,7 @@ class StructuredLogger:
                         }
                         writer.writerow(row)
 
-        self.info(f"Exported {len(self._log_entries)} log entries to {file_path}")
+        self.info(f"Exported {len(entries)} log entries to {file_path}")
 
 
 # Context manager for automatic context setting
@@ -670,11 +827,10 @@ class LogContextManager:
     def __init__(self, logger: StructuredLogger, context: LogContext) -> None:
         self.logger = logger
         self.new_context = context
-        self.previous_context = None
+        self._token: Optional[Token[Optional[LogContext]]] = None
 
     def __enter__(self) -> "LogContextManager":
-        self.previous_context = self.logger._current_context
-        self.logger.set_context(self.new_context)
+        self._token = _log_context.set(self.new_context)
         return self
 
     def __exit__(
@@ -683,7 +839,9 @@ class LogContextManager:
         exc_val: Optional[Exception],
         exc_tb: Optional[Any],
     ) -> None:
-        self.logger.set_context(self.previous_context)
+        if self._token is not None:
+            _log_context.reset(self._token)
+            self._token = None
 
 
 # Context manager for performance timing
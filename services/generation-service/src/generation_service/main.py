@@ -10,7 +10,16 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from generation_service.api import generate, health, metrics, rag, sse_generation
 from generation_service.config_loader import settings
-from generation_service.middleware import setup_security_middleware
+from generation_service.middleware import (
+    RateLimitPolicy,
+    RequestMetricsMiddleware,
+    setup_security_middleware,
+)
+from generation_service.monitoring.loop_monitor import (
+    shutdown_loop_monitor,
+    start_loop_monitor,
+)
+from generation_service.monitoring.prometheus_metrics import get_generation_metrics
 
 # Import Core Module utilities
 try:
@@ -61,8 +70,22 @@ setup_security_middleware(
     enable_rate_limiting=True,
     rate_limit_calls=getattr(settings, "rate_limit_calls", 100),
     rate_limit_period=getattr(settings, "rate_limit_period", 60),
+    rate_limit_redis_url=getattr(settings, "rate_limit_redis_url", None),
+    rate_limit_tenant_policies={
+        tenant: RateLimitPolicy(
+            calls=int(limit.get("calls", RateLimitPolicy.calls)),
+            period=float(limit.get("period", RateLimitPolicy.period)),
+        )
+        for tenant, limit in getattr(settings, "rate_limit_tenant_policies", {}).items()
+    },
+    rate_limit_tenant_header=getattr(settings, "rate_limit_tenant_header", None),
 )
 
+
+# Record request count and latency for the Prometheus endpoint
+app.add_middleware(RequestMetricsMiddleware, record=metrics.increment_request_counter)
+
+
 # Log middleware setup
 logger.info(
     f"CORS middleware configured with origins: {getattr(settings, 'cors_origins', [])}"
@@ -112,12 +135,29 @@ async def startup_event():
     ai_configs = settings.get_ai_provider_config()
     logger.info(f"AI Providers configured: {list(ai_configs.keys())}")
 
+    # Share metrics with sibling workers when a multiprocess dir is set
+    generation_metrics = get_generation_metrics()
+    if generation_metrics is not None:
+        generation_metrics.registry.start_flusher()
+
+    # Measure event loop lag and report callbacks that block it
+    if getattr(settings, "loop_monitor_enabled", True):
+        await start_loop_monitor(
+            {"block_threshold": getattr(settings, "loop_block_threshold", 0.1)}
+        )
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown event"""
     logger.info("Generation Service shutting down...")
 
+    await shutdown_loop_monitor()
+
+    generation_metrics = get_generation_metrics()
+    if generation_metrics is not None:
+        generation_metrics.registry.stop_flusher()
+
 
 if __name__ == "__main__":
     uvicorn.run(
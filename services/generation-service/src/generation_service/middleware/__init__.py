@@ -2,6 +2,8 @@
 Middleware package for Generation Service
 """
 
+from .rate_limiter import RateLimitPolicy, RedisRateLimiter, SlidingWindowRateLimiter
+from .request_metrics import RequestMetricsMiddleware
 from .security_middleware import (
     APIKeyValidationMiddleware,
     RateLimitingMiddleware,
@@ -17,5 +19,9 @@ __all__ = [
     "APIKeyValidationMiddleware",
     "RequestValidationMiddleware",
     "RequestSignatureMiddleware",
+    "RequestMetricsMiddleware",
+    "RateLimitPolicy",
+    "SlidingWindowRateLimiter",
+    "RedisRateLimiter",
     "setup_security_middleware",
 ]
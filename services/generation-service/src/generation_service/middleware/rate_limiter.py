@@ -0,0 +1,230 @@
+"""
+Sliding-window-counter rate limiters for Generation Service
+
+A key's usage is estimated from the counts of the current and the previous
+fixed window, weighting the previous count by how much of it still overlaps
+the sliding window. That is O(1) time and two counters per key, unlike a
+timestamp log. ``SlidingWindowRateLimiter`` keeps the counters in process;
+``RedisRateLimiter`` keeps them in Redis so limits hold across workers.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Number of calls allowed per period (in seconds)"""
+
+    calls: int = 100
+    period: float = 60.0
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """Outcome of counting one request against a policy"""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_at: float  # Epoch time at which the current window ends
+    retry_after: float  # Seconds until a request would be allowed again
+
+
+def window_start(now: float, period: float) -> float:
+    """Start of the fixed window containing ``now``"""
+    return now - now % period
+
+
+def decide(
+    policy: RateLimitPolicy,
+    now: float,
+    start: float,
+    current: int,
+    previous: int,
+    allowed: bool,
+) -> RateLimitDecision:
+    """
+    Build the decision for a key whose windows hold ``current`` and
+    ``previous`` requests, ``current`` including this one if it was allowed
+    """
+    period = policy.period
+    elapsed = now - start
+    estimated = previous * (1 - elapsed / period) + current
+
+    if allowed:
+        retry_after = 0.0
+    elif current >= policy.calls or not previous:
+        # Nothing frees up until the current window becomes the previous one
+        retry_after = period - elapsed
+    else:
+        # The previous window's weight must drop enough for one more request
+        retry_after = period * (1 - (policy.calls - current - 1) / previous) - elapsed
+
+    return RateLimitDecision(
+        allowed=allowed,
+        limit=policy.calls,
+        remaining=max(0, math.floor(policy.calls - estimated)),
+        reset_at=start + period,
+        retry_after=max(0.0, retry_after),
+    )
+
+
+class _Window:
+    """Counters of one key's current and previous window"""
+
+    __slots__ = ("current", "period", "previous", "start")
+
+    def __init__(self, start: float, period: float) -> None:
+        self.start = start
+        self.period = period
+        self.current = 0
+        self.previous = 0
+
+
+class SlidingWindowRateLimiter:
+    """
+    In-process sliding-window-counter rate limiter
+
+    A check reads and updates two counters without awaiting, so it is atomic
+    on the event loop and needs no lock. Keys idle for more than two periods
+    are evicted every ``eviction_interval`` seconds, from the request path.
+    """
+
+    def __init__(
+        self,
+        eviction_interval: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.eviction_interval = eviction_interval
+        self.clock = clock
+        self._windows: dict[str, _Window] = {}
+        self._next_eviction = clock() + eviction_interval
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def hit_sync(self, key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+        """Count one request for ``key`` if the policy allows it"""
+        now = self.clock()
+        if now >= self._next_eviction:
+            self.evict_idle(now)
+
+        start = window_start(now, policy.period)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _Window(start, policy.period)
+        elif window.start != start or window.period != policy.period:
+            # Roll over; the old current window is only kept if adjacent
+            adjacent = (
+                window.period == policy.period and start - window.start == window.period
+            )
+            window.previous = window.current if adjacent else 0
+            window.current = 0
+            window.start = start
+            window.period = policy.period
+
+        estimated = window.previous * (1 - (now - start) / policy.period)
+        allowed = estimated + window.current + 1 <= policy.calls
+        if allowed:
+            window.current += 1
+        return decide(policy, now, start, window.current, window.previous, allowed)
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+        return self.hit_sync(key, policy)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop keys whose counters no longer affect any decision"""
+        now = self.clock() if now is None else now
+        self._next_eviction = now + self.eviction_interval
+        idle = [
+            key
+            for key, window in self._windows.items()
+            if now - window.start >= 2 * window.period
+        ]
+        for key in idle:
+            del self._windows[key]
+        return len(idle)
+
+
+# Count one request against a sliding window counter, unless it is full.
+#   KEYS[1] current window counter, KEYS[2] previous window counter
+#   ARGV[1] limit, ARGV[2] weight of the previous window, ARGV[3] counter TTL ms
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[2]) + current + 1 > tonumber(ARGV[1]) then
+    return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[3])
+end
+return {1, current, previous}
+"""
+
+
+class RedisRateLimiter:
+    """
+    Sliding-window-counter rate limiter shared through Redis
+
+    Each check is one script call. Counters are keyed per window and expire
+    after two periods, so idle keys are evicted by Redis. Window boundaries
+    come from each worker's clock. If Redis is unavailable the check falls
+    back to a per-process limiter rather than rejecting traffic.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any,
+        prefix: str = "ratelimit:",
+        fallback: Optional[SlidingWindowRateLimiter] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.redis = redis_client
+        self.prefix = prefix
+        self.fallback = fallback or SlidingWindowRateLimiter(clock=clock)
+        self.clock = clock
+        self._script = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._degraded = False
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+        """Count one request for ``key`` if the policy allows it"""
+        now = self.clock()
+        period = policy.period
+        index = int(now // period)
+        start = index * period
+        # The hash tag keeps both counters of a key in one cluster slot
+        base = f"{self.prefix}{{{key}}}:{period:g}"
+
+        try:
+            allowed, current, previous = await self._script(
+                keys=[f"{base}:{index}", f"{base}:{index - 1}"],
+                args=[
+                    policy.calls,
+                    1 - (now - start) / period,
+                    int(period * 2000),
+                ],
+            )
+        except Exception as e:
+            if not self._degraded:
+                logger.warning(f"Redis rate limiter unavailable, limiting locally: {e}")
+                self._degraded = True
+            return self.fallback.hit_sync(key, policy)
+
+        if self._degraded:
+            logger.info("Redis rate limiter available again")
+            self._degraded = False
+        return decide(policy, now, start, int(current), int(previous), bool(allowed))
+
+
+def create_redis_rate_limiter(redis_url: str) -> RedisRateLimiter:
+    """Build a Redis-backed limiter for ``redis_url``"""
+    import redis.asyncio as redis
+
+    return RedisRateLimiter(redis.from_url(redis_url, decode_responses=True))
@@ -0,0 +1,46 @@
+"""
+Request metrics middleware for Generation Service
+"""
+
+import time
+from typing import Callable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RequestMetricsMiddleware:
+    """
+    Record request count and latency through ``record(seconds, method, status)``
+
+    Latency is measured to the response start, so long-lived SSE streams are
+    counted when their headers go out rather than when the stream closes.
+    """
+
+    def __init__(self, app: ASGIApp, record: Callable[[float, str, int], None]) -> None:
+        self.app = app
+        self.record = record
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        recorded = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal recorded
+            if message["type"] == "http.response.start" and not recorded:
+                recorded = True
+                self.record(
+                    time.perf_counter() - start_time,
+                    scope["method"],
+                    message["status"],
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded:
+                self.record(time.perf_counter() - start_time, scope["method"], 500)
@@ -1,24 +1,42 @@
 """
 Security middleware for Generation Service
 Implements security best practices including rate limiting, input validation, and security headers.
+
+All middleware here are pure ASGI: rejections are sent directly as JSON
+error responses, accepted requests are passed through with their response
+messages forwarded as produced, so SSE streams are never buffered.
 """
 
-import asyncio
 import hashlib
 import hmac
 import logging
-import time
-from typing import Any, Callable, Optional
+import math
+from typing import Any, Optional
 
-from fastapi import HTTPException, Request, Response
 from fastapi.security.utils import get_authorization_scheme_param
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ai_script_core.utils.asgi import (
+    client_ip,
+    encode_headers,
+    read_body,
+    replay_body,
+    request_header_items,
+    request_headers,
+    send_error,
+    send_with_headers,
+)
+
+from .rate_limiter import (
+    RateLimitPolicy,
+    SlidingWindowRateLimiter,
+    create_redis_rate_limiter,
+)
 
 logger = logging.getLogger(__name__)
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """Add security headers to all responses"""
 
     def __init__(
@@ -31,7 +49,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         referrer_policy: str = "strict-origin-when-cross-origin",
         content_security_policy: Optional[str] = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.security_headers = {
             "Strict-Transport-Security": strict_transport_security,
             "X-Content-Type-Options": content_type_options,
@@ -41,23 +59,33 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         }
         if content_security_policy:
             self.security_headers["Content-Security-Policy"] = content_security_policy
+        self._raw_headers = encode_headers(self.security_headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Add security headers and remove the server header to avoid
+        # information disclosure
+        await self.app(
+            scope,
+            receive,
+            send_with_headers(send, self._raw_headers, remove=frozenset({b"server"})),
+        )
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-
-        # Add security headers
-        for header, value in self.security_headers.items():
-            response.headers[header] = value
-
-        # Remove server header to avoid information disclosure
-        if "server" in response.headers:
-            del response.headers["server"]
-
-        return response
 
+class RateLimitingMiddleware:
+    """
+    Sliding-window-counter rate limiting middleware
 
-class RateLimitingMiddleware(BaseHTTPMiddleware):
-    """Simple in-memory rate limiting middleware"""
+    Requests are counted per client (IP, or the ``tenant_header`` value when
+    one is configured and sent) and per policy scope. ``route_policies`` map
+    path prefixes to their own limits (longest prefix wins) and
+    ``tenant_policies`` override the limit for individual tenants. Counters
+    live in ``limiter``: in process by default, or a ``RedisRateLimiter``
+    for limits shared by all workers.
+    """
 
     def __init__(
         self,
@@ -66,8 +94,12 @@ class RateLimitingMiddleware(BaseHTTPMiddleware):
         period: int = 60,
         per_ip: bool = True,
         excluded_paths: Optional[list[str]] = None,
+        route_policies: Optional[dict[str, RateLimitPolicy]] = None,
+        tenant_policies: Optional[dict[str, RateLimitPolicy]] = None,
+        tenant_header: Optional[str] = None,
+        limiter: Optional[Any] = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.calls = calls
         self.period = period
         self.per_ip = per_ip
@@ -77,78 +109,69 @@ class RateLimitingMiddleware(BaseHTTPMiddleware):
             "/docs",
             "/redoc",
         ]
-        self.requests: dict[str, list[float]] = {}
-        self.lock = asyncio.Lock()
+        self.default_policy = RateLimitPolicy(calls=calls, period=period)
+        self.route_policies = route_policies or {}
+        self.tenant_policies = tenant_policies or {}
+        self.tenant_header = tenant_header.lower() if tenant_header else None
+        self.limiter = limiter or SlidingWindowRateLimiter()
+        self._route_prefixes = sorted(self.route_policies, key=len, reverse=True)
+
+    def _resolve(self, scope: Scope) -> tuple[str, RateLimitPolicy]:
+        """Counter key and policy for a request"""
+        route, policy = "*", self.default_policy
+        path = scope["path"]
+        for prefix in self._route_prefixes:
+            if path.startswith(prefix):
+                route, policy = prefix, self.route_policies[prefix]
+                break
+
+        tenant = (
+            request_headers(scope).get(self.tenant_header)
+            if self.tenant_header
+            else None
+        )
+        if tenant:
+            return f"{route}|tenant:{tenant}", self.tenant_policies.get(tenant, policy)
+        client_id = client_ip(scope) if self.per_ip else "global"
+        return f"{route}|{client_id}", policy
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Skip rate limiting for excluded paths
-        if request.url.path in self.excluded_paths:
-            return await call_next(request)
-
-        # Get client identifier
-        if self.per_ip:
-            client_id = self._get_client_ip(request)
-        else:
-            client_id = "global"
-
-        # Check rate limit
-        async with self.lock:
-            current_time = time.time()
-
-            # Initialize or clean old requests
-            if client_id not in self.requests:
-                self.requests[client_id] = []
-
-            # Remove old requests
-            self.requests[client_id] = [
-                req_time
-                for req_time in self.requests[client_id]
-                if current_time - req_time < self.period
-            ]
-
-            # Check if limit exceeded
-            if len(self.requests[client_id]) >= self.calls:
-                raise HTTPException(
-                    status_code=429,
-                    detail={
-                        "error": "Rate limit exceeded",
-                        "limit": self.calls,
-                        "period": self.period,
-                        "retry_after": self.period,
-                    },
-                    headers={"Retry-After": str(self.period)},
-                )
-
-            # Add current request
-            self.requests[client_id].append(current_time)
-
-        response = await call_next(request)
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        key, policy = self._resolve(scope)
+        decision = await self.limiter.hit(key, policy)
+
+        # Check if limit exceeded
+        if not decision.allowed:
+            retry_after = str(math.ceil(decision.retry_after))
+            await send_error(
+                scope,
+                receive,
+                send,
+                429,
+                {
+                    "error": "Rate limit exceeded",
+                    "limit": policy.calls,
+                    "period": policy.period,
+                    "retry_after": math.ceil(decision.retry_after),
+                },
+                headers={"Retry-After": retry_after},
+            )
+            return
 
         # Add rate limit headers
-        remaining = max(0, self.calls - len(self.requests[client_id]))
-        response.headers["X-RateLimit-Limit"] = str(self.calls)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(current_time + self.period))
-
-        return response
-
-    def _get_client_ip(self, request: Request) -> str:
-        """Extract client IP considering proxy headers"""
-        # Check for forwarded headers (in order of preference)
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            # Take the first IP (client)
-            return forwarded_for.split(",")[0].strip()
-
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip.strip()
-
-        # Fallback to client host
-        return request.client.host if request.client else "unknown"
+        rate_limit_headers = [
+            (b"x-ratelimit-limit", str(decision.limit).encode()),
+            (b"x-ratelimit-remaining", str(decision.remaining).encode()),
+            (b"x-ratelimit-reset", str(int(decision.reset_at)).encode()),
+        ]
+        await self.app(scope, receive, send_with_headers(send, rate_limit_headers))
 
 
-class APIKeyValidationMiddleware(BaseHTTPMiddleware):
+class APIKeyValidationMiddleware:
     """Validate API keys for protected endpoints"""
 
     def __init__(
@@ -158,21 +181,25 @@ class APIKeyValidationMiddleware(BaseHTTPMiddleware):
         api_key_header: str = "X-API-Key",
         valid_keys: Optional[set[str]] = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.protected_paths = protected_paths or ["/api/v1/generate"]
         self.api_key_header = api_key_header
         self.valid_keys = valid_keys or set()
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Skip validation for non-protected paths
-        if not any(request.url.path.startswith(path) for path in self.protected_paths):
-            return await call_next(request)
+        if scope["type"] != "http" or not scope["path"].startswith(
+            tuple(self.protected_paths)
+        ):
+            await self.app(scope, receive, send)
+            return
 
         # Extract API key
-        api_key = request.headers.get(self.api_key_header)
+        headers = request_headers(scope)
+        api_key = headers.get(self.api_key_header.lower())
         if not api_key:
             # Check Authorization header as fallback
-            authorization = request.headers.get("Authorization")
+            authorization = headers.get("authorization")
             if authorization:
                 scheme, credentials = get_authorization_scheme_param(authorization)
                 if scheme.lower() == "bearer":
@@ -180,54 +207,63 @@ class APIKeyValidationMiddleware(BaseHTTPMiddleware):
 
         # Validate API key
         if not api_key:
-            raise HTTPException(
-                status_code=401,
-                detail={
+            await send_error(
+                scope,
+                receive,
+                send,
+                401,
+                {
                     "error": "Missing API key",
                     "message": f"API key required in {self.api_key_header} header or Authorization header",
                 },
             )
+            return
 
         if self.valid_keys and api_key not in self.valid_keys:
             # Log failed authentication attempt
             logger.warning(
-                f"Invalid API key attempt from {self._get_client_ip(request)}: {api_key[:8]}..."
+                f"Invalid API key attempt from {client_ip(scope)}: {api_key[:8]}..."
             )
-            raise HTTPException(
-                status_code=401,
-                detail={
+            await send_error(
+                scope,
+                receive,
+                send,
+                401,
+                {
                     "error": "Invalid API key",
                     "message": "The provided API key is not valid",
                 },
             )
+            return
 
         # Add API key info to request state for downstream use
-        request.state.api_key = api_key
-        request.state.authenticated = True
-
-        return await call_next(request)
+        state = scope.setdefault("state", {})
+        state["api_key"] = api_key
+        state["authenticated"] = True
 
-    def _get_client_ip(self, request: Request) -> str:
-        """Extract client IP considering proxy headers"""
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip.strip()
-        return request.client.host if request.client else "unknown"
+        await self.app(scope, receive, send)
 
 
-class RequestValidationMiddleware(BaseHTTPMiddleware):
+class RequestValidationMiddleware:
     """Validate and sanitize incoming requests"""
 
+    suspicious_patterns = (
+        "<script",
+        "javascript:",
+        "vbscript:",
+        "onload=",
+        "onerror=",
+        "../",
+        "..\\",
+    )
+
     def __init__(
         self,
         app: ASGIApp,
         max_content_length: int = 16 * 1024 * 1024,  # 16MB
         allowed_content_types: Optional[set[str]] = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.max_content_length = max_content_length
         self.allowed_content_types = allowed_content_types or {
             "application/json",
@@ -236,74 +272,87 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
             "text/plain",
         }
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = request_headers(scope)
+
         # Check content length
-        content_length = request.headers.get("content-length")
+        content_length = headers.get("content-length")
         if content_length:
             try:
                 length = int(content_length)
-                if length > self.max_content_length:
-                    raise HTTPException(
-                        status_code=413,
-                        detail={
-                            "error": "Request entity too large",
-                            "max_size": self.max_content_length,
-                            "actual_size": length,
-                        },
-                    )
             except ValueError:
-                raise HTTPException(
-                    status_code=400,
-                    detail={"error": "Invalid content-length header"},
+                await send_error(
+                    scope,
+                    receive,
+                    send,
+                    400,
+                    {"error": "Invalid content-length header"},
                 )
+                return
+            if length > self.max_content_length:
+                await send_error(
+                    scope,
+                    receive,
+                    send,
+                    413,
+                    {
+                        "error": "Request entity too large",
+                        "max_size": self.max_content_length,
+                        "actual_size": length,
+                    },
+                )
+                return
 
         # Check content type for POST/PUT requests
-        if request.method in ("POST", "PUT", "PATCH"):
-            content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        if scope["method"] in ("POST", "PUT", "PATCH"):
+            content_type = headers.get("content-type", "").split(";")[0].strip()
             if content_type and content_type not in self.allowed_content_types:
-                raise HTTPException(
-                    status_code=415,
-                    detail={
+                await send_error(
+                    scope,
+                    receive,
+                    send,
+                    415,
+                    {
                         "error": "Unsupported media type",
                         "supported_types": list(self.allowed_content_types),
                     },
                 )
+                return
+
+        # Validate common suspicious patterns, every value of repeated headers included
+        if not self._validate_request_headers(request_header_items(scope)):
+            await send_error(
+                scope,
+                receive,
+                send,
+                400,
+                {
+                    "error": "Invalid request",
+                    "message": "Suspicious content detected in headers",
+                },
+            )
+            return
 
-        # Validate common suspicious patterns
-        self._validate_request_headers(request)
-
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
-    def _validate_request_headers(self, request: Request) -> None:
+    def _validate_request_headers(self, headers: list[tuple[str, str]]) -> bool:
         """Validate request headers for suspicious patterns"""
-        suspicious_patterns = [
-            "<script",
-            "javascript:",
-            "vbscript:",
-            "onload=",
-            "onerror=",
-            "../",
-            "..\\",
-        ]
+        for header_name, header_value in headers:
+            header_lower = header_value.lower()
+            for pattern in self.suspicious_patterns:
+                if pattern in header_lower:
+                    logger.warning(
+                        f"Suspicious pattern '{pattern}' detected in header '{header_name}': {header_value}"
+                    )
+                    return False
+        return True
+
 
-        for header_name, header_value in request.headers.items():
-            if isinstance(header_value, str):
-                header_lower = header_value.lower()
-                for pattern in suspicious_patterns:
-                    if pattern in header_lower:
-                        logger.warning(
-                            f"Suspicious pattern '{pattern}' detected in header '{header_name}': {header_value}"
-                        )
-                        raise HTTPException(
-                            status_code=400,
-                            detail={
-                                "error": "Invalid request",
-                                "message": "Suspicious content detected in headers",
-                            },
-                        )
-
-
-class RequestSignatureMiddleware(BaseHTTPMiddleware):
+class RequestSignatureMiddleware:
     """Verify request signatures for webhook-like endpoints"""
 
     def __init__(
@@ -313,42 +362,53 @@ class RequestSignatureMiddleware(BaseHTTPMiddleware):
         signature_header: str = "X-Signature-256",
         signed_paths: Optional[list[str]] = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.secret_key = secret_key.encode()
         self.signature_header = signature_header
         self.signed_paths = signed_paths or []
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Skip signature verification for non-signed paths
-        if not any(request.url.path.startswith(path) for path in self.signed_paths):
-            return await call_next(request)
+        if scope["type"] != "http" or not scope["path"].startswith(
+            tuple(self.signed_paths)
+        ):
+            await self.app(scope, receive, send)
+            return
 
         # Get signature from header
-        signature = request.headers.get(self.signature_header)
+        signature = request_headers(scope).get(self.signature_header.lower())
         if not signature:
-            raise HTTPException(
-                status_code=401,
-                detail={
+            await send_error(
+                scope,
+                receive,
+                send,
+                401,
+                {
                     "error": "Missing signature",
                     "message": f"Request signature required in {self.signature_header} header",
                 },
             )
+            return
 
-        # Read request body
-        body = await request.body()
+        # Read request body; it is replayed to the app below
+        body = await read_body(receive)
 
         # Verify signature
         if not self._verify_signature(body, signature):
-            logger.warning(f"Invalid signature from {self._get_client_ip(request)}")
-            raise HTTPException(
-                status_code=401,
-                detail={
+            logger.warning(f"Invalid signature from {client_ip(scope)}")
+            await send_error(
+                scope,
+                receive,
+                send,
+                401,
+                {
                     "error": "Invalid signature",
                     "message": "Request signature verification failed",
                 },
             )
+            return
 
-        return await call_next(request)
+        await self.app(scope, replay_body(body, receive), send)
 
     def _verify_signature(self, body: bytes, signature: str) -> bool:
         """Verify HMAC signature"""
@@ -366,16 +426,6 @@ class RequestSignatureMiddleware(BaseHTTPMiddleware):
             logger.error(f"Signature verification error: {e}")
             return False
 
-    def _get_client_ip(self, request: Request) -> str:
-        """Extract client IP considering proxy headers"""
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            return forwarded_for.split(",")[0].strip()
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip.strip()
-        return request.client.host if request.client else "unknown"
-
 
 def setup_security_middleware(
     app: Any,
@@ -386,8 +436,19 @@ def setup_security_middleware(
     rate_limit_period: int = 60,
     api_keys: Optional[set[str]] = None,
     signing_secret: Optional[str] = None,
+    rate_limit_redis_url: Optional[str] = None,
+    rate_limit_route_policies: Optional[dict[str, RateLimitPolicy]] = None,
+    rate_limit_tenant_policies: Optional[dict[str, RateLimitPolicy]] = None,
+    rate_limit_tenant_header: Optional[str] = None,
 ) -> None:
-    """Setup all security middleware for the FastAPI app"""
+    """
+    Setup all security middleware for the FastAPI app
+
+    Rate limits are kept per worker unless ``rate_limit_redis_url`` is set,
+    in which case they are shared by all workers through Redis. With
+    ``rate_limit_tenant_header`` requests are counted per tenant, and
+    ``rate_limit_tenant_policies`` override the limit of individual tenants.
+    """
 
     # Security headers (always enabled)
     app.add_middleware(SecurityHeadersMiddleware)
@@ -401,6 +462,14 @@ def setup_security_middleware(
             RateLimitingMiddleware,
             calls=rate_limit_calls,
             period=rate_limit_period,
+            route_policies=rate_limit_route_policies,
+            tenant_policies=rate_limit_tenant_policies,
+            tenant_header=rate_limit_tenant_header,
+            limiter=(
+                create_redis_rate_limiter(rate_limit_redis_url)
+                if rate_limit_redis_url
+                else None
+            ),
         )
 
     # API key validation (optional)
@@ -418,7 +487,10 @@ def setup_security_middleware(
         )
 
     logger.info("Security middleware configured")
-    logger.info(f"Rate limiting: {'enabled' if enable_rate_limiting else 'disabled'}")
+    logger.info(
+        f"Rate limiting: {'enabled' if enable_rate_limiting else 'disabled'}"
+        f"{' (shared via Redis)' if enable_rate_limiting and rate_limit_redis_url else ''}"
+    )
     logger.info(
         f"API key validation: {'enabled' if enable_api_key_validation else 'disabled'}"
     )
@@ -241,6 +241,16 @@ class GenerationJob(BaseModel):
         None, description="Estimated duration in seconds"
     )
 
+    # Scheduling
+    tenantId: str = Field(default="default", description="Tenant for fair queuing")
+    priority: str = Field(default="normal", description="Queue priority class")
+    queuePosition: Optional[int] = Field(
+        None, description="1-based position in the generation queue while queued"
+    )
+    queueEtaSeconds: Optional[int] = Field(
+        None, description="Estimated seconds until the job leaves the queue"
+    )
+
     # Error handling
     errorCode: Optional[str] = Field(None, description="Error code if failed")
     errorMessage: Optional[str] = Field(None, description="Error message if failed")
@@ -313,6 +323,9 @@ class GenerationJob(BaseModel):
 
     def get_estimated_remaining_time(self) -> Optional[int]:
         """Calculate estimated remaining time in seconds"""
+        if self.status == GenerationJobStatus.QUEUED and self.queueEtaSeconds:
+            return self.queueEtaSeconds + (self.estimatedDuration or 0)
+
         if not self.startedAt or self.progress <= 0:
             return self.estimatedDuration
 
@@ -399,6 +412,11 @@ class GenerationJobRequest(BaseModel):
     model: Optional[str] = Field(None, description="Preferred AI model")
     temperature: Optional[float] = Field(0.7, description="Generation creativity")
     lengthTarget: Optional[int] = Field(None, description="Target length in words")
+    priority: str = Field(
+        default="normal",
+        pattern="^(high|normal|low)$",
+        description="Queue priority class",
+    )
 
 
 class GenerationJobResponse(BaseModel):
@@ -416,3 +434,9 @@ class GenerationJobResponse(BaseModel):
     estimatedDuration: Optional[int] = Field(
         None, description="Estimated duration in seconds"
     )
+    queuePosition: Optional[int] = Field(
+        None, description="Queue position if the job is waiting for a worker"
+    )
+    queueEtaSeconds: Optional[int] = Field(
+        None, description="Estimated seconds until the job starts"
+    )
@@ -459,10 +459,6 @@ class AlertManager:
             since = (utc_now() if CORE_AVAILABLE else datetime.now()) - timedelta(
                 seconds=window_seconds
             )
-            history = collector.get_metric_history(metric_name, since)
-
-            if not history:
-                return None
 
             # For most metrics, use the latest value
             # For some metrics, we might want to use average
@@ -472,11 +468,13 @@ class AlertManager:
                 "cache_hit_ratio",
             ]:
                 # Use average for time-based metrics
-                values = [h.value for h in history]
+                _, values = collector.get_metric_window(metric_name, since)
+                if not values:
+                    return None
                 return sum(values) / len(values)
             else:
                 # Use latest value for counters and gauges
-                return history[-1].value
+                return collector.get_latest_value(metric_name, since)
 
         except Exception as e:
             logger.error(f"Failed to get metric value for {metric_name}: {e}")
@@ -82,6 +82,7 @@ class ComponentType(str, Enum):
     DISK = "disk"
     NETWORK = "network"
     SERVICE = "service"
+    EVENT_LOOP = "event_loop"
 
 
 @dataclass
@@ -213,6 +214,15 @@ class HealthMonitor:
             critical=True,
         )
 
+        # Event loop lag check
+        self.register_health_check(
+            name="event_loop_health",
+            component_type=ComponentType.EVENT_LOOP,
+            check_function=self._check_event_loop_health,
+            interval=30.0,
+            critical=False,
+        )
+
     def register_health_check(
         self,
         name: str,
@@ -719,6 +729,45 @@ class HealthMonitor:
                 "message": f"Service check failed: {e}",
             }
 
+    async def _check_event_loop_health(self) -> dict[str, Any]:
+        """Check event loop lag over the recent window"""
+
+        try:
+            from .loop_monitor import get_loop_monitor
+
+            loop_monitor = get_loop_monitor()
+            if not loop_monitor or not loop_monitor.running:
+                return {
+                    "status": HealthStatus.UNKNOWN,
+                    "message": "Loop monitor not running",
+                }
+
+            recent = loop_monitor.get_recent_summary()
+            lag = recent.get("p99", recent.get("max", 0.0))
+
+            if lag >= loop_monitor.critical_lag:
+                status = HealthStatus.CRITICAL
+            elif lag >= loop_monitor.block_threshold:
+                status = HealthStatus.DEGRADED
+            else:
+                status = HealthStatus.HEALTHY
+
+            return {
+                "status": status,
+                "message": f"Event loop lag p99: {lag * 1000:.1f}ms",
+                "details": {
+                    "recent": recent,
+                    "blocked": loop_monitor.blocked,
+                    "blocking_sites": loop_monitor.get_blocking_sites(5),
+                },
+            }
+
+        except Exception as e:
+            return {
+                "status": HealthStatus.UNHEALTHY,
+                "message": f"Event loop check failed: {e}",
+            }
+
 
 # Global health monitor instance
 _health_monitor: Optional[HealthMonitor] = None
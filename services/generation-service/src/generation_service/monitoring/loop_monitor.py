@@ -0,0 +1,313 @@
+"""
+Event loop lag and blocking call detection for Generation Service
+"""
+
+import asyncio
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any, Optional
+
+from .prometheus_metrics import (
+    LOOP_LAG_BUCKETS,
+    observe_event_loop_lag,
+    record_event_loop_block,
+)
+from .time_series import summarize
+
+# Import Core Module components
+try:
+    from ai_script_core import get_service_logger
+
+    logger = get_service_logger("generation-service.loop_monitor")
+except (ImportError, RuntimeError):
+    import logging
+
+    logger = logging.getLogger(__name__)  # type: ignore[assignment]
+
+# Blocking call sites are reported at the innermost frame outside these
+_LIBRARY_PATHS = tuple(
+    {
+        path
+        for name in ("stdlib", "platstdlib", "purelib", "platlib")
+        if (path := sysconfig.get_paths().get(name))
+    }
+)
+
+UNKNOWN_SITE = "<not captured>"
+
+
+@dataclass
+class BlockingSite:
+    """Call site that blocked the event loop, with its blocking time"""
+
+    site: str
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seen: float = 0.0
+    stack: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "site": self.site,
+            "count": self.count,
+            "total_seconds": round(self.total_seconds, 4),
+            "max_seconds": round(self.max_seconds, 4),
+            "last_seen": self.last_seen,
+            "stack": self.stack,
+        }
+
+
+class LoopLagMonitor:
+    """
+    Continuous event loop lag measurement
+
+    A heartbeat task sleeps for ``interval`` and records how late it woke
+    up, which is how long the loop was kept from running callbacks. A
+    watchdog thread checks the heartbeat; once it is ``block_threshold``
+    overdue the loop thread is stuck in one callback, and the thread's
+    stack at that moment shows the blocking call. The lag measured when
+    the heartbeat resumes is then charged to that call site.
+    """
+
+    def __init__(self, config: Optional[dict[str, Any]] = None) -> None:
+        self.config = config or {}
+
+        self.interval = self.config.get("interval", 0.1)
+        self.block_threshold = self.config.get("block_threshold", 0.1)
+        self.critical_lag = self.config.get("critical_lag", 1.0)
+        self.recent_window = self.config.get("recent_window_seconds", 60.0)
+        self.max_sites = self.config.get("max_blocking_sites", 100)
+        self.max_stack_depth = self.config.get("max_stack_depth", 30)
+
+        # Lag statistics
+        self.samples = 0
+        self.blocked = 0
+        self.lag_sum = 0.0
+        self.max_lag = 0.0
+        self.bucket_counts = [0] * (len(LOOP_LAG_BUCKETS) + 1)
+        self._recent: deque[tuple[float, float]] = deque()
+        self._sites: dict[str, BlockingSite] = {}
+
+        # Heartbeat state shared with the watchdog thread
+        self._beat = time.monotonic()
+        self._captured: Optional[tuple[float, str, list[str]]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task[None]] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat_task is not None and not self._heartbeat_task.done()
+
+    async def start(self) -> None:
+        """Start measuring the running loop"""
+
+        if self.running:
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop_event.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+        logger.info(
+            f"LoopLagMonitor started (interval {self.interval}s, "
+            f"block threshold {self.block_threshold}s)"
+        )
+
+    async def stop(self) -> None:
+        """Stop measuring"""
+
+        self._stop_event.set()
+        if self._heartbeat_task and not self._heartbeat_task.done():
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+        logger.info("LoopLagMonitor stopped")
+
+    async def _heartbeat(self) -> None:
+        while True:
+            previous_beat = self._beat
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+
+            # Only a capture taken during this sleep belongs to this lag
+            captured, self._captured = self._captured, None
+            if captured is not None and captured[0] != previous_beat:
+                captured = None
+
+            try:
+                self.record_lag(now - started - self.interval, now, captured)
+            except Exception as e:
+                logger.error(f"Loop lag recording failed: {e}")
+
+    def _watch(self) -> None:
+        """Capture the loop thread's stack while the heartbeat is overdue"""
+
+        check_interval = max(self.block_threshold / 2, 0.005)
+        while not self._stop_event.wait(check_interval):
+            beat = self._beat
+            overdue = time.monotonic() - beat - self.interval
+            if overdue < self.block_threshold:
+                continue
+            if self._captured is not None and self._captured[0] == beat:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                site, stack = self._describe(frame)
+                self._captured = (beat, site, stack)
+
+    def _describe(self, frame: FrameType) -> tuple[str, list[str]]:
+        """Blocking call site and formatted stack of a loop thread frame"""
+
+        site = None
+        current: Optional[FrameType] = frame
+        while current is not None:
+            filename = current.f_code.co_filename
+            if not filename.startswith(_LIBRARY_PATHS):
+                site = f"{current.f_code.co_name} ({filename}:{current.f_lineno})"
+                break
+            current = current.f_back
+
+        if site is None:
+            code = frame.f_code
+            site = f"{code.co_name} ({code.co_filename}:{frame.f_lineno})"
+
+        stack = traceback.format_list(
+            traceback.extract_stack(frame, limit=self.max_stack_depth)
+        )
+        return site, [line.rstrip() for line in stack]
+
+    def record_lag(
+        self,
+        lag: float,
+        now: Optional[float] = None,
+        captured: Optional[tuple[float, str, list[str]]] = None,
+    ) -> None:
+        """Record one lag measurement, charging it to a blocking site"""
+
+        lag = max(0.0, lag)
+        now = time.monotonic() if now is None else now
+
+        self.samples += 1
+        self.lag_sum += lag
+        self.max_lag = max(self.max_lag, lag)
+        self.bucket_counts[bisect_left(LOOP_LAG_BUCKETS, lag)] += 1
+
+        self._recent.append((now, lag))
+        horizon = now - self.recent_window
+        while self._recent and self._recent[0][0] < horizon:
+            self._recent.popleft()
+
+        observe_event_loop_lag(lag)
+
+        if lag < self.block_threshold:
+            return
+
+        self.blocked += 1
+        record_event_loop_block()
+
+        _, site_name, stack = captured or (None, UNKNOWN_SITE, [])
+        site = self._sites.get(site_name)
+        if site is None:
+            if len(self._sites) >= self.max_sites:
+                # Make room by forgetting the site that blocked the least
+                least = min(self._sites.values(), key=lambda s: s.total_seconds)
+                del self._sites[least.site]
+            site = self._sites[site_name] = BlockingSite(site_name)
+        site.count += 1
+        site.total_seconds += lag
+        site.max_seconds = max(site.max_seconds, lag)
+        site.last_seen = time.time()
+        if stack:
+            site.stack = stack
+
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms at {site_name}")
+
+    def get_blocking_sites(self, count: int = 10) -> list[dict[str, Any]]:
+        """Call sites that blocked the loop the longest in total"""
+        sites = sorted(
+            self._sites.values(), key=lambda s: s.total_seconds, reverse=True
+        )
+        return [site.to_dict() for site in sites[:count]]
+
+    def get_lag_histogram(self) -> list[dict[str, Any]]:
+        """Cumulative lag counts per bucket upper bound"""
+        histogram = []
+        cumulative = 0
+        for bound, bucket_count in zip((*LOOP_LAG_BUCKETS, "+Inf"), self.bucket_counts):
+            cumulative += bucket_count
+            histogram.append({"le": bound, "count": cumulative})
+        return histogram
+
+    def get_recent_summary(self) -> dict[str, float]:
+        """Lag statistics over the recent window"""
+        return summarize([lag for _, lag in self._recent], percentiles=True)
+
+    def get_report(self, top: int = 10) -> dict[str, Any]:
+        """Lag statistics, histogram and top blocking call sites"""
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "block_threshold_seconds": self.block_threshold,
+            "samples": self.samples,
+            "blocked": self.blocked,
+            "mean_lag_seconds": self.lag_sum / self.samples if self.samples else 0.0,
+            "max_lag_seconds": self.max_lag,
+            "recent": self.get_recent_summary(),
+            "histogram": self.get_lag_histogram(),
+            "blocking_sites": self.get_blocking_sites(top),
+        }
+
+
+# Global loop monitor instance
+_loop_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_loop_monitor() -> Optional[LoopLagMonitor]:
+    """Get global loop monitor instance"""
+    global _loop_monitor
+    return _loop_monitor
+
+
+async def start_loop_monitor(
+    config: Optional[dict[str, Any]] = None,
+) -> LoopLagMonitor:
+    """Initialize the global loop monitor and start it on the running loop"""
+    global _loop_monitor
+
+    if _loop_monitor is None:
+        _loop_monitor = LoopLagMonitor(config)
+    await _loop_monitor.start()
+    return _loop_monitor
+
+
+async def shutdown_loop_monitor() -> None:
+    """Shutdown global loop monitor"""
+    global _loop_monitor
+
+    if _loop_monitor:
+        await _loop_monitor.stop()
+        _loop_monitor = None
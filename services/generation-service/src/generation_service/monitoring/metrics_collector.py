@@ -3,15 +3,17 @@ Performance metrics collection and tracking system
 """
 
 import asyncio
+import math
 import statistics
 import time
-from collections import defaultdict
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Any, Optional
 
+from .time_series import SKETCH_AVAILABLE, MetricSeries, SketchWindow, summarize
+
 # Import Core Module components
 try:
     from ai_script_core import (
@@ -148,21 +150,23 @@ class MetricsCollector:
     - Automatic aggregation and statistics
     - Performance target tracking
     - Custom metric registration
-    - Time-series data storage
+    - Time-series data storage in per-metric columnar ring buffers
     """
 
     def __init__(self, config: Optional[dict[str, Any]] = None):
         self.config = config or {}
 
-        # Metric storage
-        self._metrics: dict[str, list[MetricValue]] = defaultdict(list)
-        self._metric_types: dict[str, MetricType] = {}
-        self._metric_descriptions: dict[str, str] = {}
-
         # Time-series storage configuration
         self.max_history_size = self.config.get("max_history_size", 10000)
         self.retention_hours = self.config.get("retention_hours", 24)
 
+        # Metric storage
+        self._metrics: dict[str, MetricSeries] = {}
+        # Per-minute quantile sketches of histogram metrics
+        self._sketches: dict[str, SketchWindow] = {}
+        self._metric_types: dict[str, MetricType] = {}
+        self._metric_descriptions: dict[str, str] = {}
+
         # Aggregation intervals
         self.aggregation_intervals = {
             "1min": timedelta(minutes=1),
@@ -271,26 +275,31 @@ class MetricsCollector:
             )
             return
 
-        # Create metric value
-        metric_value = MetricValue(
-            timestamp=utc_now() if CORE_AVAILABLE else datetime.now(),
-            value=value,
-            labels=labels or {},
-        )
-
-        # Store metric
-        self._metrics[name].append(metric_value)
-
-        # Trim history if too large
-        if len(self._metrics[name]) > self.max_history_size:
-            self._metrics[name] = self._metrics[name][-self.max_history_size :]
+        # Store metric; a full buffer overwrites its oldest sample
+        series = self._metrics.get(name)
+        if series is None:
+            series = self._metrics[name] = MetricSeries(self.max_history_size)
+        timestamp = time.time()
+        series.append(timestamp, value, labels)
+
+        if expected_type == MetricType.HISTOGRAM and SKETCH_AVAILABLE:
+            sketches = self._sketches.get(name)
+            if sketches is None:
+                sketches = self._sketches[name] = SketchWindow(
+                    max_slices=int(self.retention_hours * 60)
+                )
+            sketches.add(timestamp, value)
 
         # Call event handlers
-        for handler in self._metric_handlers:
-            try:
-                handler(name, metric_value)
-            except Exception as e:
-                logger.error(f"Metric handler failed: {e}")
+        if self._metric_handlers:
+            metric_value = MetricValue(
+                timestamp=_to_datetime(timestamp), value=value, labels=labels or {}
+            )
+            for handler in self._metric_handlers:
+                try:
+                    handler(name, metric_value)
+                except Exception as e:
+                    logger.error(f"Metric handler failed: {e}")
 
     async def start_collection(self) -> None:
         """Start metrics collection"""
@@ -349,17 +358,11 @@ class MetricsCollector:
             try:
                 await asyncio.sleep(300.0)  # Cleanup every 5 minutes
 
-                cutoff_time = (
-                    utc_now() if CORE_AVAILABLE else datetime.now()
-                ) - timedelta(hours=self.retention_hours)
+                cutoff_time = time.time() - self.retention_hours * 3600
 
-                cleaned_count = 0
-                for metric_name, values in self._metrics.items():
-                    original_size = len(values)
-                    self._metrics[metric_name] = [
-                        v for v in values if v.timestamp > cutoff_time
-                    ]
-                    cleaned_count += original_size - len(self._metrics[metric_name])
+                cleaned_count = sum(
+                    series.drop_before(cutoff_time) for series in self._metrics.values()
+                )
 
                 if cleaned_count > 0:
                     logger.debug(f"Cleaned {cleaned_count} old metric values")
@@ -379,43 +382,43 @@ class MetricsCollector:
             # Workflow execution time
             workflow_times = self._get_recent_values("workflow_execution_time", window)
             if workflow_times:
-                self._current_metrics.workflow_execution_time = statistics.mean(
-                    workflow_times
-                )
+                self._current_metrics.workflow_execution_time = _mean(workflow_times)
 
             # AI API response time
             api_times = self._get_recent_values("ai_api_response_time", window)
             if api_times:
-                self._current_metrics.ai_api_response_time = statistics.mean(api_times)
+                self._current_metrics.ai_api_response_time = _mean(api_times)
 
             # Token usage
             token_usage = self._get_recent_values("token_usage_per_request", window)
             if token_usage:
-                self._current_metrics.token_usage_per_request = statistics.mean(
-                    token_usage
-                )
+                self._current_metrics.token_usage_per_request = _mean(token_usage)
 
             # Cache hit ratio
             cache_hits = self._get_recent_values("cache_hit_ratio", window)
             if cache_hits:
-                self._current_metrics.cache_hit_ratio = statistics.mean(cache_hits)
+                self._current_metrics.cache_hit_ratio = _mean(cache_hits)
                 self._current_metrics.cache_miss_ratio = (
                     1.0 - self._current_metrics.cache_hit_ratio
                 )
 
             # Concurrent workflows (latest value)
-            concurrent_values = self._get_recent_values("concurrent_workflows", window)
-            if concurrent_values:
-                self._current_metrics.concurrent_workflows = int(concurrent_values[-1])
+            concurrent = self.get_latest_value("concurrent_workflows", window)
+            if concurrent is not None:
+                self._current_metrics.concurrent_workflows = int(concurrent)
 
             # Memory usage
             memory_values = self._get_recent_values("memory_usage", window)
             if memory_values:
-                self._current_metrics.memory_usage_mb = statistics.mean(memory_values)
+                self._current_metrics.memory_usage_mb = _mean(memory_values)
 
             # API throughput and latency
             api_latencies = self._get_recent_values("api_latency", window)
-            if api_latencies:
+            latency_sketch = self.get_quantile_sketch("api_latency", window)
+            if latency_sketch is not None and latency_sketch.count:
+                self._current_metrics.api_latency_p95 = latency_sketch.percentile(95)
+                self._current_metrics.api_latency_p99 = latency_sketch.percentile(99)
+            elif api_latencies:
                 self._current_metrics.api_latency_p95 = (
                     statistics.quantiles(api_latencies, n=20)[18]
                     if len(api_latencies) > 20
@@ -433,13 +436,14 @@ class MetricsCollector:
         except Exception as e:
             logger.error(f"Failed to update current metrics: {e}")
 
-    def _get_recent_values(self, metric_name: str, since: datetime) -> list[float]:
+    def _get_recent_values(self, metric_name: str, since: datetime) -> Sequence[float]:
         """Get metric values since specified time"""
 
-        if metric_name not in self._metrics:
+        series = self._metrics.get(metric_name)
+        if series is None:
             return []
 
-        return [m.value for m in self._metrics[metric_name] if m.timestamp >= since]
+        return series.values(since.timestamp())
 
     async def _calculate_success_rates(self, window: datetime) -> None:
         """Calculate success and error rates"""
@@ -447,15 +451,13 @@ class MetricsCollector:
         # This would integrate with actual error tracking
         # For now, we'll use dummy calculation
 
-        total_workflows = len(
-            self._get_recent_values("workflow_execution_time", window)
-        )
+        total_workflows = self.count_since("workflow_execution_time", window)
         if total_workflows > 0:
             # Assume 95% success rate as baseline
             self._current_metrics.workflow_success_rate = 95.0
             self._current_metrics.workflow_error_rate = 5.0
 
-        total_api_calls = len(self._get_recent_values("ai_api_response_time", window))
+        total_api_calls = self.count_since("ai_api_response_time", window)
         if total_api_calls > 0:
             # Assume 98% success rate for AI API
             self._current_metrics.ai_api_success_rate = 98.0
@@ -466,19 +468,73 @@ class MetricsCollector:
         return self._current_metrics
 
     def get_metric_history(
-        self, metric_name: str, since: Optional[datetime] = None
+        self,
+        metric_name: str,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None,
     ) -> list[MetricValue]:
-        """Get historical metric values"""
+        """Get historical metric values, the newest ``limit`` if given"""
 
-        if metric_name not in self._metrics:
+        series = self._metrics.get(metric_name)
+        if series is None:
             return []
 
-        values = self._metrics[metric_name]
+        since_ts = since.timestamp() if since else None
+        timestamps, values = series.window(since_ts, limit)
+        labels = series.labels(since_ts, limit)
+
+        return [
+            MetricValue(timestamp=_to_datetime(timestamp), value=value, labels=label)
+            for timestamp, value, label in zip(timestamps, values, labels)
+        ]
+
+    def get_metric_window(
+        self, metric_name: str, since: Optional[datetime] = None
+    ) -> tuple[Sequence[float], Sequence[float]]:
+        """Epoch timestamps and values since a time, without per-sample objects"""
 
-        if since:
-            values = [v for v in values if v.timestamp >= since]
+        series = self._metrics.get(metric_name)
+        if series is None:
+            return [], []
 
-        return values
+        return series.window(since.timestamp() if since else None)
+
+    def get_latest_value(
+        self, metric_name: str, since: Optional[datetime] = None
+    ) -> Optional[float]:
+        """Newest value of a metric, if recorded since the given time"""
+
+        series = self._metrics.get(metric_name)
+        latest = series.latest() if series is not None else None
+        if latest is None or (since is not None and latest[0] < since.timestamp()):
+            return None
+
+        return latest[1]
+
+    def get_quantile_sketch(
+        self, metric_name: str, since: Optional[datetime] = None
+    ) -> Optional[Any]:
+        """
+        Mergeable quantile sketch of a histogram metric since a time
+
+        Resolved to whole minutes. None when the metric has no sketches,
+        e.g. without the core module.
+        """
+
+        sketches = self._sketches.get(metric_name)
+        if sketches is None:
+            return None
+
+        return sketches.merged(since.timestamp() if since else None)
+
+    def count_since(self, metric_name: str, since: datetime) -> int:
+        """Number of values recorded since the given time"""
+
+        series = self._metrics.get(metric_name)
+        if series is None:
+            return 0
+
+        return len(series) - series.index_at(since.timestamp())
 
     def get_aggregated_metrics(
         self, metric_name: str, interval: str = "5min"
@@ -492,38 +548,18 @@ class MetricsCollector:
         since = now - self.aggregation_intervals[interval]
 
         values = self._get_recent_values(metric_name, since)
-
-        if not values:
-            return {}
-
-        aggregation = {
-            "count": len(values),
-            "min": min(values),
-            "max": max(values),
-            "mean": statistics.mean(values),
-            "median": statistics.median(values),
-        }
-
-        if len(values) > 1:
-            aggregation["stddev"] = statistics.stdev(values)
-
-        # Add percentiles for histogram metrics
-        if (
-            self._metric_types.get(metric_name) == MetricType.HISTOGRAM
-            and len(values) > 10
-        ):
-            try:
-                quantiles = statistics.quantiles(values, n=100)
-                aggregation.update(
-                    {
-                        "p50": quantiles[49],
-                        "p90": quantiles[89],
-                        "p95": quantiles[94],
-                        "p99": quantiles[98],
-                    }
-                )
-            except statistics.StatisticsError:
-                pass
+        is_histogram = self._metric_types.get(metric_name) == MetricType.HISTOGRAM
+        sketch = self.get_quantile_sketch(metric_name, since)
+
+        # Add percentiles for histogram metrics, read from the sketch if kept
+        aggregation = summarize(values, percentiles=is_histogram and sketch is None)
+        if sketch is not None and len(values) > 10:
+            aggregation.update(
+                {
+                    f"p{percentile}": sketch.percentile(percentile)
+                    for percentile in (50, 90, 95, 99)
+                }
+            )
 
         return aggregation
 
@@ -597,7 +633,7 @@ class MetricsCollector:
                 name: {
                     "type": self._metric_types[name].value,
                     "description": self._metric_descriptions[name],
-                    "data_points": len(self._metrics.get(name, [])),
+                    "data_points": len(self._metrics.get(name, ())),
                 }
                 for name in self._metric_types.keys()
             },
@@ -611,6 +647,17 @@ class MetricsCollector:
         }
 
 
+def _mean(values: Sequence[float]) -> float:
+    return math.fsum(values) / len(values)
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    """Epoch seconds as the datetime flavour ``utc_now`` would have produced"""
+    if CORE_AVAILABLE:
+        return datetime.fromtimestamp(timestamp, timezone.utc)
+    return datetime.fromtimestamp(timestamp)
+
+
 # Context managers for automatic metric recording
 class MetricTimer:
     """Context manager for timing operations"""
@@ -0,0 +1,202 @@
+"""
+Prometheus series recorded by the Generation Service
+"""
+
+import time
+from typing import Any, Optional
+
+try:
+    from ai_script_core.observability.prometheus import (
+        CONTENT_TYPE_LATEST,
+        FIRST_EVENT_BUCKETS,
+        LATENCY_BUCKETS,
+        LLM_LATENCY_BUCKETS,
+        TOKEN_BUCKETS,
+        get_prometheus_registry,
+    )
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+    PROMETHEUS_AVAILABLE = False
+
+# Import Core Module components
+try:
+    from ai_script_core import get_service_logger
+
+    logger = get_service_logger("generation-service.prometheus_metrics")
+except (ImportError, RuntimeError):
+    import logging
+
+    logger = logging.getLogger(__name__)  # type: ignore[assignment]
+
+PREFIX = "generation_service"
+SERVICE_VERSION = "3.0.0"
+
+# Event loop lag buckets, in seconds
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class GenerationMetrics:
+    """
+    Handles to the service's Prometheus series
+
+    Series are looked up once here, so recording is a dict lookup and an
+    in-place increment on the worker's registry. Job and connection gauges
+    are refreshed from the job manager whenever the registry is collected.
+    """
+
+    def __init__(self, registry: Any) -> None:
+        self.registry = registry
+        self.start_time = time.time()
+
+        self.requests_total = registry.counter(
+            f"{PREFIX}_requests_total",
+            "Total number of HTTP requests",
+            ("method", "status"),
+        )
+        self.request_duration = registry.histogram(
+            f"{PREFIX}_requests_duration_seconds",
+            "HTTP request latency in seconds",
+            ("method",),
+            LATENCY_BUCKETS,
+        )
+        self.llm_duration = registry.histogram(
+            f"{PREFIX}_llm_request_duration_seconds",
+            "LLM provider call latency in seconds",
+            ("provider",),
+            LLM_LATENCY_BUCKETS,
+        )
+        self.llm_tokens = registry.histogram(
+            f"{PREFIX}_llm_tokens",
+            "Tokens used per LLM provider call",
+            ("provider",),
+            TOKEN_BUCKETS,
+        )
+        self.sse_first_event = registry.histogram(
+            f"{PREFIX}_sse_first_event_duration_seconds",
+            "Time from SSE connection to the first event in seconds",
+            (),
+            FIRST_EVENT_BUCKETS,
+        )
+        self.rag_stage_duration = registry.histogram(
+            f"{PREFIX}_rag_stage_duration_seconds",
+            "RAG pipeline stage latency in seconds",
+            ("stage",),
+            LATENCY_BUCKETS,
+        )
+        self.event_loop_lag = registry.histogram(
+            f"{PREFIX}_event_loop_lag_seconds",
+            "Delay of the event loop in running a due callback, in seconds",
+            (),
+            LOOP_LAG_BUCKETS,
+        )
+        self.event_loop_blocks = registry.counter(
+            f"{PREFIX}_event_loop_blocked_total",
+            "Number of times a callback blocked the event loop",
+        )
+        self.jobs_finished = {
+            status: registry.counter(
+                f"{PREFIX}_jobs_{status}_total", f"Total number of {status} jobs"
+            )
+            for status in ("completed", "failed")
+        }
+        self.jobs_active = registry.gauge(
+            f"{PREFIX}_jobs_active", "Number of currently active jobs"
+        )
+        self.jobs_queued = registry.gauge(
+            f"{PREFIX}_jobs_queued", "Number of jobs waiting in the queue"
+        )
+        self.sse_connections_active = registry.gauge(
+            f"{PREFIX}_sse_connections_active", "Number of active SSE connections"
+        )
+        self.uptime = registry.gauge(
+            f"{PREFIX}_uptime_seconds",
+            "Uptime of the longest-running worker",
+            multiprocess_mode="max",
+        )
+        self.build_info = registry.gauge(
+            f"{PREFIX}_build_info",
+            "Build information",
+            ("version", "service"),
+            multiprocess_mode="max",
+        )
+        self.build_info.labels(SERVICE_VERSION, "generation-service").set(1)
+
+        registry.add_collect_hook(self._refresh_gauges)
+
+    def _refresh_gauges(self) -> None:
+        self.uptime.set(time.time() - self.start_time)
+        try:
+            from ..services.job_manager import get_job_manager
+
+            job_stats = get_job_manager().get_job_stats()
+        except Exception as e:
+            logger.debug(f"Job stats unavailable for metrics: {e}")
+            return
+
+        self.jobs_active.set(job_stats.get("queued", 0) + job_stats.get("streaming", 0))
+        self.jobs_queued.set(job_stats.get("queued", 0))
+        self.sse_connections_active.set(job_stats.get("active_connections", 0))
+
+
+_generation_metrics: Optional[GenerationMetrics] = None
+
+
+def get_generation_metrics() -> Optional[GenerationMetrics]:
+    """Get the service's Prometheus series, None without the core module"""
+    global _generation_metrics
+    if _generation_metrics is None and PROMETHEUS_AVAILABLE:
+        _generation_metrics = GenerationMetrics(get_prometheus_registry())
+    return _generation_metrics
+
+
+def observe_request(method: str, status_code: int, seconds: float) -> None:
+    metrics = get_generation_metrics()
+    if metrics is not None:
+        metrics.requests_total.labels(method, status_code).inc()
+        metrics.request_duration.labels(method).observe(seconds)
+
+
+def observe_llm_request(provider: str, seconds: float, tokens: int) -> None:
+    metrics = get_generation_metrics()
+    if metrics is not None:
+        metrics.llm_duration.labels(provider).observe(seconds)
+        metrics.llm_tokens.labels(provider).observe(tokens)
+
+
+def observe_sse_first_event(seconds: float) -> None:
+    metrics = get_generation_metrics()
+    if metrics is not None:
+        metrics.sse_first_event.observe(seconds)
+
+
+def observe_rag_stage(stage: str, seconds: float) -> None:
+    metrics = get_generation_metrics()
+    if metrics is not None:
+        metrics.rag_stage_duration.labels(stage).observe(seconds)
+
+
+def observe_event_loop_lag(seconds: float) -> None:
+    metrics = get_generation_metrics()
+    if metrics is not None:
+        metrics.event_loop_lag.observe(seconds)
+
+
+def record_event_loop_block() -> None:
+    metrics = get_generation_metrics()
+    if metrics is not None:
+        metrics.event_loop_blocks.inc()
+
+
+def record_job_finished(status: str) -> None:
+    """Count a job reaching a final status (completed or failed)"""
+    metrics = get_generation_metrics()
+    if metrics is not None and status in metrics.jobs_finished:
+        metrics.jobs_finished[status].inc()
+
+
+def render_metrics() -> Optional[str]:
+    """All workers' series in the Prometheus text format"""
+    metrics = get_generation_metrics()
+    return metrics.registry.render() if metrics is not None else None
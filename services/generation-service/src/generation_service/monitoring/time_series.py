@@ -0,0 +1,219 @@
+"""
+Columnar ring-buffer storage for metric time series
+"""
+
+import math
+import statistics
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Optional
+
+try:
+    from ai_script_core.observability.sketch import QuantileSketch
+
+    SKETCH_AVAILABLE = True
+except ImportError:
+    QuantileSketch = None  # type: ignore[assignment,misc]
+    SKETCH_AVAILABLE = False
+
+
+class MetricSeries:
+    """
+    Fixed-capacity ring buffer of samples stored in columns
+
+    Timestamps (epoch seconds) and values are kept in preallocated float64
+    arrays, so recording a sample is O(1), overwrites the oldest sample
+    once the buffer is full and allocates no per-sample object. Samples
+    are kept in time order, which lets a time window be located by binary
+    search in O(log n) and returned as a contiguous array slice. Labels
+    are stored in a separate column that is only allocated once a sample
+    carries labels.
+    """
+
+    __slots__ = ("_labels", "_size", "_start", "_timestamps", "_values", "capacity")
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._labels: Optional[list[Optional[dict[str, str]]]] = None
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self, timestamp: float, value: float, labels: Optional[dict[str, str]] = None
+    ) -> None:
+        if self._size:
+            # Keep the column sorted even if the wall clock steps back
+            timestamp = max(timestamp, self._timestamps[self._physical(self._size - 1)])
+
+        if self._size < self.capacity:
+            index = self._physical(self._size)
+            self._size += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        self._timestamps[index] = timestamp
+        self._values[index] = value
+        if labels:
+            if self._labels is None:
+                self._labels = [None] * self.capacity
+            self._labels[index] = labels
+        elif self._labels is not None:
+            self._labels[index] = None
+
+    def latest(self) -> Optional[tuple[float, float]]:
+        """Timestamp and value of the newest sample"""
+        if not self._size:
+            return None
+        index = self._physical(self._size - 1)
+        return self._timestamps[index], self._values[index]
+
+    def index_at(self, since: float) -> int:
+        """Position of the first sample at or after ``since``"""
+        first_end = min(self._start + self._size, self.capacity)
+        position = bisect_left(self._timestamps, since, self._start, first_end)
+        if position < first_end:
+            return position - self._start
+
+        wrapped = self._start + self._size - self.capacity
+        if wrapped <= 0:
+            return self._size
+        return (
+            first_end - self._start + bisect_left(self._timestamps, since, 0, wrapped)
+        )
+
+    def window(
+        self, since: Optional[float] = None, limit: Optional[int] = None
+    ) -> tuple[array, array]:
+        """Timestamp and value columns of the samples at or after ``since``"""
+        start = self.index_at(since) if since is not None else 0
+        if limit is not None:
+            start = max(start, self._size - limit)
+        return (
+            self._slice(self._timestamps, start),
+            self._slice(self._values, start),
+        )
+
+    def values(self, since: Optional[float] = None) -> array:
+        """Value column of the samples at or after ``since``"""
+        return self._slice(
+            self._values, self.index_at(since) if since is not None else 0
+        )
+
+    def labels(
+        self, since: Optional[float] = None, limit: Optional[int] = None
+    ) -> list[dict[str, str]]:
+        """Labels of the same samples as ``window``, empty where unset"""
+        start = self.index_at(since) if since is not None else 0
+        if limit is not None:
+            start = max(start, self._size - limit)
+        if self._labels is None:
+            return [{} for _ in range(self._size - start)]
+        return [
+            self._labels[self._physical(position)] or {}
+            for position in range(start, self._size)
+        ]
+
+    def drop_before(self, cutoff: float) -> int:
+        """Discard samples older than ``cutoff``, returning how many"""
+        dropped = self.index_at(cutoff)
+        if dropped:
+            if self._labels is not None:
+                for position in range(dropped):
+                    self._labels[self._physical(position)] = None
+            self._start = (self._start + dropped) % self.capacity
+            self._size -= dropped
+        return dropped
+
+    def _physical(self, position: int) -> int:
+        return (self._start + position) % self.capacity
+
+    def _slice(self, column: array, start: int) -> array:
+        count = self._size - start
+        if count <= 0:
+            return array("d")
+        begin = self._physical(start)
+        end = begin + count
+        if end <= self.capacity:
+            return column[begin:end]
+        return column[begin:] + column[: end - self.capacity]
+
+
+class SketchWindow:
+    """
+    Quantile sketches of consecutive time slices
+
+    Every ``slice_seconds`` starts a new sketch and a window query merges
+    the sketches it covers, so a percentile read costs O(slices) however
+    many samples were recorded. Windows are resolved to whole slices, and
+    only the latest ``max_slices`` slices are kept.
+    """
+
+    def __init__(self, slice_seconds: float = 60.0, max_slices: int = 1440) -> None:
+        self.slice_seconds = slice_seconds
+        self._slices: deque[tuple[int, Any]] = deque(maxlen=max_slices)
+
+    def add(self, timestamp: float, value: float) -> None:
+        slice_index = int(timestamp // self.slice_seconds)
+        if not self._slices or self._slices[-1][0] < slice_index:
+            self._slices.append((slice_index, QuantileSketch()))
+        self._slices[-1][1].add(value)
+
+    def merged(self, since: Optional[float] = None) -> Any:
+        """One sketch of the slices overlapping ``[since, now]``"""
+        first = int(since // self.slice_seconds) if since is not None else None
+        merged = QuantileSketch()
+        for slice_index, sketch in reversed(self._slices):
+            if first is not None and slice_index < first:
+                break
+            merged.merge(sketch)
+        return merged
+
+
+def summarize(values: Any, percentiles: bool = False) -> dict[str, float]:
+    """Count, min, max, mean, median and stddev (plus p50-p99) of values"""
+
+    count = len(values)
+    if not count:
+        return {}
+
+    ordered = sorted(values)
+    mean = math.fsum(ordered) / count
+    middle = count // 2
+    summary = {
+        "count": count,
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": mean,
+        "median": (
+            ordered[middle]
+            if count % 2
+            else (ordered[middle - 1] + ordered[middle]) / 2
+        ),
+    }
+
+    if count > 1:
+        summary["stddev"] = math.sqrt(
+            math.fsum((value - mean) ** 2 for value in ordered) / (count - 1)
+        )
+
+    if percentiles and count > 10:
+        quantiles = statistics.quantiles(ordered, n=100)
+        summary.update(
+            {
+                "p50": quantiles[49],
+                "p90": quantiles[89],
+                "p95": quantiles[94],
+                "p99": quantiles[98],
+            }
+        )
+
+    return summary
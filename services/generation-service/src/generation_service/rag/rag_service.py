@@ -66,6 +66,7 @@ except (ImportError, RuntimeError):
         pass
 
 
+from ..monitoring.prometheus_metrics import observe_rag_stage
 from .chroma_store import ChromaStore, ChromaStoreError
 from .context_builder import (
     ContextBuilder,
@@ -383,6 +384,10 @@ class RAGService:
 
             # Update metrics
             self._update_service_metrics(search_time, build_time, total_tokens)
+            observe_rag_stage("search", search_time)
+            if search_response.results:
+                observe_rag_stage("context_build", build_time)
+            observe_rag_stage("total", total_time)
 
             # Prepare search results for response
             search_results_data = [
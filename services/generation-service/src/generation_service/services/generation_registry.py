@@ -0,0 +1,448 @@
+"""
+Bounded registry for generation results with spill-to-storage eviction
+"""
+
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from generation_service.models.generation import GenerationResponse, GenerationStatus
+
+try:
+    from ai_script_core import get_service_logger
+
+    logger = get_service_logger("generation-service.generation-registry")
+except (ImportError, RuntimeError):
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+
+TERMINAL_STATUSES = frozenset(
+    {GenerationStatus.COMPLETED, GenerationStatus.FAILED, GenerationStatus.CANCELLED}
+)
+
+
+class SpillStore(ABC):
+    """Storage for full generation records evicted from memory"""
+
+    @abstractmethod
+    async def put(self, generation_id: str, data: str) -> None:
+        """Store a serialized generation record"""
+
+    @abstractmethod
+    async def get(self, generation_id: str) -> Optional[str]:
+        """Load a serialized generation record"""
+
+    @abstractmethod
+    async def delete(self, generation_id: str) -> None:
+        """Remove a serialized generation record"""
+
+
+class DiskSpillStore(SpillStore):
+    """Spill store keeping one JSON file per generation"""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, generation_id: str) -> Path:
+        return self.directory / f"{generation_id}.json"
+
+    async def put(self, generation_id: str, data: str) -> None:
+        await asyncio.to_thread(self._path(generation_id).write_text, data, "utf-8")
+
+    async def get(self, generation_id: str) -> Optional[str]:
+        path = self._path(generation_id)
+        try:
+            return await asyncio.to_thread(path.read_text, "utf-8")
+        except FileNotFoundError:
+            return None
+
+    async def delete(self, generation_id: str) -> None:
+        await asyncio.to_thread(self._path(generation_id).unlink, True)
+
+
+class RedisSpillStore(SpillStore):
+    """Spill store keeping generation records in Redis with an expiry"""
+
+    def __init__(
+        self, redis_client: Any, prefix: str = "generation:", ttl_seconds: int = 86400
+    ) -> None:
+        self.redis = redis_client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    async def put(self, generation_id: str, data: str) -> None:
+        await self.redis.set(f"{self.prefix}{generation_id}", data, ex=self.ttl_seconds)
+
+    async def get(self, generation_id: str) -> Optional[str]:
+        data = await self.redis.get(f"{self.prefix}{generation_id}")
+        if isinstance(data, bytes):
+            return data.decode("utf-8")
+        return data
+
+    async def delete(self, generation_id: str) -> None:
+        await self.redis.delete(f"{self.prefix}{generation_id}")
+
+
+@dataclass
+class GenerationSummary:
+    """Lightweight in-memory record of a generation"""
+
+    generation_id: str
+    project_id: Optional[str]
+    status: GenerationStatus
+    script_type: str
+    created_at: Optional[datetime]
+    completed_at: Optional[datetime] = None
+    word_count: Optional[int] = None
+    quality_score: Optional[float] = None
+    recommendations: tuple[str, ...] = ()
+    spilled: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["status"] = self.status.value
+        data["recommendations"] = list(self.recommendations)
+        return data
+
+
+@dataclass
+class _LiveGeneration:
+    """Full generation record with its execution state"""
+
+    response: GenerationResponse
+    metadata: Any = None
+    context: Any = None
+    finished_at: Optional[float] = None
+    extras: dict[str, Any] = field(default_factory=dict)
+
+
+DetailsBuilder = Callable[[str, Any], Optional[dict[str, Any]]]
+
+
+class GenerationRegistry:
+    """
+    Bounded generation store with status indexes
+
+    Running generations stay in memory with their metadata and node context.
+    Once a generation reaches a terminal status it is kept in memory for
+    ``completed_ttl`` seconds (or until more than ``max_live`` generations
+    are held), then its full record is written to the spill store and only
+    a ``GenerationSummary`` remains. Summaries are dropped after
+    ``summary_ttl`` seconds or beyond ``max_summaries`` entries.
+
+    Callers mutating a generation's status in place must call ``update()``
+    so the status indexes stay correct.
+    """
+
+    def __init__(
+        self,
+        spill_store: Optional[SpillStore] = None,
+        max_live: int = 200,
+        completed_ttl: float = 300.0,
+        max_summaries: int = 10000,
+        summary_ttl: float = 86400.0,
+        details_builder: Optional[DetailsBuilder] = None,
+    ) -> None:
+        self.spill_store = spill_store
+        self.max_live = max_live
+        self.completed_ttl = completed_ttl
+        self.max_summaries = max_summaries
+        self.summary_ttl = summary_ttl
+        self.details_builder = details_builder
+
+        self._live: OrderedDict[str, _LiveGeneration] = OrderedDict()
+        # Insertion order doubles as age order for eviction
+        self._summaries: OrderedDict[str, GenerationSummary] = OrderedDict()
+        self._summary_times: dict[str, float] = {}
+
+        # Indexes kept in step with every status change
+        self._status_of: dict[str, GenerationStatus] = {}
+        self._script_type_of: dict[str, str] = {}
+        self._status_counts: Counter[GenerationStatus] = Counter()
+        self._script_type_counts: Counter[str] = Counter()
+        self._active: dict[str, None] = {}
+
+        self._spilled = 0
+        self._evicted = 0
+
+        # Spilling awaits the store, so overlapping maintenance passes would
+        # pick the same generations; passes run one at a time instead
+        self._maintain_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._status_of)
+
+    def __contains__(self, generation_id: object) -> bool:
+        return generation_id in self._status_of
+
+    @property
+    def live_count(self) -> int:
+        return len(self._live)
+
+    async def put(
+        self,
+        generation_id: str,
+        response: GenerationResponse,
+        metadata: Any = None,
+        context: Any = None,
+    ) -> None:
+        """Register or replace a generation and index its status"""
+        entry = self._live.get(generation_id)
+        if entry is None:
+            entry = _LiveGeneration(response, metadata, context)
+            self._live[generation_id] = entry
+        else:
+            entry.response = response
+            entry.metadata = metadata if metadata is not None else entry.metadata
+            entry.context = context if context is not None else entry.context
+
+        self._summaries.pop(generation_id, None)
+        self._summary_times.pop(generation_id, None)
+        self._index(generation_id, response)
+        await self.maintain()
+
+    async def update(self, generation_id: str) -> None:
+        """Re-index a live generation after its status was changed in place"""
+        entry = self._live.get(generation_id)
+        if entry is None:
+            return
+        self._index(generation_id, entry.response)
+        await self.maintain()
+
+    def get_live(self, generation_id: str) -> Optional[GenerationResponse]:
+        """Get a generation only if it is still held in memory"""
+        entry = self._live.get(generation_id)
+        return entry.response if entry else None
+
+    def get_context(self, generation_id: str) -> Any:
+        """Get the node context of an in-memory generation"""
+        entry = self._live.get(generation_id)
+        return entry.context if entry else None
+
+    async def get(self, generation_id: str) -> Optional[GenerationResponse]:
+        """Get a generation from memory, or reload it from the spill store"""
+        live = self.get_live(generation_id)
+        if live is not None:
+            return live
+
+        record = await self._load(generation_id)
+        if record is None:
+            return None
+        return GenerationResponse.model_validate(record["response"])
+
+    async def get_details(self, generation_id: str) -> Optional[dict[str, Any]]:
+        """Get the details built for a generation when it left memory"""
+        record = await self._load(generation_id)
+        return record.get("details") if record else None
+
+    def get_summary(self, generation_id: str) -> Optional[GenerationSummary]:
+        entry = self._live.get(generation_id)
+        if entry is not None:
+            return self._summarize(generation_id, entry)
+        return self._summaries.get(generation_id)
+
+    def list_active(self) -> list[GenerationResponse]:
+        """Pending and in-progress generations, oldest first"""
+        return [
+            self._live[generation_id].response
+            for generation_id in self._active
+            if generation_id in self._live
+        ]
+
+    def iter_summaries(
+        self, status: Optional[GenerationStatus] = None
+    ) -> Iterator[GenerationSummary]:
+        """Summaries of all known generations, optionally filtered by status"""
+        for generation_id, entry in self._live.items():
+            if status is None or self._status_of.get(generation_id) == status:
+                yield self._summarize(generation_id, entry)
+        for summary in self._summaries.values():
+            if status is None or summary.status == status:
+                yield summary
+
+    def get_statistics(self) -> dict[str, Any]:
+        """Status and script type counts from the indexes"""
+        return {
+            "total_generations": len(self._status_of),
+            "by_status": {
+                status.value: self._status_counts[status] for status in GenerationStatus
+            },
+            "by_script_type": {
+                script_type: count
+                for script_type, count in self._script_type_counts.items()
+                if count
+            },
+        }
+
+    def get_registry_stats(self) -> dict[str, Any]:
+        """Memory footprint and eviction counters"""
+        return {
+            "live": len(self._live),
+            "summaries": len(self._summaries),
+            "active": len(self._active),
+            "spilled": self._spilled,
+            "evicted": self._evicted,
+            "max_live": self.max_live,
+            "max_summaries": self.max_summaries,
+        }
+
+    async def maintain(self) -> None:
+        """Spill finished generations and drop expired summaries"""
+        async with self._maintain_lock:
+            now = time.monotonic()
+
+            finished = [
+                generation_id
+                for generation_id, entry in self._live.items()
+                if entry.finished_at is not None
+            ]
+            overflow = len(self._live) - self.max_live
+            for generation_id in finished:
+                # Generations may be replaced while an earlier spill awaits
+                entry = self._live.get(generation_id)
+                if entry is None or entry.finished_at is None:
+                    continue
+                if overflow > 0 or now - entry.finished_at >= self.completed_ttl:
+                    await self._spill(generation_id, entry)
+                    overflow -= 1
+
+            while self._summaries:
+                generation_id, _ = next(iter(self._summaries.items()))
+                expired = now - self._summary_times[generation_id] >= self.summary_ttl
+                if not expired and len(self._summaries) <= self.max_summaries:
+                    break
+                await self._evict(generation_id)
+
+    def _index(self, generation_id: str, response: GenerationResponse) -> None:
+        status = response.status
+        script_type = response.script_type.value if response.script_type else "unknown"
+
+        previous = self._status_of.get(generation_id)
+        if previous is not None:
+            self._status_counts[previous] -= 1
+            self._script_type_counts[self._script_type_of[generation_id]] -= 1
+
+        self._status_of[generation_id] = status
+        self._script_type_of[generation_id] = script_type
+        self._status_counts[status] += 1
+        self._script_type_counts[script_type] += 1
+
+        entry = self._live[generation_id]
+        if status in TERMINAL_STATUSES:
+            self._active.pop(generation_id, None)
+            if entry.finished_at is None:
+                entry.finished_at = time.monotonic()
+        else:
+            self._active[generation_id] = None
+            entry.finished_at = None
+
+    def _summarize(
+        self, generation_id: str, entry: _LiveGeneration
+    ) -> GenerationSummary:
+        response = entry.response
+        details = self._details(generation_id, entry) or {}
+        return GenerationSummary(
+            generation_id=generation_id,
+            project_id=response.project_id,
+            status=response.status,
+            script_type=self._script_type_of.get(generation_id, "unknown"),
+            created_at=getattr(response, "created_at", None),
+            completed_at=getattr(response, "completed_at", None),
+            word_count=response.word_count,
+            quality_score=details.get("overall_quality_score"),
+            recommendations=tuple(details.get("recommendations", ())),
+        )
+
+    def _details(
+        self, generation_id: str, entry: _LiveGeneration
+    ) -> Optional[dict[str, Any]]:
+        if "details" in entry.extras:
+            return entry.extras["details"]
+        if self.details_builder is None or entry.context is None:
+            return None
+
+        try:
+            details = self.details_builder(generation_id, entry.context)
+        except Exception as e:
+            logger.warning(f"Failed to build details for {generation_id}: {e}")
+            return None
+
+        # Finished generations no longer change, so build their details once
+        if entry.finished_at is not None:
+            entry.extras["details"] = details
+        return details
+
+    async def _spill(self, generation_id: str, entry: _LiveGeneration) -> None:
+        details = self._details(generation_id, entry)
+        summary = self._summarize(generation_id, entry)
+        if self.spill_store is not None:
+            record = {
+                "response": entry.response.model_dump(mode="json"),
+                "details": details,
+            }
+            try:
+                await self.spill_store.put(generation_id, json.dumps(record))
+                summary.spilled = True
+                self._spilled += 1
+            except Exception as e:
+                logger.warning(f"Failed to spill generation {generation_id}: {e}")
+
+        # Keep the generation in memory if it was put again during the spill
+        if self._live.get(generation_id) is not entry or entry.finished_at is None:
+            return
+
+        del self._live[generation_id]
+        self._summaries[generation_id] = summary
+        self._summary_times[generation_id] = time.monotonic()
+        logger.debug(f"Moved generation {generation_id} out of memory")
+
+    async def _evict(self, generation_id: str) -> None:
+        summary = self._summaries.pop(generation_id)
+        self._summary_times.pop(generation_id, None)
+
+        status = self._status_of.pop(generation_id)
+        self._status_counts[status] -= 1
+        self._script_type_counts[self._script_type_of.pop(generation_id)] -= 1
+        self._evicted += 1
+
+        if summary.spilled and self.spill_store is not None:
+            try:
+                await self.spill_store.delete(generation_id)
+            except Exception as e:
+                logger.warning(f"Failed to delete spilled {generation_id}: {e}")
+
+    async def _load(self, generation_id: str) -> Optional[dict[str, Any]]:
+        summary = self._summaries.get(generation_id)
+        if summary is None or not summary.spilled or self.spill_store is None:
+            return None
+        try:
+            data = await self.spill_store.get(generation_id)
+        except Exception as e:
+            logger.warning(f"Failed to load spilled generation {generation_id}: {e}")
+            return None
+        return json.loads(data) if data else None
+
+
+def create_spill_store(config: dict[str, Any]) -> Optional[SpillStore]:
+    """Build the configured spill store, or None to keep summaries only"""
+    backend = config.get("spill_backend", "disk")
+    if backend == "disk":
+        return DiskSpillStore(config["spill_dir"])
+    if backend == "redis":
+        import redis.asyncio as redis
+
+        return RedisSpillStore(
+            redis.from_url(config["redis_url"], decode_responses=True),
+            ttl_seconds=int(config["summary_ttl"]),
+        )
+    return None
@@ -0,0 +1,372 @@
+"""
+Bounded generation scheduler with admission control for SSE generation jobs
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Optional
+
+try:
+    from ai_script_core import get_service_logger
+
+    logger = get_service_logger("generation-service.generation-scheduler")
+except (ImportError, RuntimeError):
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+
+class GenerationPriority(str, Enum):
+    """Priority classes for queued generation jobs (served strictly in order)"""
+
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+class QueueFullError(Exception):
+    """Raised when a generation job cannot be admitted to the queue"""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+QueueUpdateListener = Callable[[str, Optional[int], Optional[int]], None]
+
+
+@dataclass
+class _QueuedGeneration:
+    """Generation job waiting for a worker slot"""
+
+    job_id: str
+    tenant_id: str
+    project_id: str
+    priority: GenerationPriority
+    runner: Callable[[], Awaitable[None]]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class _FairQueue:
+    """Round-robin queue over tenants, and over projects within each tenant"""
+
+    def __init__(self) -> None:
+        # tenant -> project -> jobs; OrderedDict order is the round-robin order
+        self._tenants: OrderedDict[str, OrderedDict[str, deque[_QueuedGeneration]]] = (
+            OrderedDict()
+        )
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, item: _QueuedGeneration) -> None:
+        projects = self._tenants.setdefault(item.tenant_id, OrderedDict())
+        projects.setdefault(item.project_id, deque()).append(item)
+        self._size += 1
+
+    def pop(self) -> Optional[_QueuedGeneration]:
+        if not self._tenants:
+            return None
+
+        tenant_id, projects = next(iter(self._tenants.items()))
+        project_id, jobs = next(iter(projects.items()))
+        item = jobs.popleft()
+        self._size -= 1
+
+        # Rotate served project and tenant to the back of the round-robin
+        if jobs:
+            projects.move_to_end(project_id)
+        else:
+            del projects[project_id]
+        if projects:
+            self._tenants.move_to_end(tenant_id)
+        else:
+            del self._tenants[tenant_id]
+
+        return item
+
+    def remove(self, job_id: str) -> Optional[_QueuedGeneration]:
+        for tenant_id, projects in self._tenants.items():
+            for project_id, jobs in projects.items():
+                for item in jobs:
+                    if item.job_id == job_id:
+                        jobs.remove(item)
+                        self._size -= 1
+                        if not jobs:
+                            del projects[project_id]
+                        if not projects:
+                            del self._tenants[tenant_id]
+                        return item
+        return None
+
+    def ordered(self) -> list[_QueuedGeneration]:
+        """Return items in the order pop() would serve them, without mutating"""
+        tenants = [
+            deque(deque(jobs) for jobs in projects.values())
+            for projects in self._tenants.values()
+        ]
+        rotation = deque(tenants)
+        result: list[_QueuedGeneration] = []
+
+        while rotation:
+            projects = rotation.popleft()
+            jobs = projects.popleft()
+            result.append(jobs.popleft())
+            if jobs:
+                projects.append(jobs)
+            if projects:
+                rotation.append(projects)
+
+        return result
+
+    def tenant_size(self, tenant_id: str) -> int:
+        projects = self._tenants.get(tenant_id)
+        if not projects:
+            return 0
+        return sum(len(jobs) for jobs in projects.values())
+
+
+class GenerationScheduler:
+    """
+    Bounded worker pool for generation jobs
+
+    At most ``max_concurrent`` generations run at once. Further jobs wait in
+    per-priority fair queues (round-robin across tenants and projects) and
+    are rejected with ``QueueFullError`` once the queue or the tenant's share
+    of it is full, so callers can answer with 429 and ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 5,
+        max_queue_size: int = 100,
+        max_queued_per_tenant: int = 20,
+        default_job_duration: float = 60.0,
+        on_queue_update: Optional[QueueUpdateListener] = None,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_queue_size = max_queue_size
+        self.max_queued_per_tenant = max_queued_per_tenant
+        self.on_queue_update = on_queue_update
+
+        self._queues: dict[GenerationPriority, _FairQueue] = {
+            priority: _FairQueue() for priority in GenerationPriority
+        }
+        self._running: dict[str, asyncio.Task[None]] = {}
+        self._avg_duration = default_job_duration
+
+        # Statistics
+        self._admitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._total_wait_time = 0.0
+
+    @property
+    def queued_count(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def running_count(self) -> int:
+        return len(self._running)
+
+    def submit(
+        self,
+        job_id: str,
+        runner: Callable[[], Awaitable[None]],
+        tenant_id: str = "default",
+        project_id: str = "default",
+        priority: GenerationPriority = GenerationPriority.NORMAL,
+    ) -> Optional[int]:
+        """
+        Admit a generation job
+
+        Returns None when the job started immediately, otherwise its 1-based
+        queue position. Raises QueueFullError when the job is not admitted.
+        """
+        if self.running_count < self.max_concurrent and self.queued_count == 0:
+            self._admitted += 1
+            self._start(
+                _QueuedGeneration(job_id, tenant_id, project_id, priority, runner)
+            )
+            return None
+
+        self.check_admission(tenant_id)
+
+        self._admitted += 1
+        self._queues[priority].push(
+            _QueuedGeneration(job_id, tenant_id, project_id, priority, runner)
+        )
+        self._dispatch()
+        logger.info(
+            f"Queued generation {job_id} (tenant={tenant_id}, priority={priority.value})"
+        )
+        return self.get_queue_position(job_id)
+
+    def check_admission(self, tenant_id: str = "default") -> None:
+        """Raise QueueFullError if a new job for ``tenant_id`` would be rejected"""
+        if self.running_count < self.max_concurrent and self.queued_count == 0:
+            return
+
+        if self.queued_count >= self.max_queue_size:
+            self._rejected += 1
+            raise QueueFullError(
+                "Generation queue is full", retry_after=self._retry_after()
+            )
+
+        tenant_queued = sum(
+            queue.tenant_size(tenant_id) for queue in self._queues.values()
+        )
+        if tenant_queued >= self.max_queued_per_tenant:
+            self._rejected += 1
+            raise QueueFullError(
+                f"Too many queued generations for tenant {tenant_id}",
+                retry_after=self._retry_after(),
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        """Remove a queued job, or cancel it if already running"""
+        for queue in self._queues.values():
+            if queue.remove(job_id):
+                self._notify_positions()
+                return True
+
+        task = self._running.get(job_id)
+        if task:
+            task.cancel()
+            return True
+        return False
+
+    def get_queue_position(self, job_id: str) -> Optional[int]:
+        """Get 1-based queue position, or None if the job is not queued"""
+        for position, item in enumerate(self._ordered(), start=1):
+            if item.job_id == job_id:
+                return position
+        return None
+
+    def estimate_wait_seconds(self, position: int) -> int:
+        """Estimate seconds until the job at ``position`` gets a worker slot"""
+        waves = math.ceil(position / self.max_concurrent)
+        return int(waves * self._avg_duration)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get scheduler statistics"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue_size": self.max_queue_size,
+            "running": self.running_count,
+            "queued": self.queued_count,
+            "queued_by_priority": {
+                priority.value: len(queue) for priority, queue in self._queues.items()
+            },
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "completed": self._completed,
+            "avg_wait_seconds": (
+                self._total_wait_time / self._completed if self._completed else 0.0
+            ),
+            "avg_duration_seconds": self._avg_duration,
+        }
+
+    async def shutdown(self) -> None:
+        """Drop queued jobs and cancel running ones"""
+        for queue in self._queues.values():
+            while queue.pop():
+                pass
+
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _ordered(self) -> list[_QueuedGeneration]:
+        items: list[_QueuedGeneration] = []
+        for priority in GenerationPriority:
+            items.extend(self._queues[priority].ordered())
+        return items
+
+    def _retry_after(self) -> int:
+        """Seconds until a worker slot is expected to free up"""
+        return max(1, int(self._avg_duration / self.max_concurrent))
+
+    def _dispatch(self) -> None:
+        started = False
+        while self.running_count < self.max_concurrent:
+            item = self._next_item()
+            if item is None:
+                break
+            self._start(item)
+            started = True
+
+        if started or self.queued_count:
+            self._notify_positions()
+
+    def _next_item(self) -> Optional[_QueuedGeneration]:
+        for priority in GenerationPriority:
+            item = self._queues[priority].pop()
+            if item is not None:
+                return item
+        return None
+
+    def _start(self, item: _QueuedGeneration) -> None:
+        self._total_wait_time += time.monotonic() - item.enqueued_at
+        task = asyncio.create_task(self._run(item))
+        self._running[item.job_id] = task
+        self._emit(item.job_id, None, None)
+
+    async def _run(self, item: _QueuedGeneration) -> None:
+        started_at = time.monotonic()
+        try:
+            await item.runner()
+        except asyncio.CancelledError:
+            logger.info(f"Generation {item.job_id} was cancelled")
+        except Exception as e:
+            logger.error(f"Generation {item.job_id} failed in scheduler: {e}")
+        finally:
+            duration = time.monotonic() - started_at
+            # Exponentially weighted average drives ETA and Retry-After
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+            self._completed += 1
+            self._running.pop(item.job_id, None)
+            self._dispatch()
+
+    def _notify_positions(self) -> None:
+        for position, item in enumerate(self._ordered(), start=1):
+            self._emit(item.job_id, position, self.estimate_wait_seconds(position))
+
+    def _emit(
+        self, job_id: str, position: Optional[int], eta_seconds: Optional[int]
+    ) -> None:
+        if self.on_queue_update is None:
+            return
+        try:
+            self.on_queue_update(job_id, position, eta_seconds)
+        except Exception as e:
+            logger.warning(f"Queue update listener failed for {job_id}: {e}")
+
+
+# Global scheduler instance
+_generation_scheduler: Optional[GenerationScheduler] = None
+
+
+def get_generation_scheduler() -> GenerationScheduler:
+    """Get or create generation scheduler instance"""
+    global _generation_scheduler
+    if _generation_scheduler is None:
+        from ..config.settings import get_settings
+        from .job_manager import get_job_manager
+
+        config = get_settings().get_generation_queue_config()
+        _generation_scheduler = GenerationScheduler(
+            max_concurrent=config["max_concurrent"],
+            max_queue_size=config["max_queue_size"],
+            max_queued_per_tenant=config["max_queued_per_tenant"],
+            default_job_duration=config["default_job_duration"],
+            on_queue_update=get_job_manager().update_queue_position,
+        )
+    return _generation_scheduler
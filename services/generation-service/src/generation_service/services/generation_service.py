@@ -4,7 +4,9 @@ LangGraph workflow-based generation service with Core Module integration
 
 import asyncio
 import logging
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from enum import Enum
 from typing import Any, Optional
@@ -36,9 +38,24 @@ from generation_service.models.generation import (
     WorkflowStatusResponse,
 )
 from generation_service.rag.rag_service import RAGService
+from generation_service.services.generation_registry import (
+    GenerationRegistry,
+    create_spill_store,
+)
 
 # Import LangGraph workflow system
+from generation_service.workflows.agents.scene_patches import estimate_tokens
+from generation_service.workflows.checkpoint_store import CheckpointStore
 from generation_service.workflows.generation_workflow import GenerationWorkflow
+from generation_service.workflows.pipelining import (
+    ScenePipeline,
+    active_pipeline,
+    generate_into_pipeline,
+    use_pipeline,
+)
+from generation_service.workflows.quality.script_features import (
+    extract_script_features,
+)
 
 # Import Core Module utilities
 # Import Core Module components
@@ -161,15 +178,32 @@ class GenerationService:
     """LangGraph workflow-based script generation service"""
 
     def __init__(self) -> None:
-        self._generations: dict[str, GenerationResponse] = {}
-        self._metadata: dict[str, GenerationMetadata] = {}
-        self._contexts: dict[str, NodeContext] = {}
+        # Bounded generation storage: finished generations are spilled out
+        # of memory and only summaries are kept
+        registry_config = settings.get_generation_registry_config()
+        try:
+            spill_store = create_spill_store(registry_config)
+        except Exception as e:
+            logger.warning(f"Generation spill store unavailable: {e}")
+            spill_store = None
+        self._generations = GenerationRegistry(
+            spill_store=spill_store,
+            max_live=registry_config["max_live"],
+            completed_ttl=registry_config["completed_ttl"],
+            max_summaries=registry_config["max_summaries"],
+            summary_ttl=registry_config["summary_ttl"],
+            details_builder=self._build_quality_details,
+        )
 
         # Hybrid workflow storage
         self._workflows: dict[str, HybridWorkflowResponse] = {}
         self._workflow_tasks: dict[str, asyncio.Task[Any]] = {}
         self._workflow_progress: dict[str, WorkflowProgress] = {}
         self._node_results: dict[str, list[NodeExecutionResult]] = {}
+        self._active_workflow_ids: dict[str, None] = {}
+        self._finished_workflows: OrderedDict[str, float] = OrderedDict()
+        self._max_finished_workflows = registry_config["max_live"]
+        self._workflow_ttl = registry_config["completed_ttl"]
 
         # Initialize AI provider factory
         self.provider_factory = ProviderFactory(settings.get_ai_provider_config())
@@ -191,9 +225,25 @@ class GenerationService:
             )
             self.rag_service = None
 
+        # Persistent node checkpoints so interrupted generations can resume
+        checkpoint_store = None
+        checkpoint_config = settings.get_checkpoint_config()
+        if checkpoint_config["enabled"]:
+            try:
+                checkpoint_store = CheckpointStore(
+                    db_path=checkpoint_config["db_path"],
+                    retention_seconds=checkpoint_config["retention_seconds"],
+                    max_age_seconds=checkpoint_config["max_age_seconds"],
+                )
+            except Exception as e:
+                logger.warning(f"Checkpoint store unavailable, resume disabled: {e}")
+
         # Initialize LangGraph workflow
         self.langgraph_workflow = GenerationWorkflow(
-            provider_factory=self.provider_factory, rag_service=self.rag_service
+            provider_factory=self.provider_factory,
+            rag_service=self.rag_service,
+            checkpoint_store=checkpoint_store,
+            pipeline_config=settings.get_pipeline_config(),
         )
 
         # Initialize specialized prompt templates (for legacy node functions)
@@ -261,7 +311,7 @@ class GenerationService:
             )
 
             # Store generation for tracking
-            self._generations[generation_id] = workflow_response
+            await self._generations.put(generation_id, workflow_response)
 
             if CORE_AVAILABLE:
                 logger.info(
@@ -299,16 +349,16 @@ class GenerationService:
             generation_id, request, created_time
         )
 
-        # Store generation
-        self._generations[generation_id] = response
-
         # Create metadata
         metadata = GenerationMetadata(generation_id=generation_id)
-        self._metadata[generation_id] = metadata
 
         # Create node context
         context = NodeContext(generation_id, request)
-        self._contexts[generation_id] = context
+
+        # Store generation
+        await self._generations.put(
+            generation_id, response, metadata=metadata, context=context
+        )
 
         if CORE_AVAILABLE:
             logger.info(
@@ -331,11 +381,26 @@ class GenerationService:
         self, generation_id: str
     ) -> Optional[GenerationResponse]:
         """Get the status of a generation request"""
-        return self._generations.get(generation_id)
+        return await self._generations.get(generation_id)
+
+    async def resume_generation(
+        self, generation_id: str
+    ) -> Optional[GenerationResponse]:
+        """Resume an interrupted generation from its last completed node"""
+
+        response = await self.langgraph_workflow.resume(generation_id)
+        if response is not None:
+            await self._generations.put(generation_id, response)
+            logger.info(f"Resumed generation {generation_id}: {response.status}")
+        return response
+
+    async def list_resumable_generations(self) -> list[dict[str, Any]]:
+        """List interrupted generations that have checkpoints"""
+        return await self.langgraph_workflow.list_resumable()
 
     async def cancel_generation(self, generation_id: str) -> bool:
         """Cancel a generation request"""
-        generation = self._generations.get(generation_id)
+        generation = self._generations.get_live(generation_id)
 
         if not generation:
             return False
@@ -350,6 +415,7 @@ class GenerationService:
         # Update status
         generation.status = GenerationStatus.CANCELLED
         generation.updated_at = datetime.now()
+        await self._generations.update(generation_id)
 
         logger.info(f"Cancelled generation {generation_id}")
         return True
@@ -359,20 +425,44 @@ class GenerationService:
     ) -> None:
         """Execute the LangGraph workflow with all nodes"""
 
-        generation = self._generations[generation_id]
+        generation = self._generations.get_live(generation_id)
+        if generation is None:
+            raise ValueError(f"Generation {generation_id} is not registered")
         start_time = utc_now() if CORE_AVAILABLE else datetime.now()
+        pipeline: Optional[ScenePipeline] = None
 
         try:
             # Update status to in progress
             generation.status = GenerationStatus.IN_PROGRESS
             generation.updated_at = start_time
+            await self._generations.update(generation_id)
 
             logger.info(f"Starting LangGraph workflow for {generation_id}")
 
+            # Stylist calls start on each scene outline while the architect
+            # is still streaming the rest of the structure
+            pipeline_config = settings.get_pipeline_config()
+            if pipeline_config["enabled"]:
+
+                async def style(outline: str, preamble: str) -> Any:
+                    structure = f"{preamble}\n\n{outline}" if preamble else outline
+                    return await self._style_structure(context, structure)
+
+                pipeline = ScenePipeline(
+                    style,
+                    max_concurrency=pipeline_config["max_concurrency"],
+                    min_outline_chars=pipeline_config["min_outline_chars"],
+                )
+
             # Execute nodes in sequence
             for node_type in self.node_workflow:
                 try:
-                    await self._execute_node(node_type, context)
+                    with use_pipeline(
+                        pipeline
+                        if node_type in (NodeType.ARCHITECT, NodeType.STYLIST)
+                        else None
+                    ):
+                        await self._execute_node(node_type, context)
 
                     if context.has_errors():
                         logger.warning(
@@ -413,6 +503,10 @@ class GenerationService:
             generation.status = GenerationStatus.FAILED
             generation.error_message = str(e)
             generation.updated_at = utc_now() if CORE_AVAILABLE else datetime.now()
+            await self._generations.update(generation_id)
+        finally:
+            if pipeline is not None:
+                pipeline.cancel()
 
     # ========================================================================================
     # LangGraph Node Implementation Functions
@@ -530,27 +624,39 @@ class GenerationService:
             temperature=0.7,
         )
 
-        response = await provider.generate_with_retry(generation_request)
+        pipeline = active_pipeline()
+        if pipeline is not None:
+            structure = await generate_into_pipeline(
+                provider, generation_request, pipeline
+            )
+            model_used = provider.get_model_info().name
+            tokens_used = estimate_tokens(structure)
+        else:
+            response = await provider.generate_with_retry(generation_request)
+            structure = response.content
+            model_used = response.model_info.name
+            tokens_used = (
+                response.metadata.get("tokens_used", 0) if response.metadata else 0
+            )
 
         # Store architect results with RAG and prompt metadata
         architect_result = {
-            "structure": response.content,
-            "model_used": response.model_info.name,
-            "tokens_used": (
-                response.metadata.get("tokens_used", 0) if response.metadata else 0
-            ),
+            "structure": structure,
+            "model_used": model_used,
+            "tokens_used": tokens_used,
             "rag_context_used": bool(rag_context),
             "rag_context_length": len(rag_context) if rag_context else 0,
             "rag_tokens_estimated": rag_tokens_used,
             "prompt_template_used": "ArchitectPrompts",
             "prompt_id": prompt_result.prompt_id,
             "specialized_prompt": True,
+            "streamed": pipeline is not None,
         }
 
         context.add_result(NodeType.ARCHITECT.value, architect_result)
 
         # Set quality score based on structure completeness
-        structure_score = self._evaluate_structure_quality(response.content)
+        structure_score = self._evaluate_structure_quality(structure)
         context.set_quality_score("structure", structure_score)
 
         # Boost quality score slightly if RAG context was successfully used
@@ -570,11 +676,57 @@ class GenerationService:
         if not architect_result:
             raise ValueError("Architect results not available for stylist")
 
+        # Join the scenes styled while the architect was streaming; without a
+        # finished pipeline the whole structure is styled in one call
+        pipeline = active_pipeline()
+        if pipeline is not None and pipeline.upstream_finished is not None:
+            styled = await pipeline.collect()
+            if not styled:
+                raise ValueError("Pipelined stylist produced no scenes")
+            responses = [response for response, _ in styled]
+            content = "\n\n".join(response.content for response in responses)
+            prompt_id = styled[0][1].prompt_id
+            pipeline_stats = pipeline.get_stats()
+        else:
+            response, prompt_result = await self._style_structure(
+                context, architect_result["structure"]
+            )
+            responses = [response]
+            content = response.content
+            prompt_id = prompt_result.prompt_id
+            pipeline_stats = None
+
+        # Store stylist results with prompt metadata
+        stylist_result = {
+            "enhanced_script": content,
+            "model_used": responses[0].model_info.name,
+            "tokens_used": sum(
+                response.metadata.get("tokens_used", 0) if response.metadata else 0
+                for response in responses
+            ),
+            "prompt_template_used": "StylistPrompts",
+            "prompt_id": prompt_id,
+            "specialized_prompt": True,
+        }
+        if pipeline_stats is not None:
+            stylist_result["pipeline"] = pipeline_stats
+
+        context.add_result(NodeType.STYLIST.value, stylist_result)
+
+        # Set quality score based on dialogue and style
+        style_score = self._evaluate_style_quality(content)
+        context.set_quality_score("style", style_score)
+
+        logger.info(f"Stylist generation completed for {context.generation_id}")
+
+    async def _style_structure(
+        self, context: NodeContext, structure: str
+    ) -> tuple[Any, Any]:
+        """Style an architect structure, or one scene outline of it"""
+
         # Create prompt context for stylist with architect structure
         prompt_context = self._create_prompt_context(context.request, "")
-        prompt_context.additional_context["architect_structure"] = architect_result[
-            "structure"
-        ]
+        prompt_context.additional_context["architect_structure"] = structure
 
         # Generate specialized stylist prompt
         prompt_result = self.stylist_prompts.generate_prompt(prompt_context)
@@ -596,26 +748,7 @@ class GenerationService:
         )
 
         response = await provider.generate_with_retry(generation_request)
-
-        # Store stylist results with prompt metadata
-        stylist_result = {
-            "enhanced_script": response.content,
-            "model_used": response.model_info.name,
-            "tokens_used": (
-                response.metadata.get("tokens_used", 0) if response.metadata else 0
-            ),
-            "prompt_template_used": "StylistPrompts",
-            "prompt_id": prompt_result.prompt_id,
-            "specialized_prompt": True,
-        }
-
-        context.add_result(NodeType.STYLIST.value, stylist_result)
-
-        # Set quality score based on dialogue and style
-        style_score = self._evaluate_style_quality(response.content)
-        context.set_quality_score("style", style_score)
-
-        logger.info(f"Stylist generation completed for {context.generation_id}")
+        return response, prompt_result
 
     async def run_special_agent_generation(self, context: NodeContext) -> None:
         """Special Agent node: Handles specialized requirements and domain expertise"""
@@ -890,7 +1023,9 @@ class GenerationService:
     ) -> None:
         """Finalize generation with results from LangGraph workflow"""
 
-        generation = self._generations[generation_id]
+        generation = self._generations.get_live(generation_id)
+        if generation is None:
+            raise ValueError(f"Generation {generation_id} is not registered")
         final_result = context.get_result(NodeType.FINAL_ASSEMBLER.value)
 
         if not final_result:
@@ -912,6 +1047,8 @@ class GenerationService:
         if hasattr(generation, "quality_score"):
             generation.quality_score = final_result["quality_score"]
 
+        await self._generations.update(generation_id)
+
         logger.info(
             f"Generation {generation_id} finalized with {final_result['word_count']} words and quality score {final_result['quality_score']:.2f}"
         )
@@ -1271,25 +1408,15 @@ ORIGINAL REQUEST CONTEXT:
             return 0.0
 
         score = 0.0
-        content_lines = content.split("\\n")
+        features = extract_script_features(content)
 
         # Check for standard script formatting elements
         formatting_elements = {
-            "fade_in": any("FADE IN" in line.upper() for line in content_lines),
-            "scene_headers": any(
-                line.strip().startswith(("EXT.", "INT.")) for line in content_lines
-            ),
-            "character_names": any(
-                line.strip().isupper() and len(line.strip().split()) <= 3
-                for line in content_lines
-            ),
-            "dialogue": any(
-                not line.strip().startswith(("EXT.", "INT.", "FADE"))
-                and line.strip()
-                and not line.strip().isupper()
-                for line in content_lines
-            ),
-            "fade_out": any("FADE OUT" in line.upper() for line in content_lines),
+            "fade_in": features.contains("FADE IN"),
+            "scene_headers": bool(features.scene_headers),
+            "character_names": bool(features.dialogue_blocks),
+            "dialogue": features.dialogue_line_count > 0,
+            "fade_out": features.contains("FADE OUT"),
         }
 
         # Score based on presence of formatting elements
@@ -1346,15 +1473,12 @@ ORIGINAL REQUEST CONTEXT:
 
         score = 0.0
 
-        # Check for common technical issues
-        lines = [line.strip() for line in content.split("\\n") if line.strip()]
+        features = extract_script_features(content)
 
         # Consistent formatting
-        if len(lines) > 0:
+        if features.nonblank_lines:
             # Check for consistent capitalization in scene headers
-            scene_headers = [
-                line for line in lines if line.startswith(("EXT.", "INT."))
-            ]
+            scene_headers = [header.text for header in features.scene_headers]
             if scene_headers:
                 consistent_caps = all(
                     line.isupper() or line.istitle() for line in scene_headers
@@ -1363,30 +1487,19 @@ ORIGINAL REQUEST CONTEXT:
                     score += 0.25
 
             # Check for proper dialogue attribution
-            dialogue_blocks = 0
-            for i, line in enumerate(lines):
-                if line.isupper() and len(line.split()) <= 3:  # Character name
-                    if (
-                        i + 1 < len(lines) and not lines[i + 1].isupper()
-                    ):  # Followed by dialogue
-                        dialogue_blocks += 1
-
+            dialogue_blocks = sum(
+                1 for block in features.dialogue_blocks if block.lines
+            )
             if dialogue_blocks > 0:
                 score += 0.25
 
             # Check for scene transitions
-            transitions = sum(
-                1
-                for line in lines
-                if any(word in line.upper() for word in ["CUT TO:", "DISSOLVE", "FADE"])
-            )
-            if transitions > 0:
+            if features.transition_count > 0:
                 score += 0.25
 
             # Check spelling/grammar (basic check)
             common_errors = ["teh", "adn", "hte", "recieve", "seperate"]
-            error_count = sum(content.lower().count(error) for error in common_errors)
-            if error_count == 0:
+            if features.count_terms(common_errors) == 0:
                 score += 0.25
 
         return min(score, 1.0)
@@ -1466,21 +1579,15 @@ ORIGINAL REQUEST CONTEXT:
 
         return improved_content
 
-    async def get_generation_quality_metrics(
-        self, generation_id: str
-    ) -> Optional[dict[str, Any]]:
-        """Get quality metrics for a specific generation"""
-
-        context = self._contexts.get(generation_id)
-        if not context:
-            return None
-
-        quality_result = context.get_result(NodeType.QUALITY_REVIEWER.value)
-        if not quality_result:
-            return None
+    def _build_quality_details(
+        self, generation_id: str, context: NodeContext
+    ) -> dict[str, Any]:
+        """Collect quality results kept after a generation leaves memory"""
+        quality_result = context.get_result(NodeType.QUALITY_REVIEWER.value) or {}
 
         return {
             "generation_id": generation_id,
+            "has_quality_review": bool(quality_result),
             "overall_quality_score": context.get_overall_quality_score(),
             "quality_breakdown": {
                 "format_score": quality_result.get("format_score", 0),
@@ -1496,14 +1603,30 @@ ORIGINAL REQUEST CONTEXT:
             },
         }
 
+    async def get_generation_quality_metrics(
+        self, generation_id: str
+    ) -> Optional[dict[str, Any]]:
+        """Get quality metrics for a specific generation"""
+
+        context = self._generations.get_context(generation_id)
+        if context:
+            details = self._build_quality_details(generation_id, context)
+        else:
+            details = await self._generations.get_details(generation_id)
+
+        if not details or not details.get("has_quality_review"):
+            return None
+
+        return {
+            key: value for key, value in details.items() if key != "has_quality_review"
+        }
+
     async def get_service_quality_statistics(self) -> dict[str, Any]:
         """Get overall service quality statistics"""
 
-        completed_generations = [
-            gen
-            for gen in self._generations.values()
-            if gen.status == GenerationStatus.COMPLETED
-        ]
+        completed_generations = list(
+            self._generations.iter_summaries(GenerationStatus.COMPLETED)
+        )
 
         if not completed_generations:
             return {
@@ -1517,15 +1640,10 @@ ORIGINAL REQUEST CONTEXT:
         quality_scores = []
         all_recommendations = []
 
-        for gen in completed_generations:
-            context = self._contexts.get(gen.generation_id)
-            if context:
-                overall_score = context.get_overall_quality_score()
-                quality_scores.append(overall_score)
-
-                quality_result = context.get_result(NodeType.QUALITY_REVIEWER.value)
-                if quality_result and quality_result.get("recommendations"):
-                    all_recommendations.extend(quality_result["recommendations"])
+        for summary in completed_generations:
+            if summary.quality_score is not None:
+                quality_scores.append(summary.quality_score)
+                all_recommendations.extend(summary.recommendations)
 
         # Quality distribution
         quality_distribution = {
@@ -1563,40 +1681,20 @@ ORIGINAL REQUEST CONTEXT:
 
     async def list_active_generations(self) -> list:
         """List all active generations"""
-        active = []
-        for gen_id, generation in self._generations.items():
-            if generation.status in [
-                GenerationStatus.PENDING,
-                GenerationStatus.IN_PROGRESS,
-            ]:
-                active.append(
-                    {
-                        "generation_id": gen_id,
-                        "project_id": generation.project_id,
-                        "status": generation.status,
-                        "created_at": generation.created_at,
-                    }
-                )
-        return active
+        return [
+            {
+                "generation_id": generation.generation_id,
+                "project_id": generation.project_id,
+                "status": generation.status,
+                "created_at": generation.created_at,
+            }
+            for generation in self._generations.list_active()
+        ]
 
     async def get_generation_statistics(self) -> dict[str, Any]:
         """Get generation service statistics"""
-        total = len(self._generations)
-
-        stats: dict[str, Any] = {
-            "total_generations": total,
-            "by_status": {status.value: 0 for status in GenerationStatus},
-            "by_script_type": {},
-        }
-
-        for generation in self._generations.values():
-            stats["by_status"][generation.status.value] += 1
-
-            script_type = generation.script_type.value
-            if script_type not in stats["by_script_type"]:
-                stats["by_script_type"][script_type] = 0
-            stats["by_script_type"][script_type] += 1
-
+        stats = self._generations.get_statistics()
+        stats["registry"] = self._generations.get_registry_stats()
         return stats
 
     async def get_workflow_info(self) -> dict[str, Any]:
@@ -1654,6 +1752,7 @@ ORIGINAL REQUEST CONTEXT:
         self._workflows[workflow_id] = workflow_response
         self._workflow_progress[workflow_id] = progress
         self._node_results[workflow_id] = []
+        self._active_workflow_ids[workflow_id] = None
 
         # Start background execution
         task = asyncio.create_task(
@@ -1713,6 +1812,29 @@ ORIGINAL REQUEST CONTEXT:
             # Clean up task reference
             if workflow_id in self._workflow_tasks:
                 del self._workflow_tasks[workflow_id]
+            self._mark_workflow_finished(workflow_id)
+
+    def _mark_workflow_finished(self, workflow_id: str) -> None:
+        """Move a workflow out of the active index and prune old workflows"""
+        if workflow_id not in self._workflows:
+            return
+        self._active_workflow_ids.pop(workflow_id, None)
+        self._finished_workflows[workflow_id] = time.monotonic()
+        self._finished_workflows.move_to_end(workflow_id)
+
+        # Finished workflows are kept for status polling for a limited time
+        now = time.monotonic()
+        while self._finished_workflows:
+            oldest_id, finished_at = next(iter(self._finished_workflows.items()))
+            if (
+                len(self._finished_workflows) <= self._max_finished_workflows
+                and now - finished_at < self._workflow_ttl
+            ):
+                break
+            del self._finished_workflows[oldest_id]
+            self._workflows.pop(oldest_id, None)
+            self._workflow_progress.pop(oldest_id, None)
+            self._node_results.pop(oldest_id, None)
 
     async def _execute_workflow_with_tracking(
         self, request: GenerationRequest, generation_id: str, workflow_id: str
@@ -2004,6 +2126,7 @@ ORIGINAL REQUEST CONTEXT:
         # Update workflow status
         workflow.status = WorkflowStatus.CANCELLED
         workflow.updated_at = utc_now() if CORE_AVAILABLE else datetime.now()
+        self._mark_workflow_finished(workflow_id)
 
         if CORE_AVAILABLE:
             logger.info(
@@ -2021,7 +2144,8 @@ ORIGINAL REQUEST CONTEXT:
 
         active_workflows = []
 
-        for workflow_id, workflow in self._workflows.items():
+        for workflow_id in self._active_workflow_ids:
+            workflow = self._workflows[workflow_id]
             if workflow.status in [
                 WorkflowStatus.PENDING,
                 WorkflowStatus.RUNNING,
@@ -6,6 +6,7 @@ import asyncio
 import json
 import logging
 import threading
+import time
 from collections.abc import AsyncGenerator
 from datetime import datetime, timedelta, timezone
 from typing import Optional
@@ -19,6 +20,7 @@ from ..models.sse_models import (
     GenerationJobStatus,
     SSEEvent,
 )
+from ..monitoring.prometheus_metrics import observe_sse_first_event, record_job_finished
 
 logger = logging.getLogger(__name__)
 
@@ -151,7 +153,9 @@ class JobManager:
             except Exception as e:
                 logger.error(f"Error in cleanup task: {e}")
 
-    def create_job(self, request: GenerationJobRequest) -> GenerationJob:
+    def create_job(
+        self, request: GenerationJobRequest, tenant_id: str = "default"
+    ) -> GenerationJob:
         """Create a new generation job"""
         job_id = f"job_{uuid4().hex[:16]}"
 
@@ -169,6 +173,8 @@ class JobManager:
             scriptType=request.scriptType,
             promptSnapshot=request.description,
             estimatedDuration=self._estimate_duration(request),
+            tenantId=tenant_id,
+            priority=request.priority,
         )
 
         with self.lock:
@@ -225,6 +231,7 @@ class JobManager:
             return False
 
         job.complete(final_content, tokens, model_used)
+        record_job_finished("completed")
         logger.info(f"Completed job {job_id}")
         return True
 
@@ -235,9 +242,26 @@ class JobManager:
             return False
 
         job.fail(error_code, error_message)
+        record_job_finished("failed")
         logger.error(f"Failed job {job_id}: {error_code} - {error_message}")
         return True
 
+    def update_queue_position(
+        self, job_id: str, position: Optional[int], eta_seconds: Optional[int]
+    ) -> bool:
+        """Update queue position and ETA reported by the generation scheduler"""
+        job = self.get_job(job_id)
+        if not job or job.status != GenerationJobStatus.QUEUED:
+            return False
+
+        job.queuePosition = position
+        job.queueEtaSeconds = eta_seconds
+        if position is not None:
+            job.currentStep = f"대기 중 ({position}번째)"
+
+        self._persist_job(job)
+        return True
+
     def cancel_job(self, job_id: str) -> bool:
         """Cancel a job (idempotent)"""
         job = self.get_job(job_id)
@@ -259,6 +283,8 @@ class JobManager:
 
         job.status = GenerationJobStatus.STREAMING
         job.startedAt = datetime.now(timezone.utc)
+        job.queuePosition = None
+        job.queueEtaSeconds = None
         logger.info(f"Started streaming job {job_id}")
         return True
 
@@ -306,6 +332,7 @@ class JobManager:
         self, job_id: str, last_event_id: Optional[str] = None
     ) -> AsyncGenerator[str, None]:
         """Generate SSE events for a job"""
+        connected_at = time.perf_counter()
         job = self.get_job(job_id)
         if not job:
             # Send error event for non-existent job
@@ -347,14 +374,20 @@ class JobManager:
             job.eventSequence += 1
             job.lastEventId = f"{job.jobId}_{job.eventSequence}"
             self._store_event_id(job_id, job.lastEventId)
-            yield job.to_progress_event().format_sse(job.lastEventId)
+            first_event = job.to_progress_event().format_sse(job.lastEventId)
+            observe_sse_first_event(time.perf_counter() - connected_at)
+            yield first_event
 
             last_progress = job.progress
             last_content = job.currentContent
+            last_queue_position = job.queuePosition
 
             while not job.is_finished():
-                # Send progress update if changed
-                if job.progress != last_progress:
+                # Send progress update if changed (including queue movement)
+                if (
+                    job.progress != last_progress
+                    or job.queuePosition != last_queue_position
+                ):
                     job.eventSequence += 1
                     progress_event_id = f"{job.jobId}_{job.eventSequence}"
                     job.lastEventId = progress_event_id
@@ -362,6 +395,7 @@ class JobManager:
 
                     yield job.to_progress_event().format_sse(progress_event_id)
                     last_progress = job.progress
+                    last_queue_position = job.queuePosition
 
                 # Send preview update if content changed
                 if job.currentContent != last_content and job.currentContent.strip():
@@ -3,14 +3,17 @@ Background retry queue system for storage failure recovery
 """
 
 import asyncio
+import json
+import time
 import uuid
+from collections import Counter, deque
 from collections.abc import Callable
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Optional
 
-import redis
+import redis.asyncio as redis
 from redis.exceptions import RedisError
 
 try:
@@ -67,14 +70,33 @@ class RetryJob:
             data["last_attempt_at"] = self.last_attempt_at.isoformat()
         return data
 
+    def to_redis(self) -> dict[str, str]:
+        """Convert to flat string mapping for Redis HSET"""
+        data = self.to_dict()
+        data["job_type"] = self.job_type.value
+        data["status"] = self.status.value
+        data["payload"] = json.dumps(self.payload)
+        return {key: "" if value is None else str(value) for key, value in data.items()}
+
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "RetryJob":
-        """Create from dictionary"""
+        """Create from dictionary (also accepts the flat Redis hash form)"""
+        data = dict(data)
         # Convert ISO strings back to datetime objects
         data["created_at"] = datetime.fromisoformat(data["created_at"])
         data["scheduled_at"] = datetime.fromisoformat(data["scheduled_at"])
         if data.get("last_attempt_at"):
             data["last_attempt_at"] = datetime.fromisoformat(data["last_attempt_at"])
+        else:
+            data["last_attempt_at"] = None
+
+        if isinstance(data["payload"], str):
+            data["payload"] = json.loads(data["payload"])
+        data["job_type"] = JobType(data["job_type"])
+        data["status"] = JobStatus(data["status"])
+        data["attempt"] = int(data["attempt"])
+        data["max_attempts"] = int(data["max_attempts"])
+        data["last_error"] = data.get("last_error") or None
 
         return cls(**data)
 
@@ -103,35 +125,170 @@ class ExponentialBackoff:
         return delay
 
 
+@dataclass
+class JobTypePolicy:
+    """Concurrency limit and per-job deadline for one job type"""
+
+    max_concurrency: int = 4
+    timeout_seconds: float = 30.0
+
+
+DEFAULT_JOB_TYPE_POLICIES: dict[JobType, JobTypePolicy] = {
+    JobType.SAVE_GENERATION: JobTypePolicy(max_concurrency=8, timeout_seconds=30.0),
+    JobType.SAVE_EPISODE: JobTypePolicy(max_concurrency=8, timeout_seconds=30.0),
+    JobType.SAVE_PROJECT: JobTypePolicy(max_concurrency=4, timeout_seconds=30.0),
+    JobType.CLEANUP_CACHE: JobTypePolicy(max_concurrency=2, timeout_seconds=60.0),
+}
+
+
+# Completions older than this are dropped, so it bounds the throughput window
+STATS_HORIZON_SECONDS = 3600.0
+
+
+@dataclass
+class JobTypeStats:
+    """Throughput and latency statistics for one job type"""
+
+    succeeded: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    in_flight: int = 0
+    total_duration: float = 0.0
+    durations: deque = field(default_factory=lambda: deque(maxlen=500))
+    completions: deque = field(default_factory=lambda: deque(maxlen=10000))
+
+    def record(self, duration: float, success: bool, timed_out: bool = False) -> None:
+        """Record a finished job attempt"""
+        if success:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        if timed_out:
+            self.timed_out += 1
+        self.total_duration += duration
+        self.durations.append(duration)
+        now = time.monotonic()
+        self.completions.append(now)
+        while self.completions[0] < now - STATS_HORIZON_SECONDS:
+            self.completions.popleft()
+
+    def to_dict(self, window_seconds: float = 60.0) -> dict[str, Any]:
+        """Build report with throughput over the trailing window"""
+        attempts = self.succeeded + self.failed
+        cutoff = time.monotonic() - window_seconds
+        recent = sum(1 for finished_at in self.completions if finished_at >= cutoff)
+        ordered = sorted(self.durations)
+
+        def percentile(fraction: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+        return {
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "in_flight": self.in_flight,
+            "success_rate": self.succeeded / attempts if attempts else 1.0,
+            "throughput_per_second": recent / window_seconds,
+            "avg_latency_seconds": self.total_duration / attempts if attempts else 0.0,
+            "p50_latency_seconds": percentile(0.5),
+            "p95_latency_seconds": percentile(0.95),
+        }
+
+
+# Atomically requeue jobs whose visibility lease expired, then claim ready jobs
+# by moving them from the ready set to the processing set with a new lease.
+# Each job type has its own pair of sets, so a claim only sees one type.
+#   KEYS[1] ready zset of the job type (score = scheduled time)
+#   KEYS[2] processing zset of the job type (score = lease deadline)
+#   ARGV[1] now, ARGV[2] batch limit, ARGV[3] lease deadline
+CLAIM_JOBS_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job_id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], job_id)
+    redis.call('ZADD', KEYS[1], ARGV[1], job_id)
+end
+local ready = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job_id in ipairs(ready) do
+    redis.call('ZREM', KEYS[1], job_id)
+    redis.call('ZADD', KEYS[2], ARGV[3], job_id)
+end
+return {ready, #expired}
+"""
+
+
 class RetryQueue:
     """Redis-based background retry queue"""
 
     def __init__(
         self,
-        redis_client: redis.Optional[Redis] = None,
+        redis_client: Optional[redis.Redis] = None,
         queue_name: str = "retry_queue",
         dlq_name: str = "dead_letter_queue",
         processing_set: str = "processing_jobs",
+        notify_key: str = "retry_queue:notify",
         max_attempts: int = 5,
         base_delay: float = 1.0,
         max_delay: float = 16.0,
+        visibility_timeout: float = 300.0,
     ):
         self.redis = redis_client or redis.Redis(decode_responses=True)
         self.queue_name = queue_name
         self.dlq_name = dlq_name
         self.processing_set = processing_set
+        self.notify_key = notify_key
         self.max_attempts = max_attempts
         self.base_delay = base_delay
         self.max_delay = max_delay
+        self.visibility_timeout = visibility_timeout
         self.backoff = ExponentialBackoff()
 
-        # Job processors registry
+        self._claim_script = self.redis.register_script(CLAIM_JOBS_SCRIPT)
+
+        # Job processors registry with per-type limits
         self.processors: dict[JobType, Callable] = {}
+        self.policies: dict[JobType, JobTypePolicy] = dict(DEFAULT_JOB_TYPE_POLICIES)
+        self._semaphores: dict[JobType, asyncio.Semaphore] = {}
+        self.stats: dict[JobType, JobTypeStats] = {
+            job_type: JobTypeStats() for job_type in JobType
+        }
 
-    def register_processor(self, job_type: JobType, processor: Callable) -> None:
+    def register_processor(
+        self,
+        job_type: JobType,
+        processor: Callable,
+        max_concurrency: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+    ) -> None:
         """Register a job processor function"""
         self.processors[job_type] = processor
-        logger.info(f"Registered processor for job type: {job_type}")
+
+        policy = self.policies.get(job_type, JobTypePolicy())
+        self.policies[job_type] = JobTypePolicy(
+            max_concurrency=max_concurrency or policy.max_concurrency,
+            timeout_seconds=timeout_seconds or policy.timeout_seconds,
+        )
+        self._semaphores[job_type] = asyncio.Semaphore(
+            self.policies[job_type].max_concurrency
+        )
+        logger.info(
+            f"Registered processor for job type: {job_type} "
+            f"(concurrency={self.policies[job_type].max_concurrency})"
+        )
+
+    def _ready_key(self, job_type: JobType) -> str:
+        return f"{self.queue_name}:{job_type.value}"
+
+    def _processing_key(self, job_type: JobType) -> str:
+        return f"{self.processing_set}:{job_type.value}"
+
+    @property
+    def total_concurrency(self) -> int:
+        """Upper bound of jobs that can run at once across all job types"""
+        return sum(
+            self.policies[job_type].max_concurrency for job_type in self.processors
+        )
 
     async def enqueue_job(
         self,
@@ -160,14 +317,7 @@ class RetryQueue:
         )
 
         try:
-            # Store job data
-            job_key = f"job:{job_id}"
-            await self._redis_hset(job_key, job.to_dict())
-
-            # Add to scheduled queue with score as timestamp
-            score = scheduled_at.timestamp()
-            await self._redis_zadd(self.queue_name, {job_id: score})
-
+            await self._schedule(job, scheduled_at.timestamp())
             logger.info(f"Enqueued job {job_id} of type {job_type}")
             return job_id
 
@@ -175,45 +325,177 @@ class RetryQueue:
             logger.error(f"Failed to enqueue job: {e}")
             raise
 
-    async def get_ready_jobs(self, limit: int = 10) -> list[RetryJob]:
-        """Get jobs ready for processing"""
+    async def claim_jobs(
+        self, limit: int = 10, job_type: Optional[JobType] = None
+    ) -> list[RetryJob]:
+        """
+        Atomically claim up to ``limit`` ready jobs
+
+        Claimed jobs move from the ready set to the processing set with a
+        visibility lease; jobs whose lease expired (crashed worker) are put
+        back into the ready set by the same script. With ``job_type`` only
+        jobs of that type are claimed.
+        """
+        jobs: list[RetryJob] = []
+        for claim_type in [job_type] if job_type else list(JobType):
+            if len(jobs) >= limit:
+                break
+            jobs.extend(await self._claim_jobs_of_type(claim_type, limit - len(jobs)))
+        return jobs
+
+    async def _claim_jobs_of_type(
+        self, job_type: JobType, limit: int
+    ) -> list[RetryJob]:
         try:
-            now = datetime.utcnow().timestamp()
+            now = time.time()
+            processing_key = self._processing_key(job_type)
+            job_ids, recovered = await self._claim_script(
+                keys=[self._ready_key(job_type), processing_key],
+                args=[now, limit, now + self.visibility_timeout],
+            )
 
-            # Get jobs scheduled for now or earlier
-            job_ids = await self._redis_zrangebyscore(self.queue_name, 0, now, 0, limit)
+            if recovered:
+                logger.warning(
+                    f"Recovered {recovered} jobs with expired visibility timeout"
+                )
 
             if not job_ids:
                 return []
 
-            # Get job details
+            # Fetch all claimed job bodies in one round trip
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for job_id in job_ids:
+                    pipe.hgetall(f"job:{job_id}")
+                results = await pipe.execute()
+
             jobs = []
-            for job_id in job_ids:
-                job_data = await self._redis_hgetall(f"job:{job_id}")
+            for job_id, job_data in zip(job_ids, results):
                 if job_data:
-                    job = RetryJob.from_dict(job_data)
-                    jobs.append(job)
+                    jobs.append(RetryJob.from_dict(job_data))
+                else:
+                    # Job body expired or was deleted; drop the dangling claim
+                    await self.redis.zrem(processing_key, job_id)
 
             return jobs
 
         except RedisError as e:
-            logger.error(f"Failed to get ready jobs: {e}")
+            logger.error(f"Failed to claim jobs: {e}")
             return []
 
+    async def migrate_legacy_jobs(self, batch_size: int = 500) -> int:
+        """
+        Move jobs from the single ready and processing sets into per-type sets
+
+        Queues written before ready and processing sets were split by job
+        type keep their jobs under ``queue_name`` and ``processing_set``
+        themselves. Each job keeps its score, so delayed jobs stay delayed
+        and leases still expire. Running this concurrently is safe: moves
+        are idempotent.
+        """
+        moved = 0
+        try:
+            for legacy_key, key_for_type in (
+                (self.queue_name, self._ready_key),
+                (self.processing_set, self._processing_key),
+            ):
+                while True:
+                    entries = await self.redis.zrange(
+                        legacy_key, 0, batch_size - 1, withscores=True
+                    )
+                    if not entries:
+                        break
+
+                    async with self.redis.pipeline(transaction=False) as pipe:
+                        for job_id, _ in entries:
+                            pipe.hget(f"job:{job_id}", "job_type")
+                        job_types = await pipe.execute()
+
+                    async with self.redis.pipeline(transaction=True) as pipe:
+                        for (job_id, score), job_type in zip(entries, job_types):
+                            if job_type:
+                                pipe.zadd(
+                                    key_for_type(JobType(job_type)), {job_id: score}
+                                )
+                                moved += 1
+                            # Jobs without a body are dropped like dangling claims
+                            pipe.zrem(legacy_key, job_id)
+                        await pipe.execute()
+
+            if moved:
+                logger.info(f"Migrated {moved} jobs to per-type queues")
+            return moved
+
+        except RedisError as e:
+            logger.error(f"Failed to migrate legacy jobs: {e}")
+            return moved
+
+    async def get_ready_jobs(self, limit: int = 10) -> list[RetryJob]:
+        """Claim jobs ready for processing (alias of claim_jobs)"""
+        return await self.claim_jobs(limit)
+
+    async def wait_for_jobs(
+        self,
+        max_wait: float = 5.0,
+        job_types: Optional[list[JobType]] = None,
+        wake_key: Optional[str] = None,
+    ) -> None:
+        """
+        Block until a job may be ready
+
+        Waits on the notification list that enqueue pushes to (and on
+        ``wake_key`` if given), but never longer than the time until the
+        earliest scheduled (delayed) job of ``job_types`` (all types by
+        default).
+        """
+        try:
+            timeout = max_wait
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for job_type in job_types or list(JobType):
+                    pipe.zrange(self._ready_key(job_type), 0, 0, withscores=True)
+                earliest = [entry[0][1] for entry in await pipe.execute() if entry]
+            if earliest:
+                until_ready = min(earliest) - time.time()
+                if until_ready <= 0:
+                    return
+                timeout = min(timeout, until_ready)
+
+            # BLPOP accepts fractional timeouts; 0 would block forever
+            keys = [self.notify_key, wake_key] if wake_key else [self.notify_key]
+            await self.redis.blpop(keys, timeout=max(timeout, 0.01))
+
+        except RedisError as e:
+            logger.error(f"Failed to wait for jobs: {e}")
+            await asyncio.sleep(max_wait)
+
     async def process_job(self, job: RetryJob) -> bool:
-        """Process a single job"""
+        """Process a single claimed job within its type's concurrency limit"""
+        semaphore = self._semaphores.get(job.job_type)
+        if semaphore is None:
+            return await self._execute_job(job)
+
+        async with semaphore:
+            return await self._execute_job(job)
+
+    async def _execute_job(self, job: RetryJob) -> bool:
+        """Run the processor for a claimed job under its deadline"""
         job_key = f"job:{job.id}"
+        stats = self.stats[job.job_type]
+        policy = self.policies.get(job.job_type, JobTypePolicy())
+        started_at = time.monotonic()
+        stats.in_flight += 1
 
         try:
-            # Move to processing set
-            await self._redis_zrem(self.queue_name, job.id)
-            await self._redis_sadd(self.processing_set, job.id)
-
-            # Update job status
+            # Update job status and renew the lease now that the job actually runs
             job.status = JobStatus.PROCESSING
             job.attempt += 1
             job.last_attempt_at = datetime.utcnow()
-            await self._redis_hset(job_key, job.to_dict())
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hset(job_key, mapping=job.to_redis())
+                pipe.zadd(
+                    self._processing_key(job.job_type),
+                    {job.id: time.time() + self.visibility_timeout},
+                )
+                await pipe.execute()
 
             # Get processor
             processor = self.processors.get(job.job_type)
@@ -223,31 +505,53 @@ class RetryQueue:
                 )
 
             # Execute processor
-            await processor(job.payload)
+            await asyncio.wait_for(processor(job.payload), policy.timeout_seconds)
 
-            # Mark as completed
+            # Mark as completed and release the claim
             job.status = JobStatus.COMPLETED
-            await self._redis_hset(job_key, job.to_dict())
-            await self._redis_srem(self.processing_set, job.id)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hset(job_key, mapping=job.to_redis())
+                pipe.zrem(self._processing_key(job.job_type), job.id)
+                await pipe.execute()
 
+            stats.record(time.monotonic() - started_at, success=True)
             logger.info(f"Successfully processed job {job.id}")
             return True
 
+        except asyncio.TimeoutError:
+            stats.record(time.monotonic() - started_at, success=False, timed_out=True)
+            await self._handle_job_failure(
+                job, f"Timed out after {policy.timeout_seconds:.1f}s"
+            )
+            return False
+
         except Exception as e:
             # Handle job failure
+            stats.record(time.monotonic() - started_at, success=False)
             await self._handle_job_failure(job, str(e))
             return False
 
+        finally:
+            stats.in_flight -= 1
+
+    def get_processor_report(self, window_seconds: float = 60.0) -> dict[str, Any]:
+        """Per-job-type throughput and latency report"""
+        report = {}
+        for job_type in JobType:
+            policy = self.policies.get(job_type, JobTypePolicy())
+            report[job_type.value] = {
+                "registered": job_type in self.processors,
+                "max_concurrency": policy.max_concurrency,
+                "timeout_seconds": policy.timeout_seconds,
+                **self.stats[job_type].to_dict(window_seconds),
+            }
+        return report
+
     async def _handle_job_failure(self, job: RetryJob, error_message: str) -> None:
         """Handle job processing failure"""
-        job_key = f"job:{job.id}"
+        job.last_error = error_message
 
         try:
-            job.status = JobStatus.FAILED
-            job.last_error = error_message
-            await self._redis_hset(job_key, job.to_dict())
-            await self._redis_srem(self.processing_set, job.id)
-
             # Check if we should retry
             if job.attempt < job.max_attempts:
                 # Calculate next retry delay
@@ -260,10 +564,7 @@ class RetryQueue:
                 job.scheduled_at = next_attempt
                 job.status = JobStatus.PENDING
 
-                await self._redis_hset(job_key, job.to_dict())
-                await self._redis_zadd(
-                    self.queue_name, {job.id: next_attempt.timestamp()}
-                )
+                await self._schedule(job, next_attempt.timestamp())
 
                 logger.warning(
                     f"Job {job.id} failed (attempt {job.attempt}/{job.max_attempts}), "
@@ -279,6 +580,17 @@ class RetryQueue:
         except RedisError as e:
             logger.error(f"Failed to handle job failure: {e}")
 
+    async def _schedule(self, job: RetryJob, score: float) -> None:
+        """Store job, add it to the ready set and wake a waiting worker"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(f"job:{job.id}", mapping=job.to_redis())
+            pipe.zrem(self._processing_key(job.job_type), job.id)
+            pipe.zadd(self._ready_key(job.job_type), {job.id: score})
+            pipe.rpush(self.notify_key, job.id)
+            # Notifications are only wake-up tokens; keep the list small
+            pipe.ltrim(self.notify_key, -100, -1)
+            await pipe.execute()
+
     async def _move_to_dlq(self, job: RetryJob) -> None:
         """Move job to dead letter queue"""
         job.status = JobStatus.DEAD
@@ -286,8 +598,11 @@ class RetryQueue:
         try:
             # Store in DLQ with timestamp score
             score = datetime.utcnow().timestamp()
-            await self._redis_zadd(self.dlq_name, {job.id: score})
-            await self._redis_hset(f"job:{job.id}", job.to_dict())
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.zrem(self._processing_key(job.job_type), job.id)
+                pipe.zadd(self.dlq_name, {job.id: score})
+                pipe.hset(f"job:{job.id}", mapping=job.to_redis())
+                await pipe.execute()
 
         except RedisError as e:
             logger.error(f"Failed to move job to DLQ: {e}")
@@ -295,7 +610,7 @@ class RetryQueue:
     async def get_job_status(self, job_id: str) -> Optional[RetryJob]:
         """Get current job status"""
         try:
-            job_data = await self._redis_hgetall(f"job:{job_id}")
+            job_data = await self.redis.hgetall(f"job:{job_id}")
             if job_data:
                 return RetryJob.from_dict(job_data)
             return None
@@ -307,20 +622,36 @@ class RetryQueue:
     async def get_queue_stats(self) -> dict[str, int]:
         """Get queue statistics"""
         try:
-            pending_count = await self._redis_zcard(self.queue_name)
-            processing_count = await self._redis_scard(self.processing_set)
-            dlq_count = await self._redis_zcard(self.dlq_name)
+            now = time.time()
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for job_type in JobType:
+                    pipe.zcard(self._ready_key(job_type))
+                    pipe.zcard(self._processing_key(job_type))
+                    pipe.zcount(self._processing_key(job_type), "-inf", now)
+                pipe.zcard(self.dlq_name)
+                *counts, dlq_count = await pipe.execute()
+
+            pending_count = sum(counts[0::3])
+            processing_count = sum(counts[1::3])
+            expired_count = sum(counts[2::3])
 
             return {
                 "pending": pending_count,
                 "processing": processing_count,
+                "expired_leases": expired_count,
                 "dead_letter": dlq_count,
                 "total": pending_count + processing_count + dlq_count,
             }
 
         except RedisError as e:
             logger.error(f"Failed to get queue stats: {e}")
-            return {"pending": 0, "processing": 0, "dead_letter": 0, "total": 0}
+            return {
+                "pending": 0,
+                "processing": 0,
+                "expired_leases": 0,
+                "dead_letter": 0,
+                "total": 0,
+            }
 
     async def cleanup_old_jobs(self, older_than_hours: int = 24) -> int:
         """Clean up old completed/dead jobs"""
@@ -329,7 +660,7 @@ class RetryQueue:
             cutoff_timestamp = cutoff.timestamp()
 
             # Remove from DLQ
-            dlq_removed = await self._redis_zremrangebyscore(
+            dlq_removed = await self.redis.zremrangebyscore(
                 self.dlq_name, 0, cutoff_timestamp
             )
 
@@ -341,108 +672,164 @@ class RetryQueue:
             logger.error(f"Failed to cleanup old jobs: {e}")
             return 0
 
-    # Redis async wrapper methods (for compatibility)
-    async def _redis_hset(self, key: str, data: dict[str, Any]) -> int:
-        """Async wrapper for Redis HSET"""
-        return self.redis.hset(key, mapping=data)
-
-    async def _redis_hgetall(self, key: str) -> dict[str, str]:
-        """Async wrapper for Redis HGETALL"""
-        return self.redis.hgetall(key)
-
-    async def _redis_zadd(self, key: str, mapping: dict[str, float]) -> int:
-        """Async wrapper for Redis ZADD"""
-        return self.redis.zadd(key, mapping)
-
-    async def _redis_zrangebyscore(
-        self, key: str, min_score: float, max_score: float, start: int, num: int
-    ) -> list[str]:
-        """Async wrapper for Redis ZRANGEBYSCORE"""
-        return self.redis.zrangebyscore(key, min_score, max_score, start, num)
-
-    async def _redis_zrem(self, key: str, *values: Any) -> int:
-        """Async wrapper for Redis ZREM"""
-        return self.redis.zrem(key, *values)
-
-    async def _redis_sadd(self, key: str, *values: Any) -> int:
-        """Async wrapper for Redis SADD"""
-        return self.redis.sadd(key, *values)
-
-    async def _redis_srem(self, key: str, *values: Any) -> int:
-        """Async wrapper for Redis SREM"""
-        return self.redis.srem(key, *values)
-
-    async def _redis_zcard(self, key: str) -> int:
-        """Async wrapper for Redis ZCARD"""
-        return self.redis.zcard(key)
-
-    async def _redis_scard(self, key: str) -> int:
-        """Async wrapper for Redis SCARD"""
-        return self.redis.scard(key)
-
-    async def _redis_zremrangebyscore(
-        self, key: str, min_score: float, max_score: float
-    ) -> int:
-        """Async wrapper for Redis ZREMRANGEBYSCORE"""
-        return self.redis.zremrangebyscore(key, min_score, max_score)
-
 
 class RetryQueueWorker:
-    """Background worker to process retry queue"""
+    """Background worker that runs claimed jobs concurrently"""
 
     def __init__(
         self,
         retry_queue: RetryQueue,
         worker_id: Optional[str] = None,
-        poll_interval: float = 1.0,
+        max_wait: float = 5.0,
         batch_size: int = 10,
+        max_in_flight: Optional[int] = None,
     ):
         self.queue = retry_queue
         self.worker_id = worker_id or str(uuid.uuid4())
-        self.poll_interval = poll_interval
+        self.max_wait = max_wait
         self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
         self.running = False
+        self._in_flight: set[asyncio.Task] = set()
+        self._in_flight_by_type: Counter[JobType] = Counter()
+        self._slot_freed = asyncio.Event()
+        self._next_type = 0
+        # Finishing jobs push here to wake the worker from its Redis wait
+        self._wake_key = f"{retry_queue.notify_key}:{self.worker_id}"
+        self._waiting = False
 
     async def start(self) -> None:
         """Start the worker"""
         self.running = True
         logger.info(f"Starting retry queue worker {self.worker_id}")
+        # Jobs queued by a version without per-type sets
+        await self.queue.migrate_legacy_jobs()
 
         try:
             while self.running:
                 try:
-                    # Get ready jobs
-                    jobs = await self.queue.get_ready_jobs(self.batch_size)
+                    # Cleared before counting so a job finishing after this
+                    # point still wakes the waits below
+                    self._slot_freed.clear()
+                    free_slots = self._free_slots()
+                    if not free_slots:
+                        # All slots busy: wait for any job to finish
+                        await self._slot_freed.wait()
+                        continue
+
+                    # Claim only as many jobs of each type as can start right away
+                    jobs = await self._claim_jobs(free_slots)
 
                     if jobs:
-                        # Process jobs concurrently
-                        tasks = [self.queue.process_job(job) for job in jobs]
-                        await asyncio.gather(*tasks, return_exceptions=True)
+                        for job in jobs:
+                            self._spawn(job)
                     else:
-                        # No jobs ready, wait before polling again
-                        await asyncio.sleep(self.poll_interval)
+                        # Nothing ready: block until notified, a delayed job is
+                        # due or a running job frees its slot
+                        await self._wait_for_work(list(free_slots))
 
                 except Exception as e:
                     logger.error(f"Worker {self.worker_id} error: {e}")
-                    await asyncio.sleep(self.poll_interval)
+                    await asyncio.sleep(self.max_wait)
 
         except asyncio.CancelledError:
             logger.info(f"Worker {self.worker_id} was cancelled")
         finally:
             self.running = False
+            if self._in_flight:
+                # Let running jobs finish so their claims are released cleanly
+                await asyncio.gather(*self._in_flight, return_exceptions=True)
             logger.info(f"Worker {self.worker_id} stopped")
 
+    def _free_slots(self) -> dict[JobType, int]:
+        """Jobs of each type that can start now without waiting for a slot"""
+        capacity = self.max_in_flight or self.queue.total_concurrency
+        total_free = max(capacity, 1) - len(self._in_flight)
+        if total_free <= 0:
+            return {}
+
+        free_slots = {}
+        for job_type in JobType:
+            policy = self.queue.policies.get(job_type, JobTypePolicy())
+            type_free = policy.max_concurrency - self._in_flight_by_type[job_type]
+            if type_free > 0:
+                free_slots[job_type] = min(type_free, total_free)
+        return free_slots
+
+    async def _claim_jobs(self, free_slots: dict[JobType, int]) -> list[RetryJob]:
+        """Claim jobs type by type within each type's free slots"""
+        capacity = self.max_in_flight or self.queue.total_concurrency
+        budget = min(max(capacity, 1) - len(self._in_flight), self.batch_size)
+
+        # Rotate the starting type so a shared budget is not always spent
+        # on the same type first
+        job_types = list(free_slots)
+        start = self._next_type % len(job_types)
+        self._next_type += 1
+
+        jobs: list[RetryJob] = []
+        for job_type in job_types[start:] + job_types[:start]:
+            if budget <= 0:
+                break
+            claimed = await self.queue.claim_jobs(
+                min(free_slots[job_type], budget), job_type
+            )
+            budget -= len(claimed)
+            jobs.extend(claimed)
+        return jobs
+
+    async def _wait_for_work(self, job_types: list[JobType]) -> None:
+        self._waiting = True
+        try:
+            if not self._slot_freed.is_set():
+                await self.queue.wait_for_jobs(
+                    self.max_wait, job_types, wake_key=self._wake_key
+                )
+        finally:
+            self._waiting = False
+
+    async def _run_job(self, job: RetryJob) -> bool:
+        try:
+            return await self.queue.process_job(job)
+        finally:
+            self._in_flight_by_type[job.job_type] -= 1
+            if self._waiting:
+                # The freed slot may belong to a type with a backlog
+                await self._wake()
+
+    async def _wake(self) -> None:
+        try:
+            async with self.queue.redis.pipeline(transaction=True) as pipe:
+                pipe.rpush(self._wake_key, "1")
+                pipe.ltrim(self._wake_key, -1, -1)
+                pipe.expire(self._wake_key, 60)
+                await pipe.execute()
+        except RedisError as e:
+            logger.error(f"Failed to wake worker {self.worker_id}: {e}")
+
+    def _spawn(self, job: RetryJob) -> None:
+        task = asyncio.create_task(self._run_job(job))
+        self._in_flight.add(task)
+        self._in_flight_by_type[job.job_type] += 1
+        task.add_done_callback(self._on_job_done)
+
+    def _on_job_done(self, task: asyncio.Task) -> None:
+        self._in_flight.discard(task)
+        self._slot_freed.set()
+
     async def stop(self) -> None:
         """Stop the worker"""
         self.running = False
+        self._slot_freed.set()
 
 
 # Singleton instances
 _global_retry_queue: Optional[RetryQueue] = None
 _global_worker: Optional[RetryQueueWorker] = None
+_global_worker_task: Optional[asyncio.Task] = None
 
 
-def get_retry_queue(redis_client: redis.Optional[Redis] = None) -> RetryQueue:
+def get_retry_queue(redis_client: Optional[redis.Redis] = None) -> RetryQueue:
     """Get global retry queue instance"""
     global _global_retry_queue
     if _global_retry_queue is None:
@@ -451,18 +838,21 @@ def get_retry_queue(redis_client: redis.Optional[Redis] = None) -> RetryQueue:
 
 
 async def start_retry_worker() -> None:
-    """Start global retry queue worker"""
-    global _global_worker
+    """Start global retry queue worker in the background"""
+    global _global_worker, _global_worker_task
     if _global_worker is None:
         queue = get_retry_queue()
         _global_worker = RetryQueueWorker(queue)
 
-    if not _global_worker.running:
-        await _global_worker.start()
+    if _global_worker_task is None or _global_worker_task.done():
+        _global_worker_task = asyncio.create_task(_global_worker.start())
 
 
 async def stop_retry_worker() -> None:
-    """Stop global retry queue worker"""
-    global _global_worker
+    """Stop global retry queue worker and wait for in-flight jobs"""
+    global _global_worker_task
     if _global_worker and _global_worker.running:
         await _global_worker.stop()
+    if _global_worker_task is not None:
+        await asyncio.gather(_global_worker_task, return_exceptions=True)
+        _global_worker_task = None
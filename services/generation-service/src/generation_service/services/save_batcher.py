@@ -0,0 +1,281 @@
+"""
+Write-behind batcher that coalesces episode saves to project-service
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import httpx
+
+try:
+    from ai_script_core import get_service_logger
+
+    logger = get_service_logger("generation-service.save-batcher")
+except (ImportError, RuntimeError):
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+
+class SaveBatchError(Exception):
+    """Raised to a caller whose save was not committed by project-service"""
+
+    pass
+
+
+@dataclass
+class _PendingSave:
+    """Latest write for one episode, plus every caller waiting on it"""
+
+    project_id: str
+    key: str
+    item: dict[str, Any]
+    version: float
+    waiters: list[asyncio.Future[dict[str, Any]]] = field(default_factory=list)
+
+
+class SaveBatcher:
+    """
+    Coalescing write-behind buffer in front of the bulk episode endpoint
+
+    Saves are buffered per (project, key) and flushed every
+    ``flush_interval`` seconds, or as soon as ``max_batch_size`` saves are
+    pending. A newer save for the same key replaces the buffered one
+    (last-write-wins by ``version``) and all callers are resolved with the
+    outcome of the surviving write. ``save()`` returns only once the batch
+    holding the write has been committed, so retry jobs are acknowledged
+    after the data is durable and retried if the batch fails.
+    """
+
+    def __init__(
+        self,
+        project_service_url: str = "http://localhost:8002",
+        max_batch_size: int = 50,
+        flush_interval: float = 0.2,
+        request_timeout: float = 30.0,
+        max_connections: int = 10,
+        client: Optional[httpx.AsyncClient] = None,
+        max_tracked_versions: int = 10000,
+    ) -> None:
+        self.project_service_url = project_service_url.rstrip("/")
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_tracked_versions = max_tracked_versions
+
+        # One pooled client for all flushes instead of a client per job
+        self._client = client or httpx.AsyncClient(
+            timeout=request_timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._owns_client = client is None
+
+        self._pending: OrderedDict[tuple[str, str], _PendingSave] = OrderedDict()
+        # Versions already committed per key, so stale retries cannot win
+        self._committed: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._flush_timer: Optional[asyncio.Task[None]] = None
+        self._flush_tasks: set[asyncio.Task[None]] = set()
+
+        # Statistics
+        self._submitted = 0
+        self._coalesced = 0
+        self._stale = 0
+        self._batches = 0
+        self._items_flushed = 0
+        self._failed_batches = 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def save(
+        self,
+        project_id: str,
+        key: str,
+        item: dict[str, Any],
+        version: Optional[float] = None,
+    ) -> dict[str, Any]:
+        """
+        Buffer a bulk-endpoint item and wait until it is committed
+
+        ``key`` identifies the record being written (the episode id when
+        known). Returns the project-service result for the surviving write
+        and raises SaveBatchError when it was not committed.
+        """
+        version = time.time() if version is None else version
+        slot = (project_id, key)
+        self._submitted += 1
+
+        committed = self._committed.get(slot)
+        if committed is not None and committed >= version:
+            # A newer write for this key already landed
+            self._stale += 1
+            return {"key": key, "status": "superseded"}
+
+        loop = asyncio.get_running_loop()
+        waiter: asyncio.Future[dict[str, Any]] = loop.create_future()
+
+        pending = self._pending.get(slot)
+        if pending is None:
+            pending = _PendingSave(project_id, key, item, version)
+            self._pending[slot] = pending
+        else:
+            self._coalesced += 1
+            if version >= pending.version:
+                pending.item = item
+                pending.version = version
+        pending.waiters.append(waiter)
+
+        if len(self._pending) >= self.max_batch_size:
+            self._start_flush()
+        elif self._flush_timer is None:
+            self._flush_timer = asyncio.create_task(self._flush_later())
+
+        return await waiter
+
+    async def flush(self) -> None:
+        """Send everything buffered and wait for the batches to finish"""
+        if self._pending:
+            self._start_flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Flush pending saves and release the HTTP connection pool"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        await self.flush()
+        if self._owns_client:
+            await self._client.aclose()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get batching statistics"""
+        return {
+            "pending": self.pending_count,
+            "submitted": self._submitted,
+            "coalesced": self._coalesced,
+            "stale_dropped": self._stale,
+            "batches": self._batches,
+            "failed_batches": self._failed_batches,
+            "items_flushed": self._items_flushed,
+            "avg_batch_size": (
+                self._items_flushed / self._batches if self._batches else 0.0
+            ),
+        }
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.sleep(self.flush_interval)
+        except asyncio.CancelledError:
+            return
+        self._flush_timer = None
+        self._start_flush()
+
+    def _start_flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if not self._pending:
+            return
+
+        pending = list(self._pending.values())
+        self._pending.clear()
+
+        by_project: dict[str, list[_PendingSave]] = {}
+        for entry in pending:
+            by_project.setdefault(entry.project_id, []).append(entry)
+
+        for project_id, entries in by_project.items():
+            for start in range(0, len(entries), self.max_batch_size):
+                batch = entries[start : start + self.max_batch_size]
+                task = asyncio.create_task(self._send_batch(project_id, batch))
+                self._flush_tasks.add(task)
+                task.add_done_callback(self._flush_tasks.discard)
+
+    async def _send_batch(self, project_id: str, batch: list[_PendingSave]) -> None:
+        url = f"{self.project_service_url}/api/v1/projects/{project_id}/episodes/_bulk"
+        items = [{**entry.item, "key": entry.key} for entry in batch]
+        self._batches += 1
+
+        try:
+            response = await self._client.post(url, json={"items": items})
+            response.raise_for_status()
+            results = {
+                result["key"]: result for result in response.json()["data"]["results"]
+            }
+        except Exception as e:
+            self._failed_batches += 1
+            logger.warning(
+                f"Bulk save of {len(batch)} episodes for project {project_id} "
+                f"failed: {e}"
+            )
+            for entry in batch:
+                self._reject(entry, SaveBatchError(f"Bulk save failed: {e}"))
+            return
+
+        self._items_flushed += len(batch)
+        for entry in batch:
+            result = results.get(entry.key)
+            if result is None:
+                self._reject(entry, SaveBatchError("Missing result for bulk item"))
+            elif result["status"] in ("created", "updated"):
+                self._remember(entry)
+                for waiter in entry.waiters:
+                    if not waiter.done():
+                        waiter.set_result(result)
+            else:
+                message = f"Episode {entry.key} was not saved ({result['status']})"
+                if result.get("error"):
+                    message += f": {result['error']}"
+                self._reject(entry, SaveBatchError(message))
+
+        logger.debug(f"Committed batch of {len(batch)} episodes for {project_id}")
+
+    def _remember(self, entry: _PendingSave) -> None:
+        slot = (entry.project_id, entry.key)
+        self._committed[slot] = max(entry.version, self._committed.get(slot, 0.0))
+        self._committed.move_to_end(slot)
+        while len(self._committed) > self.max_tracked_versions:
+            self._committed.popitem(last=False)
+
+    @staticmethod
+    def _reject(entry: _PendingSave, error: Exception) -> None:
+        for waiter in entry.waiters:
+            if not waiter.done():
+                waiter.set_exception(error)
+
+
+# Global batcher instance
+_save_batcher: Optional[SaveBatcher] = None
+
+
+def get_save_batcher(project_service_url: Optional[str] = None) -> SaveBatcher:
+    """Get or create the save batcher instance"""
+    global _save_batcher
+    if _save_batcher is None:
+        from ..config.settings import get_settings
+
+        settings = get_settings()
+        config = settings.get_save_batch_config()
+        _save_batcher = SaveBatcher(
+            project_service_url=project_service_url or settings.project_service_url,
+            max_batch_size=config["max_batch_size"],
+            flush_interval=config["flush_interval"],
+            request_timeout=config["request_timeout"],
+            max_connections=config["max_connections"],
+        )
+    return _save_batcher
+
+
+async def close_save_batcher() -> None:
+    """Flush and close the save batcher if it was created"""
+    global _save_batcher
+    if _save_batcher is not None:
+        await _save_batcher.close()
+        _save_batcher = None
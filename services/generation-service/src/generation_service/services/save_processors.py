@@ -2,11 +2,14 @@
 Save processors for retry queue system
 """
 
-from typing import Any
+import time
+import uuid
+from typing import Any, Optional
 
 import httpx
 
 from .retry_queue import JobType, get_retry_queue
+from .save_batcher import SaveBatcher, get_save_batcher
 
 try:
     from ai_script_core import get_service_logger
@@ -21,8 +24,14 @@ except ImportError:
 class SaveProcessors:
     """Collection of save processors for different job types"""
 
-    def __init__(self, project_service_url: str = "http://localhost:8002") -> None:
+    def __init__(
+        self,
+        project_service_url: str = "http://localhost:8002",
+        batcher: Optional[SaveBatcher] = None,
+    ) -> None:
         self.project_service_url = project_service_url.rstrip("/")
+        # Generation and episode saves are coalesced into bulk writes
+        self.batcher = batcher or SaveBatcher(self.project_service_url)
 
     async def save_generation_processor(self, payload: dict[str, Any]) -> None:
         """Process generation save job"""
@@ -36,27 +45,22 @@ class SaveProcessors:
 
         logger.info(f"Processing generation save: {generation_id}")
 
-        # Simulate save to project service
-        async with httpx.AsyncClient() as client:
-            # Save generation result
-            save_url = f"{self.project_service_url}/generations/{generation_id}/save"
-            response = await client.post(
-                save_url,
-                json={
-                    "project_id": project_id,
-                    "episode_id": episode_id,
-                    "generation_data": generation_data,
-                    "status": "completed",
-                },
-                timeout=30.0,
-            )
-
-            if response.status_code not in [200, 201]:
-                raise httpx.HTTPStatusError(
-                    f"Failed to save generation {generation_id}: {response.status_code}",
-                    request=response.request,
-                    response=response,
-                )
+        item = {
+            "episodeId": episode_id,
+            "title": generation_data.get("title"),
+            "script": {
+                "markdown": generation_data.get("content", ""),
+                "tokens": generation_data.get("tokens", 0),
+            },
+            "promptSnapshot": generation_data.get("prompt"),
+        }
+        # Returns once the batch holding this write has been committed
+        await self.batcher.save(
+            project_id,
+            episode_id or f"generation:{generation_id}",
+            item,
+            version=payload.get("queued_at"),
+        )
 
         logger.info(f"Successfully saved generation: {generation_id}")
 
@@ -71,26 +75,26 @@ class SaveProcessors:
         episode_id = episode_data.get("id")
         logger.info(f"Processing episode save: {episode_id}")
 
-        # Save to project service
-        async with httpx.AsyncClient() as client:
-            save_url = f"{self.project_service_url}/projects/{project_id}/episodes"
-
-            # Check if episode exists (update) or create new
-            if episode_id:
-                # Update existing episode
-                response = await client.put(
-                    f"{save_url}/{episode_id}", json=episode_data, timeout=30.0
-                )
-            else:
-                # Create new episode
-                response = await client.post(save_url, json=episode_data, timeout=30.0)
-
-            if response.status_code not in [200, 201]:
-                raise httpx.HTTPStatusError(
-                    f"Failed to save episode {episode_id}: {response.status_code}",
-                    request=response.request,
-                    response=response,
-                )
+        script = episode_data.get("script") or {}
+        if isinstance(script, str):
+            script = {"markdown": script}
+
+        item = {
+            "episodeId": episode_id,
+            "title": episode_data.get("title"),
+            "script": {
+                "markdown": script.get("markdown", ""),
+                "tokens": script.get("tokens", 0),
+            },
+            "promptSnapshot": episode_data.get("promptSnapshot"),
+        }
+        # New episodes have no stable key, so they are never coalesced
+        await self.batcher.save(
+            project_id,
+            episode_id or f"new:{uuid.uuid4()}",
+            item,
+            version=payload.get("queued_at"),
+        )
 
         logger.info(f"Successfully saved episode: {episode_id}")
 
@@ -149,13 +153,21 @@ def register_save_processors(
     project_service_url: str = "http://localhost:8002",
 ) -> None:
     """Register all save processors with the retry queue"""
-    processors = SaveProcessors(project_service_url)
+    batcher = get_save_batcher(project_service_url)
+    processors = SaveProcessors(project_service_url, batcher=batcher)
     queue = get_retry_queue()
 
+    # Save jobs mostly wait on a shared batch, so allow a full batch in flight
+    queue.register_processor(
+        JobType.SAVE_GENERATION,
+        processors.save_generation_processor,
+        max_concurrency=batcher.max_batch_size,
+    )
     queue.register_processor(
-        JobType.SAVE_GENERATION, processors.save_generation_processor
+        JobType.SAVE_EPISODE,
+        processors.save_episode_processor,
+        max_concurrency=batcher.max_batch_size,
     )
-    queue.register_processor(JobType.SAVE_EPISODE, processors.save_episode_processor)
     queue.register_processor(JobType.SAVE_PROJECT, processors.save_project_processor)
     queue.register_processor(JobType.CLEANUP_CACHE, processors.cleanup_cache_processor)
 
@@ -178,6 +190,8 @@ async def enqueue_generation_save(
         "project_id": project_id,
         "episode_id": episode_id,
         "generation_data": generation_data,
+        # Orders writes to the same episode for last-write-wins coalescing
+        "queued_at": time.time(),
     }
 
     return await queue.enqueue_job(
@@ -191,7 +205,11 @@ async def enqueue_episode_save(
     """Enqueue episode save job"""
     queue = get_retry_queue()
 
-    payload = {"project_id": project_id, "episode_data": episode_data}
+    payload = {
+        "project_id": project_id,
+        "episode_data": episode_data,
+        "queued_at": time.time(),
+    }
 
     return await queue.enqueue_job(
         JobType.SAVE_EPISODE, payload, delay_seconds=delay_seconds
@@ -5,7 +5,9 @@ Startup initialization for retry queue system
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
+from ..config.settings import get_settings
 from ..services.retry_queue import start_retry_worker, stop_retry_worker
+from ..services.save_batcher import close_save_batcher
 from ..services.save_processors import register_save_processors
 
 try:
@@ -22,8 +24,7 @@ async def initialize_retry_system() -> None:
     """Initialize the retry queue system"""
     try:
         # Register processors
-        project_service_url = "http://localhost:8002"  # TODO: Get from config
-        register_save_processors(project_service_url)
+        register_save_processors(get_settings().project_service_url)
 
         # Start worker
         await start_retry_worker()
@@ -39,6 +40,8 @@ async def shutdown_retry_system() -> None:
     """Shutdown the retry queue system"""
     try:
         await stop_retry_worker()
+        # Commit saves still buffered by in-flight jobs before exiting
+        await close_save_batcher()
         logger.info("Retry queue system shutdown complete")
 
     except Exception as e:
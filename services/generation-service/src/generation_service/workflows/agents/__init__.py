@@ -2,7 +2,11 @@
 Specialized AI agents for script enhancement
 """
 
-from .agent_coordinator import AgentCoordinator, AgentExecutionPlan
+from .agent_coordinator import (
+    AgentCoordinator,
+    AgentExecutionPlan,
+    CircularDependencyError,
+)
 from .base_agent import (
     AgentCapability,
     AgentExecutionError,
@@ -12,6 +16,12 @@ from .base_agent import (
 from .dialogue_enhancer_agent import DialogueEnhancerAgent
 from .flaw_generator_agent import FlawGeneratorAgent
 from .plot_twister_agent import PlotTwisterAgent
+from .scene_patches import (
+    ScenePatch,
+    build_scene_index,
+    diff_scene_patches,
+    merge_scene_patches,
+)
 from .scene_visualizer_agent import SceneVisualizerAgent
 from .tension_builder_agent import TensionBuilderAgent
 
@@ -22,9 +32,14 @@ __all__ = [
     "AgentExecutionPlan",
     "AgentPriority",
     "BaseSpecialAgent",
+    "CircularDependencyError",
     "DialogueEnhancerAgent",
     "FlawGeneratorAgent",
     "PlotTwisterAgent",
+    "ScenePatch",
     "SceneVisualizerAgent",
     "TensionBuilderAgent",
+    "build_scene_index",
+    "diff_scene_patches",
+    "merge_scene_patches",
 ]
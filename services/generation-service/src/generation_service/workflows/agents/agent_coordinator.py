@@ -3,6 +3,8 @@ Agent Coordinator - Manages and coordinates specialized AI agents
 """
 
 import asyncio
+import contextlib
+import time
 from datetime import datetime
 from typing import Any, Optional
 
@@ -57,16 +59,31 @@ except (ImportError, RuntimeError):
         pass
 
 
-from generation_service.workflows.state import GenerationState
+from generation_service.workflows.state import (
+    AppendLog,
+    GenerationState,
+    fork_state,
+)
 
 from .base_agent import AgentCapability, BaseSpecialAgent
 from .dialogue_enhancer_agent import DialogueEnhancerAgent
 from .flaw_generator_agent import FlawGeneratorAgent
 from .plot_twister_agent import PlotTwisterAgent
+from .scene_patches import ScenePatch, merge_scene_patches
 from .scene_visualizer_agent import SceneVisualizerAgent
 from .tension_builder_agent import TensionBuilderAgent
 
 
+class CircularDependencyError(ValueError):
+    """Agent dependencies in an execution plan form a cycle"""
+
+    def __init__(self, agents: list[str]) -> None:
+        self.agents = agents
+        super().__init__(
+            f"Circular agent dependencies between: {', '.join(sorted(agents))}"
+        )
+
+
 class AgentExecutionPlan:
     """Plan for agent execution with dependencies and ordering"""
 
@@ -77,6 +94,7 @@ class AgentExecutionPlan:
         self.dependencies: dict[str, list[str]] = {}
         self.estimated_duration: float = 0.0
         self.confidence_score: float = 0.0
+        self.max_concurrency: Optional[int] = None
 
     def add_agent(
         self,
@@ -89,60 +107,88 @@ class AgentExecutionPlan:
         if dependencies:
             self.dependencies[agent.agent_name] = dependencies
 
-    def optimize_execution_order(self) -> None:
-        """Optimize execution order based on dependencies and priorities"""
-        # Sort by priority (higher priority first) and dependencies
-        agent_priorities = [
-            (agent.agent_name, agent.priority.value) for agent, _ in self.agents
-        ]
-        agent_priorities.sort(key=lambda x: x[1], reverse=True)
+    def get_dependencies(self, agent_name: str) -> list[str]:
+        """Dependencies of an agent that are part of this plan"""
+        planned = {agent.agent_name for agent, _ in self.agents}
+        return [dep for dep in self.dependencies.get(agent_name, []) if dep in planned]
 
-        # Create execution order respecting dependencies
-        executed = set()
-        self.execution_order = []
+    def get_agent_config(self, agent_name: str) -> dict[str, Any]:
+        for agent, config in self.agents:
+            if agent.agent_name == agent_name:
+                return config
+        return {}
+
+    def optimize_execution_order(self) -> None:
+        """
+        Topologically order agents, preferring higher priority among ready ones
 
-        while len(executed) < len(self.agents):
-            for agent_name, _ in agent_priorities:
-                if agent_name in executed:
-                    continue
+        Raises:
+            CircularDependencyError: If the dependencies contain a cycle
+        """
+        priorities = {
+            agent.agent_name: agent.priority.value for agent, _ in self.agents
+        }
+        remaining = {
+            name: set(self.get_dependencies(name)) for name in priorities.keys()
+        }
 
-                # Check if dependencies are satisfied
-                deps = self.dependencies.get(agent_name, [])
-                if all(dep in executed for dep in deps):
-                    self.execution_order.append(agent_name)
-                    executed.add(agent_name)
+        self.execution_order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise CircularDependencyError(list(remaining))
+
+            # Agents are added in selection order; keep it among equal priorities
+            ready.sort(key=lambda name: priorities[name], reverse=True)
+            for agent_name in ready:
+                self.execution_order.append(agent_name)
+                del remaining[agent_name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
 
         # Identify parallel execution opportunities
         self._identify_parallel_groups()
 
     def _identify_parallel_groups(self) -> None:
-        """Identify agents that can be executed in parallel"""
-        self.parallel_groups = []
-        remaining = set(self.execution_order)
+        """Group agents by dependency depth (informational; execution is DAG based)"""
+        depth: dict[str, int] = {}
+        for agent_name in self.execution_order:
+            deps = self.get_dependencies(agent_name)
+            depth[agent_name] = max((depth[dep] + 1 for dep in deps), default=0)
 
-        while remaining:
-            # Find agents with no remaining dependencies
-            parallel_group = []
-            for agent_name in list(remaining):
-                deps = self.dependencies.get(agent_name, [])
-                if not any(dep in remaining for dep in deps):
-                    parallel_group.append(agent_name)
-
-            if parallel_group:
-                self.parallel_groups.append(parallel_group)
-                remaining -= set(parallel_group)
-            else:
-                # Handle circular dependencies by taking highest priority
-                highest_priority = max(
-                    remaining,
-                    key=lambda x: next(
-                        agent.priority.value
-                        for agent, _ in self.agents
-                        if agent.agent_name == x
-                    ),
-                )
-                self.parallel_groups.append([highest_priority])
-                remaining.remove(highest_priority)
+        self.parallel_groups = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for agent_name in self.execution_order:
+            self.parallel_groups[depth[agent_name]].append(agent_name)
+
+    def critical_path(self, durations: dict[str, float]) -> tuple[list[str], float]:
+        """
+        Longest dependency chain given per-agent durations
+
+        Returns:
+            The agents on the critical path in execution order and its length
+        """
+        if not self.execution_order:
+            self.optimize_execution_order()
+
+        finish: dict[str, float] = {}
+        previous: dict[str, Optional[str]] = {}
+        for agent_name in self.execution_order:
+            deps = self.get_dependencies(agent_name)
+            gate = max(deps, key=lambda dep: finish[dep], default=None)
+            previous[agent_name] = gate
+            start = finish[gate] if gate else 0.0
+            finish[agent_name] = start + durations.get(agent_name, 0.0)
+
+        if not finish:
+            return [], 0.0
+
+        last: Optional[str] = max(finish, key=lambda name: finish[name])
+        total = finish[last]
+        path = []
+        while last is not None:
+            path.append(last)
+            last = previous[last]
+        return list(reversed(path)), total
 
 
 class AgentCoordinator:
@@ -194,6 +240,10 @@ class AgentCoordinator:
             AgentCapability.PACING_OPTIMIZATION: ["tension_builder"],
         }
 
+        # Scheduling limits
+        self.max_concurrency = max(1, int(self.config.get("max_concurrency", 3)))
+        self.agent_timeout = float(self.config.get("agent_timeout", 120.0))
+
         # Execution metrics
         self.total_executions = 0
         self.successful_executions = 0
@@ -221,7 +271,7 @@ class AgentCoordinator:
         agent_analyses = {}
         for agent_name, agent in self.agents.items():
             try:
-                analysis = await agent.analyze_content(state)
+                analysis = await agent.analyze_content_cached(state)
                 agent_analyses[agent_name] = analysis
             except Exception as e:
                 logger.warning(f"Failed to analyze with {agent_name}: {e}")
@@ -320,6 +370,7 @@ class AgentCoordinator:
             plan.add_agent(agent, config, dependencies)
 
         # Optimize execution order
+        plan.max_concurrency = preferences.get("max_concurrency")
         plan.optimize_execution_order()
         plan.estimated_duration = self._estimate_execution_duration(plan)
         plan.confidence_score = content_analysis["analysis_confidence"]
@@ -330,76 +381,107 @@ class AgentCoordinator:
         self, state: GenerationState, plan: AgentExecutionPlan
     ) -> GenerationState:
         """
-        Execute the agent plan with optimization and error handling
+        Execute the agent plan as a dependency graph
+
+        Each agent starts as soon as its own dependencies have finished, up to
+        the plan's concurrency limit, and is bounded by its timeout. A failed
+        dependency does not block its dependents; they run on the content
+        available at that point.
         """
 
         self.total_executions += 1
         start_time = utc_now() if CORE_AVAILABLE else datetime.now()
 
         try:
-            enhanced_state = state.copy()
+            if not plan.execution_order:
+                plan.optimize_execution_order()
+
+            enhanced_state = fork_state(state)
             execution_results = []
+            timings: dict[str, dict[str, float]] = {}
 
-            # Execute agents in parallel groups
-            for group in plan.parallel_groups:
-                if len(group) == 1:
-                    # Single agent execution
-                    agent_name = group[0]
-                    agent = self.agents[agent_name]
-
-                    result = await agent.execute(enhanced_state)
-                    enhanced_state = result
-
-                    execution_results.append(
-                        {
-                            "agent_name": agent_name,
-                            "status": (
-                                "completed"
-                                if not result.get("has_errors")
-                                else "failed"
-                            ),
-                            "execution_time": 0.0,  # Will be calculated by agent
-                        }
-                    )
+            limit = plan.max_concurrency or self.max_concurrency
+            semaphore = asyncio.Semaphore(max(1, limit))
+            clock_start = time.perf_counter()
 
-                else:
-                    # Parallel execution
-                    tasks = []
-                    for agent_name in group:
-                        agent = self.agents[agent_name]
-                        task = asyncio.create_task(agent.execute(enhanced_state))
-                        tasks.append((agent_name, task))
-
-                    # Wait for all tasks in the group
-                    group_results = await asyncio.gather(
-                        *[task for _, task in tasks], return_exceptions=True
+            waiting_on = {
+                name: set(plan.get_dependencies(name)) for name in plan.execution_order
+            }
+            dependents: dict[str, list[str]] = {name: [] for name in waiting_on}
+            for agent_name, deps in waiting_on.items():
+                for dep in deps:
+                    dependents[dep].append(agent_name)
+
+            running: dict[asyncio.Task, str] = {}
+            # Log and error counts of the state each agent started from
+            offsets: dict[str, tuple[int, int]] = {}
+            ready = [name for name in plan.execution_order if not waiting_on[name]]
+
+            while ready or running:
+                # execution_order is priority sorted, so start higher priority first
+                for agent_name in ready:
+                    timings[agent_name] = {
+                        "ready_at": time.perf_counter() - clock_start
+                    }
+                    offsets[agent_name] = (
+                        len(enhanced_state.get("execution_log", [])),
+                        len(enhanced_state.get("error_messages", [])),
+                    )
+                    task = asyncio.create_task(
+                        self._run_scheduled_agent(
+                            agent_name,
+                            enhanced_state,
+                            plan,
+                            semaphore,
+                            timings[agent_name],
+                            clock_start,
+                        )
                     )
+                    running[task] = agent_name
+                ready = []
 
-                    # Process results
-                    for i, (agent_name, _) in enumerate(tasks):
-                        result = group_results[i]
+                done, _ = await asyncio.wait(
+                    running.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    agent_name = running.pop(task)
+                    result, error = task.result()
+                    log_offset, error_offset = offsets[agent_name]
+                    result_entry: dict[str, Any] = {
+                        "agent_name": agent_name,
+                        "execution_time": timings[agent_name]["duration"],
+                    }
 
-                        if isinstance(result, Exception):
-                            logger.error(f"Agent {agent_name} failed: {result}")
-                            execution_results.append(
-                                {
-                                    "agent_name": agent_name,
-                                    "status": "failed",
-                                    "error": str(result),
-                                }
-                            )
+                    if error is not None:
+                        logger.error(f"Agent {agent_name} failed: {error}")
+                        result_entry["status"] = "failed"
+                        result_entry["error"] = error
+                    else:
+                        enhanced_state = self._merge_agent_results(
+                            enhanced_state, self._agent_delta(result, log_offset)
+                        )
+                        if result.get("has_errors"):
+                            result_entry["status"] = "failed"
+                            enhanced_state["has_errors"] = True
+                            enhanced_state.setdefault(
+                                "error_messages", AppendLog()
+                            ).extend(result.get("error_messages", [])[error_offset:])
                         else:
-                            # Merge successful results
-                            enhanced_state = self._merge_agent_results(
-                                enhanced_state, result
-                            )
-                            execution_results.append(
-                                {"agent_name": agent_name, "status": "completed"}
-                            )
+                            result_entry["status"] = "completed"
+                    execution_results.append(result_entry)
+
+                    for dependent in dependents[agent_name]:
+                        waiting_on[dependent].discard(agent_name)
+                        if not waiting_on[dependent]:
+                            ready.append(dependent)
+                    ready.sort(key=plan.execution_order.index)
 
             # Calculate execution metrics
             end_time = utc_now() if CORE_AVAILABLE else datetime.now()
             total_duration = (end_time - start_time).total_seconds()
+            critical_path, critical_duration = plan.critical_path(
+                {name: timing["duration"] for name, timing in timings.items()}
+            )
 
             # Update coordination metadata
             enhanced_state["coordination_metadata"] = {
@@ -407,8 +489,19 @@ class AgentCoordinator:
                 "execution_plan": {
                     "agents_executed": [r["agent_name"] for r in execution_results],
                     "parallel_groups": plan.parallel_groups,
+                    "dependencies": {
+                        name: plan.get_dependencies(name)
+                        for name in plan.execution_order
+                    },
+                    "max_concurrency": limit,
                     "total_duration": total_duration,
                     "estimated_duration": plan.estimated_duration,
+                    "critical_path": critical_path,
+                    "critical_path_duration": critical_duration,
+                    "agent_timings": timings,
+                    "cached_agents": [
+                        name for name, timing in timings.items() if timing.get("cached")
+                    ],
                 },
                 "execution_results": execution_results,
                 "overall_success": all(
@@ -425,6 +518,7 @@ class AgentCoordinator:
                         "generation_id": state["generation_id"],
                         "agents_executed": len(execution_results),
                         "total_duration": total_duration,
+                        "critical_path": critical_path,
                         "success_rate": self.successful_executions
                         / self.total_executions,
                     },
@@ -436,13 +530,70 @@ class AgentCoordinator:
             logger.error(f"Agent coordination failed: {e}")
 
             # Return state with error information
-            error_state = state.copy()
+            error_state = fork_state(state)
             error_state["has_errors"] = True
-            error_state["error_messages"] = error_state.get("error_messages", [])
-            error_state["error_messages"].append(f"Agent coordination failed: {e!s}")
+            error_state.setdefault("error_messages", AppendLog()).append(
+                f"Agent coordination failed: {e!s}"
+            )
 
             return error_state
 
+    async def _run_scheduled_agent(
+        self,
+        agent_name: str,
+        state: GenerationState,
+        plan: AgentExecutionPlan,
+        semaphore: asyncio.Semaphore,
+        timing: dict[str, float],
+        clock_start: float,
+    ) -> tuple[Optional[GenerationState], Optional[str]]:
+        """Run one agent under the concurrency limit and its timeout"""
+
+        # Agents running concurrently each append to their own fork
+        agent_input = fork_state(state)
+
+        timeout = float(
+            plan.get_agent_config(agent_name).get("timeout", self.agent_timeout)
+        )
+
+        agent = self.agents[agent_name]
+
+        # A memoized agent (e.g. on retry) makes no provider call, so it
+        # doesn't queue behind agents that do
+        if await agent.has_cached_enhancement(agent_input):
+            slot: Any = contextlib.nullcontext()
+            timing["cached"] = True
+        else:
+            slot = semaphore
+
+        async with slot:
+            started = time.perf_counter()
+            timing["started_at"] = started - clock_start
+            try:
+                result = await asyncio.wait_for(
+                    agent.execute(agent_input), timeout=timeout
+                )
+                error = None
+            except asyncio.TimeoutError:
+                result, error = None, f"timed out after {timeout:.1f}s"
+            except Exception as e:
+                result, error = None, str(e)
+            finished = time.perf_counter()
+
+        timing["finished_at"] = finished - clock_start
+        timing["duration"] = finished - started
+        timing["queue_wait"] = timing["started_at"] - timing["ready_at"]
+        return result, error
+
+    def _agent_delta(
+        self, agent_result: GenerationState, log_offset: int
+    ) -> GenerationState:
+        """Reduce an agent result to the log entries the agent added"""
+
+        delta = agent_result.copy()
+        delta["execution_log"] = agent_result.get("execution_log", [])[log_offset:]
+        return delta
+
     async def execute_adaptive_workflow(
         self, state: GenerationState, preferences: Optional[dict[str, Any]] = None
     ) -> GenerationState:
@@ -554,12 +705,14 @@ class AgentCoordinator:
             "tension_builder": 30.0,
         }
 
-        total_time = 0.0
-
-        # Calculate time for each parallel group
-        for group in plan.parallel_groups:
-            group_time = max(base_times.get(agent_name, 30.0) for agent_name in group)
-            total_time += group_time
+        # Independent agents overlap, so the plan takes as long as its
+        # longest dependency chain
+        _, total_time = plan.critical_path(
+            {
+                agent_name: base_times.get(agent_name, 30.0)
+                for agent_name in plan.execution_order
+            }
+        )
 
         return total_time
 
@@ -568,25 +721,44 @@ class AgentCoordinator:
     ) -> GenerationState:
         """Merge results from parallel agent execution"""
 
-        merged_state = base_state.copy()
+        merged_state = fork_state(base_state)
 
-        # Merge enhanced content (use the latest)
-        if "enhanced_script" in agent_result:
-            merged_state["enhanced_script"] = agent_result["enhanced_script"]
+        # Merge enhanced content: the script is always rebuilt from the base
+        # and every agent's scene patches, so a skipped or failed agent's
+        # forked copy of the script never replaces merged work
+        enhancement_metadata = dict(merged_state.get("enhancement_metadata") or {})
+        scene_patches = {
+            **enhancement_metadata.get("scene_patches", {}),
+            **(agent_result.get("enhancement_metadata") or {}).get("scene_patches", {}),
+        }
+        if scene_patches:
+            base_script = merged_state.get("styled_script") or merged_state.get(
+                "draft_script", ""
+            )
+            merged_script, merge_report = merge_scene_patches(
+                base_script,
+                [
+                    ScenePatch.from_dict(patch)
+                    for patches in scene_patches.values()
+                    for patch in patches
+                ],
+            )
+            enhancement_metadata["scene_patches"] = scene_patches
+            enhancement_metadata["merge_report"] = merge_report
+            merged_state["enhancement_metadata"] = enhancement_metadata
+            merged_state["enhanced_script"] = merged_script
 
         # Merge metadata
         if "generation_metadata" in agent_result:
-            if "generation_metadata" not in merged_state:
-                merged_state["generation_metadata"] = {}
-            merged_state["generation_metadata"].update(
+            merged_state.setdefault("generation_metadata", {}).update(
                 agent_result["generation_metadata"]
             )
 
         # Merge execution logs
         if "execution_log" in agent_result:
-            if "execution_log" not in merged_state:
-                merged_state["execution_log"] = []
-            merged_state["execution_log"].extend(agent_result["execution_log"])
+            merged_state.setdefault("execution_log", AppendLog()).extend(
+                agent_result["execution_log"]
+            )
 
         # Update quality score (take the maximum improvement)
         current_quality = merged_state.get("current_quality_score", 0.0)
@@ -2,7 +2,9 @@
 Base class for specialized AI agents
 """
 
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
 from datetime import datetime
 from enum import Enum
 from typing import Any, Optional
@@ -59,7 +61,14 @@ except (ImportError, RuntimeError):
 
 
 from generation_service.ai.providers.base_provider import ProviderGenerationRequest
-from generation_service.workflows.state import GenerationState
+from generation_service.workflows.state import (
+    AppendLog,
+    GenerationState,
+    fork_state,
+)
+
+from .result_cache import AgentResultCache, get_agent_result_cache
+from .scene_patches import diff_scene_patches, estimate_tokens, shard_script
 
 
 class AgentExecutionError(Exception):
@@ -106,6 +115,10 @@ class BaseSpecialAgent(ABC):
     - Supports both independent and coordinated execution
     """
 
+    # Whether long scripts may be enhanced scene shard by scene shard; agents
+    # whose edits need the whole story at once opt out
+    supports_sharding = True
+
     def __init__(
         self,
         agent_name: str,
@@ -121,6 +134,11 @@ class BaseSpecialAgent(ABC):
         self.config = config or {}
         self.provider = None
 
+        # Memoized analysis/enhancement results (config "memoize": False opts out)
+        self.result_cache: Optional[AgentResultCache] = (
+            get_agent_result_cache() if self.config.get("memoize", True) else None
+        )
+
         # Execution metrics
         self.execution_count = 0
         self.success_count = 0
@@ -181,7 +199,7 @@ class BaseSpecialAgent(ABC):
             self._validate_input_state(state)
 
             # Analyze content to determine if enhancement is needed
-            analysis = await self.analyze_content(state)
+            analysis = await self.analyze_content_cached(state)
 
             if not analysis.get("should_enhance", False):
                 logger.info(
@@ -189,8 +207,13 @@ class BaseSpecialAgent(ABC):
                 )
                 return self._create_skip_result(state, analysis)
 
-            # Apply enhancements
-            enhancement_result = await self.enhance_content(state)
+            # Apply enhancements (reused if this exact input was enhanced before)
+            enhancement_result, cached = await self._enhance_content_cached(state)
+            if cached:
+                enhancement_result["cached"] = True
+                enhancement_result["tokens_saved"] = enhancement_result.pop(
+                    "tokens_used", 0
+                )
 
             # Update state with results
             updated_state = self._update_state_with_enhancement(
@@ -225,15 +248,64 @@ class BaseSpecialAgent(ABC):
             self.execution_count += 1
 
             # Create error state
-            error_state = state.copy()
+            error_state = fork_state(state)
             error_state["has_errors"] = True
-            error_state["error_messages"].append(
+            error_state.setdefault("error_messages", AppendLog()).append(
                 f"Agent {self.agent_name} failed: {e!s}"
             )
 
             # Don't fail the entire workflow - continue with original content
             return error_state
 
+    async def analyze_content_cached(self, state: GenerationState) -> dict[str, Any]:
+        """Analyze content, reusing the result for identical content and config"""
+
+        if self.result_cache is None:
+            return await self.analyze_content(state)
+
+        key = AgentResultCache.make_key(
+            "analysis", self.agent_name, self.config, self._memo_content(state)
+        )
+        analysis, _ = await self.result_cache.get_or_compute(
+            key, lambda: self.analyze_content(state)
+        )
+        return analysis
+
+    async def has_cached_enhancement(self, state: GenerationState) -> bool:
+        """Whether executing on this state would reuse a memoized enhancement"""
+
+        if self.result_cache is None:
+            return False
+        if not self.provider and self.provider_factory:
+            await self._initialize_provider()
+        return await self.result_cache.contains(self._enhancement_key(state))
+
+    async def _enhance_content_cached(
+        self, state: GenerationState
+    ) -> tuple[dict[str, Any], bool]:
+        if self.result_cache is None:
+            return await self.enhance_content(state), False
+
+        return await self.result_cache.get_or_compute(
+            self._enhancement_key(state), lambda: self.enhance_content(state)
+        )
+
+    def _memo_content(self, state: GenerationState) -> str:
+        """The slice of state agents read: the script they enhance"""
+        return state.get("styled_script") or state.get("draft_script") or ""
+
+    def _enhancement_key(self, state: GenerationState) -> str:
+        model = getattr(self.provider, "model", None) or getattr(
+            self.provider, "name", None
+        )
+        return AgentResultCache.make_key(
+            "enhancement",
+            self.agent_name,
+            self.config,
+            self._memo_content(state),
+            str(model) if model else None,
+        )
+
     async def _initialize_provider(self) -> None:
         """Initialize AI provider for the agent"""
 
@@ -261,7 +333,7 @@ class BaseSpecialAgent(ABC):
     ) -> GenerationState:
         """Create result when agent is skipped"""
 
-        skip_state = state.copy()
+        skip_state = fork_state(state)
 
         # Add skip metadata
         skip_metadata = {
@@ -272,10 +344,7 @@ class BaseSpecialAgent(ABC):
         }
 
         # Update execution log
-        if "execution_log" not in skip_state:
-            skip_state["execution_log"] = []
-
-        skip_state["execution_log"].append(
+        skip_state.setdefault("execution_log", AppendLog()).append(
             {
                 "node": f"agent_{self.agent_name}",
                 "status": "skipped",
@@ -298,12 +367,27 @@ class BaseSpecialAgent(ABC):
     ) -> GenerationState:
         """Update state with enhancement results"""
 
-        enhanced_state = state.copy()
+        enhanced_state = fork_state(state)
 
         # Update content
         if "enhanced_content" in enhancement_result:
             enhanced_state["enhanced_script"] = enhancement_result["enhanced_content"]
 
+            # Record the edit as scene patches so parallel results can be merged
+            base_script = state.get("styled_script") or state.get("draft_script", "")
+            patches = diff_scene_patches(
+                base_script,
+                enhancement_result["enhanced_content"],
+                self.agent_name,
+                self.priority.value,
+            )
+            enhancement_metadata = dict(state.get("enhancement_metadata") or {})
+            enhancement_metadata["scene_patches"] = {
+                **enhancement_metadata.get("scene_patches", {}),
+                self.agent_name: [patch.to_dict() for patch in patches],
+            }
+            enhanced_state["enhancement_metadata"] = enhancement_metadata
+
         # Update quality scores
         if "quality_improvement" in enhancement_result:
             current_score = enhanced_state.get("current_quality_score", 0.0)
@@ -321,21 +405,16 @@ class BaseSpecialAgent(ABC):
             "quality_improvement": enhancement_result.get("quality_improvement", 0.0),
             "tokens_used": enhancement_result.get("tokens_used", 0),
             "model_used": enhancement_result.get("model_used", "unknown"),
+            "cached": enhancement_result.get("cached", False),
         }
 
         # Update generation metadata
-        if "generation_metadata" not in enhanced_state:
-            enhanced_state["generation_metadata"] = {}
-
-        enhanced_state["generation_metadata"][
+        enhanced_state.setdefault("generation_metadata", {})[
             f"agent_{self.agent_name}"
         ] = agent_metadata
 
         # Update execution log
-        if "execution_log" not in enhanced_state:
-            enhanced_state["execution_log"] = []
-
-        enhanced_state["execution_log"].append(
+        enhanced_state.setdefault("execution_log", AppendLog()).append(
             {
                 "node": f"agent_{self.agent_name}",
                 "status": "completed",
@@ -421,6 +500,116 @@ Please provide the enhanced version of the script.
             ),
         }
 
+    async def execute_sharded_enhancement(
+        self,
+        content: str,
+        analysis: dict[str, Any],
+        prompt_builder: Callable[[str, dict[str, Any]], Awaitable[str]],
+        max_tokens: int = 3000,
+    ) -> dict[str, Any]:
+        """
+        Execute AI enhancement, splitting long scripts into scene shards
+
+        Scripts within ``shard_token_budget`` use a single provider call.
+        Longer scripts are split at scene headings into shards that are
+        enhanced concurrently, each prompted with the whole-script analysis
+        and the end of the previous shard, and reassembled in order. A shard
+        whose call fails keeps its original text.
+        """
+
+        budget = int(self.get_config_value("shard_token_budget", 1500))
+        sharding = self.supports_sharding and self.get_config_value(
+            "sharding_enabled", True
+        )
+        shards = shard_script(content, budget) if sharding else [content]
+
+        if len(shards) <= 1:
+            prompt = await prompt_builder(content, analysis)
+            return await self.execute_ai_enhancement(prompt, max_tokens=max_tokens)
+
+        semaphore = asyncio.Semaphore(
+            max(1, int(self.get_config_value("shard_concurrency", 4)))
+        )
+        context_chars = int(self.get_config_value("shard_context_chars", 400))
+
+        async def enhance_shard(index: int) -> dict[str, Any]:
+            async with semaphore:
+                prompt = await prompt_builder(shards[index], analysis)
+                prompt += self._create_shard_context(shards, index, context_chars)
+                shard_max_tokens = max(
+                    512, min(max_tokens, estimate_tokens(shards[index]) * 2)
+                )
+                return await self.execute_ai_enhancement(
+                    prompt, max_tokens=shard_max_tokens
+                )
+
+        results = await asyncio.gather(
+            *(enhance_shard(index) for index in range(len(shards))),
+            return_exceptions=True,
+        )
+
+        pieces: list[str] = []
+        failed_shards: list[int] = []
+        tokens_used = 0
+        model_used = "unknown"
+        for index, (shard, result) in enumerate(zip(shards, results)):
+            if isinstance(result, Exception):
+                logger.warning(
+                    f"Agent {self.agent_name} shard {index + 1}/{len(shards)} "
+                    f"failed, keeping original text: {result}"
+                )
+                failed_shards.append(index)
+                pieces.append(shard)
+                continue
+
+            # Keep the shard's original separation from the next scene
+            trailing = shard[len(shard.rstrip()) :]
+            pieces.append(result["enhanced_content"].strip() + trailing)
+            tokens_used += result["tokens_used"]
+            model_used = result["model_used"]
+
+        if len(failed_shards) == len(shards):
+            raise AgentExecutionError(
+                self.agent_name,
+                f"All {len(shards)} script shards failed",
+                results[0] if isinstance(results[0], Exception) else None,
+            )
+
+        return {
+            "enhanced_content": "".join(pieces),
+            "model_used": model_used,
+            "tokens_used": tokens_used,
+            "sharding": {
+                "shard_count": len(shards),
+                "failed_shards": failed_shards,
+                "shard_token_budget": budget,
+            },
+        }
+
+    def _create_shard_context(
+        self, shards: list[str], index: int, context_chars: int
+    ) -> str:
+        """Instructions and neighbouring context appended to a shard prompt"""
+
+        lines = [
+            "",
+            "",
+            f"SCRIPT SECTION {index + 1} OF {len(shards)}:",
+            "The script above is one section of a longer script. Return only "
+            "this section, enhanced, keeping its scene headings in order.",
+        ]
+        if index > 0 and context_chars > 0:
+            lines += [
+                "",
+                "END OF PREVIOUS SECTION (context only, do not include):",
+                shards[index - 1][-context_chars:].strip(),
+            ]
+        if index + 1 < len(shards):
+            next_heading = shards[index + 1].strip().splitlines()[0]
+            lines += ["", f"NEXT SECTION BEGINS WITH: {next_heading}"]
+
+        return "\n".join(lines)
+
     def get_agent_metrics(self) -> dict[str, Any]:
         """Get agent performance metrics"""
 
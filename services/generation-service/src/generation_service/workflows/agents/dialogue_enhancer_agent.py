@@ -55,6 +55,10 @@ except (ImportError, RuntimeError):
         pass
 
 
+from generation_service.workflows.quality.script_features import (
+    extract_script_features,
+    is_character_cue,
+)
 from generation_service.workflows.state import GenerationState
 
 from .base_agent import AgentCapability, AgentPriority, BaseSpecialAgent
@@ -193,11 +197,10 @@ class DialogueEnhancerAgent(BaseSpecialAgent):
         content = state.get("styled_script") or state.get("draft_script", "")
         analysis = await self.analyze_content(state)
 
-        # Create specialized dialogue enhancement prompt
-        prompt = await self._create_dialogue_enhancement_prompt(content, analysis)
-
-        # Execute AI enhancement
-        ai_result = await self.execute_ai_enhancement(prompt, max_tokens=4000)
+        # Execute AI enhancement (scene-sharded for long scripts)
+        ai_result = await self.execute_sharded_enhancement(
+            content, analysis, self._create_dialogue_enhancement_prompt, max_tokens=4000
+        )
 
         # Calculate quality improvement
         quality_improvement = self.calculate_quality_improvement(
@@ -259,36 +262,22 @@ class DialogueEnhancerAgent(BaseSpecialAgent):
     def _extract_dialogue_data(self, content: str) -> dict[str, Any]:
         """Extract dialogue data from the script content"""
 
-        lines = content.split("\n")
+        features = extract_script_features(content)
         dialogue_lines = []
         character_dialogue = {}
-        total_lines = 0
-        current_character = None
-
-        for line in lines:
-            line = line.strip()
-            total_lines += 1
-
-            # Skip empty lines and scene headers
-            if not line or line.startswith(("EXT.", "INT.", "FADE")):
-                continue
+        total_lines = features.line_count
 
-            # Detect character names
-            if self._is_character_name(line):
-                current_character = line.strip(":").strip()
-                if current_character not in character_dialogue:
-                    character_dialogue[current_character] = []
-
-            # Detect dialogue
-            elif current_character and ('"' in line or "'" in line):
+        for block in features.dialogue_blocks:
+            speech = character_dialogue.setdefault(block.character, [])
+            for line_index, line in zip(block.line_indexes, block.lines):
                 dialogue_lines.append(
                     {
-                        "character": current_character,
+                        "character": block.character,
                         "text": line,
-                        "line_number": total_lines,
+                        "line_number": line_index + 1,
                     }
                 )
-                character_dialogue[current_character].append(line)
+                speech.append(line)
 
         return {
             "total_lines": total_lines,
@@ -515,18 +504,7 @@ class DialogueEnhancerAgent(BaseSpecialAgent):
     def _is_character_name(self, line: str) -> bool:
         """Determine if a line represents a character name"""
 
-        line = line.strip(":").strip()
-
-        # Character name heuristics
-        if (
-            line.isupper()
-            and len(line.split()) <= 3
-            and len(line) > 1
-            and not line.startswith(("EXT.", "INT.", "FADE", "CUT"))
-        ):
-            return True
-
-        return False
+        return is_character_cue(line.strip())
 
     async def _create_dialogue_enhancement_prompt(
         self, content: str, analysis: dict[str, Any]
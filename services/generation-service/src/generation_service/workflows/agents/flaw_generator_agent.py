@@ -55,6 +55,7 @@ except (ImportError, RuntimeError):
         pass
 
 
+from generation_service.workflows.quality.script_features import is_character_cue
 from generation_service.workflows.state import GenerationState
 
 from .base_agent import AgentCapability, AgentPriority, BaseSpecialAgent
@@ -193,11 +194,10 @@ class FlawGeneratorAgent(BaseSpecialAgent):
         content = state.get("styled_script") or state.get("draft_script", "")
         analysis = await self.analyze_content(state)
 
-        # Create specialized flaw generation prompt
-        prompt = await self._create_flaw_generation_prompt(content, analysis)
-
-        # Execute AI enhancement
-        ai_result = await self.execute_ai_enhancement(prompt, max_tokens=4000)
+        # Execute AI enhancement (scene-sharded for long scripts)
+        ai_result = await self.execute_sharded_enhancement(
+            content, analysis, self._create_flaw_generation_prompt, max_tokens=4000
+        )
 
         # Calculate quality improvement
         quality_improvement = self.calculate_quality_improvement(
@@ -289,18 +289,7 @@ class FlawGeneratorAgent(BaseSpecialAgent):
     def _is_character_name(self, line: str) -> bool:
         """Determine if a line represents a character name"""
 
-        line = line.strip(":").strip()
-
-        # Basic heuristics for character names
-        if (
-            line.isupper()
-            and len(line.split()) <= 3
-            and len(line) > 1
-            and not line.startswith(("EXT.", "INT.", "FADE", "CUT"))
-        ):
-            return True
-
-        return False
+        return is_character_cue(line.strip())
 
     def _analyze_character(
         self, char_name: str, char_data: dict[str, Any]
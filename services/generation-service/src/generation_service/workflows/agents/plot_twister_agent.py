@@ -73,6 +73,9 @@ class PlotTwisterAgent(BaseSpecialAgent):
     - Enhances audience engagement through unexpected developments
     """
 
+    # Twists rework setups and payoffs across the whole story
+    supports_sharding = False
+
     def __init__(
         self,
         provider_factory: Optional[Any] = None,
@@ -152,11 +155,10 @@ class PlotTwisterAgent(BaseSpecialAgent):
         content = state.get("styled_script") or state.get("draft_script", "")
         analysis = await self.analyze_content(state)
 
-        # Create specialized plot twist prompt
-        prompt = await self._create_plot_twist_prompt(content, analysis)
-
-        # Execute AI enhancement
-        ai_result = await self.execute_ai_enhancement(prompt, max_tokens=4000)
+        # Execute AI enhancement (scene-sharded for long scripts)
+        ai_result = await self.execute_sharded_enhancement(
+            content, analysis, self._create_plot_twist_prompt, max_tokens=4000
+        )
 
         # Calculate quality improvement
         quality_improvement = self.calculate_quality_improvement(
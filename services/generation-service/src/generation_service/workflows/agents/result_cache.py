@@ -0,0 +1,230 @@
+"""
+Content-addressed cache of specialized agent analysis and enhancement results
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
+
+try:
+    from ai_script_core import get_service_logger
+
+    logger = get_service_logger("generation-service.agent-result-cache")
+except (ImportError, RuntimeError):
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+
+def _digest(value: Any) -> str:
+    data = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class AgentResultCache:
+    """
+    Two-tier cache of agent results keyed by a hash of everything they depend on
+
+    The first tier is an in-process LRU; the optional second tier is Redis so
+    results survive restarts and are shared between workers. Identical calls
+    that arrive while one is in flight wait for it instead of repeating the
+    LLM request.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        analysis_ttl: float = 3600.0,
+        enhancement_ttl: float = 86400.0,
+        redis_client: Optional[Any] = None,
+        prefix: str = "agent-memo:",
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttls = {"analysis": analysis_ttl, "enhancement": enhancement_ttl}
+        self.redis = redis_client
+        self.prefix = prefix
+
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._stats = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "shared_inflight": 0,
+            "stores": 0,
+            "redis_errors": 0,
+        }
+
+    @staticmethod
+    def make_key(
+        kind: str,
+        agent_name: str,
+        config: dict[str, Any],
+        content: str,
+        model: Optional[str] = None,
+    ) -> str:
+        """Key for ``kind`` ("analysis" or "enhancement") of an agent input"""
+        return ":".join(
+            [
+                kind,
+                agent_name,
+                _digest(config)[:16],
+                model or "-",
+                hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            ]
+        )
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return copy.deepcopy(value)
+            del self._memory[key]
+
+        if self.redis is not None:
+            try:
+                data = await self.redis.get(f"{self.prefix}{key}")
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"Agent result cache read failed: {e}")
+                data = None
+            if data is not None:
+                value = json.loads(data)
+                self._remember(key, value, self._ttl(key))
+                self._stats["redis_hits"] += 1
+                return copy.deepcopy(value)
+
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        ttl = self._ttl(key)
+        self._remember(key, copy.deepcopy(value), ttl)
+        self._stats["stores"] += 1
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(
+                    f"{self.prefix}{key}",
+                    json.dumps(value, default=str),
+                    ex=max(1, int(ttl)),
+                )
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.warning(f"Agent result cache write failed: {e}")
+
+    async def contains(self, key: str) -> bool:
+        """Whether a result is cached, without counting a hit or miss"""
+        entry = self._memory.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return True
+        if self.redis is not None:
+            try:
+                return bool(await self.redis.exists(f"{self.prefix}{key}"))
+            except Exception:
+                return False
+        return False
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[Any]]
+    ) -> tuple[Any, bool]:
+        """
+        Return the cached value for ``key`` or compute and store it
+
+        Returns:
+            The value and whether it came from the cache
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value, True
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._stats["shared_inflight"] += 1
+            return copy.deepcopy(await asyncio.shield(pending)), True
+
+        self._stats["misses"] += 1
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise; don't warn about an unretrieved exception
+            future.exception()
+            raise
+        else:
+            await self.set(key, value)
+            future.set_result(value)
+            return value, False
+        finally:
+            self._inflight.pop(key, None)
+
+    async def clear(self) -> None:
+        self._memory.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        lookups = (
+            self._stats["memory_hits"]
+            + self._stats["redis_hits"]
+            + self._stats["misses"]
+        )
+        hits = self._stats["memory_hits"] + self._stats["redis_hits"]
+        return {
+            **self._stats,
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "backend": "redis" if self.redis is not None else "memory",
+        }
+
+    def _ttl(self, key: str) -> float:
+        return self.ttls.get(key.split(":", 1)[0], self.ttls["analysis"])
+
+    def _remember(self, key: str, value: Any, ttl: float) -> None:
+        self._memory[key] = (time.monotonic() + ttl, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+# Global cache instance
+_agent_result_cache: Optional[AgentResultCache] = None
+_agent_result_cache_loaded = False
+
+
+def get_agent_result_cache() -> Optional[AgentResultCache]:
+    """Get the shared agent result cache, or None when memoization is disabled"""
+    global _agent_result_cache, _agent_result_cache_loaded
+
+    if not _agent_result_cache_loaded:
+        _agent_result_cache_loaded = True
+        try:
+            from generation_service.config.settings import get_settings
+
+            config = get_settings().get_agent_memo_config()
+        except Exception as e:
+            logger.warning(f"Agent memoization settings unavailable: {e}")
+            config = {"enabled": True, "backend": "memory"}
+
+        if config.get("enabled", True):
+            redis_client = None
+            if config.get("backend") == "redis" and config.get("redis_url"):
+                import redis.asyncio as redis
+
+                redis_client = redis.from_url(config["redis_url"])
+            _agent_result_cache = AgentResultCache(
+                max_entries=int(config.get("max_entries", 512)),
+                analysis_ttl=float(config.get("analysis_ttl", 3600.0)),
+                enhancement_ttl=float(config.get("enhancement_ttl", 86400.0)),
+                redis_client=redis_client,
+            )
+
+    return _agent_result_cache
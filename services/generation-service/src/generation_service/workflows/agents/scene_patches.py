@@ -0,0 +1,298 @@
+"""
+Scene-scoped script patches and their three-way merge
+
+Agents enhance the whole script, but their edits usually touch a few
+scenes. Splitting the base script into a scene index and diffing each
+agent's output against it yields patches keyed by scene span, so edits
+from agents that ran in parallel can be applied together instead of the
+last result replacing the others.
+"""
+
+import difflib
+import hashlib
+import re
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+SCENE_HEADING = re.compile(r"^\s*(?:INT\.|EXT\.|INT/EXT\.?|I/E\.?)", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Scene:
+    """One scene of a script; index 0 may be a heading-less preamble"""
+
+    index: int
+    heading: str
+    text: str
+
+    @property
+    def fingerprint(self) -> str:
+        return _fingerprint(self.text)
+
+
+@dataclass(frozen=True)
+class ScenePatch:
+    """Replacement text for base scenes ``start`` (inclusive) to ``end``"""
+
+    agent_name: str
+    priority: int
+    start: int
+    end: int
+    base_fingerprint: str
+    text: str
+
+    def overlaps(self, other: "ScenePatch") -> bool:
+        return self.start < other.end and other.start < self.end
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ScenePatch":
+        return cls(**data)
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _split_scenes(script: str) -> list[Scene]:
+    scenes: list[Scene] = []
+    heading = ""
+    lines: list[str] = []
+
+    for line in script.splitlines(keepends=True):
+        if SCENE_HEADING.match(line):
+            if lines:
+                scenes.append(Scene(len(scenes), heading, "".join(lines)))
+                lines = []
+            heading = line.strip().upper()
+        lines.append(line)
+
+    if lines or not scenes:
+        scenes.append(Scene(len(scenes), heading, "".join(lines)))
+    return scenes
+
+
+@lru_cache(maxsize=64)
+def build_scene_index(script: str) -> tuple[Scene, ...]:
+    """Split a script into scenes at INT./EXT. headings (cached per script)"""
+    return tuple(_split_scenes(script))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def shard_script(script: str, token_budget: int) -> list[str]:
+    """
+    Group consecutive scenes into shards of at most ``token_budget`` tokens
+
+    Shards always end at scene boundaries, so a single scene longer than the
+    budget becomes a shard of its own. Joining the shards gives the script.
+    """
+    shards: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    for scene in build_scene_index(script):
+        tokens = estimate_tokens(scene.text)
+        if current and current_tokens + tokens > token_budget:
+            shards.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(scene.text)
+        current_tokens += tokens
+
+    if current:
+        shards.append("".join(current))
+    return shards
+
+
+def _span_fingerprint(scenes: tuple[Scene, ...], start: int, end: int) -> str:
+    return _fingerprint("".join(scene.text for scene in scenes[start:end]))
+
+
+def diff_scene_patches(
+    base_script: str, enhanced_script: str, agent_name: str, priority: int = 0
+) -> list[ScenePatch]:
+    """
+    Express an agent's output as patches against the base script's scenes
+
+    Scenes are aligned by heading; inserted or removed scenes are attached
+    to a neighbouring base scene so every patch spans at least one scene.
+    """
+    base = build_scene_index(base_script)
+    enhanced = _split_scenes(enhanced_script)
+
+    matcher = difflib.SequenceMatcher(
+        None,
+        [scene.heading for scene in base],
+        [scene.heading for scene in enhanced],
+        autojunk=False,
+    )
+
+    hunks: list[list[int]] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for offset in range(i2 - i1):
+                if base[i1 + offset].text != enhanced[j1 + offset].text:
+                    hunks.append(
+                        [i1 + offset, i1 + offset + 1, j1 + offset, j1 + offset + 1]
+                    )
+            continue
+        if i1 == i2:
+            # Pure insertion: anchor to the previous scene (or the next one)
+            if i1 > 0:
+                i1, j1 = i1 - 1, j1 - 1
+            else:
+                i2, j2 = i2 + 1, j2 + 1
+        hunks.append([i1, i2, j1, j2])
+
+    # Coalesce hunks that now share base scenes
+    merged: list[list[int]] = []
+    for hunk in sorted(hunks):
+        if merged and hunk[0] < merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], hunk[1])
+            merged[-1][3] = max(merged[-1][3], hunk[3])
+        else:
+            merged.append(hunk)
+
+    return [
+        ScenePatch(
+            agent_name=agent_name,
+            priority=priority,
+            start=i1,
+            end=i2,
+            base_fingerprint=_span_fingerprint(base, i1, i2),
+            text="".join(scene.text for scene in enhanced[j1:j2]),
+        )
+        for i1, i2, j1, j2 in merged
+    ]
+
+
+def _changed_ranges(
+    base: list[str], other: list[str]
+) -> list[tuple[int, int, list[str]]]:
+    matcher = difflib.SequenceMatcher(None, base, other, autojunk=False)
+    return [
+        (i1, i2, other[j1:j2])
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def merge_text(base: str, ours: str, theirs: str) -> Optional[str]:
+    """
+    Line-based three-way merge
+
+    Returns the combined text, or None if both sides changed the same or
+    adjacent base lines.
+    """
+    if ours == theirs or theirs == base:
+        return ours
+    if ours == base:
+        return theirs
+
+    base_lines = base.splitlines(keepends=True)
+    changes = sorted(
+        _changed_ranges(base_lines, ours.splitlines(keepends=True))
+        + _changed_ranges(base_lines, theirs.splitlines(keepends=True)),
+        key=lambda change: (change[0], change[1]),
+    )
+    for previous, current in zip(changes, changes[1:]):
+        # Touching ranges (including two insertions at one point) conflict
+        if current[0] <= previous[1]:
+            return None
+
+    result: list[str] = []
+    position = 0
+    for start, end, replacement in changes:
+        result.extend(base_lines[position:start])
+        result.extend(replacement)
+        position = end
+    result.extend(base_lines[position:])
+    return "".join(result)
+
+
+def merge_scene_patches(
+    base_script: str, patches: list[ScenePatch]
+) -> tuple[str, dict[str, Any]]:
+    """
+    Apply every non-conflicting patch to the base script
+
+    Patches on disjoint scene spans are applied together. Patches on the
+    same span are three-way merged line by line; remaining conflicts are
+    won by the higher priority agent (earlier patch on ties). Patches whose
+    base scenes no longer match the script are rejected as stale.
+
+    Returns:
+        The merged script and a report of applied, merged and rejected patches
+    """
+    base = build_scene_index(base_script)
+    report: dict[str, Any] = {"applied": [], "merged": [], "rejected": []}
+
+    ordered = sorted(enumerate(patches), key=lambda item: (-item[1].priority, item[0]))
+    accepted: list[ScenePatch] = []
+    for _, patch in ordered:
+        if patch.end > len(base) or patch.base_fingerprint != _span_fingerprint(
+            base, patch.start, patch.end
+        ):
+            report["rejected"].append(
+                {
+                    "agent_name": patch.agent_name,
+                    "scenes": [patch.start, patch.end],
+                    "reason": "stale",
+                }
+            )
+            continue
+
+        conflict = next((other for other in accepted if other.overlaps(patch)), None)
+        if conflict is None:
+            accepted.append(patch)
+            report["applied"].append(
+                {"agent_name": patch.agent_name, "scenes": [patch.start, patch.end]}
+            )
+            continue
+
+        combined = None
+        if (conflict.start, conflict.end) == (patch.start, patch.end):
+            span_text = "".join(scene.text for scene in base[patch.start : patch.end])
+            combined = merge_text(span_text, conflict.text, patch.text)
+
+        if combined is None:
+            report["rejected"].append(
+                {
+                    "agent_name": patch.agent_name,
+                    "scenes": [patch.start, patch.end],
+                    "reason": "conflict",
+                    "winner": conflict.agent_name,
+                }
+            )
+            continue
+
+        accepted[accepted.index(conflict)] = ScenePatch(
+            agent_name=f"{conflict.agent_name}+{patch.agent_name}",
+            priority=conflict.priority,
+            start=conflict.start,
+            end=conflict.end,
+            base_fingerprint=conflict.base_fingerprint,
+            text=combined,
+        )
+        report["merged"].append(
+            {
+                "agent_name": patch.agent_name,
+                "scenes": [patch.start, patch.end],
+                "into": conflict.agent_name,
+            }
+        )
+
+    pieces: list[str] = []
+    position = 0
+    for patch in sorted(accepted, key=lambda p: p.start):
+        pieces.extend(scene.text for scene in base[position : patch.start])
+        pieces.append(patch.text)
+        position = patch.end
+    pieces.extend(scene.text for scene in base[position:])
+    return "".join(pieces), report
@@ -55,6 +55,9 @@ except (ImportError, RuntimeError):
         pass
 
 
+from generation_service.workflows.quality.script_features import (
+    extract_script_features,
+)
 from generation_service.workflows.state import GenerationState
 
 from .base_agent import AgentCapability, AgentPriority, BaseSpecialAgent
@@ -135,8 +138,9 @@ class SceneVisualizerAgent(BaseSpecialAgent):
         content = state.get("styled_script") or state.get("draft_script", "")
         analysis = await self.analyze_content(state)
 
-        prompt = await self._create_visual_enhancement_prompt(content, analysis)
-        ai_result = await self.execute_ai_enhancement(prompt, max_tokens=4000)
+        ai_result = await self.execute_sharded_enhancement(
+            content, analysis, self._create_visual_enhancement_prompt, max_tokens=4000
+        )
 
         quality_improvement = self.calculate_quality_improvement(
             content, ai_result["enhanced_content"]
@@ -167,23 +171,15 @@ class SceneVisualizerAgent(BaseSpecialAgent):
     def _extract_scene_descriptions(self, content: str) -> list[dict[str, Any]]:
         """Extract scene descriptions from script"""
 
-        scenes = []
-        lines = content.split("\n")
-
-        for i, line in enumerate(lines):
-            line = line.strip()
-
-            if line.startswith(("EXT.", "INT.")):
-                scenes.append(
-                    {
-                        "line_number": i,
-                        "header": line,
-                        "type": "exterior" if line.startswith("EXT.") else "interior",
-                        "description_quality": self._assess_scene_header_quality(line),
-                    }
-                )
-
-        return scenes
+        return [
+            {
+                "line_number": header.line_index,
+                "header": header.text,
+                "type": "exterior" if header.is_exterior else "interior",
+                "description_quality": self._assess_scene_header_quality(header.text),
+            }
+            for header in extract_script_features(content).scene_headers
+        ]
 
     def _calculate_visual_density(self, content: str) -> float:
         """Calculate density of visual descriptions"""
@@ -211,11 +211,10 @@ class TensionBuilderAgent(BaseSpecialAgent):
         content = state.get("styled_script") or state.get("draft_script", "")
         analysis = await self.analyze_content(state)
 
-        # Create specialized tension building prompt
-        prompt = await self._create_tension_building_prompt(content, analysis)
-
-        # Execute AI enhancement
-        ai_result = await self.execute_ai_enhancement(prompt, max_tokens=4000)
+        # Execute AI enhancement (scene-sharded for long scripts)
+        ai_result = await self.execute_sharded_enhancement(
+            content, analysis, self._create_tension_building_prompt, max_tokens=4000
+        )
 
         # Calculate quality improvement
         quality_improvement = self.calculate_quality_improvement(
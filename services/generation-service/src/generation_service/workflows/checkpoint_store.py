@@ -0,0 +1,324 @@
+"""
+Persistent, delta-encoded checkpoints of GenerationState at node boundaries
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Optional
+
+from generation_service.models.generation import GenerationRequest
+from generation_service.workflows.state import AppendLog, GenerationState
+
+try:
+    from ai_script_core import get_service_logger
+
+    logger = get_service_logger("generation-service.checkpoint-store")
+except (ImportError, RuntimeError):
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    generation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    node TEXT NOT NULL,
+    delta BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (generation_id, seq)
+);
+CREATE TABLE IF NOT EXISTS generations (
+    generation_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    completed_nodes TEXT NOT NULL,
+    last_seq INTEGER NOT NULL,
+    state_bytes INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_generations_status
+    ON generations (status, updated_at);
+"""
+
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+# Delta keys with this suffix hold only the entries appended to a log field
+APPENDED = "+"
+
+
+def _encode_fields(
+    state: GenerationState, previous_logs: dict[str, AppendLog]
+) -> dict[str, str]:
+    """
+    Serialize each top-level state field independently for diffing
+
+    A log that extends the one checkpointed before is encoded as just its
+    new entries, under the field name suffixed with ``APPENDED``.
+    """
+    fields: dict[str, str] = {}
+    for key, value in state.items():
+        previous = previous_logs.get(key)
+        if isinstance(value, AppendLog) and previous is not None:
+            if value.extends(previous):
+                appended = value.since(len(previous))
+                if appended:
+                    fields[key + APPENDED] = json.dumps(
+                        appended, sort_keys=True, default=str
+                    )
+                continue
+        if key == "original_request" and hasattr(value, "model_dump"):
+            value = value.model_dump(mode="json")
+        elif isinstance(value, AppendLog):
+            value = list(value)
+        fields[key] = json.dumps(value, sort_keys=True, default=str)
+    return fields
+
+
+def _append_encoded(encoded: Optional[str], appended: str) -> str:
+    """Concatenate two JSON-encoded lists without decoding them"""
+    if not encoded or encoded == "[]":
+        return appended
+    return f"{encoded[:-1]}, {appended[1:]}"
+
+
+def _decode_fields(fields: dict[str, str]) -> GenerationState:
+    state: dict[str, Any] = {key: json.loads(value) for key, value in fields.items()}
+    if isinstance(state.get("original_request"), dict):
+        state["original_request"] = GenerationRequest.model_validate(
+            state["original_request"]
+        )
+    return state  # type: ignore[return-value]
+
+
+class CheckpointStore:
+    """
+    SQLite (WAL) store of per-node GenerationState checkpoints
+
+    Each checkpoint only stores the state fields that changed since the
+    previous node, compressed with zlib, so a generation costs roughly one
+    copy of each script stage instead of one full state per node. Logs are
+    append-only, so a checkpoint stores only the entries a node added. Finished
+    generations are deleted after ``retention_seconds``; generations that
+    never finished are kept for ``max_age_seconds`` so they can be resumed
+    after a restart.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "./data/checkpoints.sqlite3",
+        retention_seconds: float = 3600.0,
+        max_age_seconds: float = 86400.0,
+    ) -> None:
+        self.db_path = db_path
+        self.retention_seconds = retention_seconds
+        self.max_age_seconds = max_age_seconds
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        # Last encoded fields of generations checkpointed by this process
+        self._last_fields: dict[str, dict[str, str]] = {}
+        # Logs as of the last checkpoint, to write only what was appended
+        self._last_logs: dict[str, dict[str, AppendLog]] = {}
+
+    async def save(self, generation_id: str, node: str, state: GenerationState) -> None:
+        """Record the state after ``node`` completed"""
+        fields = _encode_fields(state, self._last_logs.get(generation_id, {}))
+        previous = self._last_fields.get(generation_id)
+        if previous is None:
+            loaded = await self._load_fields(generation_id)
+            previous = loaded[0] if loaded else {}
+
+        delta = {
+            key: value
+            for key, value in fields.items()
+            if key.endswith(APPENDED) or previous.get(key) != value
+        }
+        blob = zlib.compress(json.dumps(delta).encode("utf-8"))
+        await asyncio.to_thread(self._write, generation_id, node, blob)
+        self._last_fields[generation_id] = {
+            key: value for key, value in fields.items() if not key.endswith(APPENDED)
+        }
+        self._last_logs[generation_id] = {
+            key: value.fork()
+            for key, value in state.items()
+            if isinstance(value, AppendLog)
+        }
+
+    async def load(
+        self, generation_id: str
+    ) -> Optional[tuple[GenerationState, list[str]]]:
+        """Rebuild the latest state and the nodes completed so far"""
+        loaded = await self._load_fields(generation_id)
+        if loaded is None:
+            return None
+        fields, completed_nodes = loaded
+        return _decode_fields(fields), completed_nodes
+
+    async def mark_finished(self, generation_id: str, succeeded: bool = True) -> None:
+        """Mark a generation finished; its checkpoints expire after retention"""
+        self._last_fields.pop(generation_id, None)
+        self._last_logs.pop(generation_id, None)
+        status = COMPLETED if succeeded else FAILED
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE generations SET status = ?, updated_at = ? WHERE generation_id = ?",
+            (status, time.time(), generation_id),
+        )
+        await self.prune()
+
+    async def list_resumable(self) -> list[dict[str, Any]]:
+        """Generations with checkpoints that were interrupted or failed"""
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT generation_id, status, completed_nodes, state_bytes, updated_at "
+            "FROM generations WHERE status != ? ORDER BY updated_at",
+            (COMPLETED,),
+        )
+        return [
+            {
+                "generation_id": generation_id,
+                "status": status,
+                "completed_nodes": json.loads(completed_nodes),
+                "checkpoint_bytes": state_bytes,
+                "updated_at": updated_at,
+            }
+            for generation_id, status, completed_nodes, state_bytes, updated_at in rows
+        ]
+
+    def release(self, generation_id: str) -> None:
+        """Drop cached fields of a generation no longer running in this process"""
+        self._last_fields.pop(generation_id, None)
+        self._last_logs.pop(generation_id, None)
+
+    async def delete(self, generation_id: str) -> None:
+        self._last_fields.pop(generation_id, None)
+        self._last_logs.pop(generation_id, None)
+        await asyncio.to_thread(self._delete, [generation_id])
+
+    async def prune(self) -> int:
+        """Apply the retention policy, returning the number of generations removed"""
+        now = time.time()
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT generation_id FROM generations "
+            "WHERE (status != ? AND updated_at < ?) OR updated_at < ?",
+            (RUNNING, now - self.retention_seconds, now - self.max_age_seconds),
+        )
+        expired = [row[0] for row in rows]
+        if expired:
+            await asyncio.to_thread(self._delete, expired)
+            logger.info(f"Pruned checkpoints of {len(expired)} generations")
+        return len(expired)
+
+    def get_stats(self) -> dict[str, Any]:
+        rows = self._query(
+            "SELECT status, COUNT(*), COALESCE(SUM(state_bytes), 0) "
+            "FROM generations GROUP BY status",
+            (),
+        )
+        return {
+            "db_path": self.db_path,
+            "by_status": {status: count for status, count, _ in rows},
+            "checkpoint_bytes": sum(size for _, _, size in rows),
+            "retention_seconds": self.retention_seconds,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    async def _load_fields(
+        self, generation_id: str
+    ) -> Optional[tuple[dict[str, str], list[str]]]:
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT delta FROM checkpoints WHERE generation_id = ? ORDER BY seq",
+            (generation_id,),
+        )
+        if not rows:
+            return None
+
+        fields: dict[str, str] = {}
+        for (blob,) in rows:
+            for key, value in json.loads(zlib.decompress(blob)).items():
+                if key.endswith(APPENDED):
+                    key = key[: -len(APPENDED)]
+                    value = _append_encoded(fields.get(key), value)
+                fields[key] = value
+
+        meta = await asyncio.to_thread(
+            self._query,
+            "SELECT completed_nodes FROM generations WHERE generation_id = ?",
+            (generation_id,),
+        )
+        completed_nodes = json.loads(meta[0][0]) if meta else []
+        return fields, completed_nodes
+
+    def _write(self, generation_id: str, node: str, blob: bytes) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT last_seq, completed_nodes FROM generations "
+                "WHERE generation_id = ?",
+                (generation_id,),
+            ).fetchone()
+            seq = row[0] + 1 if row else 1
+            completed_nodes = json.loads(row[1]) if row else []
+            if node not in completed_nodes:
+                completed_nodes.append(node)
+
+            self._conn.execute(
+                "INSERT INTO checkpoints (generation_id, seq, node, delta, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (generation_id, seq, node, blob, now),
+            )
+            self._conn.execute(
+                "INSERT INTO generations (generation_id, status, completed_nodes, "
+                "last_seq, state_bytes, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(generation_id) DO UPDATE SET status = excluded.status, "
+                "completed_nodes = excluded.completed_nodes, "
+                "last_seq = excluded.last_seq, "
+                "state_bytes = generations.state_bytes + excluded.state_bytes, "
+                "updated_at = excluded.updated_at",
+                (
+                    generation_id,
+                    RUNNING,
+                    json.dumps(completed_nodes),
+                    seq,
+                    len(blob),
+                    now,
+                ),
+            )
+
+    def _delete(self, generation_ids: list[str]) -> None:
+        with self._lock, self._conn:
+            for generation_id in generation_ids:
+                self._conn.execute(
+                    "DELETE FROM checkpoints WHERE generation_id = ?", (generation_id,)
+                )
+                self._conn.execute(
+                    "DELETE FROM generations WHERE generation_id = ?", (generation_id,)
+                )
+
+    def _execute(self, sql: str, params: tuple[Any, ...]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(sql, params)
+
+    def _query(self, sql: str, params: tuple[Any, ...]) -> list[tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
@@ -2,18 +2,22 @@
 Feedback system for continuous improvement and personalization
 """
 
+from .feedback_store import FeedbackStore
 from .feedback_system import (
     FeedbackLearningEngine,
     FeedbackSentiment,
     FeedbackType,
     UserFeedback,
     UserPreferenceProfile,
+    get_feedback_learning_engine,
 )
 
 __all__ = [
     "FeedbackLearningEngine",
     "FeedbackSentiment",
+    "FeedbackStore",
     "FeedbackType",
     "UserFeedback",
     "UserPreferenceProfile",
+    "get_feedback_learning_engine",
 ]
@@ -0,0 +1,218 @@
+"""
+Bounded, indexed feedback storage with optional SQLite persistence
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    from ai_script_core import get_service_logger
+
+    logger = get_service_logger("generation-service.feedback-store")
+except (ImportError, RuntimeError):
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    feedback_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    created_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_user ON feedback (user_id, created_at);
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _sentiment(feedback: Any) -> str:
+    return getattr(feedback.sentiment, "value", str(feedback.sentiment))
+
+
+class FeedbackStore(Mapping):
+    """
+    Feedback items indexed by user and by time bucket
+
+    Only the latest ``max_items`` items are kept; older ones are evicted
+    from every index. Each time bucket keeps sentiment counters, so windowed
+    statistics add up buckets instead of scanning items. With ``db_path``
+    items and user profiles are written to SQLite (WAL) and the most recent
+    items and all profiles are loaded back on start.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 10000,
+        bucket_seconds: float = 3600.0,
+        db_path: Optional[str] = None,
+    ) -> None:
+        self.max_items = max_items
+        self.bucket_seconds = bucket_seconds
+        self.db_path = db_path
+        self.total_recorded = 0
+
+        self._items: OrderedDict[str, Any] = OrderedDict()
+        self._by_user: dict[str, deque[str]] = {}
+        self._buckets: dict[int, dict[str, None]] = {}
+        self._bucket_sentiments: dict[int, Counter] = {}
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path:
+            if db_path != ":memory:":
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    # Mapping interface over feedback_id -> feedback
+
+    def __getitem__(self, feedback_id: str) -> Any:
+        return self._items[feedback_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, feedback: Any) -> None:
+        """Index a feedback item, evicting the oldest beyond ``max_items``"""
+        if feedback.feedback_id in self._items:
+            self._remove(feedback.feedback_id)
+
+        bucket = self._bucket(feedback.timestamp.timestamp())
+        self._items[feedback.feedback_id] = feedback
+        self._buckets.setdefault(bucket, {})[feedback.feedback_id] = None
+        self._bucket_sentiments.setdefault(bucket, Counter())[_sentiment(feedback)] += 1
+        if feedback.user_id:
+            self._by_user.setdefault(feedback.user_id, deque()).append(
+                feedback.feedback_id
+            )
+        self.total_recorded += 1
+
+        while len(self._items) > self.max_items:
+            self._remove(next(iter(self._items)))
+
+    def for_user(self, user_id: str) -> list[Any]:
+        """Stored feedback of one user, oldest first"""
+        return [self._items[i] for i in self._by_user.get(user_id, ())]
+
+    def recent(self, window_seconds: float) -> list[Any]:
+        """Feedback with a timestamp inside the window"""
+        cutoff = time.time() - window_seconds
+        first_bucket = self._bucket(cutoff)
+        return [
+            self._items[feedback_id]
+            for bucket in sorted(b for b in self._buckets if b >= first_bucket)
+            for feedback_id in self._buckets[bucket]
+            if self._items[feedback_id].timestamp.timestamp() >= cutoff
+        ]
+
+    def sentiment_counts(self, window_seconds: float) -> dict[str, int]:
+        """Sentiment totals of the window, to bucket granularity"""
+        first_bucket = self._bucket(time.time() - window_seconds)
+        totals: Counter = Counter()
+        for bucket, counts in self._bucket_sentiments.items():
+            if bucket >= first_bucket:
+                totals.update(counts)
+        return {sentiment: count for sentiment, count in totals.items() if count}
+
+    # Persistence
+
+    async def persist(
+        self, feedback: dict[str, Any], profile: Optional[dict[str, Any]] = None
+    ) -> None:
+        """Write a feedback payload and the profile it updated"""
+        if self._conn is None:
+            return
+        await asyncio.to_thread(self._write, feedback, profile)
+
+    def load(self) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]]]:
+        """Latest feedback payloads (oldest first) and all profile payloads"""
+        if self._conn is None:
+            return [], {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM feedback ORDER BY rowid DESC LIMIT ?",
+                (self.max_items,),
+            ).fetchall()
+            profiles = self._conn.execute(
+                "SELECT user_id, payload FROM profiles"
+            ).fetchall()
+        return (
+            [json.loads(payload) for (payload,) in reversed(rows)],
+            {user_id: json.loads(payload) for user_id, payload in profiles},
+        )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+
+    def _write(
+        self, feedback: dict[str, Any], profile: Optional[dict[str, Any]]
+    ) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feedback "
+                "(feedback_id, user_id, created_at, payload) VALUES (?, ?, ?, ?)",
+                (
+                    feedback["feedback_id"],
+                    feedback.get("user_id"),
+                    now,
+                    json.dumps(feedback, default=str),
+                ),
+            )
+            # Keep the table bounded like the in-memory store
+            self._conn.execute(
+                "DELETE FROM feedback WHERE rowid <= "
+                "(SELECT MAX(rowid) FROM feedback) - ?",
+                (self.max_items,),
+            )
+            if profile is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO profiles (user_id, payload, updated_at) "
+                    "VALUES (?, ?, ?)",
+                    (profile["user_id"], json.dumps(profile, default=str), now),
+                )
+
+    def _bucket(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+
+    def _remove(self, feedback_id: str) -> None:
+        feedback = self._items.pop(feedback_id)
+        bucket = self._bucket(feedback.timestamp.timestamp())
+
+        ids = self._buckets.get(bucket, {})
+        ids.pop(feedback_id, None)
+        counts = self._bucket_sentiments.get(bucket)
+        if counts is not None:
+            counts[_sentiment(feedback)] -= 1
+        if not ids:
+            self._buckets.pop(bucket, None)
+            self._bucket_sentiments.pop(bucket, None)
+
+        user_ids = self._by_user.get(feedback.user_id)
+        if user_ids:
+            if user_ids[0] == feedback_id:
+                user_ids.popleft()
+            else:
+                user_ids.remove(feedback_id)
+            if not user_ids:
+                del self._by_user[feedback.user_id]
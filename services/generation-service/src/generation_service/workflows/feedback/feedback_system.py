@@ -2,7 +2,8 @@
 Feedback Loop System - Learns from user preferences and improves quality
 """
 
-from dataclasses import dataclass
+import time
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Optional
@@ -60,6 +61,8 @@ except (ImportError, RuntimeError):
 
 from generation_service.workflows.quality import QualityDimension
 
+from .feedback_store import FeedbackStore
+
 
 class FeedbackType(str, Enum):
     """Types of user feedback"""
@@ -108,6 +111,50 @@ class UserPreferenceProfile:
     last_updated: datetime
     confidence_score: float  # How confident we are in these preferences
     total_feedback_count: int
+    # Time-decayed [score sum, weight] per dimension, as of stats_updated_at
+    preference_stats: dict[str, list[float]] = field(default_factory=dict)
+    effective_feedback_count: float = 0.0
+    stats_updated_at: float = 0.0
+
+
+def _feedback_to_dict(feedback: UserFeedback) -> dict[str, Any]:
+    data = asdict(feedback)
+    data["timestamp"] = feedback.timestamp.isoformat()
+    return data
+
+
+def _feedback_from_dict(data: dict[str, Any]) -> UserFeedback:
+    return UserFeedback(
+        **{
+            **data,
+            "feedback_type": FeedbackType(data["feedback_type"]),
+            "sentiment": FeedbackSentiment(data["sentiment"]),
+            "timestamp": datetime.fromisoformat(data["timestamp"]),
+        }
+    )
+
+
+def _profile_to_dict(profile: UserPreferenceProfile) -> dict[str, Any]:
+    data = asdict(profile)
+    data["quality_preferences"] = {
+        dimension.value: weight
+        for dimension, weight in profile.quality_preferences.items()
+    }
+    data["last_updated"] = profile.last_updated.isoformat()
+    return data
+
+
+def _profile_from_dict(data: dict[str, Any]) -> UserPreferenceProfile:
+    return UserPreferenceProfile(
+        **{
+            **data,
+            "quality_preferences": {
+                QualityDimension(name): weight
+                for name, weight in data["quality_preferences"].items()
+            },
+            "last_updated": datetime.fromisoformat(data["last_updated"]),
+        }
+    )
 
 
 class FeedbackLearningEngine:
@@ -125,15 +172,20 @@ class FeedbackLearningEngine:
     def __init__(self, config: Optional[dict[str, Any]] = None) -> None:
         self.config = config or {}
 
-        # Storage for feedback and preferences
-        self.feedback_storage: dict[str, UserFeedback] = {}
+        # Bounded, indexed storage for feedback; preferences are aggregated
+        # incrementally so no update has to revisit older feedback
+        self.feedback_storage = FeedbackStore(
+            max_items=self.config.get("max_feedback_items", 10000),
+            db_path=self.config.get("db_path"),
+        )
         self.user_profiles: dict[str, UserPreferenceProfile] = {}
+        self._load_persisted()
 
         # Learning parameters
-        self.learning_rate = self.config.get("learning_rate", 0.1)
-        self.preference_decay = self.config.get(
-            "preference_decay", 0.95
-        )  # How much to decay old preferences
+        self.preference_half_life = timedelta(
+            days=self.config.get("preference_half_life_days", 30.0)
+        ).total_seconds()  # Age at which feedback counts half as much
+        self.max_profile_history = self.config.get("max_profile_history", 100)
         self.minimum_feedback_count = self.config.get("minimum_feedback_count", 5)
 
         # Feedback aggregation windows
@@ -145,7 +197,7 @@ class FeedbackLearningEngine:
             logger.info(
                 "FeedbackLearningEngine initialized",
                 extra={
-                    "learning_rate": self.learning_rate,
+                    "preference_half_life": self.preference_half_life,
                     "minimum_feedback": self.minimum_feedback_count,
                 },
             )
@@ -154,12 +206,18 @@ class FeedbackLearningEngine:
         """Record user feedback and trigger learning"""
 
         # Store feedback
-        self.feedback_storage[feedback.feedback_id] = feedback
+        self.feedback_storage.add(feedback)
 
         # Update user profile if user_id available
         if feedback.user_id:
             await self._update_user_profile(feedback)
 
+        profile = self.user_profiles.get(feedback.user_id or "")
+        await self.feedback_storage.persist(
+            _feedback_to_dict(feedback),
+            _profile_to_dict(profile) if profile else None,
+        )
+
         # Log feedback for monitoring
         if CORE_AVAILABLE:
             logger.info(
@@ -239,15 +297,8 @@ class FeedbackLearningEngine:
         if user_id not in self.user_profiles:
             return None
 
-        profile = self.user_profiles[user_id]
-
-        # Check if profile needs updating
-        days_since_update = (
-            (utc_now() - profile.last_updated).days if CORE_AVAILABLE else 0
-        )
-
-        if days_since_update > 30:  # Refresh if older than 30 days
-            await self._refresh_user_profile(user_id)
+        # Age the aggregates to now; this only touches the profile itself
+        await self._refresh_user_profile(user_id)
 
         return self.user_profiles.get(user_id)
 
@@ -386,85 +437,71 @@ class FeedbackLearningEngine:
 
         # Update feedback history
         profile.feedback_history.append(feedback.feedback_id)
+        del profile.feedback_history[: -self.max_profile_history]
         profile.total_feedback_count += 1
         profile.last_updated = utc_now() if CORE_AVAILABLE else datetime.now()
 
-        # Update quality preferences if quality scores provided
+        # Fold the feedback into the decayed aggregates in O(dimensions)
+        observed_at = feedback.timestamp.timestamp()
+        self._decay_profile(profile, observed_at)
+        weight = self._decay_factor(profile.stats_updated_at - observed_at)
+        profile.effective_feedback_count += weight
+
         if feedback.quality_scores:
             for dimension_name, score in feedback.quality_scores.items():
                 try:
                     dimension = QualityDimension(dimension_name)
-                    current_pref = profile.quality_preferences.get(dimension, 0.5)
-
-                    # Update preference using learning rate
-                    normalized_score = score  # Assume score is already 0-1
-                    updated_pref = current_pref + (
-                        self.learning_rate * (normalized_score - current_pref)
-                    )
-                    profile.quality_preferences[dimension] = max(
-                        0.0, min(1.0, updated_pref)
-                    )
-
                 except ValueError:
                     logger.warning(f"Unknown quality dimension: {dimension_name}")
+                    continue
 
-        # Update confidence score based on feedback count
-        profile.confidence_score = min(
-            profile.total_feedback_count
-            / 10.0,  # Full confidence at 10+ feedback items
-            1.0,
-        )
+                stats = profile.preference_stats.setdefault(dimension.value, [0.0, 0.0])
+                stats[0] += weight * score  # Assume score is already 0-1
+                stats[1] += weight
+                profile.quality_preferences[dimension] = max(
+                    0.0, min(1.0, stats[0] / stats[1])
+                )
 
-        # Apply preference decay to older preferences
-        if profile.total_feedback_count > 5:
-            for dimension in profile.quality_preferences:
-                profile.quality_preferences[dimension] *= self.preference_decay
+        # Full confidence at 10+ recent feedback items
+        profile.confidence_score = min(profile.effective_feedback_count / 10.0, 1.0)
 
     async def _refresh_user_profile(self, user_id: str) -> None:
-        """Refresh user profile based on recent feedback"""
+        """Age a user profile's aggregates to the current time"""
 
         if user_id not in self.user_profiles:
             return
 
         profile = self.user_profiles[user_id]
 
-        # Get recent feedback for this user
-        recent_feedback = [
-            feedback
-            for feedback in self.feedback_storage.values()
-            if (
-                feedback.user_id == user_id
-                and (utc_now() - feedback.timestamp).days <= 90
-            )
-        ]
+        # Decaying every sum and weight alike keeps the preferences; only the
+        # effective amount of recent feedback, and so the confidence, shrinks
+        self._decay_profile(profile, time.time())
+        profile.confidence_score = min(profile.effective_feedback_count / 10.0, 1.0)
 
-        if not recent_feedback:
+    def _decay_factor(self, age_seconds: float) -> float:
+        return 0.5 ** (max(age_seconds, 0.0) / self.preference_half_life)
+
+    def _decay_profile(self, profile: UserPreferenceProfile, now: float) -> None:
+        """Decay a profile's aggregates forward to ``now``"""
+
+        if now <= profile.stats_updated_at:
             return
 
-        # Recalculate preferences from recent feedback
-        quality_sum = dict.fromkeys(QualityDimension, 0.0)
-        quality_count = dict.fromkeys(QualityDimension, 0)
+        factor = self._decay_factor(now - profile.stats_updated_at)
+        profile.effective_feedback_count *= factor
+        for stats in profile.preference_stats.values():
+            stats[0] *= factor
+            stats[1] *= factor
+        profile.stats_updated_at = now
 
-        for feedback in recent_feedback:
-            if feedback.quality_scores:
-                for dimension_name, score in feedback.quality_scores.items():
-                    try:
-                        dimension = QualityDimension(dimension_name)
-                        quality_sum[dimension] += score
-                        quality_count[dimension] += 1
-                    except ValueError:
-                        continue
-
-        # Update preferences with averages
-        for dimension in QualityDimension:
-            if quality_count[dimension] > 0:
-                profile.quality_preferences[dimension] = (
-                    quality_sum[dimension] / quality_count[dimension]
-                )
+    def _load_persisted(self) -> None:
+        """Restore stored feedback and profiles without replaying history"""
 
-        # Update confidence
-        profile.confidence_score = min(len(recent_feedback) / 10.0, 1.0)
-        profile.last_updated = utc_now() if CORE_AVAILABLE else datetime.now()
+        feedback_items, profiles = self.feedback_storage.load()
+        for data in feedback_items:
+            self.feedback_storage.add(_feedback_from_dict(data))
+        for user_id, data in profiles.items():
+            self.user_profiles[user_id] = _profile_from_dict(data)
 
     def _determine_sentiment(self, score: float) -> FeedbackSentiment:
         """Determine sentiment from numeric score"""
@@ -528,13 +565,7 @@ class FeedbackLearningEngine:
     def _get_recent_feedback(self, window: timedelta) -> list[UserFeedback]:
         """Get feedback within specified time window"""
 
-        cutoff_time = (utc_now() if CORE_AVAILABLE else datetime.now()) - window
-
-        return [
-            feedback
-            for feedback in self.feedback_storage.values()
-            if feedback.timestamp >= cutoff_time
-        ]
+        return self.feedback_storage.recent(window.total_seconds())
 
     def _analyze_common_feedback_patterns(
         self, feedback_list: list[UserFeedback]
@@ -577,18 +608,19 @@ class FeedbackLearningEngine:
         if total_feedback == 0:
             return {"total_feedback": 0}
 
-        # Calculate statistics
-        recent_feedback = self._get_recent_feedback(self.short_term_window)
+        # Calculate statistics from the per-bucket counters
+        recent_counts = self.feedback_storage.sentiment_counts(
+            self.short_term_window.total_seconds()
+        )
 
         sentiment_counts = {}
         for sentiment in FeedbackSentiment:
-            sentiment_counts[sentiment.value] = len(
-                [f for f in recent_feedback if f.sentiment == sentiment]
-            )
+            sentiment_counts[sentiment.value] = recent_counts.get(sentiment.value, 0)
 
         return {
             "total_feedback": total_feedback,
-            "recent_feedback": len(recent_feedback),
+            "total_recorded": self.feedback_storage.total_recorded,
+            "recent_feedback": sum(recent_counts.values()),
             "user_profiles": len(self.user_profiles),
             "sentiment_distribution": sentiment_counts,
             "average_confidence": (
@@ -598,3 +630,24 @@ class FeedbackLearningEngine:
                 else 0.0
             ),
         }
+
+
+# Global engine instance
+_feedback_engine: Optional[FeedbackLearningEngine] = None
+
+
+def get_feedback_learning_engine() -> FeedbackLearningEngine:
+    """Get the shared feedback learning engine configured from settings"""
+    global _feedback_engine
+
+    if _feedback_engine is None:
+        try:
+            from generation_service.config.settings import get_settings
+
+            config = get_settings().get_feedback_config()
+        except Exception as e:
+            logger.warning(f"Feedback settings unavailable: {e}")
+            config = {}
+        _feedback_engine = FeedbackLearningEngine(config)
+
+    return _feedback_engine
@@ -2,6 +2,8 @@
 Main LangGraph workflow for script generation
 """
 
+from collections.abc import Awaitable, Callable
+from datetime import datetime
 from typing import Any, Optional
 
 # Import Core Module components
@@ -57,7 +59,6 @@ except (ImportError, RuntimeError):
 
 # LangGraph imports
 try:
-    from langgraph.checkpoint.memory import MemorySaver
     from langgraph.graph import END, StateGraph
 
     LANGGRAPH_AVAILABLE = True
@@ -66,13 +67,16 @@ except ImportError:
     logger.warning("LangGraph not available - workflow functionality will be limited")
 
 from generation_service.models.generation import GenerationRequest, GenerationResponse
+from generation_service.workflows.checkpoint_store import CheckpointStore
 from generation_service.workflows.edges import route_after_stylist
 from generation_service.workflows.nodes import (
     ArchitectNode,
     SpecialAgentRouter,
     StylistNode,
 )
+from generation_service.workflows.pipelining import ScenePipeline, use_pipeline
 from generation_service.workflows.state import (
+    AppendLog,
     GenerationState,
     create_initial_state,
     finalize_state,
@@ -91,11 +95,24 @@ class GenerationWorkflow:
     """
 
     def __init__(
-        self, provider_factory: Any, rag_service: Optional[Any] = None
+        self,
+        provider_factory: Any,
+        rag_service: Optional[Any] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        pipeline_config: Optional[dict[str, Any]] = None,
     ) -> None:
         self.provider_factory = provider_factory
         self.rag_service = rag_service
 
+        # Optional architect/stylist overlap over the architect's stream
+        self.pipeline_config = pipeline_config or {}
+        self._pipelines: dict[str, ScenePipeline] = {}
+
+        # Node-boundary checkpoints on disk; None disables persistence
+        self.checkpoint_store = checkpoint_store
+        self._running: set[str] = set()
+        self._resume_completed: dict[str, set[str]] = {}
+
         # Initialize workflow components
         self.architect_node = ArchitectNode(provider_factory, rag_service)
         self.stylist_node = StylistNode(provider_factory)
@@ -154,11 +171,9 @@ class GenerationWorkflow:
             # End at finalization
             workflow.add_edge("finalization", END)
 
-            # Add memory saver for checkpoints
-            memory = MemorySaver()
-
-            # Compile the workflow
-            self.app = workflow.compile(checkpointer=memory)
+            # Compile the workflow; state is persisted per node by the
+            # checkpoint store instead of an in-memory LangGraph saver
+            self.app = workflow.compile()
             self.workflow = workflow
 
             if CORE_AVAILABLE:
@@ -172,7 +187,7 @@ class GenerationWorkflow:
                             "finalization",
                         ],
                         "entry_point": "architect",
-                        "checkpointer": "memory",
+                        "checkpointer": "sqlite" if self.checkpoint_store else "none",
                     },
                 )
 
@@ -183,15 +198,77 @@ class GenerationWorkflow:
 
     async def _architect_wrapper(self, state: GenerationState) -> GenerationState:
         """Wrapper for architect node execution"""
-        return await self.architect_node.execute(state)
+        pipeline = None
+        if self.pipeline_config.get("enabled", False):
+            pipeline = self._start_pipeline(state)
+
+        with use_pipeline(pipeline):
+            return await self._run_checkpointed(
+                "architect", state, self.architect_node.execute
+            )
 
     async def _stylist_wrapper(self, state: GenerationState) -> GenerationState:
         """Wrapper for stylist node execution"""
-        return await self.stylist_node.execute(state)
+        # Join the outlines styled during the architect's stream; a pipeline
+        # whose upstream never finished (failed or restored architect) is
+        # dropped and the stylist runs on the complete structure instead
+        pipeline = self._pipelines.pop(state["generation_id"], None)
+        if pipeline is not None and pipeline.upstream_finished is None:
+            pipeline.cancel()
+            pipeline = None
+
+        with use_pipeline(pipeline):
+            return await self._run_checkpointed(
+                "stylist", state, self.stylist_node.execute
+            )
+
+    def _start_pipeline(self, state: GenerationState) -> ScenePipeline:
+        async def style(outline: str, preamble: str) -> dict:
+            return await self.stylist_node.style_outline(state, outline, preamble)
+
+        pipeline = ScenePipeline(
+            style,
+            max_concurrency=self.pipeline_config.get("max_concurrency", 3),
+            min_outline_chars=self.pipeline_config.get("min_outline_chars", 200),
+        )
+        self._pipelines[state["generation_id"]] = pipeline
+        return pipeline
 
     async def _special_agent_wrapper(self, state: GenerationState) -> GenerationState:
         """Wrapper for special agent router execution"""
-        return await self.special_agent_router.execute_special_agent(state)
+        return await self._run_checkpointed(
+            "special_agent", state, self.special_agent_router.execute_special_agent
+        )
+
+    async def _run_checkpointed(
+        self,
+        node: str,
+        state: GenerationState,
+        runner: Callable[[GenerationState], Awaitable[GenerationState]],
+    ) -> GenerationState:
+        """Run a node unless a resumed generation already completed it"""
+
+        generation_id = state["generation_id"]
+        if node in self._resume_completed.get(generation_id, ()):
+            logger.info(
+                f"Skipping {node} for {generation_id}: restored from checkpoint"
+            )
+            return state
+
+        executed_before = len(state["generation_metadata"]["nodes_executed"])
+        state = await runner(state)
+
+        # Only successful nodes are checkpointed, failed ones rerun on resume
+        succeeded = (
+            len(state["generation_metadata"]["nodes_executed"]) > executed_before
+        )
+        if self.checkpoint_store is not None and succeeded:
+            try:
+                await self.checkpoint_store.save(generation_id, node, state)
+            except Exception as e:
+                logger.warning(f"Failed to checkpoint {node} for {generation_id}: {e}")
+
+        return state
 
     async def _finalization_wrapper(self, state: GenerationState) -> GenerationState:
         """Wrapper for finalization process"""
@@ -285,10 +362,7 @@ class GenerationWorkflow:
                 )
 
             # Execute workflow
-            if self.app and LANGGRAPH_AVAILABLE:
-                final_state = await self._execute_langgraph_workflow(initial_state)
-            else:
-                final_state = await self._execute_fallback_workflow(initial_state)
+            final_state = await self._run_state(initial_state)
 
             # Create response
             response = self._create_response(final_state, start_time)
@@ -320,15 +394,82 @@ class GenerationWorkflow:
                 request, generation_id or "unknown", str(e), start_time
             )
 
+    async def resume(self, generation_id: str) -> Optional[GenerationResponse]:
+        """
+        Resume an interrupted generation from its last checkpointed node
+
+        Returns None when no checkpoint exists for the generation. Raises
+        ValueError if the generation is still running in this process.
+        """
+
+        if self.checkpoint_store is None:
+            return None
+        if generation_id in self._running:
+            raise ValueError(f"Generation {generation_id} is still running")
+
+        loaded = await self.checkpoint_store.load(generation_id)
+        if loaded is None:
+            return None
+        state, completed_nodes = loaded
+
+        start_time = utc_now() if CORE_AVAILABLE else datetime.now()
+        logger.info(
+            f"Resuming generation {generation_id} after nodes {completed_nodes}"
+        )
+
+        # Errors of the interrupted attempt do not carry over
+        state["has_errors"] = False
+        state["error_messages"] = AppendLog()
+
+        self._resume_completed[generation_id] = set(completed_nodes)
+        try:
+            final_state = await self._run_state(state)
+        finally:
+            self._resume_completed.pop(generation_id, None)
+
+        return self._create_response(final_state, start_time)
+
+    async def list_resumable(self) -> list[dict[str, Any]]:
+        """Checkpointed generations that can be resumed"""
+
+        if self.checkpoint_store is None:
+            return []
+        resumable = await self.checkpoint_store.list_resumable()
+        return [
+            item for item in resumable if item["generation_id"] not in self._running
+        ]
+
+    async def _run_state(self, state: GenerationState) -> GenerationState:
+        """Run the graph on a state and record the outcome in the checkpoint store"""
+
+        generation_id = state["generation_id"]
+        self._running.add(generation_id)
+        try:
+            if self.app and LANGGRAPH_AVAILABLE:
+                final_state = await self._execute_langgraph_workflow(state)
+            else:
+                final_state = await self._execute_fallback_workflow(state)
+
+            if self.checkpoint_store is not None:
+                await self.checkpoint_store.mark_finished(
+                    generation_id, succeeded=not final_state["has_errors"]
+                )
+            return final_state
+        finally:
+            self._running.discard(generation_id)
+            pipeline = self._pipelines.pop(generation_id, None)
+            if pipeline is not None:
+                pipeline.cancel()
+            if self.checkpoint_store is not None:
+                self.checkpoint_store.release(generation_id)
+
     async def _execute_langgraph_workflow(
         self, initial_state: GenerationState
     ) -> GenerationState:
         """Execute workflow using LangGraph"""
 
-        config = {"configurable": {"thread_id": initial_state["generation_id"]}}
-
         # Execute the workflow
-        result = await self.app.ainvoke(initial_state, config=config)
+        result = await self.app.ainvoke(initial_state)
 
         return result
 
@@ -341,17 +482,17 @@ class GenerationWorkflow:
 
         try:
             # Execute architect
-            state = await self.architect_node.execute(state)
+            state = await self._architect_wrapper(state)
 
             # Execute stylist
-            state = await self.stylist_node.execute(state)
+            state = await self._stylist_wrapper(state)
 
             # Check if special agent is needed
             routing_decision = route_after_stylist(state)
 
             if routing_decision == "special_agent":
                 # Execute special agent
-                state = await self.special_agent_router.execute_special_agent(state)
+                state = await self._special_agent_wrapper(state)
 
             # Finalize
             finalize_state(state)
@@ -425,7 +566,7 @@ class GenerationWorkflow:
             "model_usage": metadata["model_usage"],
             "rag_context_used": metadata["rag_context_used"],
             "specialized_prompts_used": metadata["specialized_prompts_used"],
-            "execution_log": final_state["execution_log"],
+            "execution_log": list(final_state["execution_log"]),
             "langgraph_used": self.app is not None,
         }
 
@@ -491,4 +632,5 @@ class GenerationWorkflow:
             },
             "rag_service_available": self.rag_service is not None,
             "core_module_available": CORE_AVAILABLE,
+            "checkpointing_enabled": self.checkpoint_store is not None,
         }
@@ -57,8 +57,17 @@ from typing import Any, Optional
 
 from generation_service.ai.prompts import ArchitectPrompts, PromptContext, ScriptType
 from generation_service.ai.providers.base_provider import ProviderGenerationRequest
+from generation_service.workflows.agents.scene_patches import estimate_tokens
 from generation_service.workflows.nodes.base_node import PromptNode
-from generation_service.workflows.state import GenerationState, add_token_usage
+from generation_service.workflows.pipelining import (
+    active_pipeline,
+    generate_into_pipeline,
+)
+from generation_service.workflows.state import (
+    GenerationState,
+    add_token_usage,
+    fork_state,
+)
 
 
 class ArchitectNode(PromptNode):
@@ -196,6 +205,20 @@ class ArchitectNode(PromptNode):
             temperature=0.7,  # Balanced creativity for structure
         )
 
+        # In pipelined mode the stylist styles outlines as they stream in
+        pipeline = active_pipeline()
+        if pipeline is not None:
+            structure = await generate_into_pipeline(
+                self.provider, generation_request, pipeline
+            )
+            return {
+                "structure": structure,
+                "model_used": self.provider.get_model_info().name,
+                # Streams report no usage; estimate from the text
+                "tokens_used": estimate_tokens(structure),
+                "prompt_id": prompt_result.prompt_id,
+            }
+
         response = await self.provider.generate_with_retry(generation_request)
 
         return {
@@ -216,8 +239,8 @@ class ArchitectNode(PromptNode):
     ) -> GenerationState:
         """Update state with architect results"""
 
-        # Create a copy of the state to avoid mutation
-        updated_state = state.copy()
+        # Fork the state so the input state is left untouched
+        updated_state = fork_state(state)
 
         # Store structural foundation
         updated_state["draft_script"] = structure_result["structure"]
@@ -63,7 +63,11 @@ from generation_service.ai.prompts import (
 )
 from generation_service.ai.providers.base_provider import ProviderGenerationRequest
 from generation_service.workflows.nodes.base_node import PromptNode
-from generation_service.workflows.state import GenerationState, add_token_usage
+from generation_service.workflows.state import (
+    GenerationState,
+    add_token_usage,
+    fork_state,
+)
 
 
 class SpecialAgentNode(PromptNode):
@@ -244,8 +248,8 @@ class SpecialAgentNode(PromptNode):
     ) -> GenerationState:
         """Update state with special agent results"""
 
-        # Create a copy of the state to avoid mutation
-        updated_state = state.copy()
+        # Fork the state so the input state is left untouched
+        updated_state = fork_state(state)
 
         # Store enhanced script
         updated_state["enhanced_script"] = enhancement_result["enhanced_script"]
@@ -58,7 +58,12 @@ from typing import Any, Optional
 from generation_service.ai.prompts import PromptContext, ScriptType, StylistPrompts
 from generation_service.ai.providers.base_provider import ProviderGenerationRequest
 from generation_service.workflows.nodes.base_node import PromptNode
-from generation_service.workflows.state import GenerationState, add_token_usage
+from generation_service.workflows.pipelining import ScenePipeline, active_pipeline
+from generation_service.workflows.state import (
+    GenerationState,
+    add_token_usage,
+    fork_state,
+)
 
 
 class StylistNode(PromptNode):
@@ -83,6 +88,14 @@ class StylistNode(PromptNode):
     async def _execute_node_logic(self, state: GenerationState) -> GenerationState:
         """Execute stylist-specific logic"""
 
+        # In pipelined mode the outlines were styled while the architect ran
+        pipeline = active_pipeline()
+        if pipeline is not None:
+            style_result = await self._join_pipeline(pipeline)
+            updated_state = self._update_state_with_results(state, style_result, None)
+            updated_state["style_metadata"]["pipeline"] = pipeline.get_stats()
+            return updated_state
+
         # Initialize provider (Llama)
         await self._initialize_provider(self.provider_factory)
 
@@ -102,6 +115,35 @@ class StylistNode(PromptNode):
 
         return updated_state
 
+    async def style_outline(
+        self, state: GenerationState, outline: str, preamble: str = ""
+    ) -> dict:
+        """Style one act or scene outline; the pipelined mode's stage"""
+
+        await self._initialize_provider(self.provider_factory)
+
+        prompt_context = self._create_prompt_context(state)
+        prompt_context.additional_context["architect_structure"] = (
+            f"{preamble}\n\n{outline}".strip()
+        )
+        prompt_result = self.prompt_template.generate_prompt(prompt_context)
+
+        return await self._apply_style(prompt_result)
+
+    async def _join_pipeline(self, pipeline: ScenePipeline) -> dict:
+        """Stitch the styled outlines back together in order"""
+
+        results = await pipeline.collect()
+        if not results:
+            raise ValueError("Pipelined architect produced no outlines to style")
+
+        return {
+            "styled_script": "\n\n".join(r["styled_script"] for r in results),
+            "model_used": results[0]["model_used"],
+            "tokens_used": sum(r["tokens_used"] for r in results),
+            "prompt_id": results[0]["prompt_id"],
+        }
+
     def _create_prompt_context(self, state: GenerationState) -> PromptContext:
         """Create prompt context for stylist with architect structure"""
 
@@ -173,8 +215,8 @@ class StylistNode(PromptNode):
     ) -> GenerationState:
         """Update state with stylist results"""
 
-        # Create a copy of the state to avoid mutation
-        updated_state = state.copy()
+        # Fork the state so the input state is left untouched
+        updated_state = fork_state(state)
 
         # Store styled script
         updated_state["styled_script"] = style_result["styled_script"]
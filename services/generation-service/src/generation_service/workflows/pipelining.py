@@ -0,0 +1,203 @@
+"""
+Pipelined architect/stylist hand-off over the architect's streamed output
+"""
+
+import asyncio
+import contextlib
+import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextvars import ContextVar
+from typing import Any, Optional
+
+try:
+    from ai_script_core import get_service_logger
+
+    logger = get_service_logger("generation-service.pipelining")
+except (ImportError, RuntimeError):
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+
+# Lines that open a new act or scene in an architect outline, optionally
+# behind markdown markers or numbering ("## Act 2", "**Scene 3:**", "INT. ...")
+OUTLINE_HEADING = re.compile(
+    r"^[ \t]*(?:[#*>\-]+[ \t]*|\d+[.)][ \t]*)?"
+    r"(?:(?:act|scene)[ \t]*(?:\d+|[ivx]+)\b|EXT\.|INT\.|\d+[ \t]*(?:막|장|씬))",
+    re.IGNORECASE,
+)
+
+Stage = Callable[[str, str], Awaitable[Any]]
+
+
+class OutlineSplitter:
+    """
+    Incrementally split streamed text into act/scene outlines
+
+    An outline is complete once the heading of the next one has arrived.
+    Text before the first heading is kept as the preamble, and outlines
+    shorter than ``min_chars`` (a bare act title, say) are merged into the
+    one that follows.
+    """
+
+    def __init__(self, min_chars: int = 200) -> None:
+        self.min_chars = min_chars
+        self.preamble = ""
+        self._pending = ""
+        self._current: list[str] = []
+        self._seen_heading = False
+
+    def feed(self, chunk: str) -> list[str]:
+        """Add streamed text, returning outlines it completed"""
+        self._pending += chunk
+        *lines, self._pending = self._pending.split("\n")
+        completed = []
+        for line in lines:
+            completed.extend(self._add_line(line))
+        return completed
+
+    def close(self) -> list[str]:
+        """Flush the remaining text as the final outline"""
+        completed = list(self._add_line(self._pending)) if self._pending else []
+        self._pending = ""
+        # Without any heading the whole text is a single outline
+        completed.append("\n".join(self._current).strip())
+        self._current = []
+        return [outline for outline in completed if outline]
+
+    def _add_line(self, line: str) -> Iterator[str]:
+        if OUTLINE_HEADING.match(line):
+            if not self._seen_heading:
+                self._seen_heading = True
+                self.preamble = "\n".join(self._current).strip()
+                self._current = []
+            elif len("\n".join(self._current).strip()) >= self.min_chars:
+                yield "\n".join(self._current).strip()
+                self._current = []
+        self._current.append(line)
+
+
+class ScenePipeline:
+    """
+    Run a downstream stage on each outline as soon as the upstream emits it
+
+    The stage receives the outline and the preamble (premise, characters)
+    that preceded the first heading. At most ``max_concurrency`` stage calls
+    run at once; results are returned in outline order.
+    """
+
+    def __init__(
+        self, stage: Stage, max_concurrency: int = 3, min_outline_chars: int = 200
+    ) -> None:
+        self.stage = stage
+        self.splitter = OutlineSplitter(min_outline_chars)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: list[asyncio.Task] = []
+        self._text: list[str] = []
+        self._started = time.monotonic()
+        self.first_handoff: Optional[float] = None
+        self.upstream_finished: Optional[float] = None
+        self.downstream_finished: Optional[float] = None
+
+    @property
+    def text(self) -> str:
+        """Everything the upstream produced so far"""
+        return "".join(self._text)
+
+    def feed(self, chunk: str) -> None:
+        self._text.append(chunk)
+        for outline in self.splitter.feed(chunk):
+            self._submit(outline)
+
+    def close(self) -> None:
+        for outline in self.splitter.close():
+            self._submit(outline)
+        self.upstream_finished = time.monotonic() - self._started
+
+    async def consume(self, chunks: AsyncIterator[str]) -> str:
+        """Feed a whole upstream stream and return its full text"""
+        async for chunk in chunks:
+            self.feed(chunk)
+        self.close()
+        return self.text
+
+    async def collect(self) -> list[Any]:
+        """Wait for every stage call, in outline order"""
+        try:
+            results = await asyncio.gather(*self._tasks)
+        except BaseException:
+            self.cancel()
+            raise
+        self.downstream_finished = time.monotonic() - self._started
+        return list(results)
+
+    def cancel(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Timings in seconds since the pipeline started"""
+        return {
+            "outlines": len(self._tasks),
+            "first_handoff": self.first_handoff,
+            "upstream_finished": self.upstream_finished,
+            "downstream_finished": self.downstream_finished,
+            "overlap": (
+                self.upstream_finished - self.first_handoff
+                if self.upstream_finished is not None and self.first_handoff is not None
+                else 0.0
+            ),
+        }
+
+    def _submit(self, outline: str) -> None:
+        if self.first_handoff is None:
+            self.first_handoff = time.monotonic() - self._started
+        self._tasks.append(asyncio.create_task(self._run_stage(outline)))
+
+    async def _run_stage(self, outline: str) -> Any:
+        async with self._semaphore:
+            return await self.stage(outline, self.splitter.preamble)
+
+
+_active_pipeline: ContextVar[Optional[ScenePipeline]] = ContextVar(
+    "active_scene_pipeline", default=None
+)
+
+
+def active_pipeline() -> Optional[ScenePipeline]:
+    """Pipeline the current generation step should feed or join, if any"""
+    return _active_pipeline.get()
+
+
+@contextlib.contextmanager
+def use_pipeline(pipeline: Optional[ScenePipeline]) -> Iterator[None]:
+    token = _active_pipeline.set(pipeline)
+    try:
+        yield
+    finally:
+        _active_pipeline.reset(token)
+
+
+async def generate_into_pipeline(
+    provider: Any, request: Any, pipeline: ScenePipeline
+) -> str:
+    """
+    Stream a provider generation into the pipeline
+
+    Falls back to a single non-streaming call when the provider cannot
+    stream; the pipeline then receives the whole text at once.
+    """
+    try:
+        return await pipeline.consume(provider.generate_stream(request))
+    except NotImplementedError:
+        pass
+    except Exception as e:
+        if pipeline.text:
+            raise
+        logger.warning(f"Streaming unavailable, generating in one call: {e}")
+
+    response = await provider.generate_with_retry(request)
+    pipeline.feed(response.content)
+    pipeline.close()
+    return response.content
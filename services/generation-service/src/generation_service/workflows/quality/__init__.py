@@ -8,5 +8,20 @@ from .quality_assessor import (
     QualityDimension,
     QualityScore,
 )
+from .script_features import (
+    DialogueBlock,
+    SceneHeader,
+    ScriptFeatures,
+    extract_script_features,
+)
 
-__all__ = ["QualityAssessment", "QualityAssessor", "QualityDimension", "QualityScore"]
+__all__ = [
+    "DialogueBlock",
+    "QualityAssessment",
+    "QualityAssessor",
+    "QualityDimension",
+    "QualityScore",
+    "SceneHeader",
+    "ScriptFeatures",
+    "extract_script_features",
+]
@@ -2,12 +2,15 @@
 Quality Assessment System - Multi-dimensional quality scoring and analysis
 """
 
-import re
+import difflib
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import Any, Optional
 
+from .script_features import ScriptFeatures, extract_script_features
+
 # Import Core Module components
 try:
     from ai_script_core import (
@@ -141,8 +144,15 @@ class QualityAssessor:
             },
         )
 
-        # Historical assessments for learning
-        self.assessment_history = []
+        # Recent assessments for learning, bounded to the latest ones
+        self.assessment_history: deque[QualityAssessment] = deque(
+            maxlen=self.config.get("history_size", 200)
+        )
+        self.total_assessments = 0
+
+        # Assessments of recently seen scripts keyed by content digest
+        self.cache_size = self.config.get("assessment_cache_size", 64)
+        self._assessment_cache: OrderedDict[str, QualityAssessment] = OrderedDict()
 
         if CORE_AVAILABLE:
             logger.info(
@@ -163,14 +173,22 @@ class QualityAssessor:
         if not content or not content.strip():
             return self._create_empty_assessment()
 
-        # Analyze content structure and characteristics
-        content_analysis = self._analyze_content_structure(content)
+        # Parse the script once; every dimension reads from the same features
+        features = extract_script_features(content)
+
+        cached = self._assessment_cache.get(features.digest)
+        if cached is not None:
+            self._assessment_cache.move_to_end(features.digest)
+            self._record_assessment(cached)
+            return cached
+
+        content_analysis = self._analyze_content_structure(features)
 
         # Assess each quality dimension
         dimension_scores = {}
         for dimension in QualityDimension:
             score = await self._assess_dimension(
-                dimension, content, content_analysis, generation_metadata
+                dimension, features, content_analysis, generation_metadata
             )
             dimension_scores[dimension] = score
 
@@ -202,11 +220,19 @@ class QualityAssessor:
             timestamp=utc_now() if CORE_AVAILABLE else datetime.now(),
         )
 
+        self._assessment_cache[features.digest] = assessment
+        while len(self._assessment_cache) > self.cache_size:
+            self._assessment_cache.popitem(last=False)
+
         # Store for learning
-        self.assessment_history.append(assessment)
+        self._record_assessment(assessment)
 
         return assessment
 
+    def _record_assessment(self, assessment: QualityAssessment) -> None:
+        self.assessment_history.append(assessment)
+        self.total_assessments += 1
+
     async def compare_assessments(
         self,
         original_content: str,
@@ -215,6 +241,9 @@ class QualityAssessor:
     ) -> dict[str, Any]:
         """
         Compare quality assessments between original and enhanced content
+
+        Scenes the two versions share are parsed once and reused, so only the
+        changed scenes contribute new work before the aggregates are rescored.
         """
 
         original_assessment = await self.assess_quality(
@@ -232,6 +261,10 @@ class QualityAssessor:
             "dimension_improvements": {},
             "improvement_summary": [],
             "regression_warnings": [],
+            "scene_changes": self._diff_scenes(
+                extract_script_features(original_content),
+                extract_script_features(enhanced_content),
+            ),
         }
 
         # Compare each dimension
@@ -261,36 +294,59 @@ class QualityAssessor:
 
         return comparison
 
+    def _diff_scenes(
+        self, original: ScriptFeatures, enhanced: ScriptFeatures
+    ) -> dict[str, Any]:
+        """Which scenes of the enhanced version differ from the original"""
+
+        matcher = difflib.SequenceMatcher(
+            a=[scene.digest for scene in original.scenes],
+            b=[scene.digest for scene in enhanced.scenes],
+            autojunk=False,
+        )
+        changed = [
+            index
+            for tag, _, _, start, end in matcher.get_opcodes()
+            if tag != "equal"
+            for index in range(start, end)
+        ]
+
+        return {
+            "total_scenes": len(enhanced.scenes),
+            "changed_scenes": changed,
+            "unchanged_scenes": len(enhanced.scenes) - len(changed),
+        }
+
     async def _assess_dimension(
         self,
         dimension: QualityDimension,
-        content: str,
+        features: ScriptFeatures,
         content_analysis: dict[str, Any],
         metadata: dict[str, Any] = None,
     ) -> QualityScore:
         """Assess a specific quality dimension"""
 
         if dimension == QualityDimension.PLOT_STRUCTURE:
-            return self._assess_plot_structure(content, content_analysis)
+            return self._assess_plot_structure(features, content_analysis)
         elif dimension == QualityDimension.CHARACTER_DEVELOPMENT:
-            return self._assess_character_development(content, content_analysis)
+            return self._assess_character_development(features, content_analysis)
         elif dimension == QualityDimension.DIALOGUE_QUALITY:
-            return self._assess_dialogue_quality(content, content_analysis)
+            return self._assess_dialogue_quality(features, content_analysis)
         elif dimension == QualityDimension.VISUAL_STORYTELLING:
-            return self._assess_visual_storytelling(content, content_analysis)
+            return self._assess_visual_storytelling(features, content_analysis)
         elif dimension == QualityDimension.EMOTIONAL_IMPACT:
-            return self._assess_emotional_impact(content, content_analysis)
+            return self._assess_emotional_impact(features, content_analysis)
         elif dimension == QualityDimension.PACING_AND_RHYTHM:
-            return self._assess_pacing_rhythm(content, content_analysis)
+            return self._assess_pacing_rhythm(features, content_analysis)
         elif dimension == QualityDimension.ORIGINALITY:
-            return self._assess_originality(content, content_analysis)
+            return self._assess_originality(features, content_analysis)
         elif dimension == QualityDimension.TECHNICAL_CRAFT:
-            return self._assess_technical_craft(content, content_analysis)
+            return self._assess_technical_craft(features, content_analysis)
         else:
             return QualityScore(dimension, 0.5, 0.5, {}, [], [])
 
     def _assess_plot_structure(
-        self, content: str, analysis: dict[str, Any]
+        self, features: ScriptFeatures, analysis: dict[str, Any]
     ) -> QualityScore:
         """Assess plot structure quality"""
 
@@ -320,9 +376,7 @@ class QualityAssessor:
 
         # Check for plot coherence
         coherence_indicators = ["because", "therefore", "as a result", "leads to"]
-        coherence_count = sum(
-            content.lower().count(indicator) for indicator in coherence_indicators
-        )
+        coherence_count = features.count_terms(coherence_indicators)
         coherence_score = min(coherence_count / 5.0, 1.0)
         factors.append(("plot_coherence", coherence_score, 0.3))
 
@@ -343,7 +397,7 @@ class QualityAssessor:
         )
 
     def _assess_character_development(
-        self, content: str, analysis: dict[str, Any]
+        self, features: ScriptFeatures, analysis: dict[str, Any]
     ) -> QualityScore:
         """Assess character development quality"""
 
@@ -361,9 +415,7 @@ class QualityAssessor:
 
         # Character depth indicators
         depth_indicators = ["feels", "thinks", "believes", "wants", "needs", "fears"]
-        depth_count = sum(
-            content.lower().count(indicator) for indicator in depth_indicators
-        )
+        depth_count = features.count_terms(depth_indicators)
         depth_score = min(depth_count / 8.0, 1.0)
         factors.append(("character_depth", depth_score, 0.4))
 
@@ -372,9 +424,7 @@ class QualityAssessor:
 
         # Character growth
         growth_indicators = ["learns", "changes", "realizes", "overcomes", "grows"]
-        growth_count = sum(
-            content.lower().count(indicator) for indicator in growth_indicators
-        )
+        growth_count = features.count_terms(growth_indicators)
         growth_score = min(growth_count / 3.0, 1.0)
         factors.append(("character_growth", growth_score, 0.3))
 
@@ -394,7 +444,7 @@ class QualityAssessor:
         )
 
     def _assess_dialogue_quality(
-        self, content: str, analysis: dict[str, Any]
+        self, features: ScriptFeatures, analysis: dict[str, Any]
     ) -> QualityScore:
         """Assess dialogue quality"""
 
@@ -412,9 +462,7 @@ class QualityAssessor:
 
         # Natural speech patterns
         natural_indicators = ["don't", "can't", "won't", "um", "well", "you know"]
-        natural_count = sum(
-            content.lower().count(indicator) for indicator in natural_indicators
-        )
+        natural_count = features.count_terms(natural_indicators)
         natural_score = min(natural_count / 10.0, 1.0)
         factors.append(("naturalness", natural_score, 0.3))
 
@@ -428,9 +476,7 @@ class QualityAssessor:
 
         # Dialogue purpose (not just exposition)
         exposition_indicators = ["as you know", "remember when", "let me explain"]
-        exposition_count = sum(
-            content.lower().count(indicator) for indicator in exposition_indicators
-        )
+        exposition_count = features.count_terms(exposition_indicators)
         purpose_score = max(0.0, 1.0 - exposition_count / 5.0)
         factors.append(("dialogue_purpose", purpose_score, 0.2))
 
@@ -450,7 +496,7 @@ class QualityAssessor:
         )
 
     def _assess_visual_storytelling(
-        self, content: str, analysis: dict[str, Any]
+        self, features: ScriptFeatures, analysis: dict[str, Any]
     ) -> QualityScore:
         """Assess visual storytelling quality"""
 
@@ -468,7 +514,7 @@ class QualityAssessor:
             "beautiful",
             "ugly",
         ]
-        visual_count = sum(content.lower().count(word) for word in visual_words)
+        visual_count = features.count_terms(visual_words)
         visual_score = min(visual_count / 15.0, 1.0)
         factors.append(("visual_density", visual_score, 0.4))
 
@@ -482,7 +528,7 @@ class QualityAssessor:
 
         # Cinematic potential
         cinematic_words = ["camera", "shot", "close-up", "wide", "angle"]
-        cinematic_count = sum(content.lower().count(word) for word in cinematic_words)
+        cinematic_count = features.count_terms(cinematic_words)
         cinematic_score = min(cinematic_count / 3.0, 1.0)
         factors.append(("cinematic_potential", cinematic_score, 0.3))
 
@@ -502,7 +548,7 @@ class QualityAssessor:
         )
 
     def _assess_emotional_impact(
-        self, content: str, analysis: dict[str, Any]
+        self, features: ScriptFeatures, analysis: dict[str, Any]
     ) -> QualityScore:
         """Assess emotional impact quality"""
 
@@ -521,7 +567,7 @@ class QualityAssessor:
             "hope",
             "despair",
         ]
-        emotion_count = sum(content.lower().count(word) for word in emotion_words)
+        emotion_count = features.count_terms(emotion_words)
         emotion_score = min(emotion_count / 10.0, 1.0)
         factors.append(("emotional_vocabulary", emotion_score, 0.4))
 
@@ -530,7 +576,7 @@ class QualityAssessor:
 
         # Emotional range
         unique_emotions = len(
-            [word for word in emotion_words if word in content.lower()]
+            [word for word in emotion_words if features.contains(word)]
         )
         range_score = unique_emotions / len(emotion_words)
         factors.append(("emotional_range", range_score, 0.3))
@@ -540,9 +586,7 @@ class QualityAssessor:
 
         # Stakes and consequences
         stakes_indicators = ["loses", "wins", "fails", "succeeds", "dies", "lives"]
-        stakes_count = sum(
-            content.lower().count(indicator) for indicator in stakes_indicators
-        )
+        stakes_count = features.count_terms(stakes_indicators)
         stakes_score = min(stakes_count / 5.0, 1.0)
         factors.append(("emotional_stakes", stakes_score, 0.3))
 
@@ -562,7 +606,7 @@ class QualityAssessor:
         )
 
     def _assess_pacing_rhythm(
-        self, content: str, analysis: dict[str, Any]
+        self, features: ScriptFeatures, analysis: dict[str, Any]
     ) -> QualityScore:
         """Assess pacing and rhythm quality"""
 
@@ -571,9 +615,8 @@ class QualityAssessor:
         evidence = []
 
         # Sentence length variety
-        sentences = [line.strip() for line in content.split("\n") if line.strip()]
-        if sentences:
-            lengths = [len(sentence.split()) for sentence in sentences]
+        lengths = features.line_word_counts
+        if lengths:
             avg_length = sum(lengths) / len(lengths)
             length_variety = len(set(lengths)) / len(lengths)
 
@@ -587,12 +630,8 @@ class QualityAssessor:
         fast_indicators = ["quickly", "suddenly", "immediately", "rushes"]
         slow_indicators = ["slowly", "gradually", "pauses", "thoughtfully"]
 
-        fast_count = sum(
-            content.lower().count(indicator) for indicator in fast_indicators
-        )
-        slow_count = sum(
-            content.lower().count(indicator) for indicator in slow_indicators
-        )
+        fast_count = features.count_terms(fast_indicators)
+        slow_count = features.count_terms(slow_indicators)
 
         pacing_balance = (
             1.0
@@ -603,7 +642,7 @@ class QualityAssessor:
 
         # Action density
         action_words = ["runs", "jumps", "fights", "moves", "acts"]
-        action_count = sum(content.lower().count(word) for word in action_words)
+        action_count = features.count_terms(action_words)
         action_score = min(action_count / 8.0, 1.0)
         factors.append(("action_density", action_score, 0.3))
 
@@ -623,7 +662,7 @@ class QualityAssessor:
         )
 
     def _assess_originality(
-        self, content: str, analysis: dict[str, Any]
+        self, features: ScriptFeatures, analysis: dict[str, Any]
     ) -> QualityScore:
         """Assess originality and creativity"""
 
@@ -633,7 +672,7 @@ class QualityAssessor:
 
         # Cliché detection (simplified)
         cliches = ["once upon a time", "happily ever after", "dark and stormy night"]
-        cliche_count = sum(content.lower().count(cliche) for cliche in cliches)
+        cliche_count = features.count_terms(cliches)
         originality_score = max(0.0, 1.0 - cliche_count / 3.0)
         factors.append(("cliche_avoidance", originality_score, 0.5))
 
@@ -641,8 +680,11 @@ class QualityAssessor:
             suggestions.append("Avoid common clichés and overused phrases")
 
         # Unique word usage
-        words = content.lower().split()
-        unique_ratio = len(set(words)) / len(words) if words else 0
+        unique_ratio = (
+            features.unique_word_count / features.word_count
+            if features.word_count
+            else 0
+        )
         uniqueness_score = min(unique_ratio * 2, 1.0)
         factors.append(("vocabulary_uniqueness", uniqueness_score, 0.3))
 
@@ -654,9 +696,7 @@ class QualityAssessor:
             "original",
             "unique",
         ]
-        creative_count = sum(
-            content.lower().count(indicator) for indicator in creative_indicators
-        )
+        creative_count = features.count_terms(creative_indicators)
         creative_score = min(creative_count / 3.0, 1.0)
         factors.append(("creative_elements", creative_score, 0.2))
 
@@ -676,7 +716,7 @@ class QualityAssessor:
         )
 
     def _assess_technical_craft(
-        self, content: str, analysis: dict[str, Any]
+        self, features: ScriptFeatures, analysis: dict[str, Any]
     ) -> QualityScore:
         """Assess technical writing craft"""
 
@@ -685,8 +725,7 @@ class QualityAssessor:
         evidence = []
 
         # Script formatting
-        format_indicators = ["EXT.", "INT.", "FADE IN", "FADE OUT"]
-        format_count = sum(content.count(indicator) for indicator in format_indicators)
+        format_count = sum(features.format_marker_counts.values())
         format_score = min(format_count / 3.0, 1.0)
         factors.append(("script_formatting", format_score, 0.4))
 
@@ -695,9 +734,9 @@ class QualityAssessor:
 
         # Grammar and style (simplified)
         # In practice, this would use more sophisticated analysis
-        sentence_count = len([line for line in content.split("\n") if line.strip()])
+        sentence_count = len(features.nonblank_lines)
         avg_sentence_length = (
-            len(content.split()) / sentence_count if sentence_count > 0 else 0
+            features.word_count / sentence_count if sentence_count > 0 else 0
         )
 
         # Ideal range for script writing
@@ -720,37 +759,31 @@ class QualityAssessor:
             evidence=evidence,
         )
 
-    def _analyze_content_structure(self, content: str) -> dict[str, Any]:
+    def _analyze_content_structure(self, features: ScriptFeatures) -> dict[str, Any]:
         """Analyze basic content structure"""
 
-        lines = content.split("\n")
-        words = content.split()
-
-        # Count different elements
-        scene_headers = len(
-            [line for line in lines if line.strip().startswith(("EXT.", "INT."))]
-        )
-        dialogue_lines = len([line for line in lines if '"' in line])
-        character_names = len(
-            set(re.findall(r"^[A-Z][A-Z\s]{1,20}$", content, re.MULTILINE))
-        )
+        line_count = features.line_count
 
         return {
-            "total_lines": len([line for line in lines if line.strip()]),
-            "word_count": len(words),
-            "scene_count": scene_headers,
-            "dialogue_lines": dialogue_lines,
-            "dialogue_ratio": dialogue_lines / len(lines) if lines else 0,
-            "character_count": character_names,
+            "total_lines": len(features.nonblank_lines),
+            "word_count": features.word_count,
+            "scene_count": len(features.scene_headers),
+            "dialogue_lines": features.quoted_line_count,
+            "dialogue_ratio": (
+                features.quoted_line_count / line_count if line_count else 0
+            ),
+            "character_count": len(features.characters),
             "has_clear_beginning": any(
-                indicator in content.upper()
+                features.contains(indicator)
                 for indicator in ["FADE IN", "EXT.", "INT."]
             ),
             "has_resolution": any(
-                indicator in content.upper()
+                features.contains(indicator)
                 for indicator in ["FADE OUT", "END", "CONCLUSION"]
             ),
-            "average_words_per_line": len(words) / len(lines) if lines else 0,
+            "average_words_per_line": (
+                features.word_count / line_count if line_count else 0
+            ),
         }
 
     def _calculate_overall_score(
@@ -899,7 +932,7 @@ class QualityAssessor:
         if not self.assessment_history:
             return {"total_assessments": 0}
 
-        recent_assessments = self.assessment_history[-10:]  # Last 10
+        recent_assessments = list(self.assessment_history)[-10:]  # Last 10
         avg_score = sum(a.overall_score for a in recent_assessments) / len(
             recent_assessments
         )
@@ -908,7 +941,7 @@ class QualityAssessor:
         )
 
         return {
-            "total_assessments": len(self.assessment_history),
+            "total_assessments": self.total_assessments,
             "recent_average_score": avg_score,
             "recent_average_confidence": avg_confidence,
             "dimension_weights": self.dimension_weights,
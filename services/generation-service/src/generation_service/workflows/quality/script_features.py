@@ -0,0 +1,276 @@
+"""
+Single-pass screenplay feature extraction shared by quality checks and agents
+"""
+
+import hashlib
+import re
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from itertools import chain
+
+SCENE_PREFIXES = ("EXT.", "INT.")
+TRANSITION_PREFIXES = ("FADE", "CUT TO", "DISSOLVE", "SMASH CUT", "MATCH CUT")
+FORMAT_MARKERS = ("EXT.", "INT.", "FADE IN", "FADE OUT")
+
+SCENE_START = re.compile(r"^[^\S\n]*(?:EXT\.|INT\.)", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class SceneHeader:
+    """A scene heading line"""
+
+    line_index: int
+    text: str
+
+    @property
+    def is_exterior(self) -> bool:
+        return self.text.startswith("EXT.")
+
+
+@dataclass(frozen=True)
+class DialogueBlock:
+    """A character cue and the speech lines that follow it"""
+
+    character: str
+    line_index: int
+    lines: tuple[str, ...]
+    line_indexes: tuple[int, ...]
+    parentheticals: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class ScriptFeatures:
+    """
+    Compact parse of a screenplay
+
+    Built in one pass over the lines of each scene; keyword counts are
+    computed on demand from a single lower-cased copy and memoized. Features
+    of a whole script are combined from per-scene features, so a revision
+    only re-parses the scenes it changed.
+    """
+
+    digest: str
+    line_count: int
+    nonblank_lines: tuple[str, ...]
+    line_word_counts: tuple[int, ...]
+    word_count: int
+    vocabulary: frozenset[str] = field(repr=False)
+    scene_headers: tuple[SceneHeader, ...]
+    dialogue_blocks: tuple[DialogueBlock, ...]
+    action_lines: tuple[str, ...]
+    transition_count: int
+    quoted_line_count: int
+    format_marker_counts: dict[str, int]
+    _lower: str = field(default="", repr=False, compare=False)
+    _parts: tuple["ScriptFeatures", ...] = field(default=(), repr=False, compare=False)
+    _term_counts: dict[str, int] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    @classmethod
+    def combine(cls, parts: Sequence["ScriptFeatures"]) -> "ScriptFeatures":
+        """Features of consecutive segments joined by newlines"""
+        headers: list[SceneHeader] = []
+        blocks: list[DialogueBlock] = []
+        offset = 0
+        for part in parts:
+            headers.extend(
+                replace(header, line_index=header.line_index + offset)
+                for header in part.scene_headers
+            )
+            blocks.extend(
+                replace(
+                    block,
+                    line_index=block.line_index + offset,
+                    line_indexes=tuple(i + offset for i in block.line_indexes),
+                )
+                for block in part.dialogue_blocks
+            )
+            offset += part.line_count
+
+        return cls(
+            digest=_digest("".join(part.digest for part in parts)),
+            line_count=offset,
+            nonblank_lines=tuple(chain(*(part.nonblank_lines for part in parts))),
+            line_word_counts=tuple(chain(*(part.line_word_counts for part in parts))),
+            word_count=sum(part.word_count for part in parts),
+            vocabulary=frozenset().union(*(part.vocabulary for part in parts)),
+            scene_headers=tuple(headers),
+            dialogue_blocks=tuple(blocks),
+            action_lines=tuple(chain(*(part.action_lines for part in parts))),
+            transition_count=sum(part.transition_count for part in parts),
+            quoted_line_count=sum(part.quoted_line_count for part in parts),
+            format_marker_counts={
+                marker: sum(part.format_marker_counts[marker] for part in parts)
+                for marker in FORMAT_MARKERS
+            },
+            _parts=tuple(parts),
+        )
+
+    @property
+    def scenes(self) -> tuple["ScriptFeatures", ...]:
+        """Per-scene features; the preamble before the first heading is one"""
+        return self._parts or (self,)
+
+    @property
+    def unique_word_count(self) -> int:
+        return len(self.vocabulary)
+
+    @property
+    def characters(self) -> tuple[str, ...]:
+        """Distinct speaking characters in order of first appearance"""
+        return tuple(dict.fromkeys(block.character for block in self.dialogue_blocks))
+
+    @property
+    def dialogue_line_count(self) -> int:
+        return sum(len(block.lines) for block in self.dialogue_blocks)
+
+    def term_count(self, term: str) -> int:
+        """Case-insensitive occurrences of ``term`` within lines"""
+        count = self._term_counts.get(term)
+        if count is None:
+            if self._parts:
+                count = sum(part.term_count(term) for part in self._parts)
+            else:
+                count = self._lower.count(term.lower())
+            self._term_counts[term] = count
+        return count
+
+    def count_terms(self, terms: Iterable[str]) -> int:
+        return sum(self.term_count(term) for term in terms)
+
+    def contains(self, term: str) -> bool:
+        return self.term_count(term) > 0
+
+
+def is_character_cue(line: str) -> bool:
+    """Whether a stripped line is a character cue (``JOHN`` or ``MARY (V.O.)``)"""
+    name = line.strip(":").strip()
+    return (
+        name.isupper()
+        and len(name.split()) <= 3
+        and len(name) > 1
+        and not name.startswith(SCENE_PREFIXES + TRANSITION_PREFIXES)
+    )
+
+
+def _is_transition(line: str) -> bool:
+    upper = line.upper()
+    return upper.startswith(TRANSITION_PREFIXES) or (
+        line.isupper() and upper.endswith("TO:")
+    )
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def split_scenes(content: str) -> list[str]:
+    """Split a script into segments that each start at a scene heading"""
+    starts = [match.start() for match in SCENE_START.finditer(content)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    ends = [start - 1 for start in starts[1:]] + [len(content)]
+    return [content[start:end] for start, end in zip(starts, ends)]
+
+
+@lru_cache(maxsize=128)
+def extract_script_features(content: str) -> ScriptFeatures:
+    """
+    Parse a script; repeated calls with the same content are cached
+
+    Scenes are parsed and cached individually, so scripts that share scenes
+    with one seen recently only parse the scenes that differ.
+    """
+    segments = split_scenes(content)
+    if len(segments) == 1:
+        return _extract_segment_features(content)
+    return ScriptFeatures.combine(
+        [_extract_segment_features(segment) for segment in segments]
+    )
+
+
+@lru_cache(maxsize=1024)
+def _extract_segment_features(content: str) -> ScriptFeatures:
+    raw_lines = content.split("\n")
+    nonblank: list[str] = []
+    word_counts: list[int] = []
+    vocabulary: set[str] = set()
+    headers: list[SceneHeader] = []
+    blocks: list[DialogueBlock] = []
+    action_lines: list[str] = []
+    marker_counts = dict.fromkeys(FORMAT_MARKERS, 0)
+    transitions = 0
+    quoted = 0
+
+    # Open dialogue block: cue, line index, speech and parentheticals
+    cue: tuple[str, int] = ("", -1)
+    speech: list[tuple[int, str]] = []
+    parentheticals: list[str] = []
+
+    def close_block() -> None:
+        if cue[1] >= 0:
+            blocks.append(
+                DialogueBlock(
+                    character=cue[0],
+                    line_index=cue[1],
+                    lines=tuple(text for _, text in speech),
+                    line_indexes=tuple(position for position, _ in speech),
+                    parentheticals=tuple(parentheticals),
+                )
+            )
+
+    for index, raw in enumerate(raw_lines):
+        line = raw.strip()
+        if not line:
+            close_block()
+            cue, speech, parentheticals = ("", -1), [], []
+            continue
+
+        words = line.split()
+        nonblank.append(line)
+        word_counts.append(len(words))
+        vocabulary.update(word.lower() for word in words)
+        if '"' in line:
+            quoted += 1
+        for marker in FORMAT_MARKERS:
+            if marker in line:
+                marker_counts[marker] += line.count(marker)
+
+        if line.startswith(SCENE_PREFIXES):
+            close_block()
+            cue, speech, parentheticals = ("", -1), [], []
+            headers.append(SceneHeader(index, line))
+        elif _is_transition(line):
+            close_block()
+            cue, speech, parentheticals = ("", -1), [], []
+            transitions += 1
+        elif is_character_cue(line):
+            close_block()
+            cue, speech, parentheticals = (line.strip(":").strip(), index), [], []
+        elif cue[1] >= 0:
+            if line.startswith("(") and line.endswith(")"):
+                parentheticals.append(line)
+            else:
+                speech.append((index, line))
+        else:
+            action_lines.append(line)
+
+    close_block()
+
+    return ScriptFeatures(
+        digest=_digest(content),
+        line_count=len(raw_lines),
+        nonblank_lines=tuple(nonblank),
+        line_word_counts=tuple(word_counts),
+        word_count=sum(word_counts),
+        vocabulary=frozenset(vocabulary),
+        scene_headers=tuple(headers),
+        dialogue_blocks=tuple(blocks),
+        action_lines=tuple(action_lines),
+        transition_count=transitions,
+        quoted_line_count=quoted,
+        format_marker_counts=marker_counts,
+        _lower=content.lower(),
+    )
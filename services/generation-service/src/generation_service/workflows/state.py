@@ -2,8 +2,10 @@
 LangGraph workflow state definitions for script generation
 """
 
+from collections.abc import Iterable, Iterator, Sequence
 from datetime import datetime
-from typing import Any, Optional, TypedDict
+from itertools import islice
+from typing import Any, Generic, Optional, TypedDict, TypeVar
 
 # Import Core Module components
 try:
@@ -59,6 +61,79 @@ except (ImportError, RuntimeError):
 
 from generation_service.models.generation import GenerationRequest
 
+T = TypeVar("T")
+
+
+class AppendLog(Sequence, Generic[T]):
+    """
+    Append-only log whose forks share their entries
+
+    ``fork()`` is O(1): the fork shares the entry list and sees only the
+    entries appended before it. Appending to the longest view extends the
+    shared list in place; appending to a shorter one first copies its own
+    prefix, so forks never see each other's entries. Entries are treated as
+    immutable once appended.
+    """
+
+    __slots__ = ("_entries", "_length")
+
+    def __init__(self, entries: Iterable[T] = ()) -> None:
+        self._entries: list[T] = list(entries)
+        self._length = len(self._entries)
+
+    def fork(self) -> "AppendLog[T]":
+        forked = AppendLog.__new__(AppendLog)
+        forked._entries = self._entries
+        forked._length = self._length
+        return forked
+
+    def append(self, entry: T) -> None:
+        if self._length != len(self._entries):
+            self._entries = self._entries[: self._length]
+        self._entries.append(entry)
+        self._length += 1
+
+    def extend(self, entries: Iterable[T]) -> None:
+        for entry in entries:
+            self.append(entry)
+
+    def since(self, offset: int) -> list[T]:
+        """Entries appended after the first ``offset``"""
+        return self._entries[offset : self._length]
+
+    def extends(self, other: "AppendLog[T]") -> bool:
+        """Whether ``other`` is a prefix of this log"""
+        if len(other) > self._length:
+            return False
+        if other._entries is self._entries:
+            return True
+        return all(a is b for a, b in zip(other, self))
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return self._entries[: self._length][index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("AppendLog index out of range")
+        return self._entries[index]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[T]:
+        return islice(self._entries, self._length)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (AppendLog, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"AppendLog({list(self)!r})"
+
 
 class ExecutionLogEntry(TypedDict):
     """Individual execution log entry"""
@@ -112,7 +187,7 @@ class GenerationState(TypedDict):
     enhancement_metadata: Optional[dict[str, Any]]  # 향상 메타데이터
 
     # Workflow control
-    execution_log: list[ExecutionLogEntry]
+    execution_log: AppendLog[ExecutionLogEntry]
     generation_metadata: GenerationMetadata
 
     # Decision flags for conditional edges
@@ -124,7 +199,7 @@ class GenerationState(TypedDict):
 
     # Error handling
     has_errors: bool
-    error_messages: list[str]
+    error_messages: AppendLog[str]
 
     # Quality tracking
     quality_checkpoints: dict[str, float]
@@ -176,7 +251,7 @@ def create_initial_state(
         style_metadata=None,
         enhancement_metadata=None,
         # Workflow control
-        execution_log=[],
+        execution_log=AppendLog(),
         generation_metadata=metadata,
         # Decision flags - will be set during execution
         needs_plot_enhancement=False,
@@ -186,7 +261,7 @@ def create_initial_state(
         special_agent_type=None,
         # Error handling
         has_errors=False,
-        error_messages=[],
+        error_messages=AppendLog(),
         # Quality tracking
         quality_checkpoints={},
         current_quality_score=0.0,
@@ -206,6 +281,53 @@ def create_initial_state(
     return state
 
 
+# Fields nodes and agents append to; forks share them structurally
+LOG_FIELDS = ("execution_log", "error_messages")
+
+# Small bookkeeping containers of generation_metadata updated in place
+_METADATA_CONTAINERS = (
+    "nodes_executed",
+    "nodes_skipped",
+    "quality_scores",
+    "token_usage",
+    "model_usage",
+)
+
+
+def fork_state(state: GenerationState) -> GenerationState:
+    """
+    Copy a state for a node or agent to update
+
+    Script versions and other values that are replaced rather than mutated
+    are shared, the logs are forked in O(1), and only the small containers
+    updated in place are copied. Updates to the fork never reach the
+    original, even with agents running concurrently on the same state.
+    """
+
+    forked = dict(state)
+
+    for key in LOG_FIELDS:
+        log = state.get(key)
+        if isinstance(log, AppendLog):
+            forked[key] = log.fork()
+        elif log is not None:
+            forked[key] = AppendLog(log)
+
+    metadata = state.get("generation_metadata")
+    if metadata is not None:
+        metadata = dict(metadata)
+        for key in _METADATA_CONTAINERS:
+            value = metadata.get(key)
+            if isinstance(value, (list, dict)):
+                metadata[key] = value.copy()
+        forked["generation_metadata"] = metadata
+
+    if state.get("quality_checkpoints") is not None:
+        forked["quality_checkpoints"] = dict(state["quality_checkpoints"])
+
+    return forked  # type: ignore[return-value]
+
+
 def add_execution_log(
     state: GenerationState,
     node_name: str,
@@ -0,0 +1,114 @@
+"""
+Tests for memoization of specialized agent results
+"""
+
+import asyncio
+from typing import Optional
+
+import pytest
+
+from generation_service.workflows.agents import (
+    AgentCoordinator,
+    AgentExecutionPlan,
+    SceneVisualizerAgent,
+)
+from generation_service.workflows.agents.result_cache import AgentResultCache
+
+SCRIPT = "INT. OFFICE - DAY\n\nJOHN sits at his desk.\n"
+
+
+def make_state(script: str = SCRIPT) -> dict:
+    return {
+        "generation_id": "gen-1",
+        "styled_script": script,
+        "execution_log": [],
+        "error_messages": [],
+    }
+
+
+def counting_agent(calls: dict, config: Optional[dict] = None) -> SceneVisualizerAgent:
+    """Scene visualizer whose analysis and enhancement count their calls"""
+    agent = SceneVisualizerAgent(config=config)
+    agent.result_cache = AgentResultCache()
+
+    async def analyze_content(state):
+        calls["analyze"] += 1
+        return {"should_enhance": True, "enhancement_confidence": 0.9}
+
+    async def enhance_content(state):
+        calls["enhance"] += 1
+        await asyncio.sleep(0.01)
+        return {
+            "enhanced_content": state["styled_script"] + "Rain streaks the window.\n",
+            "quality_improvement": 0.1,
+            "tokens_used": 120,
+            "model_used": "test-model",
+        }
+
+    agent.analyze_content = analyze_content
+    agent.enhance_content = enhance_content
+    return agent
+
+
+class TestAgentResultCache:
+    """Test content-addressed reuse of agent work"""
+
+    @pytest.mark.asyncio
+    async def test_identical_input_skips_enhancement(self):
+        """Re-running an agent on the same script reuses its results"""
+        calls = {"analyze": 0, "enhance": 0}
+        agent = counting_agent(calls)
+
+        first = await agent.execute(make_state())
+        second = await agent.execute(make_state())
+
+        assert calls == {"analyze": 1, "enhance": 1}
+        assert second["enhanced_script"] == first["enhanced_script"]
+        metadata = second["generation_metadata"]["agent_scene_visualizer"]
+        assert metadata["cached"] is True
+        assert metadata["tokens_used"] == 0
+
+        await agent.execute(make_state(SCRIPT + "\nJOHN\nHello.\n"))
+        assert calls == {"analyze": 2, "enhance": 2}
+
+    @pytest.mark.asyncio
+    async def test_config_is_part_of_the_key(self):
+        """Agents with different configuration don't share results"""
+        cache = AgentResultCache()
+        keys = {
+            AgentResultCache.make_key("enhancement", "agent", config, SCRIPT, "m")
+            for config in ({"intensity": 0.5}, {"intensity": 0.9})
+        }
+        assert len(keys) == 2
+
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": 1}
+
+        key = keys.pop()
+        results = await asyncio.gather(
+            cache.get_or_compute(key, compute), cache.get_or_compute(key, compute)
+        )
+        assert calls == 1
+        assert sorted(cached for _, cached in results) == [False, True]
+
+    @pytest.mark.asyncio
+    async def test_coordinator_reports_cached_agents(self):
+        """A retried plan reuses every agent and reports it"""
+        calls = {"analyze": 0, "enhance": 0}
+        coordinator = AgentCoordinator()
+        coordinator.agents["scene_visualizer"] = counting_agent(calls)
+
+        for _ in range(2):
+            plan = AgentExecutionPlan()
+            plan.add_agent(coordinator.agents["scene_visualizer"])
+            result = await coordinator.execute_plan(make_state(), plan)
+
+        execution_plan = result["coordination_metadata"]["execution_plan"]
+        assert execution_plan["cached_agents"] == ["scene_visualizer"]
+        assert calls["enhance"] == 1
+        assert "Rain streaks the window." in result["enhanced_script"]
@@ -0,0 +1,159 @@
+"""
+Tests for persistent workflow checkpoints and generation resume
+"""
+
+import json
+import zlib
+from unittest.mock import MagicMock
+
+import pytest
+
+from generation_service.models.generation import GenerationRequest, ScriptType
+from generation_service.workflows.checkpoint_store import CheckpointStore
+from generation_service.workflows.generation_workflow import GenerationWorkflow
+from generation_service.workflows.state import (
+    add_execution_log,
+    create_initial_state,
+    fork_state,
+)
+
+
+def make_request() -> GenerationRequest:
+    return GenerationRequest(
+        project_id="project-1",
+        script_type=ScriptType.DRAMA,
+        title="Checkpoint Test",
+        description="A script used to test checkpoints",
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    checkpoint_store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    yield checkpoint_store
+    checkpoint_store.close()
+
+
+class TestCheckpointStore:
+    """Test delta encoding, retention and reload"""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_with_deltas(self, store):
+        """State is rebuilt from per-node deltas"""
+        state = create_initial_state(make_request(), generation_id="gen-1")
+        state["draft_script"] = "DRAFT " * 500
+        add_execution_log(state, "architect", True)
+        await store.save("gen-1", "architect", state)
+        first_size = store.get_stats()["checkpoint_bytes"]
+
+        state["styled_script"] = "STYLED"
+        add_execution_log(state, "stylist", True)
+        await store.save("gen-1", "stylist", state)
+
+        # The second checkpoint does not repeat the unchanged draft
+        assert store.get_stats()["checkpoint_bytes"] - first_size < first_size
+
+        store.release("gen-1")
+        restored, completed = await store.load("gen-1")
+        assert completed == ["architect", "stylist"]
+        assert restored["draft_script"] == state["draft_script"]
+        assert restored["styled_script"] == "STYLED"
+        assert restored["original_request"].title == "Checkpoint Test"
+
+    @pytest.mark.asyncio
+    async def test_forked_logs_store_only_appended_entries(self, store):
+        """Forks share log entries and checkpoints write only new ones"""
+        state = create_initial_state(make_request(), generation_id="gen-1")
+        add_execution_log(state, "architect", True)
+        await store.save("gen-1", "architect", state)
+
+        styled = fork_state(state)
+        add_execution_log(styled, "stylist", False, error_message="rate limited")
+        await store.save("gen-1", "stylist", styled)
+
+        # The fork did not touch the state it was taken from
+        assert len(state["execution_log"]) == 1
+        assert not state["error_messages"]
+        assert state["generation_metadata"]["nodes_executed"] == ["architect"]
+
+        (blob,) = store._query(
+            "SELECT delta FROM checkpoints WHERE generation_id = ? AND node = ?",
+            ("gen-1", "stylist"),
+        )[0]
+        delta = json.loads(zlib.decompress(blob))
+        assert "execution_log" not in delta
+        assert [
+            entry["node_name"] for entry in json.loads(delta["execution_log+"])
+        ] == ["stylist"]
+
+        store.release("gen-1")
+        restored, _ = await store.load("gen-1")
+        assert restored["execution_log"] == list(styled["execution_log"])
+        assert restored["error_messages"] == ["stylist: rate limited"]
+
+    @pytest.mark.asyncio
+    async def test_retention_prunes_finished(self, tmp_path):
+        """Finished generations are pruned, interrupted ones stay resumable"""
+        store = CheckpointStore(
+            str(tmp_path / "checkpoints.sqlite3"), retention_seconds=0
+        )
+        for generation_id in ("done", "interrupted"):
+            state = create_initial_state(make_request(), generation_id=generation_id)
+            await store.save(generation_id, "architect", state)
+
+        await store.mark_finished("done")
+
+        assert await store.load("done") is None
+        resumable = await store.list_resumable()
+        assert [item["generation_id"] for item in resumable] == ["interrupted"]
+        store.close()
+
+
+class TestWorkflowResume:
+    """Test that resumed generations skip completed nodes"""
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_completed_nodes(self, store):
+        """An interrupted generation restarts after its last completed node"""
+        workflow = GenerationWorkflow(MagicMock(), checkpoint_store=store)
+        calls: list[str] = []
+        stylist_fails = True
+
+        async def architect(state):
+            calls.append("architect")
+            state["draft_script"] = "INT. OFFICE - DAY"
+            add_execution_log(state, "architect", True)
+            return state
+
+        async def stylist(state):
+            calls.append("stylist")
+            if stylist_fails:
+                raise RuntimeError("provider unavailable")
+            state["styled_script"] = state["draft_script"] + " (styled)"
+            add_execution_log(state, "stylist", True)
+            return state
+
+        async def special_agent(state):
+            calls.append("special_agent")
+            add_execution_log(state, "special_agent", True)
+            return state
+
+        workflow.architect_node.execute = architect
+        workflow.stylist_node.execute = stylist
+        workflow.special_agent_router.execute_special_agent = special_agent
+
+        first = await workflow.execute(make_request(), "gen-1")
+        assert first.status == "failed"
+        assert [item["generation_id"] for item in await workflow.list_resumable()] == [
+            "gen-1"
+        ]
+
+        stylist_fails = False
+        calls.clear()
+        resumed = await workflow.resume("gen-1")
+
+        assert calls[:1] == ["stylist"]
+        assert "architect" not in calls
+        assert resumed.status == "completed"
+        assert resumed.generated_script.startswith("INT. OFFICE - DAY (styled)")
+        assert await workflow.resume("missing") is None
@@ -0,0 +1,105 @@
+"""
+Tests for bounded feedback storage and incremental preference learning
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+
+from generation_service.workflows.feedback import (
+    FeedbackLearningEngine,
+    FeedbackSentiment,
+    FeedbackStore,
+    FeedbackType,
+    UserFeedback,
+)
+from generation_service.workflows.quality import QualityDimension
+
+
+def make_feedback(
+    index: int,
+    user_id: str = "user_1",
+    sentiment: FeedbackSentiment = FeedbackSentiment.POSITIVE,
+    quality_scores: Optional[dict] = None,
+    age: timedelta = timedelta(0),
+) -> UserFeedback:
+    return UserFeedback(
+        feedback_id=f"fb_{index}",
+        user_id=user_id,
+        generation_id=f"gen_{index}",
+        feedback_type=FeedbackType.EXPLICIT_RATING,
+        sentiment=sentiment,
+        content={"overall_rating": 0.8},
+        quality_scores=quality_scores,
+        timestamp=datetime.now() - age,
+    )
+
+
+class TestFeedbackStore:
+    """Test indexes, bounds and persistence of feedback"""
+
+    def test_bounded_indexes(self):
+        """Evicted feedback leaves every index"""
+        store = FeedbackStore(max_items=3)
+        store.add(make_feedback(0, age=timedelta(days=20)))
+        store.add(make_feedback(1, sentiment=FeedbackSentiment.NEGATIVE))
+        for index in range(2, 5):
+            store.add(make_feedback(index, user_id="user_2"))
+
+        assert list(store) == ["fb_2", "fb_3", "fb_4"]
+        assert store.for_user("user_1") == []
+        assert len(store.for_user("user_2")) == 3
+        assert store.sentiment_counts(timedelta(days=7).total_seconds()) == {
+            "positive": 3
+        }
+        assert store.total_recorded == 5
+
+        store.add(make_feedback(5, age=timedelta(days=10)))
+        recent = store.recent(timedelta(days=7).total_seconds())
+        assert [f.feedback_id for f in recent] == ["fb_3", "fb_4"]
+
+    @pytest.mark.asyncio
+    async def test_decayed_preferences(self):
+        """Older feedback counts less, without rescanning stored items"""
+        engine = FeedbackLearningEngine({"preference_half_life_days": 30})
+        await engine.record_feedback(
+            make_feedback(
+                0, quality_scores={"plot_structure": 0.2}, age=timedelta(days=30)
+            )
+        )
+        await engine.record_feedback(
+            make_feedback(1, quality_scores={"plot_structure": 0.8})
+        )
+
+        profile = await engine.get_user_preferences("user_1")
+        # Weights 0.5 and 1.0 give (0.1 + 0.8) / 1.5
+        preference = profile.quality_preferences[QualityDimension.PLOT_STRUCTURE]
+        assert preference == pytest.approx(0.6, abs=1e-3)
+        assert profile.confidence_score == pytest.approx(0.15, abs=1e-3)
+        assert profile.total_feedback_count == 2
+
+    @pytest.mark.asyncio
+    async def test_profiles_survive_restart(self, tmp_path):
+        """Profiles and recent feedback are restored from SQLite"""
+        config = {"db_path": str(tmp_path / "feedback.sqlite3")}
+        engine = FeedbackLearningEngine(config)
+        await engine.process_generation_feedback(
+            generation_id="gen_1",
+            user_rating=0.9,
+            quality_feedback={"dialogue_quality": 0.9},
+            user_id="user_1",
+        )
+        engine.feedback_storage.close()
+
+        restored = FeedbackLearningEngine(config)
+        profile = await restored.get_user_preferences("user_1")
+        assert profile.quality_preferences[
+            QualityDimension.DIALOGUE_QUALITY
+        ] == pytest.approx(0.9)
+        assert profile.total_feedback_count == 1
+        assert len(restored.feedback_storage) == 1
+        assert (
+            restored.get_feedback_statistics()["sentiment_distribution"]["positive"]
+            == 1
+        )
@@ -0,0 +1,146 @@
+"""
+Tests for the bounded generation registry
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from generation_service.models.generation import (
+    GenerationResponse,
+    GenerationStatus,
+    ScriptType,
+)
+from generation_service.services.generation_registry import (
+    DiskSpillStore,
+    GenerationRegistry,
+    SpillStore,
+)
+
+
+class SlowSpillStore(SpillStore):
+    """In-memory spill store that yields to the loop on every call"""
+
+    def __init__(self):
+        self.records = {}
+
+    async def put(self, generation_id, data):
+        await asyncio.sleep(0.01)
+        self.records[generation_id] = data
+
+    async def get(self, generation_id):
+        await asyncio.sleep(0)
+        return self.records.get(generation_id)
+
+    async def delete(self, generation_id):
+        await asyncio.sleep(0)
+        self.records.pop(generation_id, None)
+
+
+def make_response(generation_id: str, status: GenerationStatus) -> GenerationResponse:
+    now = datetime.now()
+    return GenerationResponse(
+        generation_id=generation_id,
+        project_id="project-1",
+        status=status,
+        script_type=ScriptType.DRAMA,
+        title="Title",
+        description="Description",
+        generated_script="INT. OFFICE - DAY",
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class TestGenerationRegistry:
+    """Test indexes, spilling and eviction"""
+
+    @pytest.mark.asyncio
+    async def test_indexes_follow_status_changes(self):
+        """Active list and statistics track in-place status updates"""
+        registry = GenerationRegistry()
+        response = make_response("gen-1", GenerationStatus.PENDING)
+        await registry.put("gen-1", response)
+        await registry.put("gen-2", make_response("gen-2", GenerationStatus.PENDING))
+
+        assert [g.generation_id for g in registry.list_active()] == ["gen-1", "gen-2"]
+
+        response.status = GenerationStatus.COMPLETED
+        await registry.update("gen-1")
+
+        assert [g.generation_id for g in registry.list_active()] == ["gen-2"]
+        stats = registry.get_statistics()
+        assert stats["total_generations"] == 2
+        assert stats["by_status"]["completed"] == 1
+        assert stats["by_status"]["pending"] == 1
+        assert stats["by_script_type"] == {"drama": 2}
+
+    @pytest.mark.asyncio
+    async def test_finished_generations_spill_to_disk(self, tmp_path):
+        """Finished generations leave memory but can still be loaded"""
+        registry = GenerationRegistry(
+            spill_store=DiskSpillStore(str(tmp_path)),
+            completed_ttl=0,
+            details_builder=lambda generation_id, context: {"recommendations": ["x"]},
+        )
+        await registry.put(
+            "gen-1",
+            make_response("gen-1", GenerationStatus.COMPLETED),
+            context=object(),
+        )
+
+        assert registry.live_count == 0
+        assert registry.get_live("gen-1") is None
+        summary = registry.get_summary("gen-1")
+        assert summary.spilled is True
+        assert summary.recommendations == ("x",)
+
+        reloaded = await registry.get("gen-1")
+        assert reloaded.generated_script == "INT. OFFICE - DAY"
+        assert await registry.get_details("gen-1") == {"recommendations": ["x"]}
+
+    @pytest.mark.asyncio
+    async def test_summaries_are_bounded(self, tmp_path):
+        """The oldest summaries and their spilled records are evicted"""
+        registry = GenerationRegistry(
+            spill_store=DiskSpillStore(str(tmp_path)),
+            max_live=1,
+            max_summaries=2,
+        )
+        for index in range(4):
+            generation_id = f"gen-{index}"
+            await registry.put(
+                generation_id, make_response(generation_id, GenerationStatus.FAILED)
+            )
+
+        assert registry.live_count == 1
+        assert len(registry) == 3
+        assert "gen-0" not in registry
+        assert await registry.get("gen-0") is None
+        assert not (tmp_path / "gen-0.json").exists()
+        assert registry.get_statistics()["by_status"]["failed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_updates_spill_each_generation_once(self):
+        """Overlapping maintenance passes do not spill the same generation twice"""
+        store = SlowSpillStore()
+        registry = GenerationRegistry(spill_store=store, completed_ttl=0)
+        responses = {
+            generation_id: make_response(generation_id, GenerationStatus.PENDING)
+            for generation_id in ("a", "b")
+        }
+        for generation_id, response in responses.items():
+            await registry.put(generation_id, response)
+
+        for response in responses.values():
+            response.status = GenerationStatus.COMPLETED
+        results = await asyncio.gather(
+            registry.update("a"), registry.update("b"), return_exceptions=True
+        )
+
+        assert results == [None, None]
+        assert registry.live_count == 0
+        assert set(store.records) == {"a", "b"}
+        assert registry.get_registry_stats()["spilled"] == 2
+        assert registry.get_summary("a").status == GenerationStatus.COMPLETED
@@ -0,0 +1,108 @@
+"""
+Tests for the bounded generation scheduler
+"""
+
+import asyncio
+
+import pytest
+
+from generation_service.services.generation_scheduler import (
+    GenerationPriority,
+    GenerationScheduler,
+    QueueFullError,
+)
+
+
+def make_runner(name: str, order: list[str], delay: float = 0.01):
+    """Build a runner that records its start order"""
+
+    async def runner() -> None:
+        order.append(name)
+        await asyncio.sleep(delay)
+
+    return runner
+
+
+class TestGenerationScheduler:
+    """Test admission control, fairness and priorities"""
+
+    @pytest.mark.asyncio
+    async def test_runs_immediately_when_workers_free(self):
+        """Jobs start right away while worker slots are available"""
+        order: list[str] = []
+        scheduler = GenerationScheduler(max_concurrent=2)
+
+        assert scheduler.submit("a", make_runner("a", order)) is None
+        assert scheduler.submit("b", make_runner("b", order)) is None
+        assert scheduler.running_count == 2
+
+        await asyncio.sleep(0.05)
+        assert order == ["a", "b"]
+        assert scheduler.running_count == 0
+
+    @pytest.mark.asyncio
+    async def test_fair_queuing_and_priority(self):
+        """High priority first, then round-robin across tenants and projects"""
+        order: list[str] = []
+        updates: list[tuple] = []
+        scheduler = GenerationScheduler(
+            max_concurrent=1, on_queue_update=lambda *args: updates.append(args)
+        )
+
+        scheduler.submit("running", make_runner("running", order), "t1", "p1")
+        assert scheduler.submit("t1-a", make_runner("t1-a", order), "t1", "p1") == 1
+        assert scheduler.submit("t1-b", make_runner("t1-b", order), "t1", "p1") == 2
+        assert scheduler.submit("t2-a", make_runner("t2-a", order), "t2", "p2") == 2
+        assert (
+            scheduler.submit(
+                "urgent",
+                make_runner("urgent", order),
+                "t3",
+                "p3",
+                GenerationPriority.HIGH,
+            )
+            == 1
+        )
+
+        await asyncio.sleep(0.2)
+        assert order == ["running", "urgent", "t1-a", "t2-a", "t1-b"]
+        assert any(
+            job_id == "t1-b" and position == 4 for job_id, position, _ in updates
+        )
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        """Admission control raises with a Retry-After hint"""
+        order: list[str] = []
+        scheduler = GenerationScheduler(
+            max_concurrent=1, max_queue_size=2, max_queued_per_tenant=1
+        )
+
+        scheduler.submit("a", make_runner("a", order), "t1")
+        scheduler.submit("b", make_runner("b", order), "t1")
+
+        with pytest.raises(QueueFullError) as tenant_error:
+            scheduler.submit("c", make_runner("c", order), "t1")
+        assert tenant_error.value.retry_after >= 1
+
+        scheduler.submit("d", make_runner("d", order), "t2")
+        with pytest.raises(QueueFullError):
+            scheduler.check_admission("t3")
+
+        assert scheduler.get_stats()["rejected"] == 2
+        await scheduler.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued_job(self):
+        """Cancelled queued jobs never run"""
+        order: list[str] = []
+        scheduler = GenerationScheduler(max_concurrent=1)
+
+        scheduler.submit("a", make_runner("a", order))
+        scheduler.submit("b", make_runner("b", order))
+
+        assert scheduler.cancel("b") is True
+        assert scheduler.get_queue_position("b") is None
+
+        await asyncio.sleep(0.05)
+        assert order == ["a"]
@@ -0,0 +1,99 @@
+"""
+Tests for the event loop lag monitor
+"""
+
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from generation_service.api import metrics
+from generation_service.monitoring import loop_monitor as loop_monitor_module
+from generation_service.monitoring.health_monitor import HealthMonitor, HealthStatus
+from generation_service.monitoring.loop_monitor import UNKNOWN_SITE, LoopLagMonitor
+
+
+def blocking_handler() -> None:
+    time.sleep(0.3)
+
+
+def test_blocking_call_is_captured():
+    """The lag of a blocking callback is charged to its call site"""
+
+    async def scenario():
+        monitor = LoopLagMonitor({"interval": 0.02, "block_threshold": 0.05})
+        await monitor.start()
+        await asyncio.sleep(0.1)
+        blocking_handler()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(scenario())
+
+    assert monitor.samples > 5
+    assert monitor.blocked == 1
+    assert monitor.max_lag >= 0.25
+
+    site = monitor.get_blocking_sites()[0]
+    assert site["site"].startswith("blocking_handler (")
+    assert site["site"].endswith("test_loop_monitor.py:18)")
+    assert site["count"] == 1
+    assert any("scenario" in line for line in site["stack"])
+
+    histogram = monitor.get_lag_histogram()
+    assert histogram[-1] == {"le": "+Inf", "count": monitor.samples}
+    assert [b["count"] for b in histogram if b["le"] == 0.1] == [monitor.samples - 1]
+
+
+def test_lag_statistics_and_site_eviction():
+    monitor = LoopLagMonitor({"block_threshold": 0.1, "max_blocking_sites": 2})
+    for index in range(20):
+        monitor.record_lag(0.001 * index, now=100.0 + index)
+    monitor.record_lag(0.5, now=121.0, captured=(0.0, "first", ["stack"]))
+    monitor.record_lag(0.2, now=122.0, captured=(0.0, "second", []))
+    monitor.record_lag(0.3, now=123.0)
+
+    # The site with the least blocking time made room for the new one
+    sites = monitor.get_blocking_sites()
+    assert [s["site"] for s in sites] == ["first", UNKNOWN_SITE]
+    assert sites[0]["stack"] == ["stack"]
+
+    report = monitor.get_report()
+    assert report["samples"] == 23
+    assert report["blocked"] == 3
+    assert report["recent"]["max"] == 0.5
+    assert "p99" in report["recent"]
+
+    # Only the last minute counts as recent
+    monitor.record_lag(0.0, now=200.0)
+    assert monitor.get_recent_summary()["count"] == 1
+
+
+def test_health_check_and_endpoint(monkeypatch):
+    monitor = LoopLagMonitor(
+        {"interval": 60.0, "block_threshold": 0.1, "critical_lag": 1.0}
+    )
+    monkeypatch.setattr(loop_monitor_module, "_loop_monitor", monitor)
+
+    async def check_health(lag: float) -> HealthStatus:
+        await monitor.start()
+        try:
+            for _ in range(20):
+                monitor.record_lag(lag)
+            result = await HealthMonitor()._check_event_loop_health()
+        finally:
+            await monitor.stop()
+        return result["status"]
+
+    assert asyncio.run(check_health(0.002)) == HealthStatus.HEALTHY
+    assert asyncio.run(check_health(0.4)) == HealthStatus.DEGRADED
+
+    app = FastAPI()
+    app.include_router(metrics.router)
+    response = TestClient(app).get("/metrics/event-loop?top=3")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["blocked"] == 20
+    assert body["blocking_sites"][0]["count"] == 20
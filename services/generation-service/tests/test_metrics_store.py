@@ -0,0 +1,99 @@
+"""
+Tests for the columnar ring-buffer metric storage
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from generation_service.monitoring.metrics_collector import MetricsCollector
+from generation_service.monitoring.time_series import (
+    MetricSeries,
+    SketchWindow,
+    summarize,
+)
+
+
+class TestMetricSeries:
+    """Test ring-buffer recording and time-window lookups"""
+
+    def test_wraparound_window_and_retention(self):
+        """Windows are found by timestamp across the ring's wrap point"""
+        series = MetricSeries(capacity=5)
+        for second in range(8):
+            series.append(float(second), second * 10.0)
+
+        # Samples 0-2 were overwritten and the buffer now wraps
+        assert len(series) == 5
+        assert list(series.values()) == [30.0, 40.0, 50.0, 60.0, 70.0]
+        timestamps, values = series.window(since=4.5)
+        assert list(timestamps) == [5.0, 6.0, 7.0]
+        assert list(values) == [50.0, 60.0, 70.0]
+        assert list(series.window(since=0.0, limit=2)[1]) == [60.0, 70.0]
+        assert list(series.values(since=99.0)) == []
+        assert series.latest() == (7.0, 70.0)
+
+        assert series.drop_before(6.0) == 3
+        assert list(series.values()) == [60.0, 70.0]
+        series.append(8.0, 80.0, {"node": "architect"})
+        assert series.labels() == [{}, {}, {"node": "architect"}]
+
+    def test_clock_step_back_keeps_order(self):
+        """A timestamp earlier than the newest sample is clamped to it"""
+        series = MetricSeries(capacity=3)
+        series.append(10.0, 1.0)
+        series.append(9.0, 2.0)
+        assert list(series.window()[0]) == [10.0, 10.0]
+        assert series.index_at(10.0) == 0
+
+    def test_summarize(self):
+        """Aggregates match their textbook definitions"""
+        summary = summarize([4.0, 1.0, 3.0, 2.0])
+        assert summary["count"] == 4
+        assert (summary["min"], summary["max"]) == (1.0, 4.0)
+        assert summary["mean"] == pytest.approx(2.5)
+        assert summary["median"] == pytest.approx(2.5)
+        assert summary["stddev"] == pytest.approx(1.2909944)
+        assert summarize([]) == {}
+
+    def test_sketch_window_merges_covered_slices(self):
+        """Window queries merge only the slices from ``since`` onwards"""
+        window = SketchWindow(slice_seconds=60.0, max_slices=3)
+        for minute in range(4):
+            for second in range(10):
+                window.add(minute * 60.0 + second, float(minute * 100 + second))
+
+        # The first minute fell out of the window
+        assert window.merged().count == 30
+        recent = window.merged(since=150.0)
+        assert recent.count == 20
+        assert recent.min == 200.0
+        assert recent.percentile(99) == pytest.approx(309.0, rel=0.01)
+
+
+class TestCollectorStorage:
+    """Test the collector's queries over its metric series"""
+
+    def test_history_and_aggregates(self):
+        """Bounded history, labels and windowed aggregates"""
+        collector = MetricsCollector({"max_history_size": 20})
+        for index in range(30):
+            collector.record_histogram("api_latency", float(index))
+        collector.record_timer("workflow_execution_time", 2.0, {"node": "stylist"})
+
+        since = datetime.now(timezone.utc) - timedelta(minutes=1)
+        history = collector.get_metric_history("api_latency", since, limit=3)
+        assert [entry.value for entry in history] == [27.0, 28.0, 29.0]
+        assert history[-1].timestamp.timestamp() >= since.timestamp()
+
+        aggregated = collector.get_aggregated_metrics("api_latency", "1min")
+        assert aggregated["count"] == 20
+        assert aggregated["min"] == 10.0
+        assert aggregated["mean"] == pytest.approx(19.5)
+        assert "p95" in aggregated
+
+        assert collector.get_latest_value("workflow_execution_time") == 2.0
+        assert collector.count_since("workflow_execution_time", since) == 1
+        (timed,) = collector.get_metric_history("workflow_execution_time")
+        assert timed.labels == {"node": "stylist"}
+        assert collector.get_metric_history("missing") == []
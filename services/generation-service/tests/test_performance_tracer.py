@@ -0,0 +1,150 @@
+"""
+Tests for tail-based trace sampling and OTLP export
+"""
+
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from generation_service.api.performance_endpoints import PerformanceAPI
+from generation_service.logging import performance_tracer as tracer_module
+from generation_service.logging.performance_tracer import (
+    PerformanceTracer,
+    SpanType,
+    Trace,
+    TraceStore,
+)
+
+
+def run_trace(
+    tracer: PerformanceTracer,
+    name: str,
+    duration: float = 0.01,
+    error: bool = False,
+) -> str:
+    """Record a trace with one child span, backdated to last ``duration``"""
+    context = tracer.create_trace(name)
+    root = tracer._active_spans[context.parent_span_id]
+    root.start_time -= timedelta(seconds=duration)
+
+    child = tracer.start_span("llm call", SpanType.AI_API, context=context)
+    child.add_log("retrying", attempt=2)
+    tracer.finish_span(child, ValueError("provider failed") if error else None)
+    tracer.finish_span(root)
+    return context.trace_id
+
+
+def create_tracer(**config) -> PerformanceTracer:
+    return PerformanceTracer(
+        {"decision_wait": 0.0, "slow_trace_threshold": 1.0, **config}
+    )
+
+
+def test_slow_and_error_traces_are_always_kept():
+    tracer = create_tracer(sample_rate=0.0)
+
+    normal = [run_trace(tracer, f"normal-{index}") for index in range(20)]
+    slow = run_trace(tracer, "slow", duration=3.0)
+    failed = run_trace(tracer, "failed", error=True)
+    tracer._flush_decisions()
+
+    assert tracer.get_trace(normal[0]) is None
+    assert [t.trace_id for t in tracer.find_slow_traces(1.0)] == [slow]
+    assert tracer.find_slow_traces(10.0) == []
+    assert [t.trace_id for t in tracer.find_error_traces()] == [failed]
+    assert len(tracer.get_trace(slow).spans) == 2
+
+    stats = tracer.get_performance_analysis()["sampling"]
+    assert stats["dropped"] == 20
+    assert stats["kept_slow"] == 1
+    assert stats["kept_error"] == 1
+
+
+def test_decision_waits_for_late_spans():
+    """Spans finishing after the root are buffered until the decision"""
+    tracer = create_tracer(decision_wait=60.0, sample_rate=0.0)
+    context = tracer.create_trace("request")
+    late = tracer.start_span("background", context=context)
+    tracer.finish_span(tracer._active_spans[context.parent_span_id])
+    tracer.finish_span(late, RuntimeError("late failure"))
+
+    assert tracer.find_error_traces() == []
+    tracer._flush_decisions(now=tracer._completed[0][0])
+    assert [t.trace_id for t in tracer.find_error_traces()] == [context.trace_id]
+
+
+def test_late_span_reindexes_stored_trace():
+    """A span finishing after the decision updates the stored trace's indexes"""
+    tracer = create_tracer(sample_rate=1.0)
+    context = tracer.create_trace("request")
+    late = tracer.start_span("background", context=context)
+    tracer.finish_span(tracer._active_spans[context.parent_span_id])
+    assert tracer.find_slow_traces(1.0) == []
+    assert tracer._store.stats()["interesting"] == 0
+
+    late.start_time -= timedelta(seconds=3.0)
+    tracer.finish_span(late, RuntimeError("late failure"))
+
+    assert [t.trace_id for t in tracer.find_slow_traces(2.5)] == [context.trace_id]
+    assert [t.trace_id for t in tracer.find_error_traces()] == [context.trace_id]
+    assert tracer._store.stats()["interesting"] == 1
+
+
+def test_cleanup_skips_traces_without_end_time():
+    store = TraceStore()
+    now = datetime.now()
+    open_trace = Trace(trace_id="open", root_span_id="root")
+    old = Trace(trace_id="old", root_span_id="root", end_time=now - timedelta(hours=2))
+    recent = Trace(trace_id="recent", root_span_id="root", end_time=now)
+    for trace in (open_trace, old, recent):
+        store.add(trace, interesting=False, has_error=False)
+
+    assert store.remove_ended_before(now - timedelta(hours=1)) == 1
+    assert "old" not in store
+    assert "open" in store and "recent" in store
+
+
+def test_storage_is_bounded_and_evicts_sampled_first():
+    tracer = create_tracer(sample_rate=1.0, max_traces=5)
+    slow = run_trace(tracer, "slow", duration=2.0)
+    for index in range(10):
+        run_trace(tracer, f"normal-{index}")
+
+    assert len(tracer._store) == 5
+    assert tracer.get_trace(slow) is not None
+    assert tracer._store.stats()["evicted"] == 6
+
+    tracer = create_tracer(sample_rate=0.0, max_pending_traces=3)
+    for index in range(5):
+        tracer.create_trace(f"open-{index}")
+    assert len(tracer._pending) == 3
+
+
+def test_otlp_export(monkeypatch):
+    tracer = create_tracer(sample_rate=0.0)
+    trace_id = run_trace(tracer, "failed", error=True)
+    monkeypatch.setattr(tracer_module, "_performance_tracer", tracer)
+
+    app = FastAPI()
+    app.include_router(PerformanceAPI().router)
+    response = TestClient(app).get("/api/performance/traces/otlp?kind=error")
+    assert response.status_code == 200
+
+    resource_spans = response.json()["resourceSpans"][0]
+    assert resource_spans["resource"]["attributes"][0]["value"] == {
+        "stringValue": "generation-service"
+    }
+    spans = {s["name"]: s for s in resource_spans["scopeSpans"][0]["spans"]}
+    root, child = spans["failed"], spans["llm call"]
+
+    assert root["traceId"] == trace_id.replace("-", "")
+    assert len(root["spanId"]) == 16
+    assert child["parentSpanId"] == root["spanId"]
+    assert child["kind"] == 3
+    assert child["status"] == {"code": 2, "message": "provider failed"}
+    assert int(child["endTimeUnixNano"]) >= int(child["startTimeUnixNano"])
+    assert child["events"][0]["name"] == "retrying"
+    assert child["events"][0]["attributes"] == [
+        {"key": "attempt", "value": {"intValue": "2"}}
+    ]
@@ -0,0 +1,120 @@
+"""
+Tests for pipelined architect/stylist hand-off
+"""
+
+import asyncio
+
+import pytest
+
+from generation_service.workflows.pipelining import (
+    OutlineSplitter,
+    ScenePipeline,
+    active_pipeline,
+    generate_into_pipeline,
+    use_pipeline,
+)
+
+STRUCTURE = """Premise: a courier loses a package.
+Characters: MINA, JUN
+
+## Act 1
+Mina picks up the package at dawn.
+
+## Act 2
+The package goes missing on the subway.
+
+## Act 3
+Jun returns it."""
+
+
+class FakeProvider:
+    """Streams the structure line by line, checking who is waiting on it"""
+
+    def __init__(self, stream: bool = True) -> None:
+        self.stream = stream
+        self.styled_during_stream = 0
+        self.styled: list[str] = []
+
+    async def generate_stream(self, request):
+        if not self.stream:
+            raise NotImplementedError
+        for line in STRUCTURE.splitlines(keepends=True):
+            await asyncio.sleep(0)
+            self.styled_during_stream = max(self.styled_during_stream, len(self.styled))
+            yield line
+
+    async def generate_with_retry(self, request):
+        class Response:
+            content = STRUCTURE
+
+        return Response()
+
+
+class TestOutlineSplitter:
+    """Test incremental splitting of streamed outlines"""
+
+    def test_split_streamed_outline(self):
+        """Headings split outlines regardless of chunk boundaries"""
+        splitter = OutlineSplitter(min_chars=0)
+        outlines = []
+        for start in range(0, len(STRUCTURE), 7):
+            outlines.extend(splitter.feed(STRUCTURE[start : start + 7]))
+        # The last act is only complete once the stream ends
+        assert len(outlines) == 2
+        outlines.extend(splitter.close())
+
+        assert splitter.preamble.startswith("Premise:")
+        assert [outline.splitlines()[0] for outline in outlines] == [
+            "## Act 1",
+            "## Act 2",
+            "## Act 3",
+        ]
+
+    def test_short_outlines_merge_forward(self):
+        """Outlines below the minimum size are styled with the next one"""
+        splitter = OutlineSplitter(min_chars=60)
+        outlines = splitter.feed(STRUCTURE) + splitter.close()
+        assert len(outlines) == 2
+        assert outlines[0].startswith("## Act 1") and "## Act 2" in outlines[0]
+
+
+class TestScenePipeline:
+    """Test overlap and ordering of the pipelined stage"""
+
+    @pytest.mark.asyncio
+    async def test_stage_overlaps_stream(self):
+        """Outlines are styled before the stream ends and joined in order"""
+        provider = FakeProvider()
+
+        async def stage(outline: str, preamble: str) -> str:
+            assert preamble.startswith("Premise:")
+            provider.styled.append(outline)
+            await asyncio.sleep(0.01 if "Act 1" in outline else 0)
+            return outline.splitlines()[0]
+
+        pipeline = ScenePipeline(stage, max_concurrency=2, min_outline_chars=0)
+        with use_pipeline(pipeline):
+            assert active_pipeline() is pipeline
+            structure = await generate_into_pipeline(provider, None, pipeline)
+        assert active_pipeline() is None
+
+        assert structure == STRUCTURE
+        assert provider.styled_during_stream >= 1
+        assert await pipeline.collect() == ["## Act 1", "## Act 2", "## Act 3"]
+        stats = pipeline.get_stats()
+        assert stats["outlines"] == 3
+        assert stats["first_handoff"] <= stats["upstream_finished"]
+
+    @pytest.mark.asyncio
+    async def test_non_streaming_provider_falls_back(self):
+        """Providers without streaming hand over the whole text at once"""
+        pipeline = ScenePipeline(
+            lambda outline, preamble: asyncio.sleep(0, result=outline),
+            min_outline_chars=0,
+        )
+        structure = await generate_into_pipeline(
+            FakeProvider(stream=False), None, pipeline
+        )
+
+        assert structure == STRUCTURE
+        assert len(await pipeline.collect()) == 3
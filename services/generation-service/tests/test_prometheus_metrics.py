@@ -0,0 +1,40 @@
+"""
+Tests for the Prometheus metrics endpoint
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from generation_service.api import metrics
+from generation_service.monitoring.prometheus_metrics import (
+    observe_llm_request,
+    observe_rag_stage,
+    record_job_finished,
+)
+
+
+def test_metrics_endpoint_exposes_registry_series():
+    """Recorded requests, LLM calls, RAG stages and jobs are scrapeable"""
+    app = FastAPI()
+    app.include_router(metrics.router, prefix="/api/v1")
+
+    metrics.increment_request_counter(0.2, "POST", 503)
+    observe_llm_request("anthropic", 3.2, 900)
+    observe_rag_stage("search", 0.03)
+    record_job_finished("failed")
+
+    response = TestClient(app).get("/api/v1/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'generation_service_requests_total{method="POST",status="503"}' in text
+    assert (
+        'generation_service_llm_request_duration_seconds_bucket{provider="anthropic",le="5.0"}'
+        in text
+    )
+    assert 'generation_service_llm_tokens_sum{provider="anthropic"}' in text
+    assert 'generation_service_rag_stage_duration_seconds_count{stage="search"}' in text
+    assert "# TYPE generation_service_jobs_failed_total counter" in text
+    assert "generation_service_sse_first_event_duration_seconds_count" in text
+    assert "generation_service_jobs_active" in text
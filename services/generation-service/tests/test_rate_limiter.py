@@ -0,0 +1,139 @@
+"""
+Tests for the sliding-window-counter rate limiters
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from generation_service.middleware import (
+    RateLimitPolicy,
+    RedisRateLimiter,
+    SlidingWindowRateLimiter,
+)
+from generation_service.middleware.security_middleware import RateLimitingMiddleware
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_020.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSlidingWindowRateLimiter:
+    """Test the in-process limiter's window estimate and eviction"""
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        """Half a window later, half of the previous window still counts"""
+        clock = FakeClock(1_000_000.0)
+        limiter = SlidingWindowRateLimiter(clock=clock)
+        policy = RateLimitPolicy(calls=10, period=60)
+
+        decisions = [limiter.hit_sync("client", policy) for _ in range(11)]
+        assert [d.allowed for d in decisions] == [True] * 10 + [False]
+        assert decisions[9].remaining == 0
+        assert decisions[10].retry_after == pytest.approx(20)
+        assert decisions[0].reset_at == 1_000_020.0
+
+        # 30s into the next window: 10 * 0.5 = 5 previous requests remain
+        clock.now = 1_000_050.0
+        decisions = [limiter.hit_sync("client", policy) for _ in range(6)]
+        assert [d.allowed for d in decisions] == [True] * 5 + [False]
+        assert 0 < decisions[5].retry_after <= 30
+
+        assert limiter.hit_sync("other", policy).remaining == 9
+
+    def test_idle_keys_are_evicted(self):
+        """Keys untouched for two periods are dropped on the request path"""
+        clock = FakeClock()
+        limiter = SlidingWindowRateLimiter(eviction_interval=30, clock=clock)
+        policy = RateLimitPolicy(calls=5, period=10)
+
+        for index in range(100):
+            limiter.hit_sync(f"client-{index}", policy)
+        assert len(limiter) == 100
+
+        clock.now += 31
+        limiter.hit_sync("client-new", policy)
+        assert len(limiter) == 1
+
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class TestRedisRateLimiter:
+    """Test the shared limiter's Lua script and local fallback"""
+
+    @pytest.mark.asyncio
+    async def test_limit_is_shared_between_limiters(self):
+        """Two workers' limiters draw from the same counters"""
+        redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        clock = FakeClock(1_000_000.0)
+        workers = [RedisRateLimiter(redis_client, clock=clock) for _ in range(2)]
+        policy = RateLimitPolicy(calls=4, period=60)
+
+        allowed = [
+            (await workers[index % 2].hit("client", policy)).allowed
+            for index in range(6)
+        ]
+        assert allowed == [True] * 4 + [False] * 2
+
+        # Half a window later the previous window counts for 2 of the 4 calls
+        clock.now = 1_000_050.0
+        decision = await workers[0].hit("client", policy)
+        assert decision.allowed
+        assert decision.remaining == 1
+
+        ttl = await redis_client.pttl("ratelimit:{client}:60:16667")
+        assert 0 < ttl <= 120_000
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local_limits(self):
+        """Redis errors fall back to per-process counting"""
+
+        class BrokenRedis:
+            def register_script(self, script):
+                async def run(keys, args):
+                    raise ConnectionError("redis down")
+
+                return run
+
+        limiter = RedisRateLimiter(BrokenRedis())
+        policy = RateLimitPolicy(calls=1, period=60)
+
+        assert (await limiter.hit("client", policy)).allowed
+        assert not (await limiter.hit("client", policy)).allowed
+
+
+def test_route_and_tenant_policies():
+    """Routes get their own counters and tenants their own limits"""
+    app = FastAPI()
+
+    @app.get("/api/v1/generate")
+    async def generate():
+        return {}
+
+    @app.get("/api/v1/projects")
+    async def projects():
+        return {}
+
+    app.add_middleware(
+        RateLimitingMiddleware,
+        calls=3,
+        route_policies={"/api/v1/generate": RateLimitPolicy(calls=1, period=60)},
+        tenant_policies={"premium": RateLimitPolicy(calls=2, period=60)},
+        tenant_header="X-Tenant-Id",
+    )
+    client = TestClient(app)
+
+    assert client.get("/api/v1/generate").status_code == 200
+    assert client.get("/api/v1/generate").status_code == 429
+    assert client.get("/api/v1/projects").headers["X-RateLimit-Remaining"] == "2"
+
+    premium = {"X-Tenant-Id": "premium"}
+    statuses = [
+        client.get("/api/v1/generate", headers=premium).status_code for _ in range(3)
+    ]
+    assert statuses == [200, 200, 429]
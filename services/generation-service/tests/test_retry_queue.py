@@ -0,0 +1,272 @@
+"""
+Tests for the Redis-backed retry queue
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from generation_service.api import retry_endpoints
+from generation_service.services import retry_queue as retry_queue_module
+from generation_service.services.retry_queue import (
+    JobStatus,
+    JobType,
+    RetryJob,
+    RetryQueue,
+    RetryQueueWorker,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_client():
+    """In-memory async Redis with Lua support"""
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+class TestRetryQueue:
+    """Test claiming, retries and visibility timeout recovery"""
+
+    @pytest.mark.asyncio
+    async def test_claim_moves_job_to_processing(self, redis_client):
+        """Claimed jobs leave the ready set and carry their payload"""
+        queue = RetryQueue(redis_client)
+        job_id = await queue.enqueue_job(JobType.SAVE_EPISODE, {"episode": 1})
+
+        jobs = await queue.claim_jobs()
+        assert [job.id for job in jobs] == [job_id]
+        assert jobs[0].payload == {"episode": 1}
+
+        stats = await queue.get_queue_stats()
+        assert stats["pending"] == 0
+        assert stats["processing"] == 1
+
+        # A second claim must not hand out the same job
+        assert await queue.claim_jobs() == []
+
+    @pytest.mark.asyncio
+    async def test_delayed_job_not_claimed_early(self, redis_client):
+        """Jobs are only claimable once their scheduled time has passed"""
+        queue = RetryQueue(redis_client)
+        await queue.enqueue_job(JobType.SAVE_EPISODE, {}, delay_seconds=60)
+
+        assert await queue.claim_jobs() == []
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_recovered(self, redis_client):
+        """Jobs stuck in processing are requeued after the visibility timeout"""
+        queue = RetryQueue(redis_client, visibility_timeout=0.05)
+        job_id = await queue.enqueue_job(JobType.SAVE_EPISODE, {})
+
+        assert len(await queue.claim_jobs()) == 1
+        await asyncio.sleep(0.1)
+
+        reclaimed = await queue.claim_jobs()
+        assert [job.id for job in reclaimed] == [job_id]
+
+    @pytest.mark.asyncio
+    async def test_failed_job_moves_to_dlq(self, redis_client):
+        """Jobs that exhaust their attempts end up in the dead letter queue"""
+        queue = RetryQueue(redis_client)
+
+        async def failing_processor(payload):
+            raise RuntimeError("project-service unavailable")
+
+        queue.register_processor(JobType.SAVE_EPISODE, failing_processor)
+        job_id = await queue.enqueue_job(JobType.SAVE_EPISODE, {}, max_attempts=1)
+
+        jobs = await queue.claim_jobs()
+        assert await queue.process_job(jobs[0]) is False
+
+        job = await queue.get_job_status(job_id)
+        assert job.status == JobStatus.DEAD
+        assert job.last_error == "project-service unavailable"
+        stats = await queue.get_queue_stats()
+        assert stats["dead_letter"] == 1
+        assert stats["processing"] == 0
+
+    @pytest.mark.asyncio
+    async def test_worker_wakes_on_enqueue(self, redis_client):
+        """An idle worker picks up new jobs without waiting out max_wait"""
+        queue = RetryQueue(redis_client)
+        processed = asyncio.Event()
+
+        async def processor(payload):
+            processed.set()
+
+        queue.register_processor(JobType.CLEANUP_CACHE, processor)
+        worker = RetryQueueWorker(queue, max_wait=30.0)
+        worker_task = asyncio.create_task(worker.start())
+
+        await asyncio.sleep(0.05)
+        await queue.enqueue_job(JobType.CLEANUP_CACHE, {})
+        await asyncio.wait_for(processed.wait(), timeout=2.0)
+
+        await worker.stop()
+        worker_task.cancel()
+        await asyncio.gather(worker_task, return_exceptions=True)
+
+    @pytest.mark.asyncio
+    async def test_legacy_queue_is_migrated_on_start(self, redis_client):
+        """Jobs in the single pre-split sets are moved and then processed"""
+        queue = RetryQueue(redis_client)
+        now = datetime.utcnow()
+        for job_id, job_type in (
+            ("ready", JobType.SAVE_EPISODE),
+            ("leased", JobType.CLEANUP_CACHE),
+        ):
+            job = RetryJob(
+                id=job_id,
+                job_type=job_type,
+                payload={},
+                created_at=now,
+                scheduled_at=now,
+                attempt=0,
+                max_attempts=3,
+                status=JobStatus.PENDING,
+            )
+            await redis_client.hset(f"job:{job_id}", mapping=job.to_redis())
+        await redis_client.zadd("retry_queue", {"ready": time.time(), "gone": 0})
+        # Lease of a worker that died before the upgrade
+        await redis_client.zadd("processing_jobs", {"leased": time.time() - 1})
+
+        processed = []
+
+        async def processor(payload):
+            processed.append(payload)
+
+        queue.register_processor(JobType.SAVE_EPISODE, processor)
+        queue.register_processor(JobType.CLEANUP_CACHE, processor)
+        worker = RetryQueueWorker(queue, max_wait=0.1)
+        worker_task = asyncio.create_task(worker.start())
+        for _ in range(50):
+            if len(processed) == 2:
+                break
+            await asyncio.sleep(0.02)
+        await worker.stop()
+        await asyncio.wait_for(worker_task, timeout=2.0)
+
+        assert len(processed) == 2
+        assert await redis_client.exists("retry_queue", "processing_jobs") == 0
+        assert (await queue.get_job_status("leased")).status == JobStatus.COMPLETED
+
+
+class TestConcurrentProcessing:
+    """Test per-type concurrency limits, deadlines and reporting"""
+
+    @pytest.mark.asyncio
+    async def test_slow_type_does_not_block_other_types(self, redis_client):
+        """A saturated job type leaves room for other job types"""
+        queue = RetryQueue(redis_client)
+        release = asyncio.Event()
+        cleaned = asyncio.Event()
+
+        async def slow_save(payload):
+            await release.wait()
+
+        async def cleanup(payload):
+            cleaned.set()
+
+        queue.register_processor(JobType.SAVE_GENERATION, slow_save, max_concurrency=1)
+        queue.register_processor(JobType.CLEANUP_CACHE, cleanup)
+
+        worker = RetryQueueWorker(queue, max_wait=0.1)
+        worker_task = asyncio.create_task(worker.start())
+
+        await queue.enqueue_job(JobType.SAVE_GENERATION, {})
+        await queue.enqueue_job(JobType.SAVE_GENERATION, {})
+        await queue.enqueue_job(JobType.CLEANUP_CACHE, {})
+
+        await asyncio.wait_for(cleaned.wait(), timeout=2.0)
+        assert queue.stats[JobType.SAVE_GENERATION].in_flight == 1
+
+        release.set()
+        await asyncio.sleep(0.1)
+        await worker.stop()
+        await asyncio.wait_for(worker_task, timeout=2.0)
+
+        report = queue.get_processor_report()
+        assert report["save_generation"]["succeeded"] == 2
+        assert report["save_generation"]["max_concurrency"] == 1
+        assert report["cleanup_cache"]["succeeded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_deadline_fails_job(self, redis_client):
+        """Jobs exceeding their deadline are failed and rescheduled"""
+        queue = RetryQueue(redis_client, base_delay=60.0)
+
+        async def hanging(payload):
+            await asyncio.sleep(10)
+
+        queue.register_processor(JobType.SAVE_EPISODE, hanging, timeout_seconds=0.05)
+        job_id = await queue.enqueue_job(JobType.SAVE_EPISODE, {})
+
+        jobs = await queue.claim_jobs()
+        assert await queue.process_job(jobs[0]) is False
+
+        job = await queue.get_job_status(job_id)
+        assert job.status == JobStatus.PENDING
+        assert "Timed out" in job.last_error
+        assert queue.get_processor_report()["save_episode"]["timed_out"] == 1
+
+    @pytest.mark.asyncio
+    async def test_backlog_of_one_type_does_not_starve_others(self, redis_client):
+        """Jobs are claimed per type, so a backlog stays queued, not leased"""
+        queue = RetryQueue(redis_client)
+        release = asyncio.Event()
+        cleaned = asyncio.Event()
+
+        async def slow_save(payload):
+            await release.wait()
+
+        async def cleanup(payload):
+            cleaned.set()
+
+        queue.register_processor(JobType.SAVE_GENERATION, slow_save, max_concurrency=1)
+        queue.register_processor(JobType.CLEANUP_CACHE, cleanup)
+        for index in range(20):
+            await queue.enqueue_job(JobType.SAVE_GENERATION, {"index": index})
+        await queue.enqueue_job(JobType.CLEANUP_CACHE, {})
+
+        # Freed slots wake the worker, so the backlog drains without max_wait
+        worker = RetryQueueWorker(queue, max_wait=5.0)
+        worker_task = asyncio.create_task(worker.start())
+
+        await asyncio.wait_for(cleaned.wait(), timeout=2.0)
+        stats = await queue.get_queue_stats()
+        assert stats["pending"] == 19
+        assert stats["processing"] == 1
+
+        release.set()
+        for _ in range(50):
+            if queue.stats[JobType.SAVE_GENERATION].succeeded == 20:
+                break
+            await asyncio.sleep(0.02)
+        await worker.stop()
+        worker_task.cancel()
+        await asyncio.gather(worker_task, return_exceptions=True)
+
+        assert queue.stats[JobType.SAVE_GENERATION].succeeded == 20
+        assert (await queue.get_queue_stats())["total"] == 0
+
+    def test_processor_stats_window_is_validated(self, redis_client, monkeypatch):
+        """Non-positive or unretained windows are rejected before division"""
+        monkeypatch.setattr(
+            retry_queue_module, "_global_retry_queue", RetryQueue(redis_client)
+        )
+        app = FastAPI()
+        app.include_router(retry_endpoints.router)
+        client = TestClient(app)
+
+        for window in ("0", "-5", "7200"):
+            response = client.get(
+                "/api/v1/retry/processors/stats", params={"window_seconds": window}
+            )
+            assert response.status_code == 422
+        response = asyncio.run(retry_endpoints.get_processor_stats(window_seconds=30))
+        assert response.data["save_generation"]["throughput_per_second"] == 0.0
@@ -0,0 +1,141 @@
+"""
+Tests for the sampling profiler and its performance API control
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from generation_service.api.performance_endpoints import PerformanceAPI
+from generation_service.logging.debug_tools import DebugTools
+from generation_service.logging.sampling_profiler import SamplingProfiler
+
+
+def busy_loop(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def waiting_for_event(event: asyncio.Event) -> None:
+    await event.wait()
+
+
+def test_thread_and_task_stacks_are_sampled():
+    """CPU-bound code shows in thread stacks, suspended coroutines in tasks"""
+
+    async def scenario():
+        event = asyncio.Event()
+        waiter = asyncio.create_task(waiting_for_event(event))
+        await asyncio.sleep(0)
+
+        profiler = SamplingProfiler(interval=0.002)
+        profiler.start()
+        busy_loop(0.2)
+        await asyncio.sleep(0.05)
+        profiler.stop()
+
+        event.set()
+        await waiter
+        return profiler
+
+    profiler = asyncio.run(scenario())
+
+    assert profiler.samples > 10
+    top_threads = profiler.top(5, "threads")
+    assert top_threads[0]["function"].startswith("busy_loop (tests/")
+    assert top_threads[0]["self_percent"] > 30
+
+    task_functions = {
+        row["function"].split(" ")[0] for row in profiler.top(50, "tasks")
+    }
+    assert "wait" in task_functions
+
+    collapsed = profiler.collapsed("tasks").splitlines()
+    assert any(
+        line.startswith("asyncio-tasks;waiting_for_event (") and ";wait (" in line
+        for line in collapsed
+    )
+    _, count = collapsed[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def test_debug_tools_rejects_concurrent_profiles():
+    debug_tools = DebugTools()
+    debug_tools.start_sampling_profiler(interval=0.01)
+    try:
+        with pytest.raises(RuntimeError):
+            debug_tools.start_sampling_profiler()
+    finally:
+        profiler = debug_tools.stop_sampling_profiler()
+    assert not profiler.running
+
+
+def test_profile_endpoints():
+    app = FastAPI()
+    app.include_router(PerformanceAPI().router)
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/performance/profile",
+        json={"duration_seconds": 0.1, "interval_ms": 2, "top": 5},
+    )
+    assert response.status_code == 200
+    profile = response.json()["profile"]
+    assert profile["samples"] > 0
+    assert len(profile["top_threads"]) <= 5
+
+    assert client.get("/api/performance/profile").json()["profile"]["samples"] > 0
+    response = client.get("/api/performance/profile/collapsed?kind=threads")
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.text.startswith("thread:")
+    assert client.get("/api/performance/profile/collapsed?kind=x").status_code == 400
+
+    response = client.post("/api/performance/profile", json={"duration_seconds": 600})
+    assert response.status_code == 422
+
+
+def recurse(depth: int) -> None:
+    if depth:
+        recurse(depth - 1)
+    else:
+        busy_loop(0.0005)
+
+
+def test_report_can_be_read_while_sampling():
+    """Reads work on a copy while the sampler thread adds new stacks"""
+    profiler = SamplingProfiler(interval=0.0005, include_tasks=False)
+    errors = []
+    stop = threading.Event()
+
+    def read_reports():
+        while not stop.is_set():
+            try:
+                profiler.report(5)
+                profiler.collapsed()
+            except Exception as e:
+                errors.append(e)
+                return
+
+    reader = threading.Thread(target=read_reports)
+    profiler.start()
+    reader.start()
+    try:
+        # Every depth is a new stack, so the counters keep growing
+        deadline = time.perf_counter() + 0.5
+        depth = 0
+        while time.perf_counter() < deadline:
+            recurse(depth % 200)
+            depth += 1
+    finally:
+        stop.set()
+        reader.join()
+        profiler.stop()
+
+    assert errors == []
+    assert profiler.samples > 10
+    assert len(profiler.thread_stacks) > 10
@@ -0,0 +1,110 @@
+"""
+Tests for the write-behind save batcher
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from generation_service.services.save_batcher import SaveBatcher, SaveBatchError
+
+
+def make_client(requests: list[dict], status_code: int = 200) -> httpx.AsyncClient:
+    """Build a client whose bulk endpoint records requests and saves every item"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requests.append({"url": str(request.url), "items": body["items"]})
+        results = [
+            {
+                "key": item["key"],
+                "id": item["episodeId"] or "new-episode",
+                "status": "updated" if item["episodeId"] else "created",
+            }
+            for item in body["items"]
+        ]
+        return httpx.Response(status_code, json={"data": {"results": results}})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def episode_item(episode_id: str, markdown: str) -> dict:
+    return {"episodeId": episode_id, "script": {"markdown": markdown}}
+
+
+class TestSaveBatcher:
+    """Test coalescing, batching and commit acknowledgement"""
+
+    @pytest.mark.asyncio
+    async def test_coalesces_saves_per_episode(self):
+        """Several saves of one episode become a single last-write-wins item"""
+        requests: list[dict] = []
+        batcher = SaveBatcher(
+            "http://project", flush_interval=0.05, client=make_client(requests)
+        )
+
+        results = await asyncio.gather(
+            batcher.save("p1", "ep-1", episode_item("ep-1", "v1"), version=1.0),
+            batcher.save("p1", "ep-1", episode_item("ep-1", "v3"), version=3.0),
+            batcher.save("p1", "ep-1", episode_item("ep-1", "v2"), version=2.0),
+            batcher.save("p1", "ep-2", episode_item("ep-2", "other"), version=1.0),
+        )
+
+        assert len(requests) == 1
+        assert requests[0]["url"] == "http://project/api/v1/projects/p1/episodes/_bulk"
+        items = {item["key"]: item for item in requests[0]["items"]}
+        assert items["ep-1"]["script"]["markdown"] == "v3"
+        assert all(result["status"] == "updated" for result in results)
+
+        stats = batcher.get_stats()
+        assert stats["coalesced"] == 2
+        assert stats["items_flushed"] == 2
+
+        # An older write arriving after a newer commit is dropped
+        stale = await batcher.save("p1", "ep-1", episode_item("ep-1", "v0"), 0.5)
+        assert stale["status"] == "superseded"
+        assert len(requests) == 1
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_batch_full(self):
+        """A full batch is sent without waiting for the flush interval"""
+        requests: list[dict] = []
+        batcher = SaveBatcher(
+            "http://project",
+            max_batch_size=2,
+            flush_interval=30.0,
+            client=make_client(requests),
+        )
+
+        await asyncio.wait_for(
+            asyncio.gather(
+                batcher.save("p1", "ep-1", episode_item("ep-1", "a")),
+                batcher.save("p1", "ep-2", episode_item("ep-2", "b")),
+            ),
+            timeout=1.0,
+        )
+        assert len(requests) == 1
+        await batcher.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_rejects_every_waiter(self):
+        """Callers see an error so their retry jobs are not acknowledged"""
+        requests: list[dict] = []
+        batcher = SaveBatcher(
+            "http://project",
+            flush_interval=0.01,
+            client=make_client(requests, status_code=503),
+        )
+
+        results = await asyncio.gather(
+            batcher.save("p1", "ep-1", episode_item("ep-1", "a")),
+            batcher.save("p1", "ep-1", episode_item("ep-1", "b")),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, SaveBatchError) for result in results)
+        assert batcher.get_stats()["failed_batches"] == 1
+        await batcher.close()
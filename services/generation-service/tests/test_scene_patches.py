@@ -0,0 +1,222 @@
+"""
+Tests for scene-scoped agent patches and their merge
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from generation_service.workflows.agents import (
+    AgentCoordinator,
+    SceneVisualizerAgent,
+    build_scene_index,
+    diff_scene_patches,
+    merge_scene_patches,
+)
+from generation_service.workflows.agents.scene_patches import shard_script
+
+BASE_SCRIPT = """TITLE: THE MEETING
+
+INT. OFFICE - DAY
+
+JOHN sits at his desk.
+
+JOHN
+I need this deal.
+
+EXT. PARK - NIGHT
+
+MARY walks alone.
+
+MARY
+Where is he?
+"""
+
+
+class TestScenePatches:
+    """Test scene indexing, patch extraction and three-way merge"""
+
+    def test_scene_index(self):
+        """Scripts split at scene headings with a preamble scene"""
+        scenes = build_scene_index(BASE_SCRIPT)
+
+        assert [scene.heading for scene in scenes] == [
+            "",
+            "INT. OFFICE - DAY",
+            "EXT. PARK - NIGHT",
+        ]
+        assert "".join(scene.text for scene in scenes) == BASE_SCRIPT
+
+    def test_edits_to_different_scenes_are_combined(self):
+        """Parallel agents editing different scenes both contribute"""
+        dialogue = BASE_SCRIPT.replace(
+            "I need this deal.", "This deal is my last shot."
+        )
+        visual = BASE_SCRIPT.replace(
+            "MARY walks alone.", "MARY walks alone under flickering lamps."
+        )
+
+        patches = diff_scene_patches(BASE_SCRIPT, dialogue, "dialogue_enhancer", 5)
+        patches += diff_scene_patches(BASE_SCRIPT, visual, "scene_visualizer", 5)
+        merged, report = merge_scene_patches(BASE_SCRIPT, patches)
+
+        assert [(p.start, p.end) for p in patches] == [(1, 2), (2, 3)]
+        assert "This deal is my last shot." in merged
+        assert "under flickering lamps" in merged
+        assert len(report["applied"]) == 2
+        assert report["rejected"] == []
+
+    def test_same_scene_edits_merge_or_resolve_by_priority(self):
+        """Disjoint line edits merge; overlapping ones go to the higher priority"""
+        action = BASE_SCRIPT.replace(
+            "JOHN sits at his desk.", "JOHN slumps at his desk."
+        )
+        line = BASE_SCRIPT.replace("I need this deal.", "I need this.")
+        rival = BASE_SCRIPT.replace("I need this deal.", "Close the deal.")
+
+        merged, report = merge_scene_patches(
+            BASE_SCRIPT,
+            diff_scene_patches(BASE_SCRIPT, action, "scene_visualizer", 5)
+            + diff_scene_patches(BASE_SCRIPT, line, "dialogue_enhancer", 5),
+        )
+        assert "JOHN slumps at his desk." in merged
+        assert "I need this.\n" in merged
+        assert report["merged"][0]["agent_name"] == "dialogue_enhancer"
+
+        merged, report = merge_scene_patches(
+            BASE_SCRIPT,
+            diff_scene_patches(BASE_SCRIPT, line, "dialogue_enhancer", 5)
+            + diff_scene_patches(BASE_SCRIPT, rival, "tension_builder", 8),
+        )
+        assert "Close the deal." in merged
+        assert report["rejected"] == [
+            {
+                "agent_name": "dialogue_enhancer",
+                "scenes": [1, 2],
+                "reason": "conflict",
+                "winner": "tension_builder",
+            }
+        ]
+
+    def test_coordinator_merges_agent_patches(self):
+        """_merge_agent_results keeps the work of every parallel agent"""
+        coordinator = AgentCoordinator(provider_factory=Mock())
+        state = {"generation_id": "gen-1", "styled_script": BASE_SCRIPT}
+
+        results = []
+        for agent_name, enhanced in (
+            (
+                "dialogue_enhancer",
+                BASE_SCRIPT.replace("Where is he?", "He's late again."),
+            ),
+            ("scene_visualizer", BASE_SCRIPT.replace("sits at", "hunches over")),
+        ):
+            patches = diff_scene_patches(BASE_SCRIPT, enhanced, agent_name)
+            results.append(
+                {
+                    **state,
+                    "enhanced_script": enhanced,
+                    "enhancement_metadata": {
+                        "scene_patches": {
+                            agent_name: [patch.to_dict() for patch in patches]
+                        }
+                    },
+                }
+            )
+
+        merged_state = state
+        for result in results:
+            merged_state = coordinator._merge_agent_results(merged_state, result)
+
+        assert "He's late again." in merged_state["enhanced_script"]
+        assert "JOHN hunches over his desk." in merged_state["enhanced_script"]
+        assert set(merged_state["enhancement_metadata"]["scene_patches"]) == {
+            "dialogue_enhancer",
+            "scene_visualizer",
+        }
+
+    def test_skipped_and_failed_agents_keep_merged_script(self):
+        """Agents that made no patches don't replace the merged script"""
+        coordinator = AgentCoordinator(provider_factory=Mock())
+        state = {
+            "generation_id": "gen-1",
+            "styled_script": BASE_SCRIPT,
+            "enhanced_script": None,
+        }
+        enhanced = BASE_SCRIPT.replace("Where is he?", "He's late again.")
+        patches = diff_scene_patches(BASE_SCRIPT, enhanced, "dialogue_enhancer")
+        completed = {
+            **state,
+            "enhanced_script": enhanced,
+            "enhancement_metadata": {
+                "scene_patches": {
+                    "dialogue_enhancer": [patch.to_dict() for patch in patches]
+                }
+            },
+        }
+        # Both ran on a fork of the state taken before the first agent merged
+        skipped = {**state, "execution_log": [{"status": "skipped"}]}
+        failed = {**state, "has_errors": True}
+
+        merged_state = state
+        for result in (completed, skipped, failed):
+            merged_state = coordinator._merge_agent_results(merged_state, result)
+
+        assert merged_state["enhanced_script"] == enhanced
+        assert set(merged_state["enhancement_metadata"]["scene_patches"]) == {
+            "dialogue_enhancer"
+        }
+
+
+class TestShardedEnhancement:
+    """Test scene-sharded map-reduce enhancement of long scripts"""
+
+    def test_shards_end_at_scene_boundaries(self):
+        """Shards respect the token budget and rejoin to the script"""
+        script = BASE_SCRIPT * 3
+        shards = shard_script(script, token_budget=30)
+
+        assert len(shards) > 1
+        assert "".join(shards) == script
+        assert all(
+            shard.lstrip().startswith(("INT.", "EXT.", "TITLE")) for shard in shards
+        )
+
+    @pytest.mark.asyncio
+    async def test_shards_enhanced_concurrently_and_reassembled(self):
+        """Each shard is a separate concurrent call; a failed shard stays as is"""
+        agent = SceneVisualizerAgent(config={"shard_token_budget": 30})
+        script = BASE_SCRIPT * 3
+        active = 0
+        peak = 0
+
+        async def build_prompt(content, analysis):
+            return f"<<{content}>>"
+
+        async def fake_enhancement(prompt, max_tokens=3000):
+            nonlocal active, peak
+            shard = prompt[2 : prompt.index(">>")]
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if shard.startswith("TITLE"):
+                raise RuntimeError("provider timeout")
+            return {
+                "enhanced_content": shard.replace("alone", "together"),
+                "model_used": "test-model",
+                "tokens_used": 10,
+            }
+
+        agent.execute_ai_enhancement = fake_enhancement
+        result = await agent.execute_sharded_enhancement(script, {}, build_prompt)
+
+        shard_count = len(shard_script(script, 30))
+        assert result["sharding"]["shard_count"] == shard_count
+        assert result["sharding"]["failed_shards"] == [0]
+        assert peak > 1
+        assert result["tokens_used"] == 10 * (shard_count - 1)
+        assert result["enhanced_content"].count("INT. OFFICE - DAY") == 3
+        assert result["enhanced_content"].startswith(BASE_SCRIPT.split("EXT.")[0])
+        assert "together" in result["enhanced_content"]
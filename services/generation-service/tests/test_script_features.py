@@ -0,0 +1,107 @@
+"""
+Tests for the shared single-pass script feature extractor
+"""
+
+import pytest
+
+from generation_service.workflows.agents import (
+    DialogueEnhancerAgent,
+    SceneVisualizerAgent,
+)
+from generation_service.workflows.quality import (
+    QualityAssessor,
+    extract_script_features,
+)
+
+SCRIPT = """FADE IN:
+
+INT. OFFICE - DAY
+
+JOHN sits at his desk. He feels the pressure because the deal is failing.
+
+JOHN
+(quietly)
+I don't know if I can do this.
+Not again.
+
+MARY (V.O.)
+"You can. You always do."
+
+CUT TO:
+
+EXT. PARK - NIGHT
+
+MARY walks alone, suddenly stopping.
+
+FADE OUT."""
+
+
+class TestScriptFeatures:
+    """Test the parsed feature set and its consumers"""
+
+    def test_single_pass_parse(self):
+        """Scenes, cues, dialogue and transitions are classified in one pass"""
+        features = extract_script_features(SCRIPT)
+
+        assert [header.text for header in features.scene_headers] == [
+            "INT. OFFICE - DAY",
+            "EXT. PARK - NIGHT",
+        ]
+        assert features.characters == ("JOHN", "MARY (V.O.)")
+        john = features.dialogue_blocks[0]
+        assert john.lines == ("I don't know if I can do this.", "Not again.")
+        assert john.parentheticals == ("(quietly)",)
+        assert SCRIPT.split("\n")[john.line_indexes[0]] == john.lines[0]
+        assert features.transition_count == 3
+        assert features.quoted_line_count == 1
+        assert features.term_count("JOHN") == 2
+        assert features.count_terms(["because", "feels"]) == 2
+        assert extract_script_features(SCRIPT) is features
+
+    def test_agents_read_shared_features(self):
+        """Agent analysis helpers are derived from the same parse"""
+        dialogue = DialogueEnhancerAgent()._extract_dialogue_data(SCRIPT)
+        assert dialogue["total_dialogue_lines"] == 3
+        assert dialogue["character_dialogue"]["MARY (V.O.)"] == [
+            '"You can. You always do."'
+        ]
+        assert dialogue["dialogue_lines"][0]["line_number"] == 9
+
+        scenes = SceneVisualizerAgent()._extract_scene_descriptions(SCRIPT)
+        assert [scene["type"] for scene in scenes] == ["interior", "exterior"]
+
+    @pytest.mark.asyncio
+    async def test_quality_assessment_uses_features(self):
+        """The structural analysis reflects the parsed script"""
+        assessment = await QualityAssessor().assess_quality(SCRIPT)
+
+        analysis = assessment.content_analysis
+        assert analysis["scene_count"] == 2
+        assert analysis["character_count"] == 2
+        assert analysis["has_clear_beginning"] and analysis["has_resolution"]
+        assert 0.0 <= assessment.overall_score <= 1.0
+
+    @pytest.mark.asyncio
+    async def test_revision_reuses_unchanged_scenes(self):
+        """Comparing a revision only parses and reports the scenes it changed"""
+        revised = SCRIPT.replace("MARY walks alone", "MARY runs through the rain")
+        original = extract_script_features(SCRIPT)
+        enhanced = extract_script_features(revised)
+
+        assert original.scenes[:2] == enhanced.scenes[:2]
+        assert original.scenes[1] is enhanced.scenes[1]
+        assert original.scenes[2].digest != enhanced.scenes[2].digest
+
+        assessor = QualityAssessor({"history_size": 3})
+        comparison = await assessor.compare_assessments(SCRIPT, revised)
+        assert comparison["scene_changes"] == {
+            "total_scenes": 3,
+            "changed_scenes": [2],
+            "unchanged_scenes": 2,
+        }
+
+        again = await assessor.assess_quality(SCRIPT)
+        assert again is comparison["original_assessment"]
+        await assessor.assess_quality(revised)
+        assert len(assessor.assessment_history) == 3
+        assert assessor.get_assessor_stats()["total_assessments"] == 4
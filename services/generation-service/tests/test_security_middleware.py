@@ -0,0 +1,172 @@
+"""
+Tests for the ASGI security and request metrics middleware
+"""
+
+import asyncio
+import hashlib
+import hmac
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from generation_service.middleware import (
+    RateLimitPolicy,
+    RequestMetricsMiddleware,
+    RequestSignatureMiddleware,
+    setup_security_middleware,
+)
+
+
+def create_app(**security_options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            for index in range(3):
+                yield f"data: {index}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.post("/webhook")
+    async def webhook(request: Request):
+        return {"received": (await request.body()).decode()}
+
+    setup_security_middleware(app, **security_options)
+    return app
+
+
+def test_streaming_response_gets_headers_and_passes_through():
+    """SSE chunks reach the server one by one with security headers set"""
+    app = create_app(rate_limit_calls=10)
+    sent = []
+    received = []
+
+    async def receive():
+        if received:
+            # Client stays connected until the stream ends
+            await asyncio.Event().wait()
+        received.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/stream",
+        "raw_path": b"/stream",
+        "root_path": "",
+        "scheme": "http",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "client": ("10.0.0.1", 5000),
+        "server": ("testserver", 80),
+        "http_version": "1.1",
+    }
+    asyncio.run(app(scope, receive, send))
+
+    headers = dict(sent[0]["headers"])
+    assert headers[b"x-frame-options"] == b"DENY"
+    assert headers[b"x-ratelimit-remaining"] == b"9"
+    bodies = [m["body"] for m in sent[1:] if m.get("body")]
+    assert bodies == [b"data: 0\n\n", b"data: 1\n\n", b"data: 2\n\n"]
+
+
+def test_rate_limit_rejects_with_json_error():
+    """Requests over the limit get a 429 instead of an unhandled exception"""
+    client = TestClient(create_app(rate_limit_calls=2))
+
+    assert client.get("/stream").status_code == 200
+    assert client.get("/stream").status_code == 200
+    response = client.get("/stream")
+
+    assert response.status_code == 429
+    assert 0 < int(response.headers["Retry-After"]) <= 60
+    assert response.json()["detail"]["error"] == "Rate limit exceeded"
+    # Excluded paths are not counted
+    assert client.get("/health").status_code == 200
+
+
+def test_tenant_limits_are_configured_through_setup():
+    client = TestClient(
+        create_app(
+            rate_limit_calls=5,
+            rate_limit_tenant_header="X-Tenant-Id",
+            rate_limit_tenant_policies={"acme": RateLimitPolicy(calls=1)},
+        )
+    )
+    acme = {"X-Tenant-Id": "acme"}
+
+    assert client.get("/stream", headers=acme).status_code == 200
+    assert client.get("/stream", headers=acme).status_code == 429
+    # Other tenants keep the default limit
+    other = client.get("/stream", headers={"X-Tenant-Id": "other"})
+    assert other.status_code == 200
+    assert other.headers["X-RateLimit-Limit"] == "5"
+
+
+def test_request_validation_rejects_suspicious_headers():
+    client = TestClient(create_app(enable_rate_limiting=False))
+
+    response = client.get("/health", headers={"X-Note": "<script>alert(1)"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "Invalid request"
+
+
+def test_request_validation_checks_every_value_of_repeated_headers():
+    client = TestClient(create_app(enable_rate_limiting=False))
+
+    response = client.get(
+        "/health",
+        headers=[("Referer", "https://example.com"), ("Referer", "<script>x")],
+    )
+
+    assert response.status_code == 400
+    assert client.get("/health", headers={"Referer": "x"}).status_code == 200
+
+
+def test_signed_request_body_is_replayed():
+    """The body read for the signature check still reaches the endpoint"""
+    app = create_app(enable_rate_limiting=False)
+    app.add_middleware(
+        RequestSignatureMiddleware, secret_key="secret", signed_paths=["/webhook"]
+    )
+    client = TestClient(app)
+    body = b"payload"
+    signature = hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+
+    response = client.post(
+        "/webhook",
+        content=body,
+        headers={"Content-Type": "text/plain", "X-Signature-256": signature},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"received": "payload"}
+
+    response = client.post(
+        "/webhook",
+        content=body,
+        headers={"Content-Type": "text/plain", "X-Signature-256": "sha256=bad"},
+    )
+    assert response.status_code == 401
+
+
+def test_request_metrics_recorded_at_response_start():
+    recorded = []
+    app = create_app(enable_rate_limiting=False)
+    app.add_middleware(
+        RequestMetricsMiddleware,
+        record=lambda seconds, method, status: recorded.append((method, status)),
+    )
+
+    TestClient(app).get("/stream")
+
+    assert recorded == [("GET", 200)]
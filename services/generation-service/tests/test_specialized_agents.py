@@ -2,6 +2,7 @@
 Comprehensive tests for specialized agents system
 """
 
+import asyncio
 from datetime import datetime
 from typing import Any
 from unittest.mock import AsyncMock, Mock
@@ -18,6 +19,7 @@ from generation_service.workflows.agents import (
     AgentExecutionPlan,
     AgentPriority,
     BaseSpecialAgent,
+    CircularDependencyError,
     DialogueEnhancerAgent,
     FlawGeneratorAgent,
     PlotTwisterAgent,
@@ -521,6 +523,103 @@ class TestAgentCoordinator:
         assert "coordination_metadata" in result
         assert result["generation_id"] == sample_state["generation_id"]
 
+    def _fake_execute(self, agent_name: str, delay: float):
+        """Agent execute replacement that sleeps and logs its run"""
+
+        async def execute(state):
+            await asyncio.sleep(delay)
+            result = state.copy()
+            result["enhanced_script"] = f"enhanced by {agent_name}"
+            result["execution_log"].append({"node": f"agent_{agent_name}"})
+            return result
+
+        return execute
+
+    @pytest.mark.asyncio
+    async def test_dag_execution_starts_agents_when_dependencies_finish(
+        self, mock_provider_factory, sample_state
+    ):
+        """A dependent agent does not wait for unrelated slow agents"""
+        factory, _ = mock_provider_factory
+        coordinator = AgentCoordinator(provider_factory=factory)
+
+        delays = {
+            "plot_twister": 0.3,
+            "flaw_generator": 0.01,
+            "dialogue_enhancer": 0.01,
+        }
+        plan = AgentExecutionPlan()
+        for agent_name, delay in delays.items():
+            agent = coordinator.agents[agent_name]
+            agent.execute = self._fake_execute(agent_name, delay)
+            dependencies = (
+                ["flaw_generator"] if agent_name == "dialogue_enhancer" else []
+            )
+            plan.add_agent(agent, dependencies=dependencies)
+        plan.optimize_execution_order()
+
+        result = await coordinator.execute_plan(sample_state, plan)
+
+        execution_plan = result["coordination_metadata"]["execution_plan"]
+        timings = execution_plan["agent_timings"]
+        assert (
+            timings["dialogue_enhancer"]["started_at"]
+            < timings["plot_twister"]["finished_at"]
+        )
+        assert execution_plan["critical_path"] == ["plot_twister"]
+        assert result["coordination_metadata"]["overall_success"] is True
+        assert len(result["execution_log"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_agent_timeout_and_concurrency_limit(
+        self, mock_provider_factory, sample_state
+    ):
+        """Timed out agents are reported as failed and the cap serializes agents"""
+        factory, _ = mock_provider_factory
+        coordinator = AgentCoordinator(
+            provider_factory=factory, config={"max_concurrency": 1}
+        )
+
+        plan = AgentExecutionPlan()
+        slow = coordinator.agents["plot_twister"]
+        slow.execute = self._fake_execute("plot_twister", 1.0)
+        plan.add_agent(slow, {"timeout": 0.05})
+        fast = coordinator.agents["scene_visualizer"]
+        fast.execute = self._fake_execute("scene_visualizer", 0.01)
+        plan.add_agent(fast)
+
+        result = await coordinator.execute_plan(sample_state, plan)
+
+        metadata = result["coordination_metadata"]
+        statuses = {r["agent_name"]: r for r in metadata["execution_results"]}
+        assert statuses["plot_twister"]["status"] == "failed"
+        assert "timed out" in statuses["plot_twister"]["error"]
+        assert statuses["scene_visualizer"]["status"] == "completed"
+        assert (
+            metadata["execution_plan"]["agent_timings"]["scene_visualizer"][
+                "queue_wait"
+            ]
+            > 0.0
+        )
+
+    def test_circular_dependencies_detected(self, mock_provider_factory):
+        """Cycles are rejected up front instead of looping forever"""
+        factory, _ = mock_provider_factory
+        coordinator = AgentCoordinator(provider_factory=factory)
+
+        plan = AgentExecutionPlan()
+        plan.add_agent(
+            coordinator.agents["plot_twister"], dependencies=["flaw_generator"]
+        )
+        plan.add_agent(
+            coordinator.agents["flaw_generator"], dependencies=["plot_twister"]
+        )
+        plan.add_agent(coordinator.agents["scene_visualizer"])
+
+        with pytest.raises(CircularDependencyError) as exc_info:
+            plan.optimize_execution_order()
+        assert set(exc_info.value.agents) == {"plot_twister", "flaw_generator"}
+
 
 class TestQualityAssessor:
     """Test quality assessment functionality"""
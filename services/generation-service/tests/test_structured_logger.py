@@ -0,0 +1,168 @@
+"""
+Tests for the batched structured-log pipeline
+"""
+
+import asyncio
+import json
+import logging
+
+import pytest
+
+from generation_service.logging.structured_logger import (
+    LogContext,
+    LogContextManager,
+    LogLevel,
+    StructuredLogger,
+)
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.levels = []
+
+    def emit(self, record):
+        self.records.append(record.getMessage())
+        self.levels.append(record.levelno)
+
+
+def create_logger(name: str, **config) -> tuple[StructuredLogger, RecordingHandler]:
+    structured = StructuredLogger({"component": name, "log_level": "debug", **config})
+    handler = RecordingHandler()
+    structured.logger.handlers = [handler]
+    return structured, handler
+
+
+@pytest.mark.asyncio
+async def test_context_is_isolated_between_tasks():
+    """Concurrent requests each log with their own context"""
+    structured, _ = create_logger("test-context")
+
+    async def handle(request_id: str):
+        structured.set_context(LogContext(request_id=request_id))
+        await asyncio.sleep(0)
+        structured.update_context(user_id=f"user-{request_id}")
+        await asyncio.sleep(0)
+        structured.info("handled")
+
+    await asyncio.gather(*(handle(f"req-{index}") for index in range(5)))
+
+    for index in range(5):
+        entries = structured.get_logs_by_context(request_id=f"req-{index}")
+        assert len(entries) == 1
+        assert entries[0].context.user_id == f"user-req-{index}"
+    assert structured.current_context.request_id is None
+
+    with LogContextManager(structured, LogContext(workflow_id="wf")):
+        structured.info("inside")
+    structured.info("outside")
+    assert [e.message for e in structured.get_logs_by_context(workflow_id="wf")] == [
+        "inside"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_exception_is_formatted_when_written():
+    structured, handler = create_logger("test-exception")
+    await structured.start_logging()
+    try:
+        raise ValueError("boom")
+    except ValueError as e:
+        structured.error("failed", exception=e)
+
+    # Queued entries hold the exception itself
+    assert isinstance(structured._pending[0].exception, ValueError)
+    await structured.stop_logging()
+
+    written = json.loads(handler.records[0])
+    assert "ValueError: boom" in written["exception"]
+    assert written["message"] == "failed"
+
+
+@pytest.mark.asyncio
+async def test_entries_are_written_in_batches():
+    """The writer serializes queued entries as JSON lines in one record"""
+    structured, handler = create_logger(
+        "test-batches", log_batch_size=50, log_flush_interval=0.01
+    )
+    await structured.start_logging()
+    for index in range(120):
+        structured.info(f"message {index}", item=index)
+    await structured.stop_logging()
+
+    lines = [line for record in handler.records for line in record.split("\n")]
+    assert [json.loads(line)["extra"]["item"] for line in lines] == list(range(120))
+    stats = structured.get_pipeline_stats()
+    assert stats["written"] == 120
+    assert stats["batches"] == 3
+    assert stats["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batched_records_keep_entry_levels():
+    """Handlers filtering by level see warnings and errors at their level"""
+    structured, handler = create_logger("test-levels")
+    await structured.start_logging()
+    structured.info("first")
+    structured.info("second")
+    structured.error("failed")
+    structured.info("after")
+    await structured.stop_logging()
+
+    assert handler.levels == [logging.INFO, logging.ERROR, logging.INFO]
+    assert [len(record.split("\n")) for record in handler.records] == [2, 1, 1]
+    assert json.loads(handler.records[1])["message"] == "failed"
+
+
+@pytest.mark.asyncio
+async def test_overflow_policies():
+    """Under pressure low-level entries are sampled, and a full queue drops"""
+    structured, _ = create_logger(
+        "test-overflow", log_queue_size=100, log_pressure_sample_every=10
+    )
+    await structured.start_logging()
+    for _ in range(200):
+        structured.debug("noise")
+    for _ in range(50):
+        structured.error("important")
+
+    stats = structured.get_pipeline_stats()
+    # 80 before the high-water mark, then one in ten of the next 120
+    assert stats["queued"] == 100
+    assert stats["sampled_out"] == 108
+    assert stats["dropped"] == 42
+    await structured.stop_logging()
+
+    dropping, _ = create_logger(
+        "test-drop", log_queue_size=10, log_overflow_policy="drop"
+    )
+    await dropping.start_logging()
+    for _ in range(15):
+        dropping.debug("noise")
+    assert dropping.get_pipeline_stats()["dropped"] == 5
+    await dropping.stop_logging()
+
+
+def test_tail_queries_and_eviction():
+    structured, _ = create_logger("test-tail", max_log_entries=5)
+    for index in range(8):
+        context = LogContext(session_id=f"session-{index % 2}")
+        level = LogLevel.WARNING if index % 3 == 0 else LogLevel.INFO
+        structured._log(level, f"Event {index}", context=context, step=index)
+
+    assert [e.message for e in structured.get_recent_logs(10)] == [
+        f"Event {index}" for index in range(3, 8)
+    ]
+    assert [
+        e.message for e in structured.get_logs_by_context(session_id="session-1")
+    ] == [
+        "Event 3",
+        "Event 5",
+        "Event 7",
+    ]
+    warnings = structured.get_recent_logs(10, LogLevel.WARNING)
+    assert [e.message for e in warnings] == ["Event 3", "Event 6"]
+    assert [e.message for e in structured.search_logs("event 4")] == ["Event 4"]
+    assert [e.message for e in structured.search_logs("'step': 6")] == ["Event 6"]
+    assert structured.search_logs("Event 1") == []
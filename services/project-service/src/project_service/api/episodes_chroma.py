@@ -48,6 +48,26 @@ class EpisodeUpdateRequest(BaseModel):
     promptSnapshot: str | None = Field(None, description="Updated prompt")
 
 
+class EpisodeBulkItem(BaseModel):
+    """Single create-or-update entry of a bulk save"""
+
+    key: str = Field(..., description="Client correlation key echoed in results")
+    episodeId: str | None = Field(
+        None, description="Episode to update (creates a new episode if omitted)"
+    )
+    title: str | None = Field(None, description="Title for newly created episodes")
+    script: ScriptData = Field(..., description="Script content and metadata")
+    promptSnapshot: str | None = Field(None, description="Prompt used for generation")
+
+
+class EpisodeBulkRequest(BaseModel):
+    """Bulk episode save request"""
+
+    items: list[EpisodeBulkItem] = Field(
+        ..., min_length=1, max_length=500, description="Episodes to save"
+    )
+
+
 class EpisodeResponse(BaseModel):
     """Episode response"""
 
@@ -109,6 +129,38 @@ async def create_episode(
         )
 
 
+@router.post("/_bulk", response_model=SuccessResponse)
+async def bulk_save_episodes(
+    project_id: str, request: EpisodeBulkRequest
+) -> SuccessResponse:
+    """
+    Create or update several episodes in one request
+
+    Items are processed independently; each result carries the item's key
+    and a status of 'created', 'updated', 'not_found' or 'failed'.
+    """
+    try:
+        service = get_episode_service()
+        results = service.bulk_save_episodes(
+            project_id, [item.model_dump() for item in request.items]
+        )
+        failed = sum(1 for result in results if result["status"] == "failed")
+
+        return SuccessResponse(
+            success=failed == 0,
+            message=f"에피소드 {len(results) - failed}/{len(results)}개를 저장했습니다.",
+            data={"results": results},
+        )
+
+    except EpisodeChromaError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"에피소드 일괄 저장 중 오류가 발생했습니다: {e!s}",
+        )
+
+
 @router.get("/", response_model=SuccessResponse)
 async def get_episodes(project_id: str) -> SuccessResponse:
     """
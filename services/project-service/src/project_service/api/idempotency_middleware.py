@@ -1,17 +1,17 @@
 """
-FastAPI middleware for handling idempotency keys in project service
+ASGI middleware for handling idempotency keys in project service
 """
 
 import json
-from collections.abc import Callable
 
 # Always use fallback implementation for type stability
 from datetime import datetime
 from typing import Any
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ai_script_core.utils.asgi import read_body, replay_body, request_headers
 
 CORE_AVAILABLE = False
 
@@ -68,53 +68,69 @@ def store_idempotent_response(
     )
 
 
-class IdempotencyMiddleware(BaseHTTPMiddleware):
-    """FastAPI middleware for handling idempotency keys in project service"""
+# Statuses whose responses are cached for replay
+CACHEABLE_STATUS_CODES = (200, 201, 202)
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware for handling idempotency keys in project service
+
+    Only requests with an applicable method, path and key are touched: their
+    body is read once for the comparison and replayed to the app, and the
+    response body is copied while it is forwarded so it can be cached.
+    """
 
     def __init__(
         self,
-        app: Any,
+        app: ASGIApp,
         header_name: str = "Idempotency-Key",
         ttl_seconds: int = 24 * 3600,  # 24 hours
         methods: set[str] | None = None,
         enabled_paths: set[str] | None = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.header_name = header_name
         self.ttl_seconds = ttl_seconds
         self.methods = methods or {"POST", "PUT", "PATCH"}
         self.enabled_paths = enabled_paths or {"/projects", "/episodes"}
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Any]
-    ) -> Any:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Handle idempotency for applicable requests"""
 
         # Only process applicable methods and paths
-        if request.method not in self.methods or not any(
-            path in request.url.path for path in self.enabled_paths
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in self.methods
+            or not any(path in scope["path"] for path in self.enabled_paths)
         ):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Extract idempotency key from headers
-        idempotency_key = request.headers.get(self.header_name)
+        idempotency_key = request_headers(scope).get(self.header_name.lower())
 
         if not idempotency_key:
             # No idempotency key provided - proceed normally
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Validate key format
         if not self._is_valid_key(idempotency_key):
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=400,
                 content={
                     "success": False,
                     "error": "Invalid idempotency key format",
                 },
             )
+            await response(scope, receive, send)
+            return
 
-        # Get request body for comparison
-        request_body = await self._get_request_body(request)
+        # Get request body for comparison, then replay it to the app
+        body = await read_body(receive)
+        receive = replay_body(body, receive)
+        request_body = self._parse_body(body)
 
         try:
             # Check for existing response
@@ -138,48 +154,72 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
                 response.headers["Idempotency-Key"] = idempotency_key
                 response.headers["Idempotency-Replayed"] = "true"
 
-                return response
+                await response(scope, receive, send)
+                return
 
         except IdempotencyConflictError:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=409,
                 content={
                     "success": False,
                     "error": "Idempotency key conflict - request data differs from original",
                 },
             )
+            await response(scope, receive, send)
+            return
 
         except Exception:
             # Continue without idempotency on errors
             pass
 
         # Store idempotency key in request state
-        request.state.idempotency_key = idempotency_key
-        request.state.request_body = request_body
-
-        # Process request normally
-        response = await call_next(request)
-
-        # Cache successful responses
-        if response.status_code in [200, 201, 202] and hasattr(response, "body"):
-            try:
-                # Get response body
-                response_data = await self._get_response_body(response)
-
-                # Store in cache
-                store_idempotent_response(
-                    key=idempotency_key,
-                    status_code=response.status_code,
-                    response_data=response_data,
-                    headers=dict(response.headers),
-                    ttl_seconds=self.ttl_seconds,
-                )
-
-            except Exception:
-                # Ignore caching errors
-                pass
-
-        return response
+        state = scope.setdefault("state", {})
+        state["idempotency_key"] = idempotency_key
+        state["request_body"] = request_body
+
+        status_code = 0
+        response_headers: dict[str, str] = {}
+        chunks: list[bytes] | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, chunks
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if status_code in CACHEABLE_STATUS_CODES:
+                    response_headers.update(
+                        (name.decode("latin-1"), value.decode("latin-1"))
+                        for name, value in message.get("headers") or ()
+                    )
+                    content_type = response_headers.get("content-type", "")
+                    if not content_type.startswith("text/event-stream"):
+                        chunks = []
+            elif message["type"] == "http.response.body" and chunks is not None:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    # Cache successful responses
+                    self._cache_response(
+                        idempotency_key, status_code, b"".join(chunks), response_headers
+                    )
+                    chunks = None
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _cache_response(
+        self, key: str, status_code: int, body: bytes, headers: dict[str, str]
+    ) -> None:
+        """Store a completed response for replay"""
+        try:
+            store_idempotent_response(
+                key=key,
+                status_code=status_code,
+                response_data=self._parse_body(body),
+                headers=headers,
+                ttl_seconds=self.ttl_seconds,
+            )
+        except Exception:
+            # Ignore caching errors
+            pass
 
     def _is_valid_key(self, key: str) -> bool:
         """Validate idempotency key format"""
@@ -189,25 +229,12 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
             and key.replace("-", "").replace("_", "").isalnum()
         )
 
-    async def _get_request_body(self, request: Request) -> dict[str, Any]:
-        """Get request body for idempotency comparison"""
+    def _parse_body(self, body: bytes) -> dict[str, Any]:
+        """Parse a JSON request or response body, {} if empty or not JSON"""
         try:
-            body = await request.body()
             if body:
                 result: dict[str, Any] = json.loads(body.decode())
                 return result
             return {}
         except Exception:
             return {}
-
-    async def _get_response_body(self, response: Response) -> dict[str, Any]:
-        """Get response body for caching"""
-        try:
-            if hasattr(response, "body"):
-                body = response.body
-                if isinstance(body, bytes):
-                    result: dict[str, Any] = json.loads(body.decode())
-                    return result
-            return {}
-        except Exception:
-            return {}
@@ -2,6 +2,7 @@
 Middleware package for Project Service
 """
 
+from .rate_limiter import RateLimitPolicy, SlidingWindowRateLimiter
 from .security_middleware import (
     RateLimitingMiddleware,
     RequestValidationMiddleware,
@@ -13,5 +14,7 @@ __all__ = [
     "SecurityHeadersMiddleware",
     "RateLimitingMiddleware",
     "RequestValidationMiddleware",
+    "RateLimitPolicy",
+    "SlidingWindowRateLimiter",
     "setup_security_middleware",
 ]
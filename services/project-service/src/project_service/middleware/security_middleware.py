@@ -1,22 +1,33 @@
 """
 Security middleware for Project Service
 Implements security best practices including rate limiting, input validation, and security headers.
+
+All middleware here are pure ASGI: rejections are sent directly as JSON
+error responses, accepted requests are passed through with their response
+messages forwarded as produced, so SSE streams are never buffered.
 """
 
-import asyncio
 import logging
-import time
-from collections.abc import Callable
+import math
 from typing import Any
 
-from fastapi import HTTPException, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ai_script_core.utils.asgi import (
+    client_ip,
+    encode_headers,
+    request_header_items,
+    request_headers,
+    send_error,
+    send_with_headers,
+)
+
+from .rate_limiter import RateLimitPolicy, SlidingWindowRateLimiter
 
 logger = logging.getLogger(__name__)
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """Add security headers to all responses"""
 
     def __init__(
@@ -29,7 +40,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         referrer_policy: str = "strict-origin-when-cross-origin",
         content_security_policy: str | None = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.security_headers = {
             "Strict-Transport-Security": strict_transport_security,
             "X-Content-Type-Options": content_type_options,
@@ -39,23 +50,32 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         }
         if content_security_policy:
             self.security_headers["Content-Security-Policy"] = content_security_policy
+        self._raw_headers = encode_headers(self.security_headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Add security headers and remove the server header to avoid
+        # information disclosure
+        await self.app(
+            scope,
+            receive,
+            send_with_headers(send, self._raw_headers, remove=frozenset({b"server"})),
+        )
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-
-        # Add security headers
-        for header, value in self.security_headers.items():
-            response.headers[header] = value
-
-        # Remove server header to avoid information disclosure
-        if "server" in response.headers:
-            del response.headers["server"]
-
-        return response
 
+class RateLimitingMiddleware:
+    """
+    Sliding-window-counter rate limiting middleware
 
-class RateLimitingMiddleware(BaseHTTPMiddleware):
-    """Simple in-memory rate limiting middleware"""
+    Requests are counted per client (IP, or the ``tenant_header`` value when
+    one is configured and sent) and per policy scope. ``route_policies`` map
+    path prefixes to their own limits (longest prefix wins) and
+    ``tenant_policies`` override the limit for individual tenants. Counters
+    live in ``limiter``, an in-process ``SlidingWindowRateLimiter`` by default.
+    """
 
     def __init__(
         self,
@@ -64,8 +84,12 @@ class RateLimitingMiddleware(BaseHTTPMiddleware):
         period: int = 60,
         per_ip: bool = True,
         excluded_paths: list[str] | None = None,
+        route_policies: dict[str, RateLimitPolicy] | None = None,
+        tenant_policies: dict[str, RateLimitPolicy] | None = None,
+        tenant_header: str | None = None,
+        limiter: SlidingWindowRateLimiter | None = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.calls = calls
         self.period = period
         self.per_ip = per_ip
@@ -75,87 +99,88 @@ class RateLimitingMiddleware(BaseHTTPMiddleware):
             "/docs",
             "/redoc",
         ]
-        self.requests: dict[str, list[float]] = {}
-        self.lock = asyncio.Lock()
+        self.default_policy = RateLimitPolicy(calls=calls, period=period)
+        self.route_policies = route_policies or {}
+        self.tenant_policies = tenant_policies or {}
+        self.tenant_header = tenant_header.lower() if tenant_header else None
+        self.limiter = limiter or SlidingWindowRateLimiter()
+        self._route_prefixes = sorted(self.route_policies, key=len, reverse=True)
+
+    def _resolve(self, scope: Scope) -> tuple[str, RateLimitPolicy]:
+        """Counter key and policy for a request"""
+        route, policy = "*", self.default_policy
+        path = scope["path"]
+        for prefix in self._route_prefixes:
+            if path.startswith(prefix):
+                route, policy = prefix, self.route_policies[prefix]
+                break
+
+        tenant = (
+            request_headers(scope).get(self.tenant_header)
+            if self.tenant_header
+            else None
+        )
+        if tenant:
+            return f"{route}|tenant:{tenant}", self.tenant_policies.get(tenant, policy)
+        client_id = client_ip(scope) if self.per_ip else "global"
+        return f"{route}|{client_id}", policy
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Skip rate limiting for excluded paths
-        if request.url.path in self.excluded_paths:
-            return await call_next(request)
-
-        # Get client identifier
-        if self.per_ip:
-            client_id = self._get_client_ip(request)
-        else:
-            client_id = "global"
-
-        # Check rate limit
-        async with self.lock:
-            current_time = time.time()
-
-            # Initialize or clean old requests
-            if client_id not in self.requests:
-                self.requests[client_id] = []
-
-            # Remove old requests
-            self.requests[client_id] = [
-                req_time
-                for req_time in self.requests[client_id]
-                if current_time - req_time < self.period
-            ]
-
-            # Check if limit exceeded
-            if len(self.requests[client_id]) >= self.calls:
-                raise HTTPException(
-                    status_code=429,
-                    detail={
-                        "error": "Rate limit exceeded",
-                        "limit": self.calls,
-                        "period": self.period,
-                        "retry_after": self.period,
-                    },
-                    headers={"Retry-After": str(self.period)},
-                )
-
-            # Add current request
-            self.requests[client_id].append(current_time)
-
-        response = await call_next(request)
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        key, policy = self._resolve(scope)
+        decision = await self.limiter.hit(key, policy)
+
+        # Check if limit exceeded
+        if not decision.allowed:
+            retry_after = str(math.ceil(decision.retry_after))
+            await send_error(
+                scope,
+                receive,
+                send,
+                429,
+                {
+                    "error": "Rate limit exceeded",
+                    "limit": policy.calls,
+                    "period": policy.period,
+                    "retry_after": math.ceil(decision.retry_after),
+                },
+                headers={"Retry-After": retry_after},
+            )
+            return
 
         # Add rate limit headers
-        remaining = max(0, self.calls - len(self.requests[client_id]))
-        response.headers["X-RateLimit-Limit"] = str(self.calls)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(current_time + self.period))
-
-        return response
-
-    def _get_client_ip(self, request: Request) -> str:
-        """Extract client IP considering proxy headers"""
-        # Check for forwarded headers (in order of preference)
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            # Take the first IP (client)
-            return forwarded_for.split(",")[0].strip()
-
-        real_ip = request.headers.get("X-Real-IP")
-        if real_ip:
-            return real_ip.strip()
-
-        # Fallback to client host
-        return request.client.host if request.client else "unknown"
+        rate_limit_headers = [
+            (b"x-ratelimit-limit", str(decision.limit).encode()),
+            (b"x-ratelimit-remaining", str(decision.remaining).encode()),
+            (b"x-ratelimit-reset", str(int(decision.reset_at)).encode()),
+        ]
+        await self.app(scope, receive, send_with_headers(send, rate_limit_headers))
 
 
-class RequestValidationMiddleware(BaseHTTPMiddleware):
+class RequestValidationMiddleware:
     """Validate and sanitize incoming requests"""
 
+    suspicious_patterns = (
+        "<script",
+        "javascript:",
+        "vbscript:",
+        "onload=",
+        "onerror=",
+        "../",
+        "..\\",
+    )
+
     def __init__(
         self,
         app: ASGIApp,
         max_content_length: int = 16 * 1024 * 1024,  # 16MB
         allowed_content_types: set[str] | None = None,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.max_content_length = max_content_length
         self.allowed_content_types = allowed_content_types or {
             "application/json",
@@ -164,71 +189,84 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
             "text/plain",
         }
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = request_headers(scope)
+
         # Check content length
-        content_length = request.headers.get("content-length")
+        content_length = headers.get("content-length")
         if content_length:
             try:
                 length = int(content_length)
-                if length > self.max_content_length:
-                    raise HTTPException(
-                        status_code=413,
-                        detail={
-                            "error": "Request entity too large",
-                            "max_size": self.max_content_length,
-                            "actual_size": length,
-                        },
-                    )
             except ValueError:
-                raise HTTPException(
-                    status_code=400,
-                    detail={"error": "Invalid content-length header"},
+                await send_error(
+                    scope,
+                    receive,
+                    send,
+                    400,
+                    {"error": "Invalid content-length header"},
+                )
+                return
+            if length > self.max_content_length:
+                await send_error(
+                    scope,
+                    receive,
+                    send,
+                    413,
+                    {
+                        "error": "Request entity too large",
+                        "max_size": self.max_content_length,
+                        "actual_size": length,
+                    },
                 )
+                return
 
         # Check content type for POST/PUT requests
-        if request.method in ("POST", "PUT", "PATCH"):
-            content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        if scope["method"] in ("POST", "PUT", "PATCH"):
+            content_type = headers.get("content-type", "").split(";")[0].strip()
             if content_type and content_type not in self.allowed_content_types:
-                raise HTTPException(
-                    status_code=415,
-                    detail={
+                await send_error(
+                    scope,
+                    receive,
+                    send,
+                    415,
+                    {
                         "error": "Unsupported media type",
                         "supported_types": list(self.allowed_content_types),
                     },
                 )
-
-        # Validate common suspicious patterns
-        self._validate_request_headers(request)
-
-        return await call_next(request)
-
-    def _validate_request_headers(self, request: Request) -> None:
+                return
+
+        # Validate common suspicious patterns, every value of repeated headers included
+        if not self._validate_request_headers(request_header_items(scope)):
+            await send_error(
+                scope,
+                receive,
+                send,
+                400,
+                {
+                    "error": "Invalid request",
+                    "message": "Suspicious content detected in headers",
+                },
+            )
+            return
+
+        await self.app(scope, receive, send)
+
+    def _validate_request_headers(self, headers: list[tuple[str, str]]) -> bool:
         """Validate request headers for suspicious patterns"""
-        suspicious_patterns = [
-            "<script",
-            "javascript:",
-            "vbscript:",
-            "onload=",
-            "onerror=",
-            "../",
-            "..\\",
-        ]
-
-        for header_name, header_value in request.headers.items():
-            if isinstance(header_value, str):
-                header_lower = header_value.lower()
-                for pattern in suspicious_patterns:
-                    if pattern in header_lower:
-                        logger.warning(
-                            f"Suspicious pattern '{pattern}' detected in header '{header_name}': {header_value}"
-                        )
-                        raise HTTPException(
-                            status_code=400,
-                            detail={
-                                "error": "Invalid request",
-                                "message": "Suspicious content detected in headers",
-                            },
-                        )
+        for header_name, header_value in headers:
+            header_lower = header_value.lower()
+            for pattern in self.suspicious_patterns:
+                if pattern in header_lower:
+                    logger.warning(
+                        f"Suspicious pattern '{pattern}' detected in header '{header_name}': {header_value}"
+                    )
+                    return False
+        return True
 
 
 def setup_security_middleware(
@@ -236,8 +274,16 @@ def setup_security_middleware(
     enable_rate_limiting: bool = True,
     rate_limit_calls: int = 200,
     rate_limit_period: int = 60,
+    rate_limit_route_policies: dict[str, RateLimitPolicy] | None = None,
+    rate_limit_tenant_policies: dict[str, RateLimitPolicy] | None = None,
+    rate_limit_tenant_header: str | None = None,
 ) -> None:
-    """Setup all security middleware for the FastAPI app"""
+    """
+    Setup all security middleware for the FastAPI app
+
+    With ``rate_limit_tenant_header`` requests are counted per tenant, and
+    ``rate_limit_tenant_policies`` override the limit of individual tenants.
+    """
 
     # Security headers (always enabled)
     app.add_middleware(SecurityHeadersMiddleware)
@@ -251,6 +297,9 @@ def setup_security_middleware(
             RateLimitingMiddleware,
             calls=rate_limit_calls,
             period=rate_limit_period,
+            route_policies=rate_limit_route_policies,
+            tenant_policies=rate_limit_tenant_policies,
+            tenant_header=rate_limit_tenant_header,
         )
 
     logger.info("Security middleware configured")
@@ -221,6 +221,86 @@ class EpisodeChromaService:
             logger.error(f"Unexpected error updating episode {episode_id}: {e!s}")
             raise EpisodeChromaError(f"Failed to update episode: {e!s}")
 
+    def bulk_save_episodes(
+        self, project_id: str, items: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Create or update several episodes of a project in one call
+
+        Items with an 'episodeId' update that episode's script; items
+        without one create a new episode. Updates are written to ChromaDB in
+        a single batch. Returns one result per item, in request order, with
+        the item's 'key', 'id', 'status' ('created', 'updated', 'not_found'
+        or 'failed') and an 'error' message for failures.
+        """
+        results: list[dict[str, Any]] = [{} for _ in items]
+        updates: list[dict[str, Any]] = []
+        update_indexes: list[int] = []
+
+        for index, item in enumerate(items):
+            key = item.get("key")
+            episode_id = item.get("episodeId")
+            script = item.get("script") or {}
+            script_markdown = script.get("markdown", "")
+            tokens = script.get("tokens", 0)
+            if tokens == 0 and script_markdown:
+                tokens = estimate_tokens(script_markdown)
+
+            if not episode_id:
+                try:
+                    episode = self.create_episode(
+                        project_id=project_id,
+                        title=item.get("title"),
+                        script={"markdown": script_markdown, "tokens": tokens},
+                        prompt_snapshot=item.get("promptSnapshot") or "",
+                    )
+                    results[index] = {
+                        "key": key,
+                        "id": episode["id"],
+                        "status": "created",
+                    }
+                except EpisodeChromaError as e:
+                    results[index] = {
+                        "key": key,
+                        "id": None,
+                        "status": "failed",
+                        "error": str(e),
+                    }
+                continue
+
+            updates.append(
+                {
+                    "episode_id": episode_id,
+                    "script_markdown": script_markdown,
+                    "tokens": tokens,
+                    "prompt_snapshot": item.get("promptSnapshot"),
+                }
+            )
+            update_indexes.append(index)
+
+        if updates:
+            try:
+                updated = self.chroma_store.update_episodes(updates, project_id)
+                for index, update in zip(update_indexes, updates, strict=True):
+                    episode_id = update["episode_id"]
+                    results[index] = {
+                        "key": items[index].get("key"),
+                        "id": episode_id,
+                        "status": "updated" if episode_id in updated else "not_found",
+                    }
+            except ChromaStoreError as e:
+                logger.error(f"ChromaDB error in bulk episode update: {e!s}")
+                for index, update in zip(update_indexes, updates, strict=True):
+                    results[index] = {
+                        "key": items[index].get("key"),
+                        "id": update["episode_id"],
+                        "status": "failed",
+                        "error": str(e),
+                    }
+
+        logger.info(f"Bulk saved {len(items)} episodes for project {project_id}")
+        return results
+
     def delete_episode(self, episode_id: str) -> bool:
         """Delete episode"""
         try:
@@ -313,6 +313,74 @@ class EpisodeChromaStore:
             logger.error(f"Failed to update episode {episode_id}: {e!s}")
             raise ChromaStoreError(f"Failed to update episode: {e!s}")
 
+    def update_episodes(
+        self, updates: list[dict[str, Any]], project_id: str | None = None
+    ) -> set[str]:
+        """
+        Update several episodes with one read and one write to ChromaDB
+
+        Each update carries 'episode_id' and optionally 'script_markdown',
+        'tokens' and 'prompt_snapshot'. Returns the ids that were updated;
+        ids that do not exist (or belong to another project when
+        ``project_id`` is given) are skipped.
+        """
+        if not updates:
+            return set()
+
+        try:
+            assert self._episodes_collection is not None
+            current: dict[str, Any] = self._episodes_collection.get(
+                ids=[update["episode_id"] for update in updates],
+                include=["documents", "metadatas"],
+            )
+
+            existing: dict[str, tuple[str, dict[str, Any]]] = {}
+            for i, episode_id in enumerate(current["ids"]):
+                metadata = current["metadatas"][i]
+                if project_id is not None and metadata["project_id"] != project_id:
+                    continue
+                document = current["documents"][i] if current["documents"] else ""
+                existing[episode_id] = (document, metadata)
+
+            now = datetime.now(timezone.utc).isoformat()
+            ids: list[str] = []
+            documents: list[str] = []
+            metadatas: list[dict[str, Any]] = []
+
+            for update in updates:
+                episode_id = update["episode_id"]
+                if episode_id not in existing:
+                    continue
+
+                document, current_metadata = existing[episode_id]
+                metadata = current_metadata.copy()
+                metadata["updated_at"] = now
+
+                if update.get("tokens") is not None:
+                    metadata["tokens"] = update["tokens"]
+                if update.get("prompt_snapshot") is not None:
+                    metadata["prompt_snapshot"] = update["prompt_snapshot"]
+
+                ids.append(episode_id)
+                documents.append(
+                    update["script_markdown"]
+                    if update.get("script_markdown") is not None
+                    else document
+                )
+                metadatas.append(metadata)
+
+            if ids:
+                self._episodes_collection.update(
+                    ids=ids, documents=documents, metadatas=metadatas
+                )
+
+            logger.info(f"Updated {len(ids)} episodes in batch")
+            return set(ids)
+
+        except Exception as e:
+            logger.error(f"Failed to update episodes in batch: {e!s}")
+            raise ChromaStoreError(f"Failed to update episodes: {e!s}")
+
     def delete_episode(self, episode_id: str) -> bool:
         """Delete an episode"""
         try:
@@ -43,6 +43,15 @@ from .metrics import (
     track_performance,
     track_request,
 )
+from .prometheus import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    get_prometheus_registry,
+)
+from .sketch import QuantileSketch
 from .tracing import (
     TraceContext,
     TraceHeaders,
@@ -89,6 +98,14 @@ __all__ = [
     "track_request",
     "track_error",
     "track_performance",
+    "QuantileSketch",
+    # Prometheus exposition
+    "MetricsRegistry",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "CONTENT_TYPE_LATEST",
+    "get_prometheus_registry",
     # Idempotency
     "IdempotencyKey",
     "IdempotencyManager",
@@ -2,6 +2,7 @@
 Standardized event logging for critical application events.
 """
 
+import logging
 from datetime import datetime
 from enum import Enum
 from typing import Any
@@ -21,6 +22,15 @@ class EventSeverity(str, Enum):
     CRITICAL = "critical"
 
 
+# Python log level each severity is emitted at
+SEVERITY_LOG_LEVELS = {
+    EventSeverity.LOW: logging.INFO,
+    EventSeverity.MEDIUM: logging.WARNING,
+    EventSeverity.HIGH: logging.ERROR,
+    EventSeverity.CRITICAL: logging.CRITICAL,
+}
+
+
 class ApplicationEvent(BaseModel):
     """Standardized application event."""
 
@@ -65,6 +75,10 @@ class EventLogger:
         self.service_name = service_name
         self.trace_context = trace_context
 
+    def is_enabled_for(self, severity: EventSeverity) -> bool:
+        """Whether an event of ``severity`` would be logged."""
+        return self.logger.is_enabled_for(SEVERITY_LOG_LEVELS[severity])
+
     def log_event(
         self,
         event_type: str,
@@ -76,6 +90,9 @@ class EventLogger:
         error_message: str | None = None,
     ) -> None:
         """Log a standardized application event."""
+        # Skip building the event when its log level is disabled
+        if not self.is_enabled_for(severity):
+            return
 
         event = ApplicationEvent(
             event_type=event_type,
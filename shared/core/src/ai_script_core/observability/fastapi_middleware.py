@@ -2,40 +2,154 @@
 FastAPI middleware integration for unified observability system.
 """
 
+import json
+import random
 import time
 from collections.abc import Callable
 from typing import Any
 
-from fastapi import FastAPI, HTTPException, Request, Response
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from .errors import (
     ErrorCode,
     create_error_response,
 )
-from .events import EventLogger, EventSeverity, create_event_logger
+from .events import (
+    SEVERITY_LOG_LEVELS,
+    EventLogger,
+    EventSeverity,
+    create_event_logger,
+)
 from .health import HealthChecker
 from .idempotency import IdempotencyConflictError, get_idempotency_manager
-from .logging import create_service_logger
+from .logging import StructuredLogger, create_service_logger
 from .metrics import get_metrics_collector
+from .prometheus import CONTENT_TYPE_LATEST, get_prometheus_registry
 from .tracing import (
     TraceContext,
     TraceHeaders,
-    TracingMiddleware,
-    inject_trace_headers,
+    generate_trace_id,
 )
 
 
-class ObservabilityMiddleware(BaseHTTPMiddleware):
+class RequestScope:
+    """
+    Per-request observability state kept as plain values.
+
+    Only the trace header values are read up front. The Pydantic
+    ``TraceContext`` and the ``EventLogger`` are built on first access,
+    i.e. when an enabled log event or a route (via ``get_trace_context``)
+    needs them.
+    """
+
+    __slots__ = (
+        "_event_logger",
+        "_trace_context",
+        "headers",
+        "job_id",
+        "method",
+        "path",
+        "project_id",
+        "service_name",
+        "start_time",
+        "structured_logger",
+        "trace_id",
+        "user_id",
+    )
+
+    def __init__(
+        self,
+        service_name: str,
+        structured_logger: StructuredLogger,
+        method: str,
+        path: str,
+        headers: Headers,
+        start_time: float,
+        tracing: bool = True,
+    ):
+        self.service_name = service_name
+        self.structured_logger = structured_logger
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.start_time = start_time
+        self._trace_context: TraceContext | None = None
+        self._event_logger: EventLogger | None = None
+
+        if tracing:
+            self.trace_id: str | None = (
+                headers.get(TraceHeaders.TRACE_ID) or generate_trace_id()
+            )
+            self.job_id = headers.get(TraceHeaders.JOB_ID)
+            self.project_id = headers.get(TraceHeaders.PROJECT_ID)
+            self.user_id = headers.get(TraceHeaders.USER_ID)
+        else:
+            self.trace_id = self.job_id = self.project_id = self.user_id = None
+
+    @property
+    def trace_context(self) -> TraceContext | None:
+        if self._trace_context is None and self.trace_id is not None:
+            self._trace_context = TraceContext(
+                trace_id=self.trace_id,
+                job_id=self.job_id,
+                project_id=self.project_id,
+                user_id=self.user_id,
+                service=self.service_name,
+                request_path=self.path,
+                request_method=self.method,
+                metadata={
+                    "source_headers": {
+                        key: value
+                        for key, value in self.headers.items()
+                        if key.startswith("x-")
+                    }
+                },
+            )
+        return self._trace_context
+
+    @property
+    def event_logger(self) -> EventLogger:
+        if self._event_logger is None:
+            self._event_logger = create_event_logger(
+                self.structured_logger, self.service_name, self.trace_context
+            )
+        return self._event_logger
+
+    def apply_trace_headers(
+        self, headers: MutableHeaders, processing_time_ms: int
+    ) -> None:
+        """Set the same headers as ``inject_trace_headers`` on ``headers``."""
+        if self.trace_id is None:
+            return
+        headers[TraceHeaders.TRACE_ID] = self.trace_id
+        if self.job_id:
+            headers[TraceHeaders.JOB_ID] = self.job_id
+        if self.project_id:
+            headers[TraceHeaders.PROJECT_ID] = self.project_id
+        headers[TraceHeaders.SERVICE] = self.service_name
+        headers[TraceHeaders.PROCESSING_TIME] = str(processing_time_ms)
+
+
+class ObservabilityMiddleware:
     """
     Comprehensive observability middleware for FastAPI applications.
     Integrates tracing, logging, metrics, and error handling.
+
+    This is a pure ASGI middleware: response messages are forwarded as the
+    app sends them, so streaming (SSE) bodies pass straight through and
+    excluded paths cost one set lookup. The per-request path avoids
+    building models: trace values are read into a ``RequestScope``,
+    request events are only constructed when their log level is enabled
+    and the request is sampled (``log_sample_rate``; error responses are
+    always logged), and metrics are recorded as primitives.
     """
 
     def __init__(
         self,
-        app: FastAPI,
+        app: ASGIApp,
         service_name: str,
         version: str = "1.0.0",
         enable_tracing: bool = True,
@@ -43,8 +157,9 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
         enable_idempotency: bool = True,
         idempotent_methods: set[str] | None = None,
         excluded_paths: set[str] | None = None,
+        log_sample_rate: float = 1.0,
     ):
-        super().__init__(app)
+        self.app = app
         self.service_name = service_name
         self.version = version
         self.enable_tracing = enable_tracing
@@ -54,13 +169,14 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
         self.excluded_paths = excluded_paths or {
             "/health",
             "/metrics",
+            "/metrics/prometheus",
             "/docs",
             "/openapi.json",
         }
+        self.log_sample_rate = log_sample_rate
 
         # Initialize components
         self.structured_logger = create_service_logger(service_name, version)
-        self.tracing_middleware = TracingMiddleware(service_name)
 
         if enable_metrics:
             self.metrics_collector = get_metrics_collector(service_name)
@@ -68,213 +184,153 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
         if enable_idempotency:
             self.idempotency_manager = get_idempotency_manager()
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Any]
-    ) -> Response:
+    def _should_log(self, severity: EventSeverity, sampled: bool = True) -> bool:
+        return sampled and self.structured_logger.is_enabled_for(
+            SEVERITY_LOG_LEVELS[severity]
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request with full observability."""
-        start_time = time.time()
+        # Skip non-HTTP traffic and excluded paths
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
 
-        # Skip excluded paths
-        if request.url.path in self.excluded_paths:
-            result = await call_next(request)
-            return result  # type: ignore[no-any-return]
-
-        # Extract request information
-        method = request.method
-        path = request.url.path
-        client_ip = request.client.host if request.client else None
-
-        # Initialize trace context
-        trace_context = None
-        if self.enable_tracing:
-            headers_dict = dict(request.headers)
-            trace_context = self.tracing_middleware.extract_context(headers_dict)
-
-        # Create event logger with trace context
-        event_logger = create_event_logger(
-            self.structured_logger, self.service_name, trace_context
+        start_time = time.time()
+        path = scope["path"]
+        method = scope["method"]
+        headers = Headers(scope=scope)
+        request_scope = RequestScope(
+            self.service_name,
+            self.structured_logger,
+            method,
+            path,
+            headers,
+            start_time,
+            self.enable_tracing,
         )
+        sampled = self.log_sample_rate >= 1.0 or random.random() < self.log_sample_rate
 
         # Log API request started
-        event_logger.log_api_request_started(
-            method=method, endpoint=path, client_ip=client_ip
-        )
+        if self._should_log(EventSeverity.LOW, sampled):
+            client = scope.get("client")
+            request_scope.event_logger.log_api_request_started(
+                method=method, endpoint=path, client_ip=client[0] if client else None
+            )
 
         # Handle idempotency for applicable methods
-        if (
-            self.enable_idempotency
-            and method in self.idempotent_methods
-            and TraceHeaders.TRACE_ID in request.headers
-        ):
+        idempotency_key = (
+            headers.get("Idempotency-Key")
+            if self.enable_idempotency and method in self.idempotent_methods
+            else None
+        )
+        if idempotency_key and TraceHeaders.TRACE_ID in headers:
             try:
-                idempotency_key = request.headers.get("Idempotency-Key")
-                if idempotency_key:
-                    # Check for existing response
-                    existing_response = self.idempotency_manager.check_idempotency(
-                        idempotency_key,
-                        {
-                            "method": method,
-                            "path": path,
-                            "headers": dict(request.headers),
-                        },
+                # Check for existing response
+                existing_response = self.idempotency_manager.check_idempotency(
+                    idempotency_key,
+                    {"method": method, "path": path, "headers": dict(headers)},
+                )
+
+                if existing_response:
+                    # Return cached response
+                    response = JSONResponse(
+                        content=existing_response.response_data,
+                        status_code=existing_response.status_code,
+                        headers=existing_response.headers,
                     )
 
-                    if existing_response:
-                        # Return cached response
-                        response = JSONResponse(
-                            content=existing_response.response_data,
-                            status_code=existing_response.status_code,
-                            headers=existing_response.headers,
-                        )
-
-                        # Add trace headers
-                        if self.enable_tracing and trace_context:
-                            processing_time = int((time.time() - start_time) * 1000)
-                            trace_headers = inject_trace_headers(
-                                trace_context, processing_time
-                            )
-                            for key, value in trace_headers.items():
-                                response.headers[key] = value
-
-                        return response
+                    # Add trace headers
+                    processing_time = int((time.time() - start_time) * 1000)
+                    request_scope.apply_trace_headers(response.headers, processing_time)
+
+                    await response(scope, receive, send)
+                    return
 
             except IdempotencyConflictError as e:
                 # Return idempotency conflict error
                 error_response = create_error_response(
                     ErrorCode.RESOURCE_ALREADY_EXISTS,
                     str(e),
-                    trace_id=trace_context.trace_id if trace_context else None,
+                    trace_id=request_scope.trace_id,
                 )
 
                 response = JSONResponse(
                     content=error_response.model_dump(), status_code=409
                 )
 
-                if self.enable_tracing and trace_context:
-                    processing_time = int((time.time() - start_time) * 1000)
-                    trace_headers = inject_trace_headers(trace_context, processing_time)
-                    for key, value in trace_headers.items():
-                        response.headers[key] = value
-
-                return response
+                processing_time = int((time.time() - start_time) * 1000)
+                request_scope.apply_trace_headers(response.headers, processing_time)
+
+                await response(scope, receive, send)
+                return
+
+        # Attach observability context to request state; the trace context
+        # and event logger are built on demand from the request scope
+        state = scope.setdefault("state", {})
+        state["observability"] = request_scope
+        state["start_time"] = start_time
+
+        status_code = 500
+        processing_time_ms = 0
+        response_started = False
+        response_size = 0
+        response_headers: MutableHeaders | None = None
+        # Body of a response that will be stored for its idempotency key
+        captured: list[bytes] | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, processing_time_ms, response_started
+            nonlocal response_size, response_headers, captured
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                processing_time_ms = int((time.time() - start_time) * 1000)
+
+                # Add tracing headers to response
+                response_headers = MutableHeaders(scope=message)
+                request_scope.apply_trace_headers(response_headers, processing_time_ms)
+
+                content_type = response_headers.get("content-type", "")
+                if (
+                    idempotency_key
+                    and status_code < 400
+                    and not content_type.startswith("text/event-stream")
+                ):
+                    captured = []
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                response_size += len(body)
+                if captured is not None:
+                    captured.append(body)
+            await send(message)
 
-        # Process request
         try:
-            # Attach observability context to request state
-            request.state.trace_context = trace_context
-            request.state.event_logger = event_logger
-            request.state.start_time = start_time
-
-            api_response: Response = await call_next(request)
-
-            # Calculate processing time
-            processing_time_ms = int((time.time() - start_time) * 1000)
-
-            # Add tracing headers to response
-            if self.enable_tracing and trace_context:
-                trace_headers = inject_trace_headers(trace_context, processing_time_ms)
-                for key, value in trace_headers.items():
-                    api_response.headers[key] = value
-
-            # Log successful API request
-            event_logger.log_api_request_completed(
-                method=method,
-                endpoint=path,
-                status_code=api_response.status_code,
-                response_size=(
-                    len(api_response.body) if hasattr(api_response, "body") else 0
-                ),
-                duration_ms=processing_time_ms,
-            )
-
-            # Track metrics
-            if self.enable_metrics:
-                self.metrics_collector.track_request(
-                    endpoint=path,
-                    method=method,
-                    status_code=api_response.status_code,
-                    response_time_ms=processing_time_ms,
-                    trace_context=trace_context,
-                )
-
-            # Store idempotent response if applicable
-            if (
-                self.enable_idempotency
-                and method in self.idempotent_methods
-                and api_response.status_code < 400
-            ):
-                idempotency_key = request.headers.get("Idempotency-Key")
-                if idempotency_key:
-                    self.idempotency_manager.store_response(
-                        key=idempotency_key,
-                        status_code=api_response.status_code,
-                        response_data=(
-                            api_response.body if hasattr(api_response, "body") else {}
-                        ),
-                        headers=dict(api_response.headers),
-                    )
-
-            return api_response
-
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            # Calculate processing time for error
-            processing_time_ms = int((time.time() - start_time) * 1000)
-
-            # Determine error details
-            if isinstance(e, HTTPException):
-                status_code = e.status_code
-                error_code = f"HTTP_{status_code}"
-                error_message = e.detail
-            else:
-                status_code = 500
-                error_code = ErrorCode.INTERNAL_ERROR.value
-                error_message = str(e)
-
-            # Log failed API request
-            event_logger.log_api_request_failed(
-                method=method,
-                endpoint=path,
-                error_code=error_code,
-                error_message=error_message,
-                duration_ms=processing_time_ms,
-            )
-
-            # Track error metrics
-            if self.enable_metrics:
-                self.metrics_collector.track_error(
-                    endpoint=path,
-                    error_code=error_code,
-                    error_type=e.__class__.__name__,
-                    message=error_message,
-                    trace_context=trace_context,
-                )
-
-                self.metrics_collector.track_request(
-                    endpoint=path,
-                    method=method,
-                    status_code=status_code,
-                    response_time_ms=processing_time_ms,
-                    trace_context=trace_context,
-                )
+            self._handle_exception(e, request_scope, start_time, response_started)
+            if response_started:
+                raise
 
             # Create standardized error response
+            status_code = e.status_code if isinstance(e, HTTPException) else 500
             if isinstance(e, HTTPException):
                 http_error_code = (
                     ErrorCode.VALIDATION_FAILED
-                    if isinstance(e, HTTPException) and e.status_code == 422
+                    if e.status_code == 422
                     else ErrorCode.INTERNAL_ERROR
                 )
                 error_response = create_error_response(
                     http_error_code,
-                    error_message,
-                    trace_id=trace_context.trace_id if trace_context else None,
+                    e.detail,
+                    trace_id=request_scope.trace_id,
                 )
             else:
                 error_response = create_error_response(
                     ErrorCode.INTERNAL_ERROR,
                     "Internal server error occurred",
-                    details={"original_error": error_message},
-                    trace_id=trace_context.trace_id if trace_context else None,
+                    details={"original_error": str(e)},
+                    trace_id=request_scope.trace_id,
                 )
 
             # Create JSON response
@@ -283,12 +339,96 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
             )
 
             # Add tracing headers to error response
-            if self.enable_tracing and trace_context:
-                trace_headers = inject_trace_headers(trace_context, processing_time_ms)
-                for key, value in trace_headers.items():
-                    response.headers[key] = value
+            processing_time_ms = int((time.time() - start_time) * 1000)
+            request_scope.apply_trace_headers(response.headers, processing_time_ms)
 
-            return response
+            await response(scope, receive, send)
+            return
+
+        # Log completed API request; error responses are never sampled out
+        if status_code >= 500:
+            severity = EventSeverity.HIGH
+        elif status_code >= 400:
+            severity = EventSeverity.MEDIUM
+        else:
+            severity = EventSeverity.LOW
+        if self._should_log(severity, sampled or status_code >= 400):
+            request_scope.event_logger.log_api_request_completed(
+                method=method,
+                endpoint=path,
+                status_code=status_code,
+                response_size=response_size,
+                duration_ms=processing_time_ms,
+            )
+
+        # Track metrics
+        if self.enable_metrics:
+            self.metrics_collector.record_request(
+                path, method, status_code, processing_time_ms, request_scope.trace_id
+            )
+
+        # Store idempotent response if applicable
+        if captured is not None and idempotency_key and response_headers is not None:
+            try:
+                response_data = json.loads(b"".join(captured) or b"{}")
+            except ValueError:
+                response_data = {}
+            self.idempotency_manager.store_response(
+                key=idempotency_key,
+                status_code=status_code,
+                response_data=response_data,
+                headers=dict(response_headers),
+            )
+
+    def _handle_exception(
+        self,
+        e: Exception,
+        request_scope: RequestScope,
+        start_time: float,
+        response_started: bool,
+    ) -> None:
+        """Log and count an exception raised by the app."""
+        # Calculate processing time for error
+        processing_time_ms = int((time.time() - start_time) * 1000)
+
+        # Determine error details
+        if isinstance(e, HTTPException):
+            status_code = e.status_code
+            error_code = f"HTTP_{status_code}"
+            error_message = e.detail
+        else:
+            status_code = 500
+            error_code = ErrorCode.INTERNAL_ERROR.value
+            error_message = str(e)
+
+        # Log failed API request
+        request_scope.event_logger.log_api_request_failed(
+            method=request_scope.method,
+            endpoint=request_scope.path,
+            error_code=error_code,
+            error_message=error_message,
+            duration_ms=processing_time_ms,
+        )
+
+        # Track error metrics
+        if self.enable_metrics:
+            self.metrics_collector.track_error(
+                endpoint=request_scope.path,
+                error_code=error_code,
+                error_type=e.__class__.__name__,
+                message=error_message,
+                trace_context=request_scope.trace_context,
+            )
+
+            # A response already under way keeps the status it was sent with
+            if not response_started:
+                self.metrics_collector.record_request(
+                    request_scope.path,
+                    request_scope.method,
+                    status_code,
+                    processing_time_ms,
+                    request_scope.trace_id,
+                )
 
 
 def setup_observability(
@@ -349,6 +489,16 @@ def setup_observability(
                 content={"error": f"Failed to get metrics: {e!s}"}, status_code=500
             )
 
+    # Add Prometheus scrape endpoint, aggregated across workers
+    registry = get_prometheus_registry()
+    app.add_event_handler("startup", registry.start_flusher)
+    app.add_event_handler("shutdown", registry.stop_flusher)
+
+    @app.get("/metrics/prometheus")
+    async def get_prometheus_metrics() -> PlainTextResponse:
+        """Prometheus text exposition endpoint."""
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE_LATEST)
+
     # Create service logger
     logger = create_service_logger(service_name, version)
 
@@ -371,12 +521,14 @@ def setup_observability(
 # Dependency injection for FastAPI routes
 def get_trace_context(request: Request) -> TraceContext | None:
     """Get trace context from request state."""
-    return getattr(request.state, "trace_context", None)
+    scope: RequestScope | None = getattr(request.state, "observability", None)
+    return scope.trace_context if scope is not None else None
 
 
 def get_event_logger(request: Request) -> EventLogger | None:
     """Get event logger from request state."""
-    return getattr(request.state, "event_logger", None)
+    scope: RequestScope | None = getattr(request.state, "observability", None)
+    return scope.event_logger if scope is not None else None
 
 
 def get_request_start_time(request: Request) -> float | None:
@@ -85,6 +85,10 @@ class StructuredLogger:
             self.logger.addHandler(handler)
             self.logger.setLevel(logging.INFO)
 
+    def is_enabled_for(self, level: int) -> bool:
+        """Whether a message at ``level`` would be emitted."""
+        return self.logger.isEnabledFor(level)
+
     def _create_log_entry(
         self,
         level: LogLevel,
@@ -118,21 +122,29 @@ class StructuredLogger:
 
     def trace(self, message: str, **metadata: Any) -> None:
         """Log trace level message."""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         entry = self._create_log_entry(LogLevel.TRACE, message, metadata)
         self.logger.debug(entry.model_dump_json())
 
     def debug(self, message: str, **metadata: Any) -> None:
         """Log debug level message."""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         entry = self._create_log_entry(LogLevel.DEBUG, message, metadata)
         self.logger.debug(entry.model_dump_json())
 
     def info(self, message: str, **metadata: Any) -> None:
         """Log info level message."""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         entry = self._create_log_entry(LogLevel.INFO, message, metadata)
         self.logger.info(entry.model_dump_json())
 
     def warning(self, message: str, **metadata: Any) -> None:
         """Log warning level message."""
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         entry = self._create_log_entry(LogLevel.WARNING, message, metadata)
         self.logger.warning(entry.model_dump_json())
 
@@ -145,6 +157,8 @@ class StructuredLogger:
         **metadata: Any,
     ) -> None:
         """Log error level message."""
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         entry = self._create_log_entry(
             LogLevel.ERROR,
             message,
@@ -164,6 +178,8 @@ class StructuredLogger:
         **metadata: Any,
     ) -> None:
         """Log critical level message."""
+        if not self.logger.isEnabledFor(logging.CRITICAL):
+            return
         entry = self._create_log_entry(
             LogLevel.CRITICAL,
             message,
@@ -2,7 +2,9 @@
 Metrics collection system for monitoring API performance and errors.
 """
 
+import re
 import time
+from array import array
 from collections import defaultdict, deque
 from collections.abc import Callable
 from datetime import datetime, timedelta
@@ -11,6 +13,8 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+from .prometheus import get_prometheus_registry
+from .sketch import QuantileSketch
 from .tracing import TraceContext
 
 
@@ -75,43 +79,60 @@ class PerformanceMetrics(BaseModel):
 
 
 class OperationStats:
-    """Statistics for a single operation."""
+    """
+    Statistics for a single operation.
+
+    Response times are kept in quantile sketches rather than raw samples:
+    the current sketch is replaced once it holds ``max_history`` requests,
+    so percentiles cover the latest ``max_history`` to ``2 * max_history``
+    requests in bounded memory.
+    """
 
     def __init__(self, operation: str, max_history: int = 1000):
         self.operation = operation
         self.max_history = max_history
-        self.response_times: deque[float] = deque(maxlen=max_history)
         self.error_count = 0
         self.total_count = 0
         self.last_updated = datetime.utcnow()
         self._lock = Lock()
 
+        self._current = QuantileSketch()
+        self._previous = QuantileSketch()
+        self._window: QuantileSketch | None = None
+
     def record_request(self, response_time_ms: float, success: bool) -> None:
         """Record a request."""
         with self._lock:
-            self.response_times.append(response_time_ms)
+            if self._current.count >= self.max_history:
+                self._previous, self._current = self._current, QuantileSketch()
+            self._current.add(response_time_ms)
+            self._window = None
             self.total_count += 1
             if not success:
                 self.error_count += 1
             self.last_updated = datetime.utcnow()
 
+    def get_sketch(self) -> QuantileSketch:
+        """Copy of the recent response-time sketch, e.g. to merge across workers."""
+        with self._lock:
+            return self._window_sketch().copy()
+
     def get_percentile(self, percentile: float) -> float:
         """Calculate response time percentile."""
         with self._lock:
-            if not self.response_times:
-                return 0.0
-
-            sorted_times = sorted(self.response_times)
-            index = int(len(sorted_times) * percentile / 100)
-            index = min(index, len(sorted_times) - 1)
-            return sorted_times[index]
+            return self._window_sketch().percentile(percentile)
 
     def get_average(self) -> float:
         """Calculate average response time."""
         with self._lock:
-            if not self.response_times:
-                return 0.0
-            return sum(self.response_times) / len(self.response_times)
+            return self._window_sketch().mean
+
+    def _window_sketch(self) -> QuantileSketch:
+        if self._window is None:
+            window = self._previous.copy()
+            window.merge(self._current)
+            self._window = window
+        return self._window
 
     def get_error_rate(self) -> float:
         """Calculate error rate."""
@@ -122,16 +143,133 @@ class OperationStats:
 
     def to_performance_metrics(self) -> PerformanceMetrics:
         """Convert to PerformanceMetrics model."""
-        return PerformanceMetrics(
-            operation=self.operation,
-            request_count=self.total_count,
-            avg_response_time_ms=self.get_average(),
-            p50_response_time_ms=self.get_percentile(50),
-            p95_response_time_ms=self.get_percentile(95),
-            p99_response_time_ms=self.get_percentile(99),
-            error_count=self.error_count,
-            error_rate=self.get_error_rate(),
-        )
+        with self._lock:
+            sketch = self._window_sketch()
+            return PerformanceMetrics(
+                operation=self.operation,
+                request_count=self.total_count,
+                avg_response_time_ms=sketch.mean,
+                p50_response_time_ms=sketch.percentile(50),
+                p95_response_time_ms=sketch.percentile(95),
+                p99_response_time_ms=sketch.percentile(99),
+                error_count=self.error_count,
+                error_rate=(
+                    self.error_count / self.total_count if self.total_count else 0.0
+                ),
+            )
+
+
+class RequestLog:
+    """
+    Fixed-size ring of recent requests stored as primitives.
+
+    Columns are preallocated, so recording a request writes a few slots
+    without creating objects; ``RequestMetrics`` models are only built
+    when the history is read.
+    """
+
+    __slots__ = (
+        "_endpoints",
+        "_methods",
+        "_response_times",
+        "_start",
+        "_status_codes",
+        "_timestamps",
+        "_trace_ids",
+        "_user_ids",
+        "capacity",
+        "size",
+    )
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._endpoints: list[str | None] = [None] * capacity
+        self._methods: list[str | None] = [None] * capacity
+        self._trace_ids: list[str | None] = [None] * capacity
+        self._user_ids: list[str | None] = [None] * capacity
+        self._status_codes = array("i", bytes(4 * capacity))
+        self._response_times = array("i", bytes(4 * capacity))
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._start = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(
+        self,
+        endpoint: str,
+        method: str,
+        status_code: int,
+        response_time_ms: int,
+        timestamp: float,
+        trace_id: str | None = None,
+        user_id: str | None = None,
+    ) -> None:
+        if self.size < self.capacity:
+            index = (self._start + self.size) % self.capacity
+            self.size += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+
+        self._endpoints[index] = endpoint
+        self._methods[index] = method
+        self._status_codes[index] = status_code
+        self._response_times[index] = response_time_ms
+        self._timestamps[index] = timestamp
+        self._trace_ids[index] = trace_id
+        self._user_ids[index] = user_id
+
+    def rows(self) -> list[tuple[str, str, int, int]]:
+        """Endpoint, method, status code and response time, oldest first."""
+        indexes = [(self._start + i) % self.capacity for i in range(self.size)]
+        return [
+            (
+                self._endpoints[i],  # type: ignore[misc]
+                self._methods[i],
+                self._status_codes[i],
+                self._response_times[i],
+            )
+            for i in indexes
+        ]
+
+    def to_models(self, limit: int | None = None) -> list[RequestMetrics]:
+        count = min(limit, self.size) if limit else self.size
+        models = []
+        for position in range(self.size - count, self.size):
+            i = (self._start + position) % self.capacity
+            models.append(
+                RequestMetrics(
+                    endpoint=self._endpoints[i],
+                    method=self._methods[i],
+                    status_code=self._status_codes[i],
+                    response_time_ms=self._response_times[i],
+                    timestamp=datetime.utcfromtimestamp(self._timestamps[i]),
+                    trace_id=self._trace_ids[i],
+                    user_id=self._user_ids[i],
+                )
+            )
+        return models
+
+    def drop_before(self, cutoff: float) -> int:
+        """Drop requests recorded before ``cutoff`` (epoch seconds)."""
+        dropped = 0
+        while self.size and self._timestamps[self._start] < cutoff:
+            self._endpoints[self._start] = None
+            self._trace_ids[self._start] = None
+            self._user_ids[self._start] = None
+            self._start = (self._start + 1) % self.capacity
+            self.size -= 1
+            dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        self._endpoints = [None] * self.capacity
+        self._trace_ids = [None] * self.capacity
+        self._user_ids = [None] * self.capacity
+        self._start = 0
+        self.size = 0
 
 
 class MetricsCollector:
@@ -153,7 +291,7 @@ class MetricsCollector:
         self.operations: dict[str, OperationStats] = {}
 
         # Recent request history
-        self.recent_requests: deque[RequestMetrics] = deque(maxlen=max_request_history)
+        self.recent_requests = RequestLog(max_request_history)
 
         # Recent errors
         self.recent_errors: deque[ErrorMetrics] = deque(maxlen=max_error_history)
@@ -167,6 +305,20 @@ class MetricsCollector:
         # Start time for uptime calculation
         self.start_time = datetime.utcnow()
 
+        # Prometheus series, e.g. generation_service_requests_total
+        prefix = re.sub(r"[^a-zA-Z0-9_]", "_", service_name)
+        registry = get_prometheus_registry()
+        self._requests_total = registry.counter(
+            f"{prefix}_requests_total",
+            "Total number of HTTP requests",
+            ("method", "status"),
+        )
+        self._request_duration = registry.histogram(
+            f"{prefix}_requests_duration_seconds",
+            "HTTP request latency in seconds",
+            ("method",),
+        )
+
     def track_request(
         self,
         endpoint: str,
@@ -177,22 +329,42 @@ class MetricsCollector:
         user_id: str | None = None,
     ) -> None:
         """Track an API request."""
+        self.record_request(
+            endpoint,
+            method,
+            status_code,
+            response_time_ms,
+            trace_context.trace_id if trace_context else None,
+            user_id,
+        )
+
+    def record_request(
+        self,
+        endpoint: str,
+        method: str,
+        status_code: int,
+        response_time_ms: int,
+        trace_id: str | None = None,
+        user_id: str | None = None,
+    ) -> None:
+        """Track an API request from primitive values, without a trace context."""
         operation = f"{method} {endpoint}"
         success = status_code < 400
 
-        # Record request metrics
-        request_metric = RequestMetrics(
-            endpoint=endpoint,
-            method=method,
-            status_code=status_code,
-            response_time_ms=response_time_ms,
-            trace_id=trace_context.trace_id if trace_context else None,
-            user_id=user_id,
-        )
+        self._requests_total.labels(method, status_code).inc()
+        self._request_duration.labels(method).observe(response_time_ms / 1000)
 
         with self._lock:
             # Add to recent requests
-            self.recent_requests.append(request_metric)
+            self.recent_requests.append(
+                endpoint,
+                method,
+                status_code,
+                response_time_ms,
+                time.time(),
+                trace_id,
+                user_id,
+            )
 
             # Update operation statistics
             if operation not in self.operations:
@@ -259,13 +431,27 @@ class MetricsCollector:
                 stats.to_performance_metrics() for stats in self.operations.values()
             ]
 
+    def get_latency_sketch(self, operation: str | None = None) -> QuantileSketch:
+        """
+        Response-time sketch of one operation, or of all operations merged.
+
+        Sketches are mergeable, so the result of each worker (see
+        ``QuantileSketch.to_dict``) can be combined into fleet percentiles.
+        """
+        with self._lock:
+            if operation is not None:
+                stats = self.operations.get(operation)
+                return stats.get_sketch() if stats else QuantileSketch()
+
+            merged = QuantileSketch()
+            for stats in self.operations.values():
+                merged.merge(stats.get_sketch())
+            return merged
+
     def get_recent_requests(self, limit: int | None = None) -> list[RequestMetrics]:
         """Get recent request metrics."""
         with self._lock:
-            requests = list(self.recent_requests)
-            if limit:
-                requests = requests[-limit:]
-            return requests
+            return self.recent_requests.to_models(limit)
 
     def get_recent_errors(self, limit: int | None = None) -> list[ErrorMetrics]:
         """Get recent error metrics."""
@@ -325,14 +511,16 @@ class MetricsCollector:
         )
 
         with self._lock:
-            for request in self.recent_requests:
-                stats = endpoint_stats[request.endpoint]
-                stats["request_count"] += 1
-                stats["total_response_time"] += request.response_time_ms
-                stats["methods"].add(request.method)
+            rows = self.recent_requests.rows()
 
-                if request.status_code >= 400:
-                    stats["error_count"] += 1
+        for endpoint, method, status_code, response_time_ms in rows:
+            stats = endpoint_stats[endpoint]
+            stats["request_count"] += 1
+            stats["total_response_time"] += response_time_ms
+            stats["methods"].add(method)
+
+            if status_code >= 400:
+                stats["error_count"] += 1
 
         # Calculate averages and convert sets to lists
         result = {}
@@ -365,11 +553,9 @@ class MetricsCollector:
 
         with self._lock:
             # Clean old requests
-            while (
-                self.recent_requests and self.recent_requests[0].timestamp < cutoff_time
-            ):
-                self.recent_requests.popleft()
-                cleaned_count += 1
+            cleaned_count += self.recent_requests.drop_before(
+                time.time() - max_age_hours * 3600
+            )
 
             # Clean old errors
             while self.recent_errors and self.recent_errors[0].timestamp < cutoff_time:
@@ -0,0 +1,455 @@
+"""
+Prometheus metrics registry with per-worker recording and text exposition.
+"""
+
+import asyncio
+import json
+import math
+import os
+import tempfile
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default histogram buckets (seconds unless noted)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+FIRST_EVENT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+
+class _CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        self.value += amount
+
+
+class _GaugeValue:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _HistogramValue:
+    __slots__ = ("counts", "sum", "upper_bounds")
+
+    def __init__(self, upper_bounds: tuple[float, ...]) -> None:
+        self.upper_bounds = upper_bounds
+        # One count per bucket plus the +Inf bucket, not cumulative
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+
+class _Metric:
+    """Metric family keyed by label values."""
+
+    metric_type = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], Any] = {}
+        if not self.labelnames:
+            # Unlabeled metrics are exported from the start, even at zero
+            self._children[()] = self._new_child()
+
+    def labels(self, *values: Any, **labels: Any) -> Any:
+        """Child for one combination of label values."""
+        if labels:
+            values = tuple(labels[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            # setdefault keeps the first child if two callers race
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def _default(self) -> Any:
+        if self.labelnames:
+            raise ValueError(f"{self.name} requires labels {self.labelnames}")
+        return self.labels()
+
+    def _dump(self) -> list[list[Any]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def _new_child(self) -> _CounterValue:
+        return _CounterValue()
+
+    def _dump(self) -> list[list[Any]]:
+        return [[list(key), child.value] for key, child in self._children.items()]
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down.
+
+    ``multiprocess_mode`` decides how the values of live workers combine:
+    ``"sum"`` adds them and ``"max"`` keeps the largest.
+    """
+
+    metric_type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        multiprocess_mode: str = "sum",
+    ) -> None:
+        if multiprocess_mode not in ("sum", "max"):
+            raise ValueError("multiprocess_mode must be 'sum' or 'max'")
+        super().__init__(name, documentation, labelnames)
+        self.multiprocess_mode = multiprocess_mode
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def _new_child(self) -> _GaugeValue:
+        return _GaugeValue()
+
+    def _dump(self) -> list[list[Any]]:
+        return [[list(key), child.value] for key, child in self._children.items()]
+
+
+class Histogram(_Metric):
+    """Distribution counted into fixed buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+        if not self.buckets:
+            raise ValueError("Histogram needs at least one bucket")
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _dump(self) -> list[list[Any]]:
+        return [
+            [list(key), list(child.counts), child.sum]
+            for key, child in self._children.items()
+        ]
+
+
+class MetricsRegistry:
+    """
+    Per-worker registry of Prometheus metrics.
+
+    Recording touches a single in-process value and takes no lock, which
+    is safe for updates made from a worker's event loop. When
+    ``multiprocess_dir`` is set (by default from ``PROMETHEUS_MULTIPROC_DIR``),
+    each worker periodically writes its values to ``<dir>/<pid>.json`` and
+    ``render`` sums the files of all workers, so any worker can answer a
+    scrape for the whole deployment. Gauges only count workers that are
+    still running; counters and histograms of exited workers are kept so
+    totals never go backwards.
+    """
+
+    def __init__(self, multiprocess_dir: str | None = None) -> None:
+        self.multiprocess_dir = multiprocess_dir or os.environ.get(MULTIPROCESS_DIR_ENV)
+        self._metrics: dict[str, _Metric] = {}
+        self._collect_hooks: list[Callable[[], None]] = []
+        self._flush_task: asyncio.Task[None] | None = None
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        multiprocess_mode: str = "sum",
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, multiprocess_mode))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def add_collect_hook(self, hook: Callable[[], None]) -> None:
+        """Call ``hook`` before every snapshot, e.g. to refresh gauges."""
+        self._collect_hooks.append(hook)
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-serializable values of this worker's metrics."""
+        for hook in self._collect_hooks:
+            hook()
+
+        snapshot: dict[str, Any] = {}
+        for name, metric in list(self._metrics.items()):
+            entry: dict[str, Any] = {
+                "type": metric.metric_type,
+                "help": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "samples": metric._dump(),
+            }
+            if isinstance(metric, Histogram):
+                entry["buckets"] = list(metric.buckets)
+            elif isinstance(metric, Gauge):
+                entry["mode"] = metric.multiprocess_mode
+            snapshot[name] = entry
+        return snapshot
+
+    def flush(self) -> None:
+        """Write this worker's snapshot for the other workers to read."""
+        if not self.multiprocess_dir:
+            return
+
+        os.makedirs(self.multiprocess_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.multiprocess_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as handle:
+                json.dump(self.snapshot(), handle)
+            os.replace(temp_path, self._snapshot_path(os.getpid()))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def start_flusher(self, interval: float = 5.0) -> None:
+        """Flush periodically from the running event loop."""
+        if not self.multiprocess_dir or self._flush_task is not None:
+            return
+
+        async def flush_periodically() -> None:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+
+        self._flush_task = asyncio.create_task(flush_periodically())
+
+    def stop_flusher(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        try:
+            self.flush()
+        except OSError:
+            pass
+
+    def collect(self) -> dict[str, Any]:
+        """Snapshot of all workers merged into one."""
+        own = self.snapshot()
+        if not self.multiprocess_dir or not os.path.isdir(self.multiprocess_dir):
+            return own
+
+        own_pid = os.getpid()
+        snapshots = [(own, True)]
+        for filename in os.listdir(self.multiprocess_dir):
+            pid_text, _, extension = filename.partition(".")
+            if extension != "json" or not pid_text.isdigit():
+                continue
+            pid = int(pid_text)
+            if pid == own_pid:
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, filename)) as handle:
+                    snapshots.append((json.load(handle), _pid_alive(pid)))
+            except (OSError, ValueError):
+                continue
+
+        return _merge_snapshots(snapshots)
+
+    def render(self) -> str:
+        """Metrics of all workers in the Prometheus text format."""
+        lines: list[str] = []
+        for name, entry in sorted(self.collect().items()):
+            lines.append(f"# HELP {name} {_escape_help(entry['help'])}")
+            lines.append(f"# TYPE {name} {entry['type']}")
+            labelnames = entry["labelnames"]
+
+            for sample in entry["samples"]:
+                labels = list(zip(labelnames, sample[0], strict=True))
+                if entry["type"] != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_fmt(sample[1])}")
+                    continue
+
+                counts, total = sample[1], sample[2]
+                cumulative = 0
+                bounds = [*entry["buckets"], math.inf]
+                for bound, count in zip(bounds, counts, strict=True):
+                    cumulative += count
+                    bucket_labels = [*labels, ("le", _fmt(bound))]
+                    lines.append(
+                        f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{_format_labels(labels)} {_fmt(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Any) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if (
+                type(existing) is not type(metric)
+                or existing.labelnames != metric.labelnames
+            ):
+                raise ValueError(f"Metric {metric.name} already registered differently")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def _snapshot_path(self, pid: int) -> str:
+        return os.path.join(self.multiprocess_dir or "", f"{pid}.json")
+
+
+def _merge_snapshots(snapshots: list[tuple[dict[str, Any], bool]]) -> dict[str, Any]:
+    merged: dict[str, Any] = {}
+    values: dict[str, dict[tuple[str, ...], Any]] = {}
+
+    for snapshot, alive in snapshots:
+        for name, entry in snapshot.items():
+            if name not in merged:
+                merged[name] = {**entry, "samples": []}
+                values[name] = {}
+            target = merged[name]
+            if target["type"] != entry["type"] or target.get("buckets") != entry.get(
+                "buckets"
+            ):
+                continue
+            if entry["type"] == "gauge" and not alive:
+                continue
+
+            samples = values[name]
+            for sample in entry["samples"]:
+                key = tuple(sample[0])
+                current = samples.get(key)
+                if current is None:
+                    samples[key] = [
+                        list(part) if isinstance(part, list) else part
+                        for part in sample
+                    ]
+                elif entry["type"] == "histogram":
+                    current[1] = [
+                        a + b for a, b in zip(current[1], sample[1], strict=True)
+                    ]
+                    current[2] += sample[2]
+                elif entry.get("mode") == "max":
+                    current[1] = max(current[1], sample[1])
+                else:
+                    current[1] += sample[1]
+
+    for name, entry in merged.items():
+        entry["samples"] = list(values[name].values())
+    return merged
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: list[tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels)
+        + "}"
+    )
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Global registry instance
+_registry: MetricsRegistry | None = None
+
+
+def get_prometheus_registry() -> MetricsRegistry:
+    """Get the worker's global metrics registry."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
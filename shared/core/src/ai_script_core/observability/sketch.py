@@ -0,0 +1,148 @@
+"""
+Mergeable streaming quantile sketches for latency percentiles.
+"""
+
+import math
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Any
+
+
+class QuantileSketch:
+    """
+    DDSketch-style quantile sketch over non-negative values.
+
+    Values are counted in logarithmic buckets, so every quantile is returned
+    within ``relative_accuracy`` of the exact value. Memory is bounded by
+    ``max_buckets``; past that the lowest buckets are collapsed, which keeps
+    the upper percentiles accurate. Sketches with the same parameters merge
+    by adding bucket counts, so per-worker sketches combine into fleet-wide
+    percentiles.
+    """
+
+    # Values at or below this are counted as zero
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+        self._bins: dict[int, int] = {}
+        self._floor_key: float = -math.inf
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+        # Sorted keys and cumulative counts, rebuilt on the first read after
+        # a change so repeated percentile reads are cheap
+        self._keys: list[int] | None = None
+        self._cumulative: list[int] = []
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Record ``value`` ``count`` times."""
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        if value <= self.MIN_VALUE:
+            self.zero_count += count
+        else:
+            key = max(math.ceil(math.log(value) / self._log_gamma), self._floor_key)
+            self._bins[key] = self._bins.get(key, 0) + count
+            if len(self._bins) > self.max_buckets:
+                self._collapse()
+        self._keys = None
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add another sketch's values to this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        if not other.count:
+            return
+
+        for key, count in other._bins.items():
+            key = max(key, self._floor_key)
+            self._bins[key] = self._bins.get(key, 0) + count
+        if len(self._bins) > self.max_buckets:
+            self._collapse()
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._keys = None
+
+    def quantile(self, q: float) -> float:
+        """Approximate value at quantile ``q`` (0-1); 0.0 when empty."""
+        if not self.count:
+            return 0.0
+        if self._keys is None:
+            self._keys = sorted(self._bins)
+            self._cumulative = list(accumulate(self._bins[k] for k in self._keys))
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count or not self._keys:
+            return self.min
+
+        index = bisect_right(self._cumulative, rank - self.zero_count)
+        index = min(index, len(self._keys) - 1)
+        value = 2 * self._gamma ** self._keys[index] / (self._gamma + 1)
+        return min(max(value, self.min), self.max)
+
+    def percentile(self, percentile: float) -> float:
+        """Approximate value at ``percentile`` (0-100)."""
+        return self.quantile(percentile / 100)
+
+    def copy(self) -> "QuantileSketch":
+        sketch = QuantileSketch(self.relative_accuracy, self.max_buckets)
+        sketch.merge(self)
+        return sketch
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serializable form, for merging sketches across workers."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "bins": {str(key): count for key, count in self._bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch._bins = {int(key): count for key, count in data["bins"].items()}
+        if sketch._bins and len(sketch._bins) >= sketch.max_buckets:
+            sketch._floor_key = min(sketch._bins)
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+    def _collapse(self) -> None:
+        keys = sorted(self._bins)
+        excess = len(keys) - self.max_buckets
+        floor = keys[excess]
+        self._bins[floor] += sum(self._bins.pop(key) for key in keys[:excess])
+        self._floor_key = floor
@@ -0,0 +1,133 @@
+"""
+ASGI building blocks shared by the services' middleware.
+
+The services' middleware are plain ASGI callables instead of
+``BaseHTTPMiddleware`` subclasses: response messages (SSE streams included)
+are forwarded as they are produced, no task or memory stream is created per
+request, and request headers are decoded once and shared along the stack.
+"""
+
+from typing import Any
+
+from starlette.responses import JSONResponse
+from starlette.types import Message, Receive, Scope, Send
+
+# Scope key under which the decoded request headers are cached
+HEADERS_SCOPE_KEY = "ai_script_core.headers"
+
+RawHeaders = list[tuple[bytes, bytes]]
+
+
+def request_headers(scope: Scope) -> dict[str, str]:
+    """
+    Request headers keyed by lowercase name, decoded on first use.
+
+    A repeated header keeps its first value here; checks that must see
+    every value use ``request_header_items``.
+    """
+    headers = scope.get(HEADERS_SCOPE_KEY)
+    if headers is None:
+        headers = {}
+        for name, value in request_header_items(scope):
+            headers.setdefault(name, value)
+        scope[HEADERS_SCOPE_KEY] = headers
+    return headers
+
+
+def request_header_items(scope: Scope) -> list[tuple[str, str]]:
+    """Every request header as a ``(lowercase name, value)`` pair, in order."""
+    return [
+        (name.decode("latin-1").lower(), value.decode("latin-1"))
+        for name, value in scope.get("headers") or ()
+    ]
+
+
+def client_ip(scope: Scope) -> str:
+    """Extract client IP considering proxy headers."""
+    headers = request_headers(scope)
+    forwarded_for = headers.get("x-forwarded-for")
+    if forwarded_for:
+        # Take the first IP (client)
+        return forwarded_for.split(",")[0].strip()
+
+    real_ip = headers.get("x-real-ip")
+    if real_ip:
+        return real_ip.strip()
+
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def encode_headers(headers: dict[str, str]) -> RawHeaders:
+    """Encode headers into the raw ASGI form."""
+    return [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in headers.items()
+    ]
+
+
+def send_with_headers(
+    send: Send, headers: RawHeaders, remove: frozenset[bytes] = frozenset()
+) -> Send:
+    """
+    Wrap ``send`` to set ``headers`` on the response start message.
+
+    Existing headers with the same names, and any named in ``remove``, are
+    replaced in one pass; body messages are forwarded untouched.
+    """
+    replaced = remove.union(name for name, _ in headers)
+
+    async def send_wrapper(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            raw_headers = [
+                item
+                for item in message.get("headers") or ()
+                if item[0].lower() not in replaced
+            ]
+            raw_headers.extend(headers)
+            message["headers"] = raw_headers
+        await send(message)
+
+    return send_wrapper
+
+
+async def send_error(
+    scope: Scope,
+    receive: Receive,
+    send: Send,
+    status_code: int,
+    detail: Any,
+    headers: dict[str, str] | None = None,
+) -> None:
+    """Send an error response shaped like FastAPI's ``HTTPException`` handler."""
+    response = JSONResponse(
+        {"detail": detail}, status_code=status_code, headers=headers
+    )
+    await response(scope, receive, send)
+
+
+async def read_body(receive: Receive) -> bytes:
+    """Read the complete request body from ``receive``."""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def replay_body(body: bytes, receive: Receive) -> Receive:
+    """Receive channel that yields an already read body, then defers to ``receive``."""
+    replayed = False
+
+    async def replay() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
@@ -0,0 +1,293 @@
+"""
+Observability Tests - Verify sketches, metrics export and middleware overhead
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import time
+
+import pytest
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import Response
+
+from ai_script_core.observability import (
+    MetricsRegistry,
+    QuantileSketch,
+    TraceHeaders,
+    fastapi_middleware,
+)
+from ai_script_core.observability.fastapi_middleware import (
+    ObservabilityMiddleware,
+    get_trace_context,
+)
+from ai_script_core.observability.metrics import MetricsCollector, OperationStats
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[round(q * (len(ordered) - 1))]
+
+
+class TestQuantileSketch:
+    """Test sketch accuracy, merging and serialization"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Every quantile is within the configured relative error"""
+        rng = random.Random(7)
+        values = [rng.lognormvariate(-2, 1.5) for _ in range(20000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.5, 0.9, 0.95, 0.99, 0.999):
+            exact = exact_quantile(values, q)
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+        assert sketch.count == len(values)
+        assert sketch.mean == pytest.approx(statistics.fmean(values))
+        assert sketch.quantile(0) == min(values)
+        assert sketch.quantile(1) == pytest.approx(max(values), rel=0.011)
+
+    def test_merge_matches_single_sketch(self):
+        """Merged per-worker sketches equal one sketch of all values"""
+        rng = random.Random(11)
+        values = [rng.expovariate(5) for _ in range(3000)] + [0.0] * 10
+        whole = QuantileSketch()
+        parts = [QuantileSketch() for _ in range(3)]
+        for index, value in enumerate(values):
+            whole.add(value)
+            parts[index % 3].add(value)
+
+        merged = QuantileSketch()
+        for part in parts:
+            merged.merge(QuantileSketch.from_dict(part.to_dict()))
+
+        assert merged.count == whole.count
+        for percentile in (1, 50, 95, 99):
+            assert merged.percentile(percentile) == whole.percentile(percentile)
+        with pytest.raises(ValueError):
+            merged.merge(QuantileSketch(relative_accuracy=0.05))
+
+    def test_bucket_count_is_bounded(self):
+        """Collapsing low buckets keeps memory bounded and upper tail exact"""
+        sketch = QuantileSketch(max_buckets=64)
+        values = [1.1**exponent for exponent in range(1000)]
+        for value in values:
+            sketch.add(value)
+
+        assert len(sketch._bins) <= 64
+        assert sketch.quantile(0.99) == pytest.approx(
+            exact_quantile(values, 0.99), rel=0.011
+        )
+        assert QuantileSketch().quantile(0.5) == 0.0
+
+
+class TestOperationStats:
+    """Test latency percentiles tracked per operation"""
+
+    def test_percentiles_from_sketch_window(self):
+        """Percentiles cover the recent window and merge across operations"""
+        stats = OperationStats("generate", max_history=100)
+        for latency in range(1, 101):
+            stats.record_request(float(latency), success=True)
+
+        assert stats.get_percentile(50) == pytest.approx(50, rel=0.02)
+        assert stats.get_percentile(99) == pytest.approx(99, rel=0.02)
+        assert stats.get_average() == pytest.approx(50.5)
+
+        collector = MetricsCollector("test-service")
+        collector.track_performance("render", 10.0)
+        collector.track_performance("export", 1000.0)
+        merged = collector.get_latency_sketch()
+        assert merged.count == 2
+        assert collector.get_latency_sketch("render").max == 10.0
+        assert collector.get_latency_sketch("missing").count == 0
+
+
+class TestPrometheusRegistry:
+    """Test metric recording, exposition and multi-worker aggregation"""
+
+    def test_render_text_format(self):
+        """Counters, gauges and histograms render as Prometheus text"""
+        registry = MetricsRegistry()
+        requests = registry.counter("app_requests_total", "Requests", ("status",))
+        requests.labels("200").inc()
+        requests.labels(status="200").inc(2)
+        registry.gauge("app_jobs_active", "Active jobs").set(3)
+        latency = registry.histogram("app_latency_seconds", "Latency", buckets=(0.1, 1))
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+
+        text = registry.render()
+        assert "# TYPE app_requests_total counter" in text
+        assert 'app_requests_total{status="200"} 3.0' in text
+        assert "app_jobs_active 3.0" in text
+        assert 'app_latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'app_latency_seconds_bucket{le="1.0"} 2' in text
+        assert 'app_latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "app_latency_seconds_count 3" in text
+        assert registry.counter("app_requests_total", "", ("status",)) is requests
+        with pytest.raises(ValueError):
+            registry.gauge("app_requests_total", "Requests")
+        with pytest.raises(ValueError):
+            requests.inc(-1)
+
+    def test_workers_merge_through_directory(self, tmp_path):
+        """Counters sum over all workers, gauges over live workers only"""
+        worker = MetricsRegistry(str(tmp_path))
+        worker.counter("app_requests_total", "Requests").inc(2)
+        worker.gauge("app_jobs_active", "Active jobs").set(1)
+        worker.histogram("app_latency_seconds", "Latency", buckets=(1,)).observe(0.5)
+        snapshot = worker.snapshot()
+
+        # A live sibling (the test runner's parent) and an exited worker
+        for pid in (os.getppid(), 2**22 + 1):
+            (tmp_path / f"{pid}.json").write_text(json.dumps(snapshot))
+
+        text = worker.render()
+        assert "app_requests_total 6.0" in text
+        assert "app_jobs_active 2.0" in text
+        assert 'app_latency_seconds_bucket{le="1.0"} 3' in text
+
+        worker.flush()
+        assert json.loads((tmp_path / f"{os.getpid()}.json").read_text()) == snapshot
+
+
+def _http_scope(headers=()):
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/items",
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+        "client": ("127.0.0.1", 5000),
+    }
+
+
+async def _call(app, scope, sent=None):
+    """Run an ASGI app for one request, returning the messages it sent."""
+    sent = [] if sent is None else sent
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+
+class TestObservabilityMiddleware:
+    """Test the per-request fast path of the observability middleware"""
+
+    @pytest.fixture
+    def middleware(self):
+        middleware = ObservabilityMiddleware(
+            Response("ok"), service_name="bench-service", enable_idempotency=False
+        )
+        middleware.structured_logger.logger.setLevel(logging.WARNING)
+        yield middleware
+        middleware.structured_logger.logger.setLevel(logging.INFO)
+
+    def test_trace_context_built_on_demand(self, middleware, monkeypatch):
+        """No models are built unless a route or an enabled log needs them"""
+        built = []
+        real_trace_context = fastapi_middleware.TraceContext
+        monkeypatch.setattr(
+            fastapi_middleware,
+            "TraceContext",
+            lambda **kwargs: built.append(kwargs) or real_trace_context(**kwargs),
+        )
+        requests = []
+
+        async def app(scope, receive, send):
+            requests.append(Request(scope))
+            await Response("ok")(scope, receive, send)
+
+        middleware.app = app
+        scope = _http_scope([("X-Trace-Id", "trace_abc"), ("X-Job-Id", "job_1")])
+        start = asyncio.run(_call(middleware, scope))[0]
+
+        headers = Headers(raw=start["headers"])
+        assert headers[TraceHeaders.TRACE_ID] == "trace_abc"
+        assert headers[TraceHeaders.JOB_ID] == "job_1"
+        assert built == []
+
+        context = get_trace_context(requests[0])
+        assert context.trace_id == "trace_abc"
+        assert context.metadata["source_headers"]["x-job-id"] == "job_1"
+        assert len(built) == 1
+
+    def test_streaming_body_passes_through(self, middleware):
+        """Each chunk reaches the server before the app produces the next"""
+        sent = []
+        forwarded = []
+
+        async def app(scope, receive, send):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [(b"content-type", b"text/event-stream")],
+                }
+            )
+            for index in range(3):
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": f"data: {index}\n\n".encode(),
+                        "more_body": index < 2,
+                    }
+                )
+                forwarded.append(len(sent))
+
+        middleware.app = app
+        asyncio.run(_call(middleware, _http_scope(), sent))
+
+        assert forwarded == [2, 3, 4]
+        assert TraceHeaders.TRACE_ID in Headers(raw=sent[0]["headers"])
+        assert (
+            middleware.metrics_collector.get_endpoint_stats()["/items"]["request_count"]
+            >= 1
+        )
+
+    def test_excluded_paths_pass_through_untouched(self, middleware):
+        """Excluded paths reach the app with the server's send channel"""
+        sends = []
+
+        async def app(scope, receive, send):
+            sends.append(send)
+
+        middleware.app = app
+        scope = dict(_http_scope(), path="/health")
+
+        async def send(message):
+            pass
+
+        asyncio.run(middleware(scope, None, send))
+        assert sends == [send]
+        assert "state" not in scope
+
+    def test_per_request_overhead(self, middleware):
+        """Micro-benchmark of the middleware's overhead per request"""
+        iterations = 2000
+        app = middleware.app
+
+        async def run(target):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                await _call(target, _http_scope([("X-Trace-Id", "trace_abc")]))
+            return time.perf_counter() - started
+
+        baseline = asyncio.run(run(app))
+        elapsed = asyncio.run(run(middleware))
+        overhead_us = (elapsed - baseline) / iterations * 1e6
+
+        # Generous bound so the check is stable on slow CI machines
+        assert overhead_us < 500, f"overhead {overhead_us:.1f}us/request"
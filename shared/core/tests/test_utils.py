@@ -604,5 +604,26 @@ class TestIntegration:
         assert restored_data["message"] == clean_text
 
 
+class TestAsgiHelpers:
+    """ASGI 헬퍼 테스트"""
+
+    def test_request_headers_keep_every_value(self):
+        """반복된 헤더의 모든 값 유지 테스트"""
+        from ai_script_core.utils.asgi import request_header_items, request_headers
+
+        scope = {
+            "headers": [
+                (b"Referer", b"https://example.com"),
+                (b"referer", b"<script>"),
+            ]
+        }
+
+        assert request_headers(scope) == {"referer": "https://example.com"}
+        assert request_header_items(scope) == [
+            ("referer", "https://example.com"),
+            ("referer", "<script>"),
+        ]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])